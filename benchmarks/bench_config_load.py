@@ -0,0 +1,74 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare :py:meth:`nemo_nowcast.config.Config.load` without the
+configuration cache (cold) and with a valid cache (warm).
+
+The configuration file is :file:`docs/nowcast_system/example_nowcast.yaml`
+with a message registry of many workers appended to it so that it is the size
+of the configuration files of production nowcast systems.
+
+Run with :command:`python benchmarks/bench_config_load.py [n_workers]`
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from nemo_nowcast import Config
+
+EXAMPLE_CONFIG = (
+    Path(__file__).parent.parent / "docs/nowcast_system/example_nowcast.yaml"
+)
+
+
+def best_seconds(func):
+    timer = timeit.Timer(func)
+    n, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=n)) / n
+
+
+def main(n_workers=200):
+    os.environ.setdefault("NOWCAST_LOGS", "/nowcast/logs")
+    os.environ.setdefault("NOWCAST_ENV", "/nowcast/env")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_file = Path(tmp_dir) / "nowcast.yaml"
+        workers = "".join(
+            f"    worker_{i}:\n"
+            f"      checklist key: worker {i}\n"
+            f"      success: worker_{i} succeeded\n"
+            f"      failure: worker_{i} failed\n"
+            f"      crash: worker_{i} crashed\n"
+            for i in range(n_workers)
+        )
+        config_file.write_text(
+            EXAMPLE_CONFIG.read_text().replace(
+                "  workers:\n", f"  workers:\n{workers}", 1
+            )
+        )
+        os.environ.pop("NOWCAST_CONFIG_CACHE", None)
+        cold = best_seconds(lambda: Config().load(config_file))
+        os.environ["NOWCAST_CONFIG_CACHE"] = os.path.join(tmp_dir, "cache")
+        Config().load(config_file)
+        warm = best_seconds(lambda: Config().load(config_file))
+        size = config_file.stat().st_size
+        print(f"{size:,} byte config file with {n_workers} extra workers")
+        print(f"cold load: {cold * 1000:8.3f} ms")
+        print(f"warm load: {warm * 1000:8.3f} ms  ({cold / warm:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,123 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare downloading many files sequentially with
+:py:func:`nemo_nowcast.worker.get_web_data` in a loop with downloading them
+concurrently with :py:func:`nemo_nowcast.worker.get_web_data_many`.
+
+The files are served by a local :py:mod:`http.server` stand-in for a
+weather forecast file server that adds :py:data:`LATENCY_SECONDS` of latency
+to each request and limits the bandwidth of each connection to
+:py:data:`STREAM_BYTES_PER_SECOND`.
+
+The labels of the concurrent downloads show their :kbd:`max_workers` and
+:kbd:`max_per_host` arguments.
+
+Run with
+:command:`python benchmarks/bench_get_web_data_many.py [n_files [file_kib]]`
+"""
+
+import functools
+import http.server
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from nemo_nowcast.worker import get_web_data, get_web_data_many
+
+LATENCY_SECONDS = 0.02
+STREAM_BYTES_PER_SECOND = 20 * 1024**2
+BLOCK_BYTES = 64 * 1024
+
+
+class ThrottledHandler(http.server.SimpleHTTPRequestHandler):
+    def send_head(self):
+        time.sleep(LATENCY_SECONDS)
+        return super().send_head()
+
+    def copyfile(self, source, outputfile):
+        while block := source.read(BLOCK_BYTES):
+            outputfile.write(block)
+            time.sleep(len(block) / STREAM_BYTES_PER_SECOND)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def sequential(downloads):
+    with requests.Session() as session:
+        for file_url, filepath in downloads:
+            get_web_data(file_url, "bench", filepath, session)
+
+
+def concurrent(downloads, max_workers, max_per_host):
+    manifest = get_web_data_many(
+        downloads, "bench", max_workers=max_workers, max_per_host=max_per_host
+    )
+    assert all(result["status"] == "downloaded" for result in manifest)
+
+
+def main(n_files=100, file_kib=1024):
+    with tempfile.TemporaryDirectory(prefix="nemo_nowcast_bench_") as tmp:
+        tmp_dir = Path(tmp)
+        serve_dir = tmp_dir / "serve"
+        serve_dir.mkdir()
+        content = os.urandom(file_kib * 1024)
+        for i in range(n_files):
+            (serve_dir / f"{i:03d}.grib2").write_bytes(content)
+        server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0),
+            functools.partial(ThrottledHandler, directory=os.fspath(serve_dir)),
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+        print(f"{n_files} files of {file_kib} KiB")
+        print(f"{'downloader':>24} {'seconds':>8} {'MiB/s':>8}")
+        try:
+            for label, download in (
+                ("get_web_data loop", sequential),
+                (
+                    "get_web_data_many 8/4",
+                    functools.partial(concurrent, max_workers=8, max_per_host=4),
+                ),
+                (
+                    "get_web_data_many 8/8",
+                    functools.partial(concurrent, max_workers=8, max_per_host=8),
+                ),
+            ):
+                dest_dir = tmp_dir / "dest"
+                dest_dir.mkdir()
+                downloads = [
+                    (f"{url}/{i:03d}.grib2", dest_dir / f"{i:03d}.grib2")
+                    for i in range(n_files)
+                ]
+                t_start = time.perf_counter()
+                download(downloads)
+                seconds = time.perf_counter() - t_start
+                mib = n_files * file_kib / 1024
+                print(f"{label:>24} {seconds:>8.2f} {mib / seconds:>8.1f}")
+                shutil.rmtree(dest_dir)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
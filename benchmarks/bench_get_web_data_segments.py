@@ -0,0 +1,111 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare downloading a large file in a single stream with downloading it in
+concurrent segments with the :kbd:`segments` argument of
+:py:func:`nemo_nowcast.worker.get_web_data`.
+
+The file is served by a local :py:mod:`http.server` stand-in for a
+weather forecast file server that supports range requests,
+adds :py:data:`LATENCY_SECONDS` of latency to each request,
+and limits the bandwidth of each connection to
+:py:data:`STREAM_BYTES_PER_SECOND`.
+
+Run with
+:command:`python benchmarks/bench_get_web_data_segments.py [file_mib]`
+"""
+
+import hashlib
+import http.server
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+from nemo_nowcast.worker import get_web_data
+
+LATENCY_SECONDS = 0.02
+STREAM_BYTES_PER_SECOND = 20 * 1024**2
+BLOCK_BYTES = 64 * 1024
+
+
+class ThrottledRangeHandler(http.server.BaseHTTPRequestHandler):
+    content = b""
+    etag = ""
+
+    def do_GET(self):
+        time.sleep(LATENCY_SECONDS)
+        start, end = 0, len(self.content) - 1
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") in (None, self.etag):
+            first, last = range_header.removeprefix("bytes=").split("-")
+            start, end = int(first), min(int(last or end), end)
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end}/{len(self.content)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(end + 1 - start))
+        self.end_headers()
+        view = memoryview(self.content)[start : end + 1]
+        try:
+            for i in range(0, len(view), BLOCK_BYTES):
+                block = view[i : i + BLOCK_BYTES]
+                self.wfile.write(block)
+                time.sleep(len(block) / STREAM_BYTES_PER_SECOND)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client closed the first response after reading its segment
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(file_mib=256):
+    content = os.urandom(file_mib * 1024**2)
+    handler = type(
+        "Handler",
+        (ThrottledRangeHandler,),
+        {"content": content, "etag": f'"{hashlib.md5(content).hexdigest()}"'},
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/forcing.nc"
+    print(f"1 file of {file_mib} MiB")
+    print(f"{'segments':>8} {'seconds':>8} {'MiB/s':>8}")
+    try:
+        with tempfile.TemporaryDirectory(prefix="nemo_nowcast_bench_") as tmp:
+            filepath = Path(tmp) / "forcing.nc"
+            for segments in (1, 2, 4, 8):
+                with requests.Session() as session:
+                    t_start = time.perf_counter()
+                    get_web_data(url, "bench", filepath, session, segments=segments)
+                    seconds = time.perf_counter() - t_start
+                assert filepath.read_bytes() == content
+                print(f"{segments:>8} {seconds:>8.2f} {file_mib / seconds:>8.1f}")
+                filepath.unlink()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,101 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the import time of worker start-up from
+:command:`python -X importtime -m nemo_nowcast.workers.awaken --help`.
+
+The total import time is the sum of the cumulative times of the top level
+imports in the :command:`-X importtime` report.
+The report of the median run lists the slowest top level imports.
+The benchmark fails if the median total import time exceeds the threshold,
+or if any of the dependencies that are only needed when a worker runs are
+imported.
+
+Run with
+:command:`python benchmarks/bench_import_time.py [n_runs [threshold_ms]]`
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+COMMAND = ["-X", "importtime", "-m", "nemo_nowcast.workers.awaken", "--help"]
+
+#: Default regression threshold for the median total import time.
+#: The total was about 300 ms before imports were deferred,
+#: and about 150 ms after.
+THRESHOLD_MS = 200
+
+#: Modules that should not be imported to show a worker's command-line help.
+DEFERRED = ("arrow", "requests", "sentry_sdk", "zmq")
+
+
+def import_times():
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(
+            [os.fspath(Path(__file__).parent.parent), os.environ.get("PYTHONPATH", "")]
+        ),
+    )
+    result = subprocess.run(
+        [sys.executable, *COMMAND],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Names of nested imports are indented by 2 spaces per level after
+        # the space that follows the separator
+        name = name[1:].rstrip()
+        times[name.strip()] = (int(cumulative), name.startswith(" "))
+    return times
+
+
+def main(n_runs=10, threshold_ms=THRESHOLD_MS):
+    runs = []
+    for _ in range(n_runs):
+        times = import_times()
+        top_level = {name: us for name, (us, nested) in times.items() if not nested}
+        runs.append((sum(top_level.values()) / 1000, top_level, times))
+    runs.sort(key=lambda run: run[0])
+    total_ms, top_level, times = runs[len(runs) // 2]
+    print(f"{'import':>30} {'ms':>8}")
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"{name:>30} {us / 1000:>8.1f}")
+    print(
+        f"{'total':>30} {total_ms:>8.1f}  "
+        f"(median of {n_runs} runs; "
+        f"min {runs[0][0]:.1f}, max {runs[-1][0]:.1f})"
+    )
+    deferred = sorted({name.split(".")[0] for name in times} & set(DEFERRED))
+    failed = False
+    if deferred:
+        print(f"FAIL: imported deferred dependencies: {', '.join(deferred)}")
+        failed = True
+    if statistics.median(run[0] for run in runs) > threshold_ms:
+        print(f"FAIL: median total import time exceeds {threshold_ms} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
@@ -0,0 +1,135 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the log publishing start-up time of sequential worker launches
+that pause for a fixed time before logging with that of launches that wait
+for the log aggregator's subscription.
+
+Each launch binds a log publishing handler to the same port,
+waits until it is ready to log,
+and publishes 1 log message to a subscriber thread that stays connected to
+the port and receives continuously,
+like the log aggregator.
+The start-up time is the time from the bind until the handler is ready to
+log;
+i.e. the delay that it adds to each launch.
+Messages that are not received within :py:data:`LOST_SECONDS` of being
+published are counted as lost.
+
+Run with :command:`python benchmarks/bench_log_publisher_startup.py [n_launches]`
+"""
+
+import logging
+import queue
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import zmq
+import zmq.log.handlers
+
+from nemo_nowcast import zmq_logging
+
+#: Fixed pause of the workers before they waited for subscribers.
+PAUSE_SECONDS = 0.25
+#: Time to wait for a published message before counting it as lost.
+LOST_SECONDS = 0.25
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def subscriber(port, received, stop):
+    context = zmq.Context()
+    sub = context.socket(zmq.SUB)
+    sub.connect(f"tcp://127.0.0.1:{port}")
+    sub.setsockopt_string(zmq.SUBSCRIBE, "")
+    while not stop.is_set():
+        if sub.poll(10):
+            received.put(sub.recv_multipart())
+    sub.close(linger=0)
+    context.term()
+
+
+def pause(handler):
+    time.sleep(PAUSE_SECONDS)
+
+
+def no_pause(handler):
+    pass
+
+
+def wait(handler):
+    handler.wait_for_subscriber(PAUSE_SECONDS)
+
+
+def launch_times(handler_class, ready, received, port, n_launches):
+    times, lost = [], 0
+    record = logging.LogRecord("bench", logging.INFO, "", 0, "message", None, None)
+    for _ in range(n_launches):
+        context = zmq.Context()
+        t0 = time.perf_counter()
+        handler = handler_class(f"tcp://127.0.0.1:{port}", context)
+        ready(handler)
+        times.append(time.perf_counter() - t0)
+        handler.emit(record)
+        try:
+            received.get(timeout=LOST_SECONDS)
+        except queue.Empty:
+            lost += 1
+        handler.socket.close(linger=0)
+        context.term()
+    return times, lost
+
+
+def report(label, times, lost, n_launches):
+    ms = [t * 1000 for t in times]
+    print(
+        f"{label:>18} {sum(times):>9.2f} {statistics.median(ms):>10.1f} "
+        f"{max(ms):>8.1f} {lost:>5}/{n_launches}"
+    )
+
+
+def main(n_launches=100):
+    port = free_port()
+    received, stop = queue.Queue(), threading.Event()
+    thread = threading.Thread(target=subscriber, args=(port, received, stop))
+    thread.start()
+    print(
+        f"{'publisher':>18} {'total s':>9} {'median ms':>10} {'max ms':>8} "
+        f"{'lost':>11}"
+    )
+    try:
+        for label, handler_class, ready in (
+            ("PUB, no pause", zmq.log.handlers.PUBHandler, no_pause),
+            (f"PUB, {PAUSE_SECONDS} s pause", zmq.log.handlers.PUBHandler, pause),
+            ("XPUB, wait", zmq_logging.XPUBHandler, wait),
+        ):
+            report(
+                label,
+                *launch_times(handler_class, ready, received, port, n_launches),
+                n_launches,
+            )
+    finally:
+        stop.set()
+        thread.join()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
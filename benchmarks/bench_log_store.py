@@ -0,0 +1,95 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measure the write throughput of :py:class:`nemo_nowcast.log_store.SQLiteHandler`
+with 1 transaction per record and 1 transaction per batch of records,
+and the time to query the resulting store for the records of 1 worker on 1
+day.
+
+The records are spread over 30 days and 20 workers.
+
+Run with :command:`python benchmarks/bench_log_store.py [n_records]`
+"""
+
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from nemo_nowcast import log_aggregator, log_store
+
+N_WORKERS = 20
+N_DAYS = 30
+BATCH_SIZE = log_aggregator.BATCH_SIZE
+
+
+def records(n_records, start):
+    seconds = N_DAYS * 86400 / n_records
+    for i in range(n_records):
+        record = logging.LogRecord(
+            "log_aggregator", logging.INFO, "", 0, f"message {i}", None, None
+        )
+        record.logger_name = f"worker_{i % N_WORKERS}"
+        record.created = start + i * seconds
+        yield record
+
+
+def write(store, n_records, start, batched):
+    handler = log_store.SQLiteHandler(store)
+    listener = log_aggregator._BatchQueueListener(None, handler)
+    batch = []
+    t_start = time.perf_counter()
+    for record in records(n_records, start):
+        if not batched:
+            handler.handle(record)
+            continue
+        batch.append(record)
+        if len(batch) == BATCH_SIZE:
+            listener.handle(batch)
+            batch = []
+    if batch:
+        listener.handle(batch)
+    handler.close()
+    return time.perf_counter() - t_start
+
+
+def main(n_records=100_000):
+    start = time.time() - N_DAYS * 86400
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for batched in (False, True):
+            store = Path(tmp_dir) / f"nowcast-{batched}.sqlite"
+            seconds = write(store, n_records, start, batched)
+            label = f"batches of {BATCH_SIZE}" if batched else "1 record at a time"
+            print(
+                f"write {n_records} records {label:>20}: "
+                f"{seconds:.2f} s, {n_records / seconds:,.0f} records/s"
+            )
+        connection = log_store.connect(store, readonly=True)
+        day = start + 15 * 86400
+        timings = []
+        for _ in range(20):
+            t_start = time.perf_counter()
+            rows = log_store.query(connection, ["worker_7"], day, day + 86400)
+            timings.append(time.perf_counter() - t_start)
+        connection.close()
+        print(
+            f"query {len(rows)} records of 1 worker on 1 day: "
+            f"{statistics.median(timings) * 1000:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,61 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare message round-trip latency and bytes on the wire for the
+:py:class:`nemo_nowcast.message.Message` codecs.
+
+The payload is a download worker style checklist with thousands of file names.
+
+Run with :command:`python benchmarks/bench_message_codecs.py [n_files]`
+"""
+
+import importlib.util
+import sys
+import timeit
+
+from nemo_nowcast import Message
+
+
+def checklist_payload(n_files):
+    return {
+        f"{hr:02d} forecast": {
+            "run date": "2026-10-17",
+            "files": [
+                f"/results/forcing/atmospheric/GEM2.5/GRIB/20261017/{hr:02d}/"
+                f"CMC_hrdps_west_UGRD_TGL_10_ps2.5km_2026101700_P{i:03d}-00.grib2"
+                for i in range(n_files // 4)
+            ],
+        }
+        for hr in (0, 6, 12, 18)
+    }
+
+
+def main(n_files=4000):
+    msg = Message("download_weather", "success 00", checklist_payload(n_files))
+    codecs = ["yaml", "binary"]
+    if importlib.util.find_spec("msgpack") is not None:
+        codecs.append("msgpack")
+    print(f"payload with {n_files} file names")
+    print(f"{'codec':>8} {'bytes':>10} {'round-trip ms':>14}")
+    for codec in codecs:
+        frame = msg.serialize(codec)
+        n_bytes = len(frame.encode() if isinstance(frame, str) else frame)
+        timer = timeit.Timer(lambda: Message.deserialize(msg.serialize(codec)))
+        n, _ = timer.autorange()
+        best = min(timer.repeat(repeat=3, number=n)) / n
+        print(f"{codec:>8} {n_bytes:>10} {best * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
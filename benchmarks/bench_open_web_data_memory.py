@@ -0,0 +1,101 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the peak memory use of parsing a large CSV response that is
+returned by :py:func:`nemo_nowcast.worker.get_web_data` with that of
+stream-parsing it from :py:func:`nemo_nowcast.worker.open_web_data`.
+
+Peak memory is measured with :py:mod:`tracemalloc`.
+The CSV content is generated before tracing starts and is served by a local
+:py:mod:`http.server` in memoryview slices,
+so the peaks are those of the downloads and the parsing.
+
+Run with
+:command:`python benchmarks/bench_open_web_data_memory.py [csv_mib]`
+"""
+
+import csv
+import http.server
+import io
+import sys
+import threading
+import time
+import tracemalloc
+
+import requests
+
+from nemo_nowcast.worker import get_web_data, open_web_data
+
+BLOCK_BYTES = 64 * 1024
+
+
+class CSVHandler(http.server.BaseHTTPRequestHandler):
+    content = b""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(self.content)))
+        self.end_headers()
+        view = memoryview(self.content)
+        for i in range(0, len(view), BLOCK_BYTES):
+            self.wfile.write(view[i : i + BLOCK_BYTES])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _sum_rows(reader):
+    return sum(float(row[1]) for row in reader)
+
+
+def parse_content(url, session):
+    content = get_web_data(url, "bench", session=session)
+    return _sum_rows(csv.reader(io.StringIO(content.decode("utf-8"))))
+
+
+def parse_stream(url, session):
+    with open_web_data(url, "bench", session=session) as f:
+        return _sum_rows(csv.reader(io.TextIOWrapper(f, encoding="utf-8")))
+
+
+def main(csv_mib=64):
+    row = b"2026-10-17T00:00:00,12.345678,-123.456789,49.123456\n"
+    content = row * (csv_mib * 1024**2 // len(row))
+    handler = type("Handler", (CSVHandler,), {"content": content})
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/obs.csv"
+    print(f"{len(content) / 1024**2:.0f} MiB CSV")
+    print(f"{'parser':>24} {'seconds':>8} {'peak MiB':>9}")
+    try:
+        with requests.Session() as session:
+            for label, parse in (
+                ("get_web_data content", parse_content),
+                ("open_web_data stream", parse_stream),
+            ):
+                tracemalloc.start()
+                t_start = time.perf_counter()
+                parse(url, session)
+                seconds = time.perf_counter() - t_start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{label:>24} {seconds:>8.2f} {peak / 1024**2:>9.1f}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,155 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the launch-to-first-log latency of workers launched in a
+subprocess with that of workers launched by :py:mod:`nemo_nowcast.forkserver`.
+
+Workers are launched via :py:meth:`nemo_nowcast.worker.NextWorker.launch`.
+The benchmark worker imports the same packages as
+:py:mod:`nemo_nowcast.worker`,
+loads the configuration file,
+configures logging from it,
+and emits one log message.
+The latency is the time from the launch call to the timestamp of that message.
+
+Run with :command:`python benchmarks/bench_worker_launch.py [n_launches]`
+"""
+
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from nemo_nowcast import Config, NextWorker
+
+WORKER_MODULE = """\
+import logging.config
+import sys
+
+import arrow
+import requests
+import sentry_sdk
+import zmq
+
+from nemo_nowcast import Config, NowcastWorker
+
+
+def main():
+    config = Config()
+    config.load(sys.argv[1])
+    logging.config.dictConfig(config["logging"])
+    logging.getLogger("bench_worker").info(sys.argv[2])
+
+
+if __name__ == "__main__":
+    main()
+"""
+
+CONFIG = """\
+checklist file: {tmp_dir}/nowcast_checklist.yaml
+python: {python}
+logging:
+  version: 1
+  formatters:
+    created:
+      format: '%(created)f %(message)s'
+  handlers:
+    bench:
+      class: logging.FileHandler
+      filename: {tmp_dir}/bench.log
+      formatter: created
+  root:
+    level: INFO
+    handlers:
+      - bench
+run:
+  launcher: {launcher}
+  forkserver:
+    socket: {tmp_dir}/forkserver.sock
+    preload:
+      - bench_worker
+"""
+
+
+def launch_latencies(config, tmp_dir, n_launches):
+    log_file = tmp_dir / "bench.log"
+    latencies = []
+    for i in range(n_launches):
+        tag = f"{config['run']['launcher']}-{i}"
+        t0 = time.time()
+        NextWorker("bench_worker", [tag]).launch(config, "bench")
+        while True:
+            lines = log_file.read_text().splitlines() if log_file.exists() else []
+            created = [float(line.split()[0]) for line in lines if tag in line]
+            if created:
+                latencies.append(created[0] - t0)
+                break
+            time.sleep(0.001)
+    return latencies
+
+
+def load_config(tmp_dir, launcher):
+    config_file = tmp_dir / f"{launcher}.yaml"
+    config_file.write_text(
+        CONFIG.format(tmp_dir=tmp_dir, python=sys.executable, launcher=launcher)
+    )
+    config = Config()
+    config.load(config_file)
+    return config
+
+
+def report(label, latencies):
+    ms = [latency * 1000 for latency in latencies]
+    print(
+        f"{label:>12} {statistics.median(ms):>10.1f} {min(ms):>10.1f} {max(ms):>10.1f}"
+    )
+
+
+def main(n_launches=10):
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory(prefix="nemo_nowcast_bench_") as tmp:
+        tmp_dir = Path(tmp)
+        (tmp_dir / "bench_worker.py").write_text(WORKER_MODULE)
+        os.environ["PYTHONPATH"] = os.pathsep.join(
+            [tmp, os.fspath(Path(__file__).parent.parent), *sys.path[1:]]
+        )
+        subprocess_config = load_config(tmp_dir, "subprocess")
+        forkserver_config = load_config(tmp_dir, "forkserver")
+        forkserver = subprocess.Popen(
+            [sys.executable, "-m", "nemo_nowcast.forkserver", forkserver_config.file],
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            while not (tmp_dir / "forkserver.sock").exists():
+                time.sleep(0.01)
+            print(f"{'launcher':>12} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+            report(
+                "subprocess",
+                launch_latencies(subprocess_config, tmp_dir, n_launches),
+            )
+            report(
+                "forkserver",
+                launch_latencies(forkserver_config, tmp_dir, n_launches),
+            )
+        finally:
+            forkserver.terminate()
+            forkserver.wait()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
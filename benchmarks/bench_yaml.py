@@ -0,0 +1,85 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the pure-Python PyYAML loader and dumper with the libyaml ones
+that :py:mod:`nemo_nowcast.yamlutils` uses.
+
+The documents are a checklist with thousands of file names,
+and :file:`docs/nowcast_system/example_nowcast.yaml`.
+
+Run with :command:`python benchmarks/bench_yaml.py [n_files]`
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import yaml
+
+from nemo_nowcast import yamlutils
+
+EXAMPLE_CONFIG = (
+    Path(__file__).parent.parent / "docs/nowcast_system/example_nowcast.yaml"
+)
+
+
+def checklist(n_files):
+    return {
+        f"weather forecast {hr:02d}": {
+            f"file {i}": f"/results/forcing/atmospheric/GEM2.5/GRIB/20261017/{hr:02d}/"
+            f"CMC_hrdps_west_UGRD_TGL_10_ps2.5km_2026101700_P{i:03d}-00.grib2"
+            for i in range(n_files // 4)
+        }
+        for hr in (0, 6, 12, 18)
+    }
+
+
+def best_seconds(func):
+    timer = timeit.Timer(func)
+    n, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=n)) / n
+
+
+def compare(label, pure_func, fast_func):
+    pure, fast = best_seconds(pure_func), best_seconds(fast_func)
+    print(f"{label:>28} {pure * 1000:>10.2f} {fast * 1000:>10.2f} {pure / fast:>8.1f}x")
+
+
+def main(n_files=4000):
+    if not yamlutils.LIBYAML:
+        print("PyYAML was built without libyaml; nothing to compare")
+        return
+    doc = checklist(n_files)
+    text = yaml.dump(doc)
+    config_text = EXAMPLE_CONFIG.read_text()
+    print(f"{'':>28} {'pure ms':>10} {'libyaml ms':>10} {'speedup':>9}")
+    compare(
+        f"dump {n_files} entry checklist",
+        lambda: yaml.dump(doc, Dumper=yaml.SafeDumper),
+        lambda: yamlutils.dump(doc),
+    )
+    compare(
+        f"load {n_files} entry checklist",
+        lambda: yaml.load(text, Loader=yaml.SafeLoader),
+        lambda: yamlutils.safe_load(text),
+    )
+    compare(
+        "load example_nowcast.yaml",
+        lambda: yaml.load(config_text, Loader=yaml.SafeLoader),
+        lambda: yamlutils.safe_load(config_text),
+    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
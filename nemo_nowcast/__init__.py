@@ -12,9 +12,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""NEMO_Nowcast framework."""
+"""NEMO_Nowcast framework.
 
-from nemo_nowcast.cli import CommandLineInterface
-from nemo_nowcast.config import Config
-from nemo_nowcast.message import Message
-from nemo_nowcast.worker import get_web_data, NextWorker, NowcastWorker, WorkerError
+The framework's public classes and functions are imported from their modules
+on first access so that importing the package,
+or a worker module,
+doesn't import the dependencies of modules that aren't used.
+"""
+
+import importlib
+
+#: Module that each of the names that the package exports is defined in.
+_EXPORTS = {
+    "CommandLineInterface": "nemo_nowcast.cli",
+    "Config": "nemo_nowcast.config",
+    "Message": "nemo_nowcast.message",
+    "get_web_data": "nemo_nowcast.worker",
+    "get_web_data_many": "nemo_nowcast.worker",
+    "NextWorker": "nemo_nowcast.worker",
+    "NowcastWorker": "nemo_nowcast.worker",
+    "open_web_data": "nemo_nowcast.worker",
+    "WorkerError": "nemo_nowcast.worker",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module = importlib.import_module(_EXPORTS[name])
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
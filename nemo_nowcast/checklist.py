@@ -0,0 +1,341 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework system state checklist persistence.
+
+The manager writes the checklist to the checklist YAML file in a background
+thread that coalesces bursts of checklist updates into one write.
+The file is replaced atomically so that it is never left partly written.
+
+In checklist journal mode the manager appends a small record to a journal file
+for each checklist update instead of rewriting the whole checklist YAML file.
+The journal is periodically compacted into the checklist YAML file,
+which remains the human-readable snapshot of the checklist.
+
+Journal records are a 4 byte length and a 4 byte CRC-32 checksum
+followed by the record serialized with the :kbd:`binary` message codec.
+A record that was only partly written when the manager stopped is detected by
+its length or checksum,
+and is discarded when the journal is loaded.
+Clearing the checklist appends a clear record to the journal before the
+empty checklist is written to the snapshot file,
+so that a manager that stops before the journal is truncated doesn't rebuild
+the cleared checklist from the records that precede the clear record.
+"""
+
+import datetime
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import attr
+
+from nemo_nowcast import fileutils, yamlutils
+from nemo_nowcast.message import CODECS
+
+_, _dumps, _loads = CODECS["binary"]
+_RECORD_HEADER = struct.Struct("!II")
+
+#: Checklist file fsync policies.
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+def write_snapshot(checklist_file, checklist, fsync=True):
+    """Write checklist to checklist_file as YAML,
+    replacing the file atomically.
+
+    :arg checklist_file: Path of the checklist YAML file.
+    :type checklist_file: :py:class:`pathlib.Path` or str
+
+    :arg dict checklist: Nowcast system checklist.
+
+    :arg boolean fsync: Flush the file to disk before it replaces
+                        checklist_file.
+    """
+    with fileutils.atomic_save(
+        os.fspath(checklist_file), text_mode=True, overwrite_part=True
+    ) as f:
+        yamlutils.dump(checklist, f)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def update(checklist, key, payload):
+    """Update the checklist value at key with the items in payload.
+
+    If key is not present in the checklist,
+    or either its value or payload is not a :py:class:`dict`,
+    the value at key is set to payload.
+
+    The value at key is replaced rather than updated in place
+    so that a shallow copy of the checklist is a consistent snapshot of it.
+
+    :arg dict checklist: Nowcast system checklist.
+
+    :arg str key: Checklist key to update.
+
+    :arg payload: Checklist items to update the value at key with.
+    """
+    try:
+        checklist[key] = {**checklist[key], **payload}
+    except (KeyError, TypeError):
+        checklist[key] = payload
+
+
+@attr.s
+class ChecklistJournal:
+    """Construct a :py:class:`nemo_nowcast.checklist.ChecklistJournal` instance."""
+
+    #: Path of the checklist YAML snapshot file.
+    snapshot_file = attr.ib(converter=Path)
+    #: Path of the checklist journal file.
+    journal_file = attr.ib(converter=Path)
+    #: Number of journal records after which the journal is compacted into
+    #: the checklist snapshot file.
+    compact_interval = attr.ib(default=100)
+    #: Number of records in the journal file.
+    records = attr.ib(default=0, init=False)
+    #: Journal file object that records are appended to.
+    _file = attr.ib(default=None, init=False, repr=False)
+
+    def load(self):
+        """Rebuild the checklist from the snapshot file and the records in the
+        journal file.
+
+        Replaying update records is idempotent,
+        so update records that were compacted into the snapshot before the
+        journal was truncated don't change the rebuilt checklist.
+        A clear record empties the rebuilt checklist,
+        so records that precede a clear that was compacted into the snapshot
+        before the journal was truncated are discarded.
+
+        :returns: Nowcast system checklist.
+        :rtype: dict
+
+        :raises: :py:exc:`FileNotFoundError` if neither the snapshot file nor
+                 the journal file exist.
+        """
+        try:
+            with self.snapshot_file.open("rt") as f:
+                checklist = yamlutils.safe_load(f) or {}
+        except FileNotFoundError:
+            if not self.journal_file.exists():
+                raise
+            checklist = {}
+        self.records = 0
+        try:
+            journal = self.journal_file.read_bytes()
+        except FileNotFoundError:
+            return checklist
+        offset = 0
+        for record, offset in self._read_records(journal):
+            if record.get("clear"):
+                checklist.clear()
+            else:
+                update(checklist, record["key"], record["payload"])
+            self.records += 1
+        if offset < len(journal):
+            # Discard partly written record at end of journal
+            os.truncate(self.journal_file, offset)
+        return checklist
+
+    @staticmethod
+    def _read_records(journal):
+        """Generate the complete records in the journal,
+        and the offset of the end of each record.
+        """
+        offset = 0
+        while offset + _RECORD_HEADER.size <= len(journal):
+            length, crc = _RECORD_HEADER.unpack_from(journal, offset)
+            start = offset + _RECORD_HEADER.size
+            data = journal[start : start + length]
+            if len(data) < length or zlib.crc32(data) != crc:
+                return
+            offset = start + length
+            yield _loads(data), offset
+
+    def append(self, key, payload):
+        """Append a checklist update record to the journal file,
+        and flush it to disk.
+
+        :arg str key: Checklist key that was updated.
+
+        :arg payload: Checklist items that the value at key was updated with.
+        """
+        self._append_record({"key": key, "payload": payload})
+
+    def clear(self):
+        """Append a clear record to the journal file,
+        then compact the journal into an empty checklist snapshot.
+
+        The clear record ensures that the checklist is rebuilt as empty if the
+        manager stops after the snapshot file is written but before the
+        journal file is truncated.
+        """
+        self._append_record({"clear": True})
+        self.compact({})
+
+    def _append_record(self, record):
+        """Append record with a timestamp to the journal file,
+        and flush it to disk.
+        """
+        record = _dumps(
+            {**record, "timestamp": datetime.datetime.now(datetime.timezone.utc)}
+        )
+        if self._file is None:
+            self._file = self.journal_file.open("ab")
+        self._file.write(_RECORD_HEADER.pack(len(record), zlib.crc32(record)))
+        self._file.write(record)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.records += 1
+
+    @property
+    def needs_compaction(self):
+        """:py:obj:`True` if the journal has reached the compaction interval."""
+        return self.records >= self.compact_interval
+
+    def compact(self, checklist):
+        """Write checklist to the snapshot file, then truncate the journal file.
+
+        The snapshot file is replaced atomically so that it is never left
+        partly written.
+
+        :arg dict checklist: Nowcast system checklist.
+        """
+        write_snapshot(self.snapshot_file, checklist)
+        if self._file is None:
+            self._file = self.journal_file.open("ab")
+        self._file.truncate(0)
+        os.fsync(self._file.fileno())
+        self.records = 0
+
+    def close(self):
+        """Close the journal file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+@attr.s
+class ChecklistWriter:
+    """Construct a :py:class:`nemo_nowcast.checklist.ChecklistWriter` instance.
+
+    Checklists submitted to the writer are written to the checklist file by a
+    background thread.
+    Checklists that are submitted while a write is in progress replace each
+    other so that only the most recent one is written when that write finishes.
+    """
+
+    #: Path of the checklist YAML file.
+    checklist_file = attr.ib(converter=Path)
+    #: Logger to log write failures to.
+    logger = attr.ib()
+    #: Checklist file fsync policy;
+    #: one of :py:data:`FSYNC_POLICIES`.
+    fsync = attr.ib(default="always", validator=attr.validators.in_(FSYNC_POLICIES))
+    #: Minimum number of seconds between fsyncs for the :kbd:`interval`
+    #: fsync policy.
+    fsync_interval = attr.ib(default=60)
+    #: Number of checklist writes.
+    writes = attr.ib(default=0, init=False)
+    #: Number of submitted checklists that were replaced by a more recent one
+    #: before they were written.
+    coalesced = attr.ib(default=0, init=False)
+    #: Shallow copy of the most recently submitted checklist that has not yet
+    #: been written, or :py:obj:`None`.
+    _pending = attr.ib(default=None, init=False, repr=False)
+    #: :py:obj:`True` while the writer thread is writing a checklist.
+    _writing = attr.ib(default=False, init=False, repr=False)
+    #: :py:obj:`True` when the writer has been asked to stop.
+    _closing = attr.ib(default=False, init=False, repr=False)
+    _last_fsync = attr.ib(default=0.0, init=False, repr=False)
+    _condition = attr.ib(default=attr.Factory(threading.Condition), repr=False)
+    _thread = attr.ib(default=None, init=False, repr=False)
+
+    def submit(self, checklist):
+        """Queue a shallow copy of checklist to be written to the checklist
+        file.
+
+        The checklist values must be replaced rather than updated in place
+        for the shallow copy to be a consistent snapshot of the checklist.
+
+        :arg dict checklist: Nowcast system checklist.
+        """
+        with self._condition:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = dict(checklist)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="checklist_writer", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self):
+        """Wait until all submitted checklists have been written."""
+        with self._condition:
+            self._condition.wait_for(
+                lambda: (self._pending is None and not self._writing)
+                or self._thread is None
+            )
+
+    def close(self):
+        """Write any pending checklist and stop the writer thread."""
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        """Write submitted checklists until the writer is closed."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._pending is not None or self._closing
+                )
+                checklist, self._pending = self._pending, None
+                if checklist is None:
+                    self._thread = None
+                    self._closing = False
+                    self._condition.notify_all()
+                    return
+                self._writing = True
+            try:
+                self._write(checklist)
+            except Exception as e:
+                self.logger.error("checklist write failed:", exc_info=e)
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def _write(self, checklist):
+        """Write checklist to the checklist file, with an fsync as required
+        by the fsync policy.
+        """
+        now = time.monotonic()
+        fsync = self.fsync == "always" or (
+            self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval
+        )
+        write_snapshot(self.checklist_file, checklist, fsync=fsync)
+        if fsync:
+            self._last_fsync = now
+        self.writes += 1
@@ -21,7 +21,6 @@ argument.
 
 import argparse
 
-import arrow
 import attr
 
 
@@ -117,6 +116,8 @@ class CommandLineInterface:
 
         :raises: :py:exc:`argparse.ArgumentTypeError`
         """
+        import arrow
+
         try:
             return arrow.get(string, "YYYY-MM-DD")
         except arrow.parser.ParserError:
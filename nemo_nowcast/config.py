@@ -16,13 +16,40 @@
 
 Provides :py:class:`dict`-like access to the configuration loaded from the
 YAML system configuration file.
+
+When the :envvar:`NOWCAST_CONFIG_CACHE` environment variable is set to a
+directory path,
+loaded configurations are cached in that directory so that later loads of
+the same configuration file don't have to parse it.
+A cached configuration is used only if the configuration file's path,
+modification time,
+size,
+and content hash,
+and the values of the environment variables that it references via
+:kbd:`$(NOWCAST.ENV.*)` are the same as when it was cached.
 """
 
+import hashlib
 import os
+import pickle
 import re
 
 import attr
-import yaml
+
+from nemo_nowcast import fileutils, yamlutils
+
+#: Environment variable that sets the configuration cache directory.
+CACHE_ENVVAR = "NOWCAST_CONFIG_CACHE"
+#: Version of the configuration cache file format.
+_CACHE_VERSION = 1
+_envvar_pattern = re.compile(r"\$\(NOWCAST\.ENV\.(\w*)\)\w*")
+
+#: Configuration data structures that have been pre-loaded by
+#: :py:meth:`Config.preload`,
+#: keyed by configuration file absolute path.
+#: Values are the file's modification time and size when it was pre-loaded,
+#: and the configuration :py:class:`dict`.
+_preloaded = {}
 
 
 @attr.s
@@ -59,30 +86,89 @@ class Config:
         The value of config_file is stored on the
         :py:attr:`nemo_nowcast.config.Config.file` attribute.
 
+        If config_file was pre-loaded by :py:meth:`preload` in this process
+        (typically by the forkserver that forked it),
+        and hasn't changed since then,
+        the pre-loaded configuration is used instead of parsing the file again.
+        A pre-loaded configuration is used only once.
+
         :arg config_file: Path/name of YAML configuration file for the NEMO nowcast system.
         :type config_file: :py:class:`pathlib.Path` or str
         """
         self.file = config_file
-        with open(config_file, "rt") as f:
-            self._dict = yaml.safe_load(f)
-        envvar_pattern = re.compile(r"\$\(NOWCAST\.ENV\.(\w*)\)\w*")
+        if _preloaded:
+            try:
+                signature, preloaded = _preloaded.pop(os.path.abspath(config_file))
+            except KeyError:
+                preloaded = None
+            if preloaded is not None and signature == _file_signature(config_file):
+                self._dict = preloaded
+                return
+        cache_dir = os.environ.get(CACHE_ENVVAR)
+        if cache_dir:
+            cache = _ConfigCache(cache_dir, config_file)
+            cached = cache.load()
+            if cached is not None:
+                self._dict = cached
+                return
+            self._dict = yamlutils.safe_load(cache.content)
+        else:
+            with open(config_file, "rt") as f:
+                self._dict = yamlutils.safe_load(f)
         envvar_sub_keys = ("checklist file", "python")
         for key in envvar_sub_keys:
-            self._dict[key] = envvar_pattern.sub(self._replace_env, self._dict[key])
+            self._dict[key] = _envvar_pattern.sub(self._replace_env, self._dict[key])
 
         try:
             # Local logging
             self._replace_handler_envvars(
-                envvar_pattern, self._dict["logging"]["handlers"]
+                _envvar_pattern, self._dict["logging"]["handlers"]
             )
         except KeyError:
             # Distributed logging
             self._replace_handler_envvars(
-                envvar_pattern, self._dict["logging"]["aggregator"]["handlers"]
+                _envvar_pattern, self._dict["logging"]["aggregator"]["handlers"]
             )
             self._replace_handler_envvars(
-                envvar_pattern, self._dict["logging"]["publisher"]["handlers"]
+                _envvar_pattern, self._dict["logging"]["publisher"]["handlers"]
+            )
+        try:
+            forkserver_config = self._dict["run"]["forkserver"]
+            forkserver_config["socket"] = _envvar_pattern.sub(
+                self._replace_env, forkserver_config["socket"]
             )
+        except (KeyError, TypeError):
+            # No forkserver socket in config
+            pass
+        try:
+            status_files = self._dict["run"]["worker status files"]
+            for process_name, status_file in status_files.items():
+                status_files[process_name] = _envvar_pattern.sub(
+                    self._replace_env, status_file
+                )
+        except (KeyError, TypeError, AttributeError):
+            # No worker status files in config
+            pass
+        try:
+            self._dict["run"]["scheduler state file"] = _envvar_pattern.sub(
+                self._replace_env, self._dict["run"]["scheduler state file"]
+            )
+        except (KeyError, TypeError):
+            # No scheduler state file in config
+            pass
+        if cache_dir:
+            cache.save(self._dict)
+
+    def preload(self):
+        """Pre-load the configuration so that processes that are forked from
+        this one can use it without parsing the configuration file again.
+
+        Used by the :py:mod:`nemo_nowcast.forkserver` worker launcher.
+        """
+        _preloaded[os.path.abspath(self.file)] = (
+            _file_signature(self.file),
+            self._dict,
+        )
 
     def _replace_handler_envvars(self, envvar_pattern, handlers):
         for handler in handlers:
@@ -100,3 +186,86 @@ class Config:
             return os.environ[var.group(1)]
         except KeyError:
             raise KeyError(f"environment variable not set: {var.group(1)}")
+
+
+@attr.s
+class _ConfigCache:
+    """Cache of the configuration loaded from a configuration file.
+
+    The cache file is a :py:mod:`pickle`,
+    so the cache directory must only be writable by the nowcast system user.
+    """
+
+    #: Cache directory.
+    cache_dir = attr.ib()
+    #: Path/name of YAML configuration file.
+    config_file = attr.ib()
+    #: Configuration file contents.
+    content = attr.ib(init=False, repr=False)
+    #: Configuration file path, modification time, size, and content hash,
+    #: and the values of the environment variables that it references.
+    key = attr.ib(init=False, repr=False)
+    #: Cache file path.
+    path = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        config_path = os.path.abspath(self.config_file)
+        with open(config_path, "rb") as f:
+            self.content = f.read()
+            stat = os.fstat(f.fileno())
+        envvars = sorted(
+            set(_envvar_pattern.findall(self.content.decode(errors="replace")))
+        )
+        self.key = (
+            _CACHE_VERSION,
+            config_path,
+            stat.st_mtime_ns,
+            stat.st_size,
+            hashlib.sha256(self.content).hexdigest(),
+            tuple((envvar, os.environ.get(envvar)) for envvar in envvars),
+        )
+        path_hash = hashlib.sha256(config_path.encode()).hexdigest()[:16]
+        self.path = os.path.join(
+            self.cache_dir, f"{os.path.basename(config_path)}-{path_hash}.pickle"
+        )
+
+    def load(self):
+        """Return the cached configuration,
+        or :py:obj:`None` if there isn't one that is valid.
+
+        :rtype: dict
+        """
+        try:
+            with open(self.path, "rb") as f:
+                key, config_dict = pickle.load(f)
+        except Exception:
+            # Missing, unreadable, or corrupt cache file
+            return None
+        return config_dict if key == self.key else None
+
+    def save(self, config_dict):
+        """Cache the configuration.
+
+        Errors are ignored so that an unwritable cache directory doesn't
+        prevent the configuration from being loaded.
+
+        :arg dict config_dict: Configuration loaded from the configuration
+                               file.
+        """
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            with fileutils.atomic_save(
+                self.path,
+                file_perms=0o600,
+                part_file=f"{os.path.basename(self.path)}.{os.getpid()}.part",
+                overwrite_part=True,
+            ) as f:
+                pickle.dump((self.key, config_dict), f, pickle.HIGHEST_PROTOCOL)
+        except (OSError, pickle.PicklingError):
+            pass
+
+
+def _file_signature(path):
+    """Return the modification time and size of the file at path."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,228 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework cron expressions for scheduled worker launches.
+
+Expressions have the 5 fields of :manpage:`crontab(5)`:
+
+.. code-block:: text
+
+    minute  hour  day-of-month  month  day-of-week
+
+Each field may be :kbd:`*`,
+a number,
+a range (:kbd:`1-5`),
+a step (:kbd:`*/15`, :kbd:`0-30/10`, :kbd:`5/20`),
+or a comma-separated list of those.
+Months and days of the week may be given by their 3-letter English names,
+and both :kbd:`0` and :kbd:`7` are Sunday.
+When both the day-of-month and the day-of-week fields are restricted
+(i.e. don't start with :kbd:`*`),
+times that match either of them match,
+as they do in :command:`cron`.
+The :kbd:`@yearly`,
+:kbd:`@annually`,
+:kbd:`@monthly`,
+:kbd:`@weekly`,
+:kbd:`@daily`,
+:kbd:`@midnight`,
+and :kbd:`@hourly` shortcuts are also accepted.
+
+Times are naive local times,
+like those of :py:mod:`schedule`.
+"""
+
+import datetime
+
+import attr
+
+#: Shortcut expressions.
+SHORTCUTS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+#: Value names, and the value of the first name.
+_MONTH_NAMES = ("jan feb mar apr may jun jul aug sep oct nov dec".split(), 1)
+_WEEKDAY_NAMES = ("sun mon tue wed thu fri sat".split(), 0)
+
+#: Field names, value ranges, and value names.
+_FIELDS = (
+    ("minute", 0, 59, None),
+    ("hour", 0, 23, None),
+    ("day-of-month", 1, 31, None),
+    ("month", 1, 12, _MONTH_NAMES),
+    ("day-of-week", 0, 7, _WEEKDAY_NAMES),
+)
+
+#: Number of years to search for the next matching time before deciding that
+#: an expression never matches (e.g. 30 February).
+_SEARCH_YEARS = 9
+
+
+def _parse_value(value, field, low, high, names):
+    if names is not None:
+        name_list, first = names
+        if value.lower() in name_list:
+            return name_list.index(value.lower()) + first
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"invalid {field} value: {value}")
+    if not low <= number <= high:
+        raise ValueError(f"{field} value out of range {low}-{high}: {value}")
+    return number
+
+
+def _parse_field(text, field, low, high, names):
+    values = set()
+    for item in text.split(","):
+        range_text, _, step_text = item.partition("/")
+        if step_text:
+            try:
+                step = int(step_text)
+            except ValueError:
+                raise ValueError(f"invalid {field} step: {item}")
+            if step < 1:
+                raise ValueError(f"invalid {field} step: {item}")
+        else:
+            step = 1
+        if range_text == "*":
+            start, stop = low, high
+        elif "-" in range_text:
+            start_text, _, stop_text = range_text.partition("-")
+            start = _parse_value(start_text, field, low, high, names)
+            stop = _parse_value(stop_text, field, low, high, names)
+            if stop < start:
+                raise ValueError(f"invalid {field} range: {item}")
+        else:
+            start = _parse_value(range_text, field, low, high, names)
+            stop = high if step_text else start
+        values.update(range(start, stop + 1, step))
+    return frozenset(values)
+
+
+@attr.s(frozen=True)
+class CronExpression:
+    """Construct a :py:class:`nemo_nowcast.cron.CronExpression` instance.
+
+    :raises: :py:exc:`ValueError` if expression is not a valid cron expression.
+    """
+
+    #: Cron expression.
+    expression = attr.ib()
+    #: Second of the minute at which matching times occur.
+    second = attr.ib(default=0)
+    minutes = attr.ib(init=False, repr=False, eq=False)
+    hours = attr.ib(init=False, repr=False, eq=False)
+    days = attr.ib(init=False, repr=False, eq=False)
+    months = attr.ib(init=False, repr=False, eq=False)
+    #: Days of the week; 0 is Monday, like :py:meth:`datetime.date.weekday`.
+    weekdays = attr.ib(init=False, repr=False, eq=False)
+    #: Days of the month and days of the week both restricted.
+    _either_day = attr.ib(init=False, repr=False, eq=False)
+
+    def __attrs_post_init__(self):
+        expression = SHORTCUTS.get(self.expression.strip(), self.expression)
+        fields = expression.split()
+        if len(fields) != len(_FIELDS):
+            raise ValueError(
+                f"cron expression must have {len(_FIELDS)} fields: {self.expression}"
+            )
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, *field) for text, field in zip(fields, _FIELDS)
+        )
+        # cron numbers days of the week from Sunday = 0 (and 7)
+        weekdays = frozenset((weekday - 1) % 7 for weekday in weekdays)
+        either_day = not (fields[2].startswith("*") or fields[4].startswith("*"))
+        for name, value in (
+            ("minutes", minutes),
+            ("hours", hours),
+            ("days", days),
+            ("months", months),
+            ("weekdays", weekdays),
+            ("_either_day", either_day),
+        ):
+            object.__setattr__(self, name, value)
+
+    def matches_date(self, date):
+        """Return :py:obj:`True` if date matches the expression's day-of-month,
+        month,
+        and day-of-week fields.
+
+        :arg date: Date to test.
+        :type date: :py:class:`datetime.date`
+
+        :rtype: boolean
+        """
+        if date.month not in self.months:
+            return False
+        day_match = date.day in self.days
+        weekday_match = date.weekday() in self.weekdays
+        if self._either_day:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_after(self, moment):
+        """Return the first time after moment that matches the expression.
+
+        :arg moment: Naive local time to search from.
+        :type moment: :py:class:`datetime.datetime`
+
+        :raises: :py:exc:`ValueError` if the expression never matches.
+
+        :rtype: :py:class:`datetime.datetime`
+        """
+        candidate = moment.replace(second=self.second, microsecond=0)
+        if candidate <= moment:
+            candidate += datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=366 * _SEARCH_YEARS)
+        while candidate <= limit:
+            if not self.matches_date(candidate):
+                candidate = datetime.datetime.combine(
+                    candidate.date() + datetime.timedelta(days=1),
+                    datetime.time(second=self.second),
+                )
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += datetime.timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"cron expression never matches: {self.expression}")
+
+    def times_between(self, start, end):
+        """Generate the times after start,
+        up to and including end,
+        that match the expression.
+
+        :arg start: Naive local time to start after.
+        :type start: :py:class:`datetime.datetime`
+
+        :arg end: Naive local time to end at.
+        :type end: :py:class:`datetime.datetime`
+
+        :rtype: generator of :py:class:`datetime.datetime`
+        """
+        moment = self.next_after(start)
+        while moment <= end:
+            yield moment
+            moment = self.next_after(moment)
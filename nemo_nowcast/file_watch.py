@@ -0,0 +1,329 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework file arrival watches for triggering worker launches.
+
+A :py:class:`~nemo_nowcast.file_watch.FileWatch` watches a directory for
+files whose names match a glob pattern.
+A file is considered to have arrived when its size and modification time
+have not changed for a settling period.
+Arrivals are collected into batches,
+and the watch's function is called with each batch of arrived files when no
+more files have arrived for a batching period.
+
+On Linux the directory is watched with :manpage:`inotify(7)` via
+:py:mod:`ctypes`.
+On other platforms,
+or when inotify is not available or not wanted
+(e.g. on network file systems where writes by other hosts don't produce
+inotify events),
+the directory is polled.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import struct
+import sys
+import time
+
+import attr
+
+# inotify event masks from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+_EVENT_HEADER = struct.Struct("iIII")
+
+#: Default number of seconds that a file's size and modification time must be
+#: unchanged for before it is considered to have arrived.
+SETTLE_SECONDS = 5
+#: Default number of seconds without arrivals that ends a batch of arrivals.
+BATCH_SECONDS = 0
+#: Default number of seconds between scans of watched directories that are
+#: polled.
+POLL_SECONDS = 10
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+def inotify_available():
+    """Return :py:obj:`True` if directories can be watched with inotify.
+
+    :rtype: boolean
+    """
+    return _libc is not None
+
+
+@attr.s
+class Inotify:
+    """Construct a :py:class:`nemo_nowcast.file_watch.Inotify` instance.
+
+    :raises: :py:exc:`OSError` if the inotify instance can't be created,
+             or the directory can't be watched.
+    """
+
+    #: Directory to watch.
+    directory = attr.ib()
+    #: Inotify file descriptor.
+    fd = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        if _libc is None:
+            raise OSError("inotify is not available")
+        fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        wd = _libc.inotify_add_watch(fd, os.fsencode(self.directory), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, os.strerror(errno), self.directory)
+        self.fd = fd
+
+    def read_events(self):
+        """Read the pending events.
+
+        :returns: (mask, name) tuples of the events.
+        :rtype: list
+        """
+        events = []
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset : offset + length].rstrip(b"\0")
+                offset += length
+                events.append((mask, os.fsdecode(name)))
+
+    def close(self):
+        """Close the inotify file descriptor."""
+        os.close(self.fd)
+
+
+def _stat_key(path):
+    """Return the size and modification time of the file at path,
+    or :py:obj:`None` if it doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+@attr.s
+class FileWatch:
+    """Construct a :py:class:`nemo_nowcast.file_watch.FileWatch` instance.
+
+    Files that exist when the watch is started don't trigger it unless they
+    are changed.
+    """
+
+    #: Directory to watch.
+    directory = attr.ib()
+    #: Glob pattern that the names of the files to watch for match.
+    pattern = attr.ib()
+    #: Function to call with the list of paths of each batch of arrived files.
+    func = attr.ib()
+    #: Number of seconds that a file's size and modification time must be
+    #: unchanged for before it is considered to have arrived.
+    settle_seconds = attr.ib(default=SETTLE_SECONDS)
+    #: Number of seconds without arrivals that ends a batch of arrivals.
+    batch_seconds = attr.ib(default=BATCH_SECONDS)
+    #: Number of seconds between scans of the directory when it is polled.
+    poll_seconds = attr.ib(default=POLL_SECONDS)
+    #: Poll the directory instead of watching it with inotify.
+    poll = attr.ib(default=False)
+    #: Inotify instance, or :py:obj:`None` if the directory is polled.
+    inotify = attr.ib(default=None, init=False, repr=False)
+    #: Sizes and modification times of the files that have arrived keyed by
+    #: path.
+    _known = attr.ib(default=attr.Factory(dict), init=False, repr=False)
+    #: Sizes and modification times of the files that are settling,
+    #: and the :py:func:`time.monotonic` times of their last changes,
+    #: keyed by path.
+    _pending = attr.ib(default=attr.Factory(dict), init=False, repr=False)
+    #: Paths of the files in the current batch of arrivals.
+    _batch = attr.ib(default=attr.Factory(list), init=False, repr=False)
+    _last_arrival = attr.ib(default=None, init=False, repr=False)
+    _next_poll = attr.ib(default=None, init=False, repr=False)
+
+    @classmethod
+    def from_glob(cls, path_glob, func, **kwargs):
+        """Construct a :py:class:`nemo_nowcast.file_watch.FileWatch` instance
+        that watches for files that match path_glob.
+
+        :arg str path_glob: Glob of the paths of the files to watch for;
+                            only the file name part may include wildcards.
+
+        :arg func: Function to call with the list of paths of each batch of
+                   arrived files.
+
+        :arg kwargs: Other attributes of the watch.
+
+        :raises: :py:exc:`ValueError` if the directory part of path_glob
+                 includes wildcards.
+
+        :rtype: :py:class:`nemo_nowcast.file_watch.FileWatch`
+        """
+        directory, pattern = os.path.split(os.path.expanduser(path_glob))
+        if any(char in directory for char in "*?["):
+            raise ValueError(f"wildcards are only allowed in file names: {path_glob}")
+        return cls(directory or os.curdir, pattern or "*", func, **kwargs)
+
+    def start(self):
+        """Start watching the directory.
+
+        Inotify is used if it is available and :py:attr:`poll` is false,
+        otherwise the directory is polled.
+        """
+        if not self.poll and inotify_available():
+            try:
+                self.inotify = Inotify(self.directory)
+            except OSError:
+                # e.g. inotify watch limit reached
+                self.inotify = None
+        self._known = {
+            path: key for path in self._scan() if (key := _stat_key(path)) is not None
+        }
+        self._next_poll = time.monotonic() + self.poll_seconds
+
+    def fileno(self):
+        """Return the inotify file descriptor,
+        or :py:obj:`None` if the directory is polled.
+
+        :rtype: int
+        """
+        return None if self.inotify is None else self.inotify.fd
+
+    def read_events(self):
+        """Read the pending inotify events,
+        and start settling the files that they are for.
+        """
+        for mask, name in self.inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                self._rescan()
+                continue
+            if mask & IN_ISDIR or not fnmatch.fnmatch(name, self.pattern):
+                continue
+            self._changed(os.path.join(self.directory, name), time.monotonic())
+
+    def run_pending(self):
+        """Scan the directory if it is polled and the scan is due,
+        move the files that have settled into the batch of arrivals,
+        and call :py:attr:`func` with the batch if it has ended.
+
+        :returns: Number of times that :py:attr:`func` was called.
+        :rtype: int
+        """
+        now = time.monotonic()
+        if self.inotify is None and now >= self._next_poll:
+            self._rescan()
+            self._next_poll = now + self.poll_seconds
+        for path, (key, changed) in list(self._pending.items()):
+            if now - changed < self.settle_seconds:
+                continue
+            current_key = _stat_key(path)
+            if current_key is None:
+                del self._pending[path]
+            elif current_key != key:
+                self._pending[path] = (current_key, now)
+            else:
+                del self._pending[path]
+                self._known[path] = key
+                self._batch.append(path)
+                self._last_arrival = now
+        if not self._batch or self._pending:
+            return 0
+        if now - self._last_arrival < self.batch_seconds:
+            return 0
+        batch, self._batch = self._batch, []
+        self.func(batch)
+        return 1
+
+    def seconds_until_next_check(self):
+        """Return the number of seconds until :py:meth:`run_pending` has work to
+        do,
+        or :py:obj:`None` if it will only have work after inotify events.
+
+        :rtype: float
+        """
+        now = time.monotonic()
+        deadlines = [
+            changed + self.settle_seconds for _, changed in self._pending.values()
+        ]
+        if self._batch and not self._pending:
+            deadlines.append(self._last_arrival + self.batch_seconds)
+        if self.inotify is None:
+            deadlines.append(self._next_poll)
+        if not deadlines:
+            return None
+        return max(min(deadlines) - now, 0)
+
+    def close(self):
+        """Stop watching the directory."""
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+    def _scan(self):
+        try:
+            with os.scandir(self.directory) as entries:
+                return [
+                    entry.path
+                    for entry in entries
+                    if fnmatch.fnmatch(entry.name, self.pattern) and not entry.is_dir()
+                ]
+        except FileNotFoundError:
+            return []
+
+    def _rescan(self):
+        now = time.monotonic()
+        for path in self._scan():
+            self._changed(path, now)
+
+    def _changed(self, path, now):
+        """Start settling the file at path if it is new or has changed."""
+        key = _stat_key(path)
+        if key is None or key == self._known.get(path):
+            return
+        if path in self._pending and self._pending[path][0] == key:
+            return
+        self._pending[path] = (key, now)
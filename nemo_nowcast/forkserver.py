@@ -0,0 +1,385 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework worker launching forkserver.
+
+The forkserver is a long-running process that imports the framework and the
+packages that workers depend on,
+and pre-loads the nowcast system configuration.
+It listens on a Unix domain socket for requests to launch workers,
+and forks a child process for each one that runs the worker module's
+:py:func:`main` function.
+That saves each worker the cost of starting a Python interpreter,
+importing its dependencies,
+and parsing the configuration file.
+
+The forkserver doesn't create a ZeroMQ context or any threads
+because they don't survive :py:func:`os.fork`,
+so its log messages are written to stderr
+(which is captured by the process manager)
+rather than via the :kbd:`logging` configuration.
+"""
+
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import traceback
+
+import attr
+import yaml
+
+from nemo_nowcast import CommandLineInterface, Config, yamlutils
+
+NAME = "forkserver"
+logger = logging.getLogger(NAME)
+
+#: Modules that are imported by the forkserver before it forks workers.
+PRELOAD_MODULES = (
+    "arrow",
+    "attr",
+    "requests",
+    "schedule",
+    "sentry_sdk",
+    "yaml",
+    "zmq",
+    "zmq.log.handlers",
+    "nemo_nowcast",
+    "nemo_nowcast.worker",
+)
+#: Seconds to wait for the forkserver to reply to a launch request.
+LAUNCH_TIMEOUT = 10
+
+
+class LaunchError(Exception):
+    """Raised when the forkserver accepted a launch request but its reply
+    wasn't received,
+    so the worker may have been launched.
+    """
+
+
+@attr.s(frozen=True)
+class ForkedWorker:
+    """Construct a :py:class:`nemo_nowcast.forkserver.ForkedWorker` instance
+    for a worker process that was launched by the forkserver.
+
+    The worker process is a child of the forkserver,
+    not of the process that asked for it to be launched,
+    so it can't be waited for.
+    Use :py:meth:`is_alive` to find out if it has exited.
+    """
+
+    #: Process id of the worker process.
+    pid = attr.ib()
+
+    def is_alive(self):
+        """Return :py:obj:`True` if the worker process is still running.
+
+        The forkserver reaps its child processes as soon as they exit,
+        so a process that no longer exists has finished.
+
+        :rtype: boolean
+        """
+        try:
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # Process exists, but is owned by another user
+            return True
+        return True
+
+
+def main():
+    """Set up and run the worker launching forkserver.
+
+    Set-up includes:
+
+    * Building the command-line parser, and parsing the command-line used
+      to launch the forkserver
+    * Reading and parsing the configuration file given on the command-line
+    * Importing the modules listed in :py:data:`PRELOAD_MODULES` and the
+      :kbd:`run: forkserver: preload` configuration key
+
+    See :command:`python -m nemo_nowcast.forkserver --help`
+    for details of the command-line interface.
+    """
+    cli = CommandLineInterface(NAME, package="nemo_nowcast", description=__doc__)
+    cli.build_parser()
+    parsed_args = cli.parser.parse_args()
+    logging.basicConfig(
+        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+        level=logging.INFO,
+        stream=sys.stderr,
+    )
+    config = Config()
+    config.load(parsed_args.config_file)
+    logger.info(f"running in process {os.getpid()}")
+    logger.info(f"read config from {config.file}")
+    _preload(config)
+    run(config)
+
+
+def _preload(config):
+    """Import the modules that workers depend on,
+    and pre-load the configuration for the workers to use.
+
+    :param config: Nowcast system configuration.
+    :type config: :py:class:`nemo_nowcast.config.Config`
+    """
+    preload_modules = config["run"]["forkserver"].get("preload", [])
+    for module in (*PRELOAD_MODULES, *preload_modules):
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"preload of {module} failed: {e}")
+    config.preload()
+    logger.info(f"preloaded {len(PRELOAD_MODULES) + len(preload_modules)} modules")
+
+
+def run(config):
+    """Run the worker launching forkserver:
+
+    * Create and bind the Unix domain socket that launch requests are received
+      on.
+    * Install signal handlers for child process exit,
+      hangup, interrupt, and kill signals.
+    * Fork a worker process for each launch request.
+
+    :param config: Nowcast system configuration.
+    :type config: :py:class:`nemo_nowcast.config.Config`
+    """
+    socket_path = config["run"]["forkserver"]["socket"]
+    server = _bind_socket(socket_path)
+    children = {}
+    _install_signal_handlers(server, socket_path, children)
+    config_signature = _file_signature(config.file)
+    try:
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                config_signature = _refresh_preloaded_config(config, config_signature)
+                try:
+                    _handle_request(conn, server, children)
+                except (OSError, KeyError, TypeError, yaml.YAMLError):
+                    logger.error("worker launch request failed:", exc_info=True)
+    except SystemExit:
+        # Termination by signal
+        pass
+    except Exception:
+        logger.critical("unhandled exception:", exc_info=True)
+        logger.critical("shutting down")
+
+
+def _bind_socket(socket_path):
+    """Create a Unix domain socket and bind it to socket_path.
+
+    :param str socket_path: File system path of the socket.
+
+    :returns: Listening socket.
+    :rtype: :py:class:`socket.socket`
+    """
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    logger.info(f"listening for worker launch requests on {socket_path}")
+    return server
+
+
+def _handle_request(conn, server, children):
+    """Fork a worker process for a launch request,
+    and reply with its process id.
+    """
+    request = yamlutils.safe_load(_recv_all(conn))
+    module, argv, cwd = request["module"], request["argv"], request["cwd"]
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        server.close()
+        _run_worker(module, argv, cwd)
+    children[pid] = module
+    logger.info(f"launched {module} worker in process {pid}")
+    conn.sendall(yamlutils.dump({"pid": pid}).encode())
+
+
+def _file_signature(path):
+    """Return the modification time and size of the file at path."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _refresh_preloaded_config(config, config_signature):
+    """Pre-load the configuration again if the configuration file has changed
+    since it was last pre-loaded.
+
+    :returns: Signature of the configuration file when it was last pre-loaded.
+    :rtype: tuple
+    """
+    try:
+        signature = _file_signature(config.file)
+        if signature == config_signature:
+            return config_signature
+        config.load(config.file)
+    except Exception:
+        logger.error("config reload failed:", exc_info=True)
+        return config_signature
+    config.preload()
+    logger.info(f"preloaded changed config from {config.file}")
+    return signature
+
+
+def _run_worker(module, argv, cwd):
+    """Run the worker module's :py:func:`main` function in a forked child
+    process, and exit the process when it returns.
+
+    :param str module: Name of the worker module including its package path,
+                       in dotted notation.
+
+    :param list argv: Worker command-line arguments.
+
+    :param str cwd: Working directory of the process that requested the launch.
+    """
+    for signum in (signal.SIGCHLD, signal.SIGHUP, signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, signal.SIG_DFL)
+    sys.argv = [module, *argv]
+    exit_code = 0
+    try:
+        os.chdir(cwd)
+        importlib.import_module(module).main()
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            exit_code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        logging.shutdown()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(exit_code)
+
+
+def _reap_children(children):
+    """Wait for child processes that have exited so that they don't become
+    zombies,
+    and log their exit statuses.
+    """
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        module = children.pop(pid, "unknown")
+        exit_code = os.waitstatus_to_exitcode(status)
+        logger.info(f"{module} worker process {pid} exited with status {exit_code}")
+
+
+def _install_signal_handlers(server, socket_path, children):
+    """Set up child process exit, hangup, interrupt, and kill signal handlers."""
+
+    def sigchld_handler(signal, frame):
+        _reap_children(children)
+
+    signal.signal(signal.SIGCHLD, sigchld_handler)
+
+    def cleanup():
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+
+    def sighup_handler(signal, frame):
+        logger.info("hangup signal (SIGHUP) received; reloading configuration")
+        cleanup()
+        main()
+
+    signal.signal(signal.SIGHUP, sighup_handler)
+
+    def sigint_handler(signal, frame):
+        logger.info("interrupt signal (SIGINT or Ctrl-C) received; shutting down")
+        cleanup()
+        raise SystemExit
+
+    signal.signal(signal.SIGINT, sigint_handler)
+
+    def sigterm_handler(signal, frame):
+        logger.info("termination signal (SIGTERM) received; shutting down")
+        cleanup()
+        raise SystemExit
+
+    signal.signal(signal.SIGTERM, sigterm_handler)
+
+
+def _recv_all(conn):
+    """Receive data from conn until the sender shuts down its end of the
+    connection.
+    """
+    chunks = []
+    while chunk := conn.recv(4096):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def launch(socket_path, module, argv):
+    """Ask the forkserver listening on socket_path to launch a worker.
+
+    :param str socket_path: File system path of the forkserver socket.
+
+    :param str module: Name of the worker module including its package path,
+                       in dotted notation.
+
+    :param list argv: Worker command-line arguments.
+
+    :returns: Process id of the worker.
+    :rtype: int
+
+    :raises: :py:exc:`OSError` if the forkserver can't be reached,
+             or the request can't be sent to it,
+             in which case the worker has not been launched.
+
+    :raises: :py:exc:`nemo_nowcast.forkserver.LaunchError` if the request
+             was sent but the forkserver's reply wasn't received within
+             :py:data:`LAUNCH_TIMEOUT` seconds or is invalid,
+             in which case the worker may have been launched.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(LAUNCH_TIMEOUT)
+        client.connect(socket_path)
+        request = {"module": module, "argv": argv, "cwd": os.getcwd()}
+        client.sendall(yamlutils.dump(request).encode())
+        client.shutdown(socket.SHUT_WR)
+        try:
+            reply = yamlutils.safe_load(_recv_all(client))
+            return reply["pid"]
+        except (OSError, yaml.YAMLError, KeyError, TypeError) as e:
+            raise LaunchError(
+                f"no reply from forkserver at {socket_path} to launch request "
+                f"for {module}: {e!r}"
+            ) from e
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
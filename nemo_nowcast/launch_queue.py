@@ -0,0 +1,280 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework manager worker launch queue.
+
+The manager passes the workers that it is asked to launch through a
+:py:class:`~nemo_nowcast.launch_queue.LaunchQueue` that limits the number of
+workers that it has launched that are running at once on each host,
+and on all hosts.
+Workers that would exceed a limit are queued until earlier workers finish.
+
+A worker is counted as running from when it is released for launch until its
+process exits.
+Workers that were launched by the :py:mod:`nemo_nowcast.forkserver` aren't
+child processes of the manager,
+so the manager checks periodically whether their processes are still running.
+Workers whose process ids aren't known are counted until the manager receives
+a :kbd:`success`, :kbd:`failure`, or :kbd:`crash` message from a worker with
+the same name.
+Workers whose launches fail stop being counted as soon as the failure is
+reported.
+"""
+
+import datetime
+import heapq
+import itertools
+
+import attr
+
+#: Launch queue orders.
+QUEUE_ORDERS = ("fifo", "priority")
+
+
+def worker_name(next_worker):
+    """Return the name that next_worker uses in its messages to the manager.
+
+    :arg next_worker: Worker.
+    :type next_worker: :py:class:`nemo_nowcast.worker.NextWorker`
+
+    :rtype: str
+    """
+    return next_worker.module.rsplit(".", 1)[-1]
+
+
+@attr.s
+class Launch:
+    """Construct a :py:class:`nemo_nowcast.launch_queue.Launch` instance."""
+
+    #: Worker that was released for launch.
+    worker = attr.ib()
+    #: Process id of the worker process,
+    #: or :py:obj:`None` if it is not known.
+    pid = attr.ib(default=None)
+    #: :py:class:`nemo_nowcast.forkserver.ForkedWorker` instance for a worker
+    #: that was launched by the forkserver,
+    #: or :py:obj:`None`.
+    forked_worker = attr.ib(default=None)
+
+
+@attr.s
+class LaunchQueue:
+    """Construct a :py:class:`nemo_nowcast.launch_queue.LaunchQueue` instance."""
+
+    #: Maximum number of running workers on all hosts,
+    #: or :py:obj:`None` for no limit.
+    max_workers = attr.ib(default=None)
+    #: Maximum numbers of running workers keyed by host.
+    #: Hosts that are not included have no limit.
+    host_max_workers = attr.ib(default=attr.Factory(dict))
+    #: Order in which queued workers are released;
+    #: one of :py:data:`QUEUE_ORDERS`.
+    #: In :kbd:`priority` order workers with higher
+    #: :py:attr:`~nemo_nowcast.worker.NextWorker.priority` values are released
+    #: first,
+    #: and workers with the same priority are released in the order in which
+    #: they were queued.
+    order = attr.ib(default="fifo", validator=attr.validators.in_(QUEUE_ORDERS))
+    #: Workers that have been released for launch and have not yet finished.
+    running = attr.ib(default=attr.Factory(list), init=False)
+    #: Heap of queued workers.
+    _queue = attr.ib(default=attr.Factory(list), init=False, repr=False)
+    _sequence = attr.ib(default=attr.Factory(itertools.count), init=False, repr=False)
+
+    @property
+    def depth(self):
+        """Number of queued workers."""
+        return len(self._queue)
+
+    def host_depths(self):
+        """Return the numbers of queued workers keyed by host.
+
+        :rtype: dict
+        """
+        depths = {}
+        for *_, worker in self._queue:
+            depths[worker.host] = depths.get(worker.host, 0) + 1
+        return depths
+
+    def submit(self, next_workers):
+        """Add next_workers to the queue,
+        and release the queued workers that can be launched without exceeding
+        the limits.
+
+        :arg next_workers: Workers to launch.
+        :type next_workers: list of :py:class:`nemo_nowcast.worker.NextWorker`
+
+        :returns: Workers to launch now.
+        :rtype: list of :py:class:`nemo_nowcast.worker.NextWorker`
+        """
+        for next_worker in next_workers:
+            key = -next_worker.priority if self.order == "priority" else 0
+            heapq.heappush(
+                self._queue,
+                (key, next(self._sequence), datetime.datetime.now(), next_worker),
+            )
+        return self.release()
+
+    @property
+    def has_forked_workers(self):
+        """:py:obj:`True` if workers that were launched by the forkserver are
+        running.
+        """
+        return any(launch.forked_worker is not None for launch in self.running)
+
+    def launched(self, next_worker, pid, forked_worker=None):
+        """Record the process id of a worker that was released for launch.
+
+        :arg next_worker: Worker that was launched.
+        :type next_worker: :py:class:`nemo_nowcast.worker.NextWorker`
+
+        :arg pid: Process id of the worker process,
+                  or :py:obj:`None` if it is not known.
+        :type pid: int
+
+        :arg forked_worker: Forkserver worker process if the worker was
+                            launched by the forkserver.
+        :type forked_worker: :py:class:`nemo_nowcast.forkserver.ForkedWorker`
+        """
+        for launch in self.running:
+            if launch.worker is next_worker and launch.pid is None:
+                launch.pid = pid
+                launch.forked_worker = forked_worker
+                return
+
+    def launch_failed(self, next_worker):
+        """Stop counting a worker that was released for launch but whose launch
+        failed,
+        and release the queued workers that can then be launched.
+
+        :arg next_worker: Worker whose launch failed.
+        :type next_worker: :py:class:`nemo_nowcast.worker.NextWorker`
+
+        :returns: Workers to launch now.
+        :rtype: list of :py:class:`nemo_nowcast.worker.NextWorker`
+        """
+        for i, launch in enumerate(self.running):
+            if launch.worker is next_worker and launch.pid is None:
+                del self.running[i]
+                break
+        return self.release()
+
+    def finished(self, name):
+        """Stop counting the earliest launched running worker named name
+        whose process id isn't known.
+
+        Messages from workers don't identify the host or process that they are
+        running in,
+        so the earliest launched worker with that name is assumed to be the one
+        that finished.
+        Workers whose process ids are known are counted until their processes
+        exit so that messages from workers that were launched by the scheduler,
+        or by hand,
+        don't release their launch slots.
+
+        :arg str name: Name of the worker that finished.
+
+        :returns: :py:obj:`True` if a running worker was found.
+        :rtype: boolean
+        """
+        for i, launch in enumerate(self.running):
+            if launch.pid is None and worker_name(launch.worker) == name:
+                del self.running[i]
+                return True
+        return False
+
+    def process_exited(self, pid):
+        """Stop counting the running worker whose process is pid.
+
+        :arg int pid: Process id of the worker process that exited.
+
+        :returns: :py:obj:`True` if a running worker was found.
+        :rtype: boolean
+        """
+        for i, launch in enumerate(self.running):
+            if launch.pid == pid:
+                del self.running[i]
+                return True
+        return False
+
+    def forked_workers_exited(self):
+        """Stop counting the running workers that were launched by the
+        forkserver and whose processes have exited.
+
+        :returns: :py:obj:`True` if any running workers were found.
+        :rtype: boolean
+        """
+        running = [
+            launch
+            for launch in self.running
+            if launch.forked_worker is None or launch.forked_worker.is_alive()
+        ]
+        exited = len(running) < len(self.running)
+        self.running = running
+        return exited
+
+    def status(self):
+        """Return the number of running workers,
+        the queue depths,
+        and the queued workers.
+
+        :rtype: dict
+        """
+        return {
+            "running": len(self.running),
+            "depth": self.depth,
+            "host depths": self.host_depths(),
+            "queued": [
+                {
+                    "module": worker.module,
+                    "args": list(worker.args),
+                    "host": worker.host,
+                    "priority": worker.priority,
+                    "queued": queued,
+                }
+                for *_, queued, worker in sorted(self._queue)
+            ],
+        }
+
+    def release(self):
+        """Release the queued workers that can be launched without exceeding
+        the limits.
+
+        :returns: Workers to launch now.
+        :rtype: list of :py:class:`nemo_nowcast.worker.NextWorker`
+        """
+        released, blocked = [], []
+        while self._queue and self._has_capacity():
+            entry = heapq.heappop(self._queue)
+            worker = entry[-1]
+            if self._has_capacity(worker.host):
+                self.running.append(Launch(worker))
+                released.append(worker)
+            else:
+                blocked.append(entry)
+        for entry in blocked:
+            heapq.heappush(self._queue, entry)
+        return released
+
+    def _has_capacity(self, host=None):
+        """Return :py:obj:`True` if another worker can run on all hosts,
+        or on host if it is given.
+        """
+        if host is None:
+            return self.max_workers is None or len(self.running) < self.max_workers
+        max_workers = self.host_max_workers.get(host)
+        if max_workers is None:
+            return True
+        running = sum(1 for launch in self.running if launch.worker.host == host)
+        return running < max_workers
@@ -18,22 +18,45 @@ This logging aggregator subscribes to a ZeroMQ port to collect logging messages
 published by other processes.
 It is useful for nowcast systems in which workers run on hosts other than the
 one that the manager and message broker run on.
+
+By default each message is logged as it is received.
+In batched message processing mode,
+enabled by the :kbd:`log aggregator: message processing: batched`
+configuration key,
+the messages that are waiting to be received are logged in batches by a
+:py:class:`~nemo_nowcast.log_aggregator.BatchedLogWriter` that passes them
+through a queue to a thread that writes them to the file system logging
+handlers.
 """
 
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
 import signal
+import time
 
+import attr
 import zmq
 
-from nemo_nowcast import CommandLineInterface, Config
+from nemo_nowcast import CommandLineInterface, Config, zmq_logging
 
 NAME = "log_aggregator"
 logger = logging.getLogger(NAME)
 
 context = zmq.Context()
 
+#: Default maximum number of messages in a batch.
+BATCH_SIZE = 1000
+#: Default maximum number of seconds to spend receiving a batch of messages.
+BATCH_SECONDS = 0.05
+#: Default maximum number of messages that may be queued for writing before
+#: messages are dropped.
+MAX_QUEUED = 100_000
+#: Default number of seconds between message count log messages.
+STATS_SECONDS = 600
+
 
 def main():
     """Set up and run the nowcast system logging aggregator.
@@ -90,17 +113,25 @@ def run(config):
     """Run the nowcast system log aggregator:
 
     * Create the :py:class:`zmq.Context.socket` instance to use to subscribe
-      to logging messages published by other processes.
+      to logging messages published by other processes,
+      and set its receive high water mark if the
+      :kbd:`log aggregator: receive hwm` configuration key is set.
     * Subscribe to all of the hosts/ports that are configured to publish log
       messages,
       and subscribe to all message topic.
+    * Start the batched log writer if the
+      :kbd:`log aggregator: message processing` configuration key is
+      :kbd:`batched`.
     * Install signal handlers for hangup, interrupt, and kill signals.
     * Launch the logging message aggregation process.
 
     :param config: Nowcast system configuration.
     :type config: :py:class:`nemo_nowcast.config.Config`
     """
+    aggregator_config = config.get("log aggregator") or {}
     socket = context.socket(zmq.SUB)
+    if "receive hwm" in aggregator_config:
+        socket.setsockopt(zmq.RCVHWM, aggregator_config["receive hwm"])
     for publisher, addrs in config["zmq"]["ports"]["logging"].items():
         if not isinstance(addrs, list):
             addrs = [addrs]
@@ -116,20 +147,41 @@ def run(config):
                 f"subscribed to {host} port {port} for all messages from {publisher}",
                 extra={"logger_name": NAME},
             )
-    _install_signal_handlers(socket)
-    _process_messages(socket)
+    if aggregator_config.get("message processing") != "batched":
+        _install_signal_handlers(socket)
+        _process_messages(socket)
+        return
+    writer = BatchedLogWriter(
+        batch_size=aggregator_config.get("batch size", BATCH_SIZE),
+        batch_seconds=aggregator_config.get("batch seconds", BATCH_SECONDS),
+        max_queued=aggregator_config.get("max queued messages", MAX_QUEUED),
+        stats_seconds=aggregator_config.get("stats interval", STATS_SECONDS),
+    )
+    writer.start()
+    _install_signal_handlers(socket, writer)
+    try:
+        _process_messages(socket, writer)
+    finally:
+        writer.stop()
 
 
-def _process_messages(socket):
+def _process_messages(socket, writer=None):
     """Process logging messages from publishers.
 
     :param socket: ZeroMQ socket to which we are subscribed to receive logging
                    messages.
     :type socket: :py:class:`zmq.Context.socket`
+
+    :param writer: Batched log writer to log the messages with,
+                   or :py:obj:`None` to log each message as it is received.
+    :type writer: :py:class:`nemo_nowcast.log_aggregator.BatchedLogWriter`
     """
     while True:
         try:
-            _log_messages(socket)
+            if writer is None:
+                _log_messages(socket)
+            else:
+                writer.log_messages(socket)
         except zmq.ZMQError as e:
             # Fatal ZeroMQ problem
             logger.critical(
@@ -153,12 +205,19 @@ def _log_messages(socket):
     publisher's name, and message, and emit them to the file system logging
     handlers.
 
+    JSON log messages are emitted as records with the time, process id,
+    host, and extra fields of the records that were published.
+
     :param socket: ZeroMQ socket to which we are subscribed to receive logging
                    messages.
     :type socket: :py:class:`zmq.Context.socket`
     """
     topic, message = socket.recv_multipart()
     logger_name, level = topic.decode().split(".")
+    if zmq_logging.is_json_message(message):
+        if logger.isEnabledFor(getattr(logging, level)):
+            logger.handle(zmq_logging.make_record(logger, message, logger_name))
+        return
     logger.log(
         getattr(logging, level),
         message.decode().strip(),
@@ -166,12 +225,215 @@ def _log_messages(socket):
     )
 
 
-def _install_signal_handlers(socket):
+class _BatchQueueListener(logging.handlers.QueueListener):
+    """Queue listener that handles batches of log records,
+    flushing its handlers once per batch instead of once per record.
+    """
+
+    def __init__(self, queue, *handlers):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        #: Number of records in batches that have been handled.
+        self.written = 0
+
+    def handle(self, item):
+        records = item if isinstance(item, list) else [item]
+        for handler in self.handlers:
+            # Suppress the flush after every record by StreamHandler.emit()
+            handler.flush = _no_flush
+            try:
+                for record in records:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            finally:
+                del handler.flush
+            handler.flush()
+        if isinstance(item, list):
+            self.written += len(item)
+
+
+def _no_flush():
+    pass
+
+
+@attr.s
+class BatchedLogWriter:
+    """Construct a :py:class:`nemo_nowcast.log_aggregator.BatchedLogWriter`
+    instance.
+
+    The writer receives the messages that are waiting on the socket in
+    batches,
+    and puts the batches of log records on a queue.
+    While the writer is started the handlers of the root logger are moved to a
+    :py:class:`logging.handlers.QueueListener` that writes the records on a
+    separate thread,
+    flushing the handlers once per batch.
+    """
+
+    #: Maximum number of messages in a batch.
+    batch_size = attr.ib(default=BATCH_SIZE)
+    #: Maximum number of seconds to spend receiving a batch of messages.
+    batch_seconds = attr.ib(default=BATCH_SECONDS)
+    #: Maximum number of messages that may be queued for writing;
+    #: messages that are received when the queue is full are dropped.
+    max_queued = attr.ib(default=MAX_QUEUED)
+    #: Number of seconds between message count log messages.
+    stats_seconds = attr.ib(default=STATS_SECONDS)
+    #: Number of messages received.
+    received = attr.ib(default=0, init=False)
+    #: Number of batches of messages received.
+    batches = attr.ib(default=0, init=False)
+    #: Number of messages dropped because the queue was full.
+    dropped = attr.ib(default=0, init=False)
+    _enqueued = attr.ib(default=0, init=False, repr=False)
+    _queue = attr.ib(default=attr.Factory(queue.SimpleQueue), init=False, repr=False)
+    _listener = attr.ib(default=None, init=False, repr=False)
+    _queue_handler = attr.ib(default=None, init=False, repr=False)
+    #: (logger name, level) tuples keyed by message topic.
+    _topics = attr.ib(default=attr.Factory(dict), init=False, repr=False)
+    _next_stats = attr.ib(init=False, repr=False)
+    _reported_dropped = attr.ib(default=0, init=False, repr=False)
+
+    @_next_stats.default
+    def _next_stats_default(self):
+        return time.monotonic() + self.stats_seconds
+
+    @property
+    def queued(self):
+        """Number of messages that are queued for writing."""
+        written = 0 if self._listener is None else self._listener.written
+        return self._enqueued - written
+
+    def stats(self):
+        """Return the message counts.
+
+        :rtype: dict
+        """
+        return {
+            "received": self.received,
+            "batches": self.batches,
+            "queued": self.queued,
+            "dropped": self.dropped,
+        }
+
+    def start(self):
+        """Move the root logger's handlers to the queue listener,
+        and start its thread.
+        """
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        for handler in handlers:
+            root.removeHandler(handler)
+        self._queue_handler = logging.handlers.QueueHandler(self._queue)
+        root.addHandler(self._queue_handler)
+        self._listener = _BatchQueueListener(self._queue, *handlers)
+        self._listener.start()
+
+    def stop(self):
+        """Write the queued messages,
+        stop the queue listener's thread,
+        move its handlers back to the root logger,
+        and log the message counts.
+        """
+        if self._listener is None:
+            return
+        root = logging.getLogger()
+        root.removeHandler(self._queue_handler)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            root.addHandler(handler)
+        self._log_stats()
+        self._enqueued -= self._listener.written
+        self._listener = None
+
+    def log_messages(self, socket):
+        """Receive the messages that are waiting on socket,
+        waiting for the first one,
+        and queue them for writing as a batch of log records.
+
+        :param socket: ZeroMQ socket to which we are subscribed to receive
+                       logging messages.
+        :type socket: :py:class:`zmq.Context.socket`
+
+        :returns: Number of messages received.
+        :rtype: int
+        """
+        messages = [socket.recv_multipart()]
+        deadline = time.monotonic() + self.batch_seconds
+        while len(messages) < self.batch_size and time.monotonic() < deadline:
+            try:
+                messages.append(socket.recv_multipart(zmq.NOBLOCK))
+            except zmq.Again:
+                break
+        self.received += len(messages)
+        self.batches += 1
+        records = []
+        for topic, message in messages:
+            try:
+                logger_name, level = self._topics[topic]
+            except KeyError:
+                logger_name, level_name = topic.decode().split(".")
+                level = getattr(logging, level_name)
+                self._topics[topic] = logger_name, level
+            if not logger.isEnabledFor(level):
+                continue
+            if zmq_logging.is_json_message(message):
+                records.append(zmq_logging.make_record(logger, message, logger_name))
+            else:
+                records.append(
+                    logger.makeRecord(
+                        NAME,
+                        level,
+                        "(unknown file)",
+                        0,
+                        message.decode().strip(),
+                        None,
+                        None,
+                        extra={"logger_name": logger_name},
+                    )
+                )
+        room = max(self.max_queued - self.queued, 0)
+        if len(records) > room:
+            if self.dropped == self._reported_dropped:
+                logger.warning(
+                    f"log message queue is full ({self.max_queued} messages); "
+                    f"dropping messages",
+                    extra={"logger_name": NAME},
+                )
+            self.dropped += len(records) - room
+            records = records[:room]
+        if records:
+            self._enqueued += len(records)
+            self._queue.put(records)
+        if time.monotonic() >= self._next_stats:
+            self._log_stats()
+        return len(messages)
+
+    def _log_stats(self):
+        """Log the message counts,
+        as a warning if messages have been dropped since they were last logged.
+        """
+        level = (
+            logging.WARNING if self.dropped > self._reported_dropped else logging.INFO
+        )
+        self._reported_dropped = self.dropped
+        self._next_stats = time.monotonic() + self.stats_seconds
+        logger.log(
+            level,
+            f"received {self.received} messages in {self.batches} batches; "
+            f"{self.queued} queued for writing; {self.dropped} dropped",
+            extra={"logger_name": NAME, "log_aggregator_stats": self.stats()},
+        )
+
+
+def _install_signal_handlers(socket, writer=None):
     """Set up hangup, interrupt, and kill signal handlers.
 
     :param socket: ZeroMQ socket to which we are subscribed to receive logging
                    messages.
     :type socket: :py:class:`zmq.Context.socket`
+
+    :param writer: Batched log writer that is logging the messages, if any.
+    :type writer: :py:class:`nemo_nowcast.log_aggregator.BatchedLogWriter`
     """
 
     def sighup_handler(signal, frame):
@@ -180,6 +442,8 @@ def _install_signal_handlers(socket):
             extra={"logger_name": NAME},
         )
         socket.close()
+        if writer is not None:
+            writer.stop()
         main()
 
     signal.signal(signal.SIGHUP, sighup_handler)
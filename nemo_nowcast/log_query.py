@@ -0,0 +1,233 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast log store query tool.
+
+Print the log records,
+or summaries of the runs of processes,
+that are stored in the SQLite log store that is written by a
+:py:class:`nemo_nowcast.log_store.SQLiteHandler` in the nowcast system's
+logging configuration.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import sqlite3
+
+from nemo_nowcast import CommandLineInterface, Config, log_store
+
+NAME = "log_query"
+
+
+def main(args=None):
+    """Query the nowcast system log store and print the results.
+
+    See :command:`python -m nemo_nowcast.log_query --help`
+    for details of the command-line interface.
+    """
+    parsed_args = _cli(args)
+    config = Config()
+    config.load(parsed_args.config_file)
+    store = parsed_args.store or _store_filename(config)
+    if store is None:
+        raise SystemExit(
+            f"no {log_store.HANDLER_CLASS} handler in logging config in "
+            f"{parsed_args.config_file}; use --store to give the log store path"
+        )
+    try:
+        connection = log_store.connect(store, readonly=True)
+    except sqlite3.OperationalError as e:
+        raise SystemExit(f"can't open log store {store}: {e}")
+    try:
+        if parsed_args.runs:
+            _print_runs(
+                log_store.runs(
+                    connection,
+                    parsed_args.worker,
+                    parsed_args.since,
+                    parsed_args.until,
+                )
+            )
+        else:
+            _print_records(
+                log_store.query(
+                    connection,
+                    parsed_args.worker,
+                    parsed_args.since,
+                    parsed_args.until,
+                    parsed_args.level,
+                    parsed_args.contains,
+                    parsed_args.limit,
+                ),
+                parsed_args.json,
+            )
+    finally:
+        connection.close()
+
+
+def _cli(args=None):
+    """Configure command-line argument parser and return parsed arguments
+    object.
+    """
+    cli = CommandLineInterface(NAME, package="nemo_nowcast", description=__doc__)
+    cli.build_parser(add_help=False)
+    parser = argparse.ArgumentParser(
+        prog=cli.parser.prog,
+        description=cli.parser.description,
+        parents=[cli.parser],
+    )
+    parser.add_argument(
+        "--store",
+        help="""
+        Path of log store database file.
+        Defaults to the filename of the log store handler in the config file.
+        """,
+    )
+    parser.add_argument(
+        "--worker",
+        action="append",
+        help="""
+        Name of worker or other nowcast system process to select records of.
+        May be repeated.
+        """,
+    )
+    parser.add_argument(
+        "--since",
+        type=_timestamp,
+        help="""
+        Select records at or after this local date/time.
+        Use YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS] format.
+        """,
+    )
+    parser.add_argument(
+        "--until",
+        type=_timestamp,
+        help="""
+        Select records before this local date/time.
+        Use YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS] format.
+        """,
+    )
+    parser.add_argument(
+        "--level",
+        type=_level,
+        help="Select records at or above this level; e.g. WARNING.",
+    )
+    parser.add_argument(
+        "--contains", help="Select records whose messages contain this text."
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Maximum number of records to print; the most recent are printed.",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print records as JSON lines."
+    )
+    parser.add_argument(
+        "--runs",
+        action="store_true",
+        help="""
+        Print the start and end times, and durations of the runs of the
+        selected processes instead of their records.
+        """,
+    )
+    return parser.parse_args(args)
+
+
+def _timestamp(string):
+    """Convert an ISO 8601 local date/time string to a Unix time or raise
+    :py:exc:`argparse.ArgumentTypeError`.
+    """
+    try:
+        return datetime.datetime.fromisoformat(string).timestamp()
+    except ValueError:
+        msg = (
+            f"unrecognized date/time format: {string} - "
+            f"please use YYYY-MM-DD or YYYY-MM-DDTHH:MM[:SS]"
+        )
+        raise argparse.ArgumentTypeError(msg)
+
+
+def _level(string):
+    """Convert a log level name to a number or raise
+    :py:exc:`argparse.ArgumentTypeError`.
+    """
+    level = logging.getLevelName(string.upper())
+    if not isinstance(level, int):
+        raise argparse.ArgumentTypeError(f"unrecognized log level: {string}")
+    return level
+
+
+def _store_filename(config):
+    """Return the filename of the log store handler in the logging config,
+    or :py:obj:`None` if there isn't one.
+    """
+    logging_config = config["logging"].get("aggregator", config["logging"])
+    for handler in logging_config.get("handlers", {}).values():
+        if handler.get("class") == log_store.HANDLER_CLASS:
+            return handler["filename"]
+    return None
+
+
+def _format_time(created):
+    return datetime.datetime.fromtimestamp(created).isoformat(
+        sep=" ", timespec="milliseconds"
+    )
+
+
+def _print_records(records, as_json=False, file=None):
+    for record in records:
+        if as_json:
+            data = {
+                "created": record["created"],
+                "time": _format_time(record["created"]),
+                "level": logging.getLevelName(record["level"]),
+                "logger": record["logger_name"],
+                "host": record["host"],
+                "pid": record["pid"],
+                "message": record["message"],
+            }
+            if record["exc_text"]:
+                data["exc_info"] = record["exc_text"]
+            if record["extra"]:
+                data["extra"] = json.loads(record["extra"])
+            print(json.dumps(data), file=file)
+            continue
+        print(
+            f"{_format_time(record['created'])} "
+            f"{logging.getLevelName(record['level'])} "
+            f"[{record['logger_name']}] {record['message']}",
+            file=file,
+        )
+        if record["exc_text"]:
+            print(record["exc_text"], file=file)
+
+
+def _print_runs(runs, file=None):
+    for run in runs:
+        duration = datetime.timedelta(seconds=round(run["end"] - run["start"]))
+        process = f"{run['host']}:{run['pid']}" if run["pid"] is not None else "-"
+        print(
+            f"{_format_time(run['start'])}  {duration}  "
+            f"{run['logger_name']}  {process}  "
+            f"{run['records']} records, "
+            f"max level {logging.getLevelName(run['max_level'])}",
+            file=file,
+        )
+
+
+if __name__ == "__main__":
+    main()  # pragma: no cover
@@ -0,0 +1,280 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework SQLite log store.
+
+:py:class:`~nemo_nowcast.log_store.SQLiteHandler` is a logging handler that
+writes log records to an SQLite database in write-ahead log mode,
+with indexes on the records' times,
+logger names,
+and levels.
+It is intended to be used in the :kbd:`logging: aggregator` section of the
+nowcast system configuration file so that the log aggregator stores the log
+messages of all of the nowcast system processes in a database that can be
+queried with :ref:`NEMO_NowcastLogQuery`.
+
+Records are buffered and written in transactions.
+The log aggregator's batched message processing mode writes each batch of
+messages in 1 transaction.
+"""
+
+import json
+import logging
+import logging.handlers
+import socket
+import sqlite3
+import time
+
+from nemo_nowcast import zmq_logging
+
+#: Fully qualified name of the handler class for use in logging configurations.
+HANDLER_CLASS = "nemo_nowcast.log_store.SQLiteHandler"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_records (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    logger_name TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    host TEXT,
+    pid INTEGER,
+    message TEXT NOT NULL,
+    exc_text TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS log_records_created
+    ON log_records (created);
+CREATE INDEX IF NOT EXISTS log_records_logger_name_created
+    ON log_records (logger_name, created);
+CREATE INDEX IF NOT EXISTS log_records_level_created
+    ON log_records (level, created);
+"""
+
+_INSERT = """
+INSERT INTO log_records
+    (created, logger_name, level, host, pid, message, exc_text, extra)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_HOSTNAME = socket.gethostname()
+_formatter = logging.Formatter()
+
+
+def connect(filename, readonly=False):
+    """Connect to the log store database in filename.
+
+    The database is created if it doesn't exist and readonly is false.
+
+    :arg str filename: Path of the database file.
+
+    :arg boolean readonly: Open the database for reading only.
+
+    :rtype: :py:class:`sqlite3.Connection`
+    """
+    if readonly:
+        connection = sqlite3.connect(f"file:{filename}?mode=ro", uri=True)
+    else:
+        connection = sqlite3.connect(filename, check_same_thread=False, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Commits in WAL mode are durable across process crashes without an
+        # fsync per transaction
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+def _record_row(record):
+    if record.exc_info and not record.exc_text:
+        record.exc_text = _formatter.formatException(record.exc_info)
+    if hasattr(record, "host"):
+        # Published in JSON log format
+        host, pid = record.host, record.process
+    elif hasattr(record, "logger_name"):
+        # Published in text log format, so the publisher's host and process id
+        # are unknown
+        host = pid = None
+    else:
+        host, pid = _HOSTNAME, record.process
+    extra = zmq_logging.extra_fields(record)
+    return (
+        record.created,
+        getattr(record, "logger_name", record.name),
+        record.levelno,
+        host,
+        pid,
+        record.getMessage(),
+        record.exc_text,
+        json.dumps(extra, default=str) if extra else None,
+    )
+
+
+class SQLiteHandler(logging.handlers.BufferingHandler):
+    """Logging handler that writes log records to an SQLite database.
+
+    Records are buffered until :py:attr:`capacity` records are buffered,
+    or :py:attr:`flush_seconds` seconds have passed since the buffer was last
+    written,
+    and then written to the database in 1 transaction.
+    The default :py:attr:`flush_seconds` of 0 writes each record as soon as it
+    is handled,
+    except in the log aggregator's batched message processing mode,
+    where each batch is written in 1 transaction.
+
+    :arg str filename: Path of the database file.
+
+    :arg int capacity: Maximum number of records to buffer.
+
+    :arg float flush_seconds: Maximum number of seconds to buffer records for
+                              while they are being handled.
+    """
+
+    def __init__(self, filename, capacity=1000, flush_seconds=0):
+        super().__init__(capacity)
+        self.filename = filename
+        self.flush_seconds = flush_seconds
+        self.connection = connect(filename)
+        self._next_flush = time.monotonic() + flush_seconds
+
+    def shouldFlush(self, record):
+        return len(self.buffer) >= self.capacity or time.monotonic() >= self._next_flush
+
+    def flush(self):
+        """Write the buffered records to the database in 1 transaction."""
+        with self.lock:
+            if not self.buffer:
+                return
+            records, self.buffer = self.buffer, []
+            self._next_flush = time.monotonic() + self.flush_seconds
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        _INSERT, [_record_row(record) for record in records]
+                    )
+            except sqlite3.Error:
+                self.handleError(records[-1])
+
+    def close(self):
+        """Write the buffered records and close the database connection."""
+        with self.lock:
+            try:
+                self.flush()
+            finally:
+                self.connection.close()
+                super().close()
+
+
+def query(
+    connection,
+    logger_names=None,
+    since=None,
+    until=None,
+    level=None,
+    contains=None,
+    limit=None,
+):
+    """Query the log store for records.
+
+    :arg connection: Log store database connection.
+    :type connection: :py:class:`sqlite3.Connection`
+
+    :arg logger_names: Names of the loggers
+                       (i.e. nowcast system processes or workers)
+                       to select records from.
+    :type logger_names: list
+
+    :arg float since: Select records that were created at or after this Unix
+                      time.
+
+    :arg float until: Select records that were created before this Unix time.
+
+    :arg int level: Select records at or above this level.
+
+    :arg str contains: Select records whose messages contain this text.
+
+    :arg int limit: Maximum number of records to return;
+                    the most recent records are returned.
+
+    :returns: Records in the order that they were created.
+    :rtype: list of :py:class:`sqlite3.Row`
+    """
+    where, params = _where(logger_names, since, until, level, contains)
+    sql = f"SELECT * FROM log_records {where} ORDER BY created DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return connection.execute(sql, params).fetchall()[::-1]
+
+
+def runs(connection, logger_names=None, since=None, until=None):
+    """Summarize the runs of processes in the log store.
+
+    A run is the records of a logger from 1 process.
+    Records that were published in the text log format don't have process ids,
+    so their runs are the records of a logger on each day.
+
+    :arg connection: Log store database connection.
+    :type connection: :py:class:`sqlite3.Connection`
+
+    :arg logger_names: Names of the loggers to summarize the runs of.
+    :type logger_names: list
+
+    :arg float since: Summarize records that were created at or after this Unix
+                      time.
+
+    :arg float until: Summarize records that were created before this Unix time.
+
+    :returns: Runs with :kbd:`logger_name`,
+              :kbd:`host`,
+              :kbd:`pid`,
+              :kbd:`start`,
+              :kbd:`end`,
+              :kbd:`records`,
+              and :kbd:`max_level` columns in the order that they started.
+    :rtype: list of :py:class:`sqlite3.Row`
+    """
+    where, params = _where(logger_names, since, until)
+    sql = f"""
+        SELECT logger_name, host, pid,
+            MIN(created) AS start, MAX(created) AS end,
+            COUNT(*) AS records, MAX(level) AS max_level
+        FROM log_records {where}
+        GROUP BY logger_name, host, pid,
+            CASE WHEN pid IS NULL
+                THEN date(created, 'unixepoch', 'localtime')
+            END
+        ORDER BY start
+    """
+    return connection.execute(sql, params).fetchall()
+
+
+def _where(logger_names=None, since=None, until=None, level=None, contains=None):
+    clauses, params = [], []
+    if logger_names:
+        clauses.append(f"logger_name IN ({', '.join('?' * len(logger_names))})")
+        params.extend(logger_names)
+    if since is not None:
+        clauses.append("created >= ?")
+        params.append(since)
+    if until is not None:
+        clauses.append("created < ?")
+        params.append(until)
+    if level is not None:
+        clauses.append("level >= ?")
+        params.append(level)
+    if contains is not None:
+        clauses.append("instr(message, ?) > 0")
+        params.append(contains)
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
@@ -15,22 +15,41 @@
 """NEMO_Nowcast manager."""
 
 import argparse
+import asyncio
+import concurrent.futures
 import importlib
 import logging
 import logging.config
 import os
 import pprint
 import signal
+import sys
 import time
 
 import attr
 import requests
 import sentry_sdk
-import yaml
 import zmq
-import zmq.log.handlers
+import zmq.asyncio
 
-from nemo_nowcast import CommandLineInterface, Config, Message
+from nemo_nowcast import (
+    CommandLineInterface,
+    Config,
+    Message,
+    checklist,
+    forkserver,
+    launch_queue,
+    processes,
+    yamlutils,
+    zmq_logging,
+)
+
+#: Next workers module reload policies.
+NEXT_WORKERS_RELOAD_POLICIES = ("on change", "always")
+
+#: Seconds between checks for exited worker processes that were launched by
+#: the forkserver.
+FORKED_WORKER_CHECK_INTERVAL = 1
 
 
 def main():
@@ -89,6 +108,65 @@ class NowcastManager:
     #: Created when the
     #: py:meth:`~nemo_nowcast.manager.NowcastManager.run` method is called.
     _socket = attr.ib(default=None)
+    #: Name of the codec to serialize reply messages with.
+    #: Set to the codec of each message received from a worker so that
+    #: workers that use different codecs can share the message broker.
+    _reply_codec = attr.ib(default="yaml")
+    #: Per-worker :py:class:`asyncio.Queue` instances of message continuations
+    #: (checklist persistence, slack notifications, and next worker launches)
+    #: that are processed as background tasks in asynchronous message
+    #: processing mode.
+    _worker_queues = attr.ib(default=attr.Factory(dict))
+    #: Background :py:class:`asyncio.Task` instances in asynchronous message
+    #: processing mode.
+    #: The event loop only keeps weak references to tasks,
+    #: so they are held here until they are done.
+    _background_tasks = attr.ib(default=attr.Factory(set))
+    #: Single thread executor that appends checklist updates to the checklist
+    #: journal in asynchronous message processing mode.
+    #: Using one thread ensures that journal records are written in the
+    #: order in which the checklist was updated.
+    _checklist_journal_writer = attr.ib(default=None)
+    #: Signature (modification time and size) of the next workers module file
+    #: when it was last imported or reloaded.
+    _next_workers_signature = attr.ib(default=None)
+    #: Cache of the :py:func:`after_worker_name` functions that have been
+    #: resolved from the next workers module,
+    #: keyed by worker name.
+    #: Invalidated when the next workers module is reloaded.
+    _after_worker_funcs = attr.ib(default=attr.Factory(dict))
+    #: Next workers module reload metrics: number of reloads,
+    #: total seconds spent reloading,
+    #: and number of reloads skipped because the module file was unchanged.
+    _next_workers_reload_stats = attr.ib(
+        default=attr.Factory(lambda: {"reloads": 0, "seconds": 0.0, "skipped": 0})
+    )
+    #: :py:class:`nemo_nowcast.checklist.ChecklistJournal` instance that
+    #: checklist updates are appended to in checklist journal mode,
+    #: or :py:obj:`None`.
+    #: Created when the
+    #: py:meth:`~nemo_nowcast.manager.NowcastManager.run` method is called.
+    _checklist_journal = attr.ib(default=None)
+    #: :py:class:`nemo_nowcast.checklist.ChecklistWriter` instance that
+    #: writes the checklist to disk in a background thread,
+    #: or :py:obj:`None`.
+    #: Created when the checklist is first written to disk.
+    _checklist_file_writer = attr.ib(default=None)
+    #: :py:class:`nemo_nowcast.processes.WorkerProcessRegistry` instance that
+    #: holds the worker subprocesses that the manager has launched so that
+    #: they are reaped when they exit.
+    _worker_processes = attr.ib(default=attr.Factory(processes.WorkerProcessRegistry))
+    #: :py:class:`nemo_nowcast.launch_queue.LaunchQueue` instance that
+    #: limits the number of workers launched by the manager that run at once.
+    #: Configured when the
+    #: py:meth:`~nemo_nowcast.manager.NowcastManager.run` method is called.
+    _launch_queue = attr.ib(default=attr.Factory(launch_queue.LaunchQueue))
+    #: Read and write ends of the pipe that the child process exit signal
+    #: handler writes to so that worker processes that have exited are reaped
+    #: in the message processing loop instead of in the signal handler.
+    #: Created when the
+    #: py:meth:`~nemo_nowcast.manager.NowcastManager.run` method is called.
+    _sigchld_pipe = attr.ib(default=None)
 
     def setup(self):
         """Set up the nowcast system manager process including:
@@ -99,8 +177,12 @@ class NowcastManager:
         * Configuring the logging system as specified in the configuration file
         * Logging the manager's PID, and the file path/name that was used to
           configure it.
+        * Validating the :kbd:`manager: next workers reload` policy
+          configuration key.
         * Importing the :py:mod:`next_workers` module specified in the
-          configuration file.
+          configuration file,
+          or reloading it if it has already been imported so that changes to
+          it are used after the configuration is reloaded.
 
         The set-up is repeated if the manager process receives a HUP signal
         so that the configuration can be re-loaded without having to stop and
@@ -113,16 +195,33 @@ class NowcastManager:
         self.logger.info(f"running in process {os.getpid()}")
         self.logger.info(f"read config from {self.config.file}")
         self.logger.info(msg)
-        try:
-            self._next_workers_module = importlib.import_module(
-                self._msg_registry["next workers module"]
+        reload_policy = self.config.get("manager", {}).get(
+            "next workers reload", "on change"
+        )
+        if reload_policy not in NEXT_WORKERS_RELOAD_POLICIES:
+            msg = (
+                f"invalid manager: next workers reload policy: {reload_policy!r}; "
+                f"must be one of {NEXT_WORKERS_RELOAD_POLICIES}"
             )
+            self.logger.critical(msg)
+            raise ValueError(msg)
+        next_workers_module = self._msg_registry["next workers module"]
+        try:
+            if next_workers_module in sys.modules:
+                # Configuration reload; pick up changes to the module
+                self._next_workers_module = importlib.reload(
+                    sys.modules[next_workers_module]
+                )
+            else:
+                self._next_workers_module = importlib.import_module(next_workers_module)
         except ImportError:
             self.logger.critical(
                 f"could not find next workers module: {self._msg_registry['next workers module']}",
                 exc_info=True,
             )
             raise
+        self._next_workers_signature = self._next_workers_module_signature()
+        self._after_worker_funcs.clear()
         self.logger.info(
             f"next workers module loaded from {self._msg_registry['next workers module']}"
         )
@@ -163,20 +262,19 @@ class NowcastManager:
             port = self.config["zmq"]["ports"]["logging"][self.name]
             addr = f"tcp://*:{port}"
             logging_config["handlers"]["zmq_pub"]["interface_or_socket"] = addr
+            zmq_logging.use_xpub_handler(logging_config["handlers"]["zmq_pub"])
             logging.config.dictConfig(logging_config)
-            for handler in self.logger.root.handlers:
-                if isinstance(handler, zmq.log.handlers.PUBHandler):
-                    handler.root_topic = self.name
-                    handler.formatters = {
-                        logging.DEBUG: logging.Formatter("%(message)s\n"),
-                        logging.INFO: logging.Formatter("%(message)s\n"),
-                        logging.WARNING: logging.Formatter("%(message)s\n"),
-                        logging.ERROR: logging.Formatter("%(message)s\n"),
-                        logging.CRITICAL: logging.Formatter("%(message)s\n"),
-                    }
-            # Not sure why, but we need a brief pause before we start logging
-            # messages
-            time.sleep(1)
+            zmq_logging.configure_pub_handlers(
+                self.logger.root,
+                self.name,
+                self.config["zmq"].get("log format", "text"),
+            )
+            # Wait for the log aggregator to subscribe so that the first log
+            # messages aren't dropped
+            zmq_logging.wait_for_subscribers(
+                self.logger.root,
+                self.config["zmq"].get("log subscription timeout", 1),
+            )
             msg = f"publishing logging messages to {addr}"
         else:
             # Write log messages to local file system
@@ -201,21 +299,44 @@ class NowcastManager:
 
         * Create the :py:class:`zmq.Context.socket` for communication with the
           worker processes and connect it to the message broker.
-        * Install signal handlers for hangup, interrupt, and kill signals.
+          The socket is a :py:data:`zmq.REP` socket unless the
+          :kbd:`manager: message processing` configuration key is
+          :kbd:`async`,
+          in which case it is an :py:mod:`asyncio` :py:data:`zmq.DEALER`
+          socket.
+        * Install signal handlers for hangup, interrupt, kill, and child
+          process exit signals.
+        * Configure the worker launch queue limits.
         * Launch the manager's message processing loop
         """
-        self._socket = self._context.socket(zmq.REP)
+        async_mode = self.config.get("manager", {}).get("message processing") == "async"
+        if async_mode:
+            self._socket = zmq.asyncio.Socket.from_socket(
+                self._context.socket(zmq.DEALER)
+            )
+        else:
+            self._socket = self._context.socket(zmq.REP)
         zmq_host = self.config["zmq"]["host"]
         zmq_port = self.config["zmq"]["ports"]["manager"]
         self._socket.connect(f"tcp://{zmq_host}:{zmq_port}")
         self.logger.info(f"connected to {zmq_host} port {zmq_port}")
         self._install_signal_handlers(zmq_host, zmq_port)
+        self._close_checklist_persistence()
+        self._open_checklist_journal()
+        self._configure_launch_queue()
         if not self._parsed_args.ignore_checklist:
             self._load_checklist()
-        self._process_messages()
+        elif self._checklist_journal is not None:
+            # Discard the journal records of a previously running manager instance
+            self._checklist_journal.clear()
+        if async_mode:
+            self.logger.info("processing messages asynchronously")
+            self._process_messages_async()
+        else:
+            self._process_messages()
 
     def _install_signal_handlers(self, zmq_host, zmq_port):
-        """Set up hangup, interrupt, and kill signal handlers."""
+        """Set up hangup, interrupt, kill, and child process exit signal handlers."""
 
         def sighup_handler(signal, frame):
             self.logger.info("hangup signal (SIGHUP) received; reloading configuration")
@@ -241,16 +362,94 @@ class NowcastManager:
 
         signal.signal(signal.SIGTERM, sigterm_handler)
 
+        if self._sigchld_pipe is None:
+            self._sigchld_pipe = os.pipe()
+            for fd in self._sigchld_pipe:
+                os.set_blocking(fd, False)
+
+        def sigchld_handler(signal, frame):
+            # Only wake the message processing loop because reaping and
+            # launching workers here could re-enter ZeroMQ, logging, or a
+            # worker launch that the signal interrupted
+            try:
+                os.write(self._sigchld_pipe[1], b"\0")
+            except BlockingIOError:
+                # Pipe is full, so the loop will wake anyway
+                pass
+
+        signal.signal(signal.SIGCHLD, sigchld_handler)
+
+    def _open_checklist_journal(self):
+        """Create the checklist journal if checklist journal mode is enabled
+        by the :kbd:`manager: checklist journal` configuration section.
+        """
+        manager_config = self.config.get("manager", {})
+        if "checklist journal" not in manager_config:
+            return
+        journal_config = manager_config["checklist journal"] or {}
+        checklist_file = self.config["checklist file"]
+        self._checklist_journal = checklist.ChecklistJournal(
+            snapshot_file=checklist_file,
+            journal_file=journal_config.get("file", f"{checklist_file}.journal"),
+            compact_interval=journal_config.get("compact interval", 100),
+        )
+        self.logger.info(
+            f"checklist updates journaled to {self._checklist_journal.journal_file}"
+        )
+
+    def _submit_checklist_file_write(self):
+        """Queue a snapshot of the checklist to be written to disk by the
+        background checklist file writer,
+        creating the writer if necessary.
+
+        The fsync policy for checklist file writes is set by the
+        :kbd:`manager: checklist fsync` configuration key.
+        """
+        if self._checklist_file_writer is None:
+            manager_config = self.config.get("manager", {})
+            self._checklist_file_writer = checklist.ChecklistWriter(
+                checklist_file=self.config["checklist file"],
+                logger=self.logger,
+                fsync=manager_config.get("checklist fsync", "always"),
+                fsync_interval=manager_config.get("checklist fsync interval", 60),
+            )
+        self._checklist_file_writer.submit(self.checklist)
+
+    def _close_checklist_persistence(self):
+        """Finish writing the checklist to disk, and close the checklist
+        journal and file writer.
+        """
+        if self._checklist_file_writer is not None:
+            self._checklist_file_writer.close()
+            self.logger.debug(
+                f"checklist written {self._checklist_file_writer.writes} times; "
+                f"{self._checklist_file_writer.coalesced} writes coalesced"
+            )
+            self._checklist_file_writer = None
+        if self._checklist_journal is not None:
+            self._checklist_journal.close()
+            self._checklist_journal = None
+
     def _load_checklist(self):
         """Load the serialized checklist left on disk by a previously
         running manager instance.
+
+        In checklist journal mode the checklist is rebuilt from the checklist
+        file and the records in the journal file.
         """
         checklist_file = self.config["checklist file"]
         try:
-            with open(checklist_file, "rt") as f:
-                self.checklist = yaml.safe_load(f)
-                self.logger.info(f"checklist read from {checklist_file}")
-                self.logger.info(f"checklist:\n{pprint.pformat(self.checklist)}")
+            if self._checklist_journal is None:
+                with open(checklist_file, "rt") as f:
+                    self.checklist = yamlutils.safe_load(f)
+            else:
+                self.checklist = self._checklist_journal.load()
+                self.logger.info(
+                    f"{self._checklist_journal.records} checklist journal records "
+                    f"replayed from {self._checklist_journal.journal_file}"
+                )
+            self.logger.info(f"checklist read from {checklist_file}")
+            self.logger.info(f"checklist:\n{pprint.pformat(self.checklist)}")
         except FileNotFoundError:
             self.logger.warning("checklist load failed:", exc_info=True)
             self.logger.warning("running with empty checklist")
@@ -260,7 +459,8 @@ class NowcastManager:
         while True:
             self.logger.debug("listening...")
             try:
-                self._try_messages()
+                if self._wait_for_message():
+                    self._try_messages()
             except zmq.ZMQError as e:
                 # Fatal ZeroMQ problem
                 self.logger.critical("ZMQError:", exc_info=e)
@@ -272,6 +472,42 @@ class NowcastManager:
             except Exception as e:
                 self.logger.critical("unhandled exception:", exc_info=e)
                 self.logger.critical("shutting down")
+        self._close_checklist_persistence()
+
+    def _wait_for_message(self):
+        """Wait until a message arrives or a worker process exits,
+        reaping the worker processes that have exited,
+        and launching queued workers if the reaped workers allow it.
+
+        While workers that were launched by the forkserver are running
+        the wait is limited to :py:data:`FORKED_WORKER_CHECK_INTERVAL` seconds
+        so that their exits are noticed.
+
+        :returns: :py:obj:`True` if a message has arrived.
+        :rtype: boolean
+        """
+        poller = zmq.Poller()
+        poller.register(self._socket, zmq.POLLIN)
+        poller.register(self._sigchld_pipe[0], zmq.POLLIN)
+        timeout = (
+            FORKED_WORKER_CHECK_INTERVAL * 1000
+            if self._launch_queue.has_forked_workers
+            else None
+        )
+        events = dict(poller.poll(timeout))
+        launch = False
+        if self._sigchld_pipe[0] in events:
+            try:
+                while os.read(self._sigchld_pipe[0], 4096):
+                    pass
+            except BlockingIOError:
+                pass
+            launch = self._reap_worker_processes()
+        if self._launch_queue.has_forked_workers:
+            launch |= self._check_forked_workers()
+        if launch:
+            self._launch_workers([])
+        return self._socket in events
 
     def _try_messages(self):
         """Try to process messages.
@@ -279,15 +515,283 @@ class NowcastManager:
         Extracted from the :kbd:`try:` block in :py:meth:`_process_messages`
         so that it can be tested outside of the :kbd:`while True:` loop.
         """
-        message = self._socket.recv_string()
+        message = self._socket.recv()
         reply, next_workers = self._message_handler(message)
-        self._socket.send_string(reply)
-        for worker in next_workers:
-            worker.launch(self.config, self.name)
+        if isinstance(reply, str):
+            self._socket.send_string(reply)
+        else:
+            self._socket.send(reply)
+        self._launch_workers(next_workers)
+
+    def _process_messages_async(self):
+        """Process messages from workers in an :py:mod:`asyncio` event loop."""
+        self._checklist_journal_writer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="checklist_journal_writer"
+        )
+        reload = False
+        try:
+            asyncio.run(self._async_process_messages())
+        except asyncio.CancelledError:
+            # Message processing loop cancelled by hangup signal
+            reload = True
+        except zmq.ZMQError as e:
+            # Fatal ZeroMQ problem
+            self.logger.critical("ZMQError:", exc_info=e)
+            self.logger.critical("shutting down")
+        except SystemExit:
+            # Termination by signal
+            pass
+        finally:
+            self._log_dropped_continuations()
+            self._checklist_journal_writer.shutdown(wait=True)
+            self._close_checklist_persistence()
+        if reload:
+            self.logger.info("hangup signal (SIGHUP) received; reloading configuration")
+            self._socket.close()
+            self._worker_queues = {}
+            self.setup()
+            self.run()
+
+    async def _async_process_messages(self):
+        """Asynchronous message processing loop.
+
+        The loop is cancelled by a hangup signal so that the configuration
+        can be reloaded after the event loop has stopped.
+        The continuations of the messages that have been acknowledged are
+        processed before the loop stops.
+        """
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGHUP, asyncio.current_task().cancel)
+        loop.add_signal_handler(signal.SIGCHLD, self._async_reap_worker_processes)
+        self._create_background_task(self._async_check_forked_workers())
+        try:
+            while True:
+                self.logger.debug("listening...")
+                try:
+                    await self._async_try_messages()
+                except zmq.ZMQError:
+                    raise
+                except Exception as e:
+                    self.logger.critical("unhandled exception:", exc_info=e)
+        except asyncio.CancelledError:
+            self.logger.info(
+                "processing acknowledged messages before reloading configuration"
+            )
+            await asyncio.gather(*(q.join() for q in self._worker_queues.values()))
+            raise
+
+    def _create_background_task(self, coro):
+        """Run coro in a background task that is held until it is done,
+        and whose unhandled exception, if any, is logged.
+
+        :returns: Background task.
+        :rtype: :py:class:`asyncio.Task`
+        """
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_task_done)
+        return task
+
+    def _background_task_done(self, task):
+        """Release a background task that is done,
+        and log its unhandled exception, if any.
+        """
+        self._background_tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self.logger.critical(
+                "unhandled exception in background task:", exc_info=exc
+            )
+
+    def _log_dropped_continuations(self):
+        """Log the messages whose continuations were still queued when the
+        asynchronous message processing loop stopped,
+        so their next workers were not launched.
+        """
+        for queue in self._worker_queues.values():
+            while not queue.empty():
+                msg, *_ = queue.get_nowait()
+                self.logger.error(
+                    f"{msg.type} message from {msg.source} dropped before its "
+                    f"next workers were launched",
+                    extra={"worker_msg": msg},
+                )
+
+    async def _async_try_messages(self):
+        """Try to process a message in asynchronous message processing mode.
+
+        The reply is sent to the worker as soon as the checklist has been
+        updated in memory.
+        Writing the checklist to disk is queued for the checklist file writer
+        thread (or checklist journal writer thread),
+        and the remaining message handling is queued for a background task
+        that processes the messages from each worker in the order in which they
+        were received.
+        """
+        *envelope, message = await self._socket.recv_multipart()
+        reply, persist, continuation = self._async_message_handler(message)
+        if isinstance(reply, str):
+            reply = reply.encode()
+        await self._socket.send_multipart([*envelope, reply])
+        if persist:
+            self._queue_checklist_write(continuation[0] if continuation else None)
+        if continuation is not None:
+            msg = continuation[0]
+            try:
+                queue = self._worker_queues[msg.source]
+            except KeyError:
+                queue = self._worker_queues[msg.source] = asyncio.Queue()
+                self._create_background_task(self._process_continuations(queue))
+            queue.put_nowait(continuation)
+
+    def _async_message_handler(self, message):
+        """Handle message from worker in asynchronous message processing mode.
+
+        :returns: Reply message,
+                  whether the checklist needs to be written to disk,
+                  and the message continuation to process in the background
+                  (or :py:obj:`None`).
+                  The continuation includes a shallow copy of the checklist
+                  so that the :py:func:`after_worker_name` function sees the
+                  checklist as it was when the message was handled.
+        """
+        msg = Message.deserialize(message)
+        self._reply_codec = msg.codec
+        if msg.source not in self._msg_registry["workers"]:
+            reply = self._handle_unregistered_worker_msg(msg)
+            return reply, False, None
+        if msg.type not in self._msg_registry["workers"][msg.source]:
+            reply = self._handle_unregistered_msg_type(msg)
+            return reply, False, None
+        self._log_received_msg(msg)
+        if msg.type == "clear checklist":
+            reply = self._clear_checklist(persist=False)
+            return reply, True, None
+        if msg.type == "need":
+            reply = self._handle_need_msg(msg)
+            return reply, False, None
+        self._launch_queue.finished(msg.source)
+        persist = msg.payload is not None
+        if persist:
+            self._update_checklist(msg, persist=False)
+        after_func = self._after_worker_func(msg.source)
+        if after_func is None:
+            reply = Message(self.name, "no after_worker function").serialize(
+                self._reply_codec
+            )
+        else:
+            reply = Message(self.name, "ack").serialize(self._reply_codec)
+        return reply, persist, (msg, after_func, dict(self.checklist))
+
+    def _queue_checklist_write(self, msg=None):
+        """Queue the checklist to be written to disk by the checklist file
+        writer thread.
+
+        In checklist journal mode,
+        queue the checklist update from msg to be appended to the journal
+        by the checklist writer thread,
+        or queue the journal to be cleared if msg is :py:obj:`None`
+        because the checklist was cleared.
+        """
+        if self._checklist_journal is None:
+            self._submit_checklist_file_write()
+            return
+        if msg is None:
+            self._checklist_journal_writer.submit(self._clear_checklist_journal)
+            return
+        key = self._msg_registry["workers"][msg.source]["checklist key"]
+        self._checklist_journal_writer.submit(
+            self._append_checklist_journal, key, msg.payload, dict(self.checklist)
+        )
+
+    def _append_checklist_journal(self, key, payload, checklist):
+        """Append a checklist update record to the checklist journal,
+        and compact the journal into the checklist file if it has reached
+        the compaction interval.
+
+        :arg str key: Checklist key that was updated.
+
+        :arg payload: Checklist items that the value at key was updated with.
+
+        :arg dict checklist: Checklist, including the update.
+        """
+        try:
+            self._checklist_journal.append(key, payload)
+        except Exception as e:
+            self.logger.error("checklist journal append failed:", exc_info=e)
+            return
+        if self._checklist_journal.needs_compaction:
+            self._compact_checklist_journal(checklist)
+
+    def _compact_checklist_journal(self, checklist):
+        """Write checklist to the checklist file, and truncate the checklist
+        journal.
+        """
+        try:
+            self._checklist_journal.compact(checklist)
+        except Exception as e:
+            self.logger.error("checklist journal compaction failed:", exc_info=e)
+            return
+        self.logger.debug(
+            f"checklist journal compacted into {self._checklist_journal.snapshot_file}"
+        )
+
+    def _clear_checklist_journal(self):
+        """Append a clear record to the checklist journal,
+        then write the empty checklist to the checklist file,
+        and truncate the checklist journal.
+        """
+        try:
+            self._checklist_journal.clear()
+        except Exception as e:
+            self.logger.error("checklist journal clear failed:", exc_info=e)
+            return
+        self.logger.debug(
+            f"checklist journal cleared into {self._checklist_journal.snapshot_file}"
+        )
+
+    async def _process_continuations(self, queue):
+        """Process the continuations of the messages from a worker,
+        in the order in which they were received.
+
+        Slack notifications,
+        the :py:func:`after_worker_name` function calls,
+        and next worker launches run in threads so that they don't block the
+        event loop.
+        The :py:func:`after_worker_name` functions for different workers run
+        concurrently,
+        each with the snapshot of the checklist that was taken when its
+        message was handled,
+        rather than the live checklist that the event loop updates.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            msg, after_func, checklist_snapshot = await queue.get()
+            try:
+                await loop.run_in_executor(None, self._slack_notification, msg)
+                next_workers = []
+                if after_func is not None:
+                    next_workers = await loop.run_in_executor(
+                        None, after_func, msg, self.config, checklist_snapshot
+                    )
+                    next_workers = self._race_condition_next_workers(
+                        msg.source, next_workers
+                    )
+                await self._async_launch_workers(next_workers)
+            except Exception as e:
+                self.logger.critical(
+                    f"unhandled exception processing {msg.source} message:",
+                    exc_info=e,
+                )
+            finally:
+                queue.task_done()
 
     def _message_handler(self, message):
         """Handle message from worker."""
         msg = Message.deserialize(message)
+        self._reply_codec = msg.codec
         if msg.source not in self._msg_registry["workers"]:
             reply = self._handle_unregistered_worker_msg(msg)
             return reply, []
@@ -312,7 +816,7 @@ class NowcastManager:
             f"message received from unregistered worker: {msg.source}",
             extra={"worker_msg": msg},
         )
-        reply = Message(self.name, "unregistered worker").serialize()
+        reply = Message(self.name, "unregistered worker").serialize(self._reply_codec)
         return reply
 
     def _handle_unregistered_msg_type(self, msg):
@@ -323,7 +827,9 @@ class NowcastManager:
             f"unregistered message type received from {msg.source} worker: {msg.type}",
             extra={"worker_msg": msg},
         )
-        reply = Message(self.name, "unregistered message type").serialize()
+        reply = Message(self.name, "unregistered message type").serialize(
+            self._reply_codec
+        )
         return reply
 
     def _log_received_msg(self, msg):
@@ -338,18 +844,40 @@ class NowcastManager:
         """Handle request for checklist section message from worker."""
         reply = Message(
             self.name, "ack", payload=self.checklist[msg.payload]
-        ).serialize()
+        ).serialize(self._reply_codec)
         return reply
 
     def _handle_continue_msg(self, msg):
         """Handle success, failure, or crash message from worker by generating
         list of subsequent workers to launch.
         """
+        self._launch_queue.finished(msg.source)
         if msg.payload is not None:
             self._update_checklist(msg)
         self._slack_notification(msg)
-        importlib.reload(self._next_workers_module)
-        worker = msg.source
+        after_func = self._after_worker_func(msg.source)
+        if after_func is None:
+            reply = Message(self.name, "no after_worker function").serialize(
+                self._reply_codec
+            )
+            return reply, []
+        next_workers = after_func(msg, self.config, self.checklist)
+        next_workers = self._race_condition_next_workers(msg.source, next_workers)
+        reply = Message(self.name, "ack").serialize(self._reply_codec)
+        return reply, next_workers
+
+    def _after_worker_func(self, worker):
+        """Reload the next workers module if necessary and return the
+        :py:func:`after_worker_name` function for worker.
+
+        :returns: :py:func:`after_worker_name` function,
+                  or :py:obj:`None` if it is not found in the next workers module.
+        """
+        self._reload_next_workers_module()
+        try:
+            return self._after_worker_funcs[worker]
+        except KeyError:
+            pass
         try:
             after_func = getattr(self._next_workers_module, f"after_{worker}")
         except AttributeError:
@@ -357,9 +885,233 @@ class NowcastManager:
                 f"could not find after_{worker} in {self._msg_registry['next workers module']} module",
                 exc_info=True,
             )
-            reply = Message(self.name, "no after_worker function").serialize()
-            return reply, []
-        next_workers = after_func(msg, self.config, self.checklist)
+            return None
+        self._after_worker_funcs[worker] = after_func
+        return after_func
+
+    def _reload_next_workers_module(self):
+        """Reload the next workers module according to the
+        :kbd:`manager: next workers reload` configuration key.
+
+        The default policy, :kbd:`on change`, reloads the module only when
+        the modification time or size of its file has changed since it was
+        last loaded.
+        The :kbd:`always` policy reloads the module every time that it is used,
+        which may be convenient during development.
+        The module is also reloaded if its file can't be found.
+
+        Reloading the module clears the cache of
+        :py:func:`after_worker_name` functions.
+        """
+        policy = self.config.get("manager", {}).get("next workers reload", "on change")
+        signature = self._next_workers_module_signature()
+        stats = self._next_workers_reload_stats
+        if (
+            policy != "always"
+            and signature is not None
+            and signature == self._next_workers_signature
+        ):
+            stats["skipped"] += 1
+            return
+        t_start = time.perf_counter()
+        importlib.reload(self._next_workers_module)
+        stats["reloads"] += 1
+        stats["seconds"] += time.perf_counter() - t_start
+        self._next_workers_signature = signature
+        self._after_worker_funcs.clear()
+        self.logger.debug(
+            f"next workers module reloaded: {stats['reloads']} reloads "
+            f"in {stats['seconds']:.3f} seconds; {stats['skipped']} reloads skipped"
+        )
+
+    def _next_workers_module_signature(self):
+        """Return the modification time and size of the next workers module file,
+        or :py:obj:`None` if the file can't be found.
+        """
+        try:
+            stat = os.stat(self._next_workers_module.__file__)
+        except (AttributeError, TypeError, OSError):
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _configure_launch_queue(self):
+        """Set the worker launch queue limits and order from the
+        :kbd:`run` configuration section.
+
+        Workers that are running or queued when the configuration is reloaded
+        are kept.
+        """
+        run_config = self.config.get("run") or {}
+        enabled_hosts = run_config.get("enabled hosts") or {}
+        self._launch_queue.max_workers = run_config.get("max concurrent workers")
+        self._launch_queue.host_max_workers = {
+            host: host_config["max concurrent workers"]
+            for host, host_config in enabled_hosts.items()
+            if "max concurrent workers" in (host_config or {})
+        }
+        self._launch_queue.order = run_config.get("launch queue order", "fifo")
+        attr.validate(self._launch_queue)
+
+    def _launch_workers(self, next_workers):
+        """Add next_workers to the launch queue,
+        and launch the queued workers that the launch queue limits allow.
+        """
+        depth = self._launch_queue.depth
+        workers = self._launch_queue.submit(next_workers)
+        pending = list(workers)
+        while pending:
+            worker = pending.pop(0)
+            released = self._worker_launched(
+                worker, worker.launch(self.config, self.name)
+            )
+            workers.extend(released)
+            pending.extend(released)
+        if next_workers or workers:
+            self._log_launch_queue_depth(depth)
+            self._write_worker_status()
+
+    async def _async_launch_workers(self, next_workers):
+        """Add next_workers to the launch queue,
+        and launch the queued workers that the launch queue limits allow,
+        in threads so that they don't block the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        depth = self._launch_queue.depth
+        workers = self._launch_queue.submit(next_workers)
+        pending = list(workers)
+        while pending:
+            worker = pending.pop(0)
+            popen = await loop.run_in_executor(
+                None, worker.launch, self.config, self.name
+            )
+            released = self._worker_launched(worker, popen)
+            workers.extend(released)
+            pending.extend(released)
+        if next_workers or workers:
+            self._log_launch_queue_depth(depth)
+            self._write_worker_status()
+
+    def _worker_launched(self, worker, popen):
+        """Add the process of a worker that was launched to the worker process
+        registry and the launch queue.
+
+        If the launch failed,
+        the worker's launch queue slot is released so that queued workers can
+        be launched.
+
+        :arg worker: Worker that was launched.
+        :type worker: :py:class:`nemo_nowcast.worker.NextWorker`
+
+        :arg popen: Worker subprocess,
+                    or the forkserver's worker process if the worker was
+                    launched by the forkserver,
+                    or :py:obj:`None` if the launch failed.
+        :type popen: :py:class:`subprocess.Popen` or
+                     :py:class:`nemo_nowcast.forkserver.ForkedWorker`
+
+        :returns: Queued workers to launch now because the launch failed.
+        :rtype: list of :py:class:`nemo_nowcast.worker.NextWorker`
+        """
+        if popen is None:
+            return self._launch_queue.launch_failed(worker)
+        if isinstance(popen, forkserver.ForkedWorker):
+            self._launch_queue.launched(worker, popen.pid, forked_worker=popen)
+            return []
+        self._worker_processes.add(worker, popen)
+        self._launch_queue.launched(worker, popen.pid)
+        return []
+
+    def _log_launch_queue_depth(self, previous_depth):
+        """Log the depth of the launch queue if workers are queued,
+        or were queued before.
+        """
+        depth = self._launch_queue.depth
+        if depth or previous_depth:
+            self.logger.info(
+                f"launch queue depth: {depth}",
+                extra={
+                    "launch_queue_depth": depth,
+                    "launch_queue_host_depths": self._launch_queue.host_depths(),
+                },
+            )
+
+    def _reap_worker_processes(self):
+        """Reap the worker subprocesses that have exited,
+        log their exit statuses and resource usage,
+        stop counting them in the launch queue,
+        and update the worker process status file.
+
+        :returns: :py:obj:`True` if workers that were reaped may allow queued
+                  workers to be launched.
+        :rtype: boolean
+        """
+        released = False
+        for process in self._worker_processes.reap():
+            self.logger.info(
+                process.exit_summary(),
+                extra={"worker_process": process.as_dict()},
+            )
+            released |= self._launch_queue.process_exited(process.pid)
+        self._write_worker_status()
+        return released and self._launch_queue.depth > 0
+
+    def _async_reap_worker_processes(self):
+        """Reap the worker subprocesses that have exited in asynchronous
+        message processing mode,
+        launching queued workers in a background task if the reaped workers
+        allow it.
+        """
+        if self._reap_worker_processes():
+            self._create_background_task(self._async_launch_workers([]))
+
+    def _check_forked_workers(self):
+        """Stop counting the workers that were launched by the forkserver and
+        have exited in the launch queue,
+        and update the worker process status file if any have exited.
+
+        :returns: :py:obj:`True` if workers that exited may allow queued
+                  workers to be launched.
+        :rtype: boolean
+        """
+        if not self._launch_queue.forked_workers_exited():
+            return False
+        self._write_worker_status()
+        return self._launch_queue.depth > 0
+
+    async def _async_check_forked_workers(self):
+        """Check every :py:data:`FORKED_WORKER_CHECK_INTERVAL` seconds for
+        workers that were launched by the forkserver and have exited in
+        asynchronous message processing mode,
+        launching queued workers if the exited workers allow it.
+        """
+        while True:
+            await asyncio.sleep(FORKED_WORKER_CHECK_INTERVAL)
+            if self._launch_queue.has_forked_workers and self._check_forked_workers():
+                await self._async_launch_workers([])
+
+    def _write_worker_status(self):
+        """Write the details of the running and recently finished worker
+        subprocesses to the file given by the manager's
+        :kbd:`run: worker status files` configuration key, if any.
+        """
+        try:
+            status_file = self.config["run"]["worker status files"][self.name]
+        except (KeyError, TypeError):
+            return
+        try:
+            self._worker_processes.write_status(
+                status_file, {"launch queue": self._launch_queue.status()}
+            )
+        except OSError as e:
+            self.logger.error("worker status file write failed:", exc_info=e)
+
+    def _race_condition_next_workers(self, worker, next_workers):
+        """Apply race condition management to the list of next workers
+        returned by the :py:func:`after_worker_name` function for worker.
+
+        :returns: Workers to launch now.
+        :rtype: list
+        """
         if len(next_workers) > 1 and isinstance(next_workers[-1], set):
             next_workers, self._race_condition_mgmt["must finish"] = next_workers
             self._race_condition_mgmt["then launch"] = []
@@ -386,39 +1138,50 @@ class NowcastManager:
         except KeyError:
             # No race condition management in effect
             pass
-        reply = Message(self.name, "ack").serialize()
-        return reply, next_workers
+        return next_workers
 
-    def _update_checklist(self, msg):
+    def _update_checklist(self, msg, persist=True):
         """Update the checklist value at worker's key with the items passed from
         the worker.
 
         If key is not present in the checklist, add it with the worker
         items as its value.
 
-        Write the checklist to disk as a YAML file so that it can be
-        inspected and/or recovered if the manager instance is restarted.
+        The value at worker's key is replaced rather than updated in place
+        so that a shallow copy of the checklist is a consistent snapshot of it.
+
+        If persist is :py:obj:`True`,
+        write the checklist to disk as a YAML file so that it can be
+        inspected and/or recovered if the manager instance is restarted,
+        or append the update to the journal in checklist journal mode.
         """
         try:
             key = self._msg_registry["workers"][msg.source]["checklist key"]
         except KeyError:
             raise KeyError(f"checklist key not found for {msg.source} worker")
-        try:
-            self.checklist[key].update(msg.payload)
-        except (KeyError, AttributeError):
-            self.checklist[key] = msg.payload
+        checklist.update(self.checklist, key, msg.payload)
         self.logger.info(
             f"checklist updated with [{key}] items from {msg.source} worker",
             extra={"worker_msg": msg},
         )
-        self._write_checklist_to_disk()
+        if persist:
+            if self._checklist_journal is None:
+                self._write_checklist_to_disk()
+            else:
+                self._append_checklist_journal(key, msg.payload, self.checklist)
 
     def _write_checklist_to_disk(self):
         """Write the checklist to disk as a YAML file so that it can be
         inspected and/or recovered if the manager instance is restarted.
+
+        The checklist is written by the checklist file writer thread,
+        which replaces the file atomically.
+        In checklist journal mode the journal is compacted into the YAML file.
         """
-        with open(self.config["checklist file"], "wt") as f:
-            yaml.dump(self.checklist, f)
+        if self._checklist_journal is not None:
+            self._compact_checklist_journal(self.checklist)
+            return
+        self._submit_checklist_file_write()
 
     def _slack_notification(self, msg):
         try:
@@ -459,7 +1222,7 @@ class NowcastManager:
             if msg.source in workers:
                 requests.post(slack_url, json=slack_msg)
 
-    def _clear_checklist(self):
+    def _clear_checklist(self, persist=True):
         """Write the checklist to a log file, then clear it.
 
         This method is called in response to a "clear checklist" message from
@@ -477,9 +1240,13 @@ class NowcastManager:
                 )
                 handler.close()
         self.checklist.clear()
-        self._write_checklist_to_disk()
+        if persist:
+            if self._checklist_journal is None:
+                self._write_checklist_to_disk()
+            else:
+                self._clear_checklist_journal()
         self.logger.info("checklist cleared")
-        reply = Message(self.name, "checklist cleared").serialize()
+        reply = Message(self.name, "checklist cleared").serialize(self._reply_codec)
         return reply
 
 
@@ -12,10 +12,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-"""NEMO_Nowcast framework message object."""
+"""NEMO_Nowcast framework message object.
+
+Messages are serialized with a codec.
+YAML is the default codec;
+YAML serialized messages are text documents.
+The binary codecs produce frames that start with a 3 byte header
+(a NUL marker byte, a frame version byte, and a codec id byte)
+so that the recipient of a message can tell which codec was used to
+serialize it.
+That allows workers that use different codecs to share a message broker.
+"""
+
+import datetime
+import struct
 
 import attr
-import yaml
+
+from nemo_nowcast import yamlutils
+
+#: Marker byte at the start of binary codec message frames.
+#: YAML documents never start with a NUL byte.
+FRAME_MARKER = b"\x00"
+#: Version of the binary codec message frame header.
+FRAME_VERSION = 1
 
 
 @attr.s
@@ -30,24 +50,216 @@ class Message:
     #: Content of message; must be serializable by YAML such that it can be
     #: deserialized by :py:func:`yaml.safe_load`.
     payload = attr.ib(default=None)
+    #: Name of the codec that the message was deserialized with.
+    #: Used by the manager to reply to a worker with the codec that the
+    #: worker used.
+    codec = attr.ib(default="yaml", eq=False, repr=False)
 
-    def serialize(self):
+    def serialize(self, codec="yaml"):
         """Construct a message data structure and transform it into a string
         suitable for sending.
 
-        :returns: Message data structure serialized using YAML.
+        :arg str codec: Name of the codec to use to serialize the message;
+                        :kbd:`yaml`,
+                        or one of the keys of :py:data:`CODECS`.
+
+        :returns: Message data structure serialized using YAML as a str,
+                  or serialized using a binary codec as a bytes frame.
         """
-        return yaml.dump(
-            {"source": self.source, "type": self.type, "payload": self.payload}
-        )
+        msg = {"source": self.source, "type": self.type, "payload": self.payload}
+        if codec == "yaml":
+            return yamlutils.dump(msg)
+        try:
+            codec_id, dumps, _ = CODECS[codec]
+        except KeyError:
+            raise ValueError(f"unknown message codec: {codec}")
+        header = FRAME_MARKER + bytes((FRAME_VERSION, codec_id))
+        return header + dumps(msg)
 
     @classmethod
     def deserialize(cls, message):
-        """Transform received message from str to message data structure.
+        """Transform received message from str or bytes to message data structure.
+
+        The codec is detected from the message frame header.
+        Messages without a frame header are deserialized as YAML.
 
-        :arg str message: Message dict serialized using YAML.
+        :arg message: Message dict serialized using YAML or a binary codec.
+        :type message: str or bytes
 
         :returns: :py:class:`nemo_nowcast.lib.Message` instance
         """
-        msg = yaml.safe_load(message)
-        return cls(source=msg["source"], type=msg["type"], payload=msg["payload"])
+        codec = "yaml"
+        if isinstance(message, bytes) and message.startswith(FRAME_MARKER):
+            version, codec_id = message[1], message[2]
+            if version != FRAME_VERSION:
+                raise ValueError(f"unsupported message frame version: {version}")
+            try:
+                codec = _CODEC_NAMES[codec_id]
+            except KeyError:
+                raise ValueError(f"unknown message codec id: {codec_id}")
+            msg = CODECS[codec][2](message[3:])
+        else:
+            msg = yamlutils.safe_load(message)
+        return cls(
+            source=msg["source"],
+            type=msg["type"],
+            payload=msg["payload"],
+            codec=codec,
+        )
+
+
+def _struct_dumps(obj):
+    """Serialize obj to bytes using a compact, length-prefixed, tagged format.
+
+    Supports the same types as :py:func:`yaml.safe_load` returns for message
+    payloads: :py:obj:`None`, :py:obj:`bool`, :py:obj:`int`,
+    :py:obj:`float`, :py:obj:`str`, :py:obj:`bytes`,
+    :py:class:`datetime.date`, :py:class:`datetime.datetime`,
+    and :py:obj:`list`, :py:obj:`tuple` and :py:obj:`dict` containers of them.
+    Tuples are deserialized as lists, as they are by the YAML codec.
+    """
+    buf = bytearray()
+    _struct_pack(obj, buf)
+    return bytes(buf)
+
+
+_pack_len = struct.Struct("!I").pack
+_pack_int = struct.Struct("!q").pack
+_pack_float = struct.Struct("!d").pack
+_unpack_len = struct.Struct("!I").unpack_from
+_unpack_int = struct.Struct("!q").unpack_from
+_unpack_float = struct.Struct("!d").unpack_from
+
+
+def _struct_pack(obj, buf):
+    if obj is None:
+        buf += b"N"
+    elif obj is True:
+        buf += b"T"
+    elif obj is False:
+        buf += b"F"
+    elif isinstance(obj, int):
+        if -(2**63) <= obj < 2**63:
+            buf += b"i" + _pack_int(obj)
+        else:
+            digits = str(obj).encode()
+            buf += b"I" + _pack_len(len(digits)) + digits
+    elif isinstance(obj, float):
+        buf += b"d" + _pack_float(obj)
+    elif isinstance(obj, str):
+        encoded = obj.encode()
+        buf += b"s" + _pack_len(len(encoded)) + encoded
+    elif isinstance(obj, bytes):
+        buf += b"b" + _pack_len(len(obj)) + obj
+    elif isinstance(obj, dict):
+        buf += b"m" + _pack_len(len(obj))
+        for key, value in obj.items():
+            _struct_pack(key, buf)
+            _struct_pack(value, buf)
+    elif isinstance(obj, (list, tuple)):
+        buf += b"l" + _pack_len(len(obj))
+        for item in obj:
+            _struct_pack(item, buf)
+    elif isinstance(obj, datetime.datetime):
+        iso = obj.isoformat().encode()
+        buf += b"Z" + _pack_len(len(iso)) + iso
+    elif isinstance(obj, datetime.date):
+        buf += b"D" + _pack_len(obj.toordinal())
+    else:
+        raise TypeError(f"can't serialize {type(obj).__name__} in a message: {obj!r}")
+
+
+def _struct_loads(data):
+    """Deserialize bytes produced by :py:func:`_struct_dumps`."""
+    obj, offset = _struct_unpack(memoryview(data), 0)
+    if offset != len(data):
+        raise ValueError("trailing bytes after message payload")
+    return obj
+
+
+def _struct_unpack(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag == 0x4E:  # N
+        return None, offset
+    if tag == 0x54:  # T
+        return True, offset
+    if tag == 0x46:  # F
+        return False, offset
+    if tag == 0x69:  # i
+        return _unpack_int(data, offset)[0], offset + 8
+    if tag == 0x64:  # d
+        return _unpack_float(data, offset)[0], offset + 8
+    if tag == 0x44:  # D
+        return datetime.date.fromordinal(_unpack_len(data, offset)[0]), offset + 4
+    (length,) = _unpack_len(data, offset)
+    offset += 4
+    if tag == 0x73:  # s
+        end = offset + length
+        return str(data[offset:end], "utf-8"), end
+    if tag == 0x6D:  # m
+        obj = {}
+        for _ in range(length):
+            key, offset = _struct_unpack(data, offset)
+            obj[key], offset = _struct_unpack(data, offset)
+        return obj, offset
+    if tag == 0x6C:  # l
+        obj = []
+        for _ in range(length):
+            item, offset = _struct_unpack(data, offset)
+            obj.append(item)
+        return obj, offset
+    end = offset + length
+    if tag == 0x62:  # b
+        return bytes(data[offset:end]), end
+    if tag == 0x49:  # I
+        return int(str(data[offset:end], "ascii")), end
+    if tag == 0x5A:  # Z
+        return datetime.datetime.fromisoformat(str(data[offset:end], "ascii")), end
+    raise ValueError(f"unknown type tag in message: {chr(tag)!r}")
+
+
+def _msgpack_default(obj):
+    import msgpack
+
+    if isinstance(obj, datetime.datetime):
+        return msgpack.ExtType(2, obj.isoformat().encode())
+    if isinstance(obj, datetime.date):
+        return msgpack.ExtType(1, obj.isoformat().encode())
+    raise TypeError(f"can't serialize {type(obj).__name__} in a message: {obj!r}")
+
+
+def _msgpack_ext_hook(code, data):
+    import msgpack
+
+    if code == 1:
+        return datetime.date.fromisoformat(data.decode())
+    if code == 2:
+        return datetime.datetime.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_dumps(obj):
+    # msgpack is an optional dependency, so import it only when it is used
+    import msgpack
+
+    return msgpack.packb(obj, use_bin_type=True, default=_msgpack_default)
+
+
+def _msgpack_loads(data):
+    import msgpack
+
+    return msgpack.unpackb(
+        data, raw=False, strict_map_key=False, ext_hook=_msgpack_ext_hook
+    )
+
+
+#: Binary message codecs: name: (codec id, dumps function, loads function).
+#: :kbd:`binary` uses only the Python standard library.
+#: :kbd:`msgpack` requires the optional :kbd:`msgpack` package to be installed
+#: on all of the hosts that exchange messages using it.
+CODECS = {
+    "binary": (1, _struct_dumps, _struct_loads),
+    "msgpack": (2, _msgpack_dumps, _msgpack_loads),
+}
+_CODEC_NAMES = {codec_id: name for name, (codec_id, _, _) in CODECS.items()}
@@ -22,13 +22,11 @@ import logging
 import logging.config
 import os
 import signal
-import time
 
 import sentry_sdk
 import zmq
-import zmq.log.handlers
 
-from nemo_nowcast import CommandLineInterface, Config
+from nemo_nowcast import CommandLineInterface, Config, zmq_logging
 
 NAME = "message_broker"
 logger = logging.getLogger(NAME)
@@ -86,20 +84,16 @@ def _configure_logging(config):
         port = config["zmq"]["ports"]["logging"][NAME]
         addr = f"tcp://*:{port}"
         logging_config["handlers"]["zmq_pub"]["interface_or_socket"] = addr
+        zmq_logging.use_xpub_handler(logging_config["handlers"]["zmq_pub"])
         logging.config.dictConfig(logging_config)
-        for handler in logger.root.handlers:
-            if isinstance(handler, zmq.log.handlers.PUBHandler):
-                handler.root_topic = NAME
-                handler.formatters = {
-                    logging.DEBUG: logging.Formatter("%(message)s\n"),
-                    logging.INFO: logging.Formatter("%(message)s\n"),
-                    logging.WARNING: logging.Formatter("%(message)s\n"),
-                    logging.ERROR: logging.Formatter("%(message)s\n"),
-                    logging.CRITICAL: logging.Formatter("%(message)s\n"),
-                }
-        # Not sure why, but we need a brief pause before we start logging
-        # messages
-        time.sleep(0.25)
+        zmq_logging.configure_pub_handlers(
+            logger.root, NAME, config["zmq"].get("log format", "text")
+        )
+        # Wait for the log aggregator to subscribe so that the first log
+        # messages aren't dropped
+        zmq_logging.wait_for_subscribers(
+            logger.root, config["zmq"].get("log subscription timeout", 0.25)
+        )
         msg = f"publishing logging messages to {addr}"
     else:
         # Write log messages to local file system
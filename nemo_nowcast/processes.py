@@ -0,0 +1,219 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework launched worker process tracking.
+
+The manager and the scheduler keep the :py:class:`subprocess.Popen` objects of
+the worker processes that they launch in a
+:py:class:`~nemo_nowcast.processes.WorkerProcessRegistry`.
+The registry reaps the processes when they exit so that they don't become
+zombies,
+and records their exit statuses,
+wall-clock run times,
+and resource usage.
+
+Only the processes in the registry are waited for,
+so other child processes (e.g. those started by :py:mod:`subprocess` calls in
+:py:func:`after_worker_name` functions) are left for their owners to wait for.
+"""
+
+import collections
+import datetime
+import os
+import time
+
+import attr
+
+from nemo_nowcast import fileutils, yamlutils
+
+
+@attr.s
+class WorkerProcess:
+    """Construct a :py:class:`nemo_nowcast.processes.WorkerProcess` instance."""
+
+    #: Name of the worker module including its package path,
+    #: in dotted notation.
+    module = attr.ib()
+    #: Worker command-line arguments.
+    args = attr.ib()
+    #: Host that the worker was launched on.
+    host = attr.ib()
+    #: Process id of the worker process
+    #: (the :command:`ssh` process for workers on remote hosts).
+    pid = attr.ib()
+    #: :py:class:`subprocess.Popen` object of the worker process.
+    popen = attr.ib(repr=False)
+    #: Time at which the worker was launched.
+    started = attr.ib(default=attr.Factory(datetime.datetime.now))
+    #: :py:func:`time.monotonic` time at which the worker was launched.
+    started_monotonic = attr.ib(default=attr.Factory(time.monotonic), repr=False)
+    #: Exit status of the worker process;
+    #: negative for processes that were terminated by a signal.
+    exit_code = attr.ib(default=None)
+    #: Wall-clock run time of the worker process in seconds.
+    wall_seconds = attr.ib(default=None)
+    #: User CPU time of the worker process in seconds.
+    user_cpu_seconds = attr.ib(default=None)
+    #: System CPU time of the worker process in seconds.
+    system_cpu_seconds = attr.ib(default=None)
+    #: Maximum resident set size of the worker process in kilobytes.
+    max_rss_kb = attr.ib(default=None)
+
+    def finish(self, status, rusage):
+        """Record the exit status and resource usage of the worker process.
+
+        :arg int status: Wait status of the worker process,
+                         or :py:obj:`None` if the process was waited for
+                         by its :py:class:`subprocess.Popen` object.
+
+        :arg rusage: Resource usage of the worker process,
+                     or :py:obj:`None` if it is not available.
+        :type rusage: :py:class:`resource.struct_rusage`
+        """
+        self.wall_seconds = round(time.monotonic() - self.started_monotonic, 3)
+        if status is not None:
+            self.popen.returncode = os.waitstatus_to_exitcode(status)
+        self.exit_code = self.popen.returncode
+        if rusage is not None:
+            self.user_cpu_seconds = rusage.ru_utime
+            self.system_cpu_seconds = rusage.ru_stime
+            self.max_rss_kb = rusage.ru_maxrss
+
+    def exit_summary(self):
+        """Return a summary of the exit status and resource usage of the
+        finished worker process.
+
+        :rtype: str
+        """
+        summary = (
+            f"{self.module} worker process {self.pid} exited with status "
+            f"{self.exit_code} after {self.wall_seconds:.1f} s"
+        )
+        if self.max_rss_kb is not None:
+            summary += (
+                f"; max RSS {self.max_rss_kb} kB, "
+                f"CPU user {self.user_cpu_seconds:.1f} s, "
+                f"system {self.system_cpu_seconds:.1f} s"
+            )
+        return summary
+
+    def as_dict(self):
+        """Return the worker process details as a :py:class:`dict` that can be
+        written to a YAML file.
+
+        :rtype: dict
+        """
+        return attr.asdict(
+            self, filter=lambda a, value: a.name not in {"popen", "started_monotonic"}
+        )
+
+
+@attr.s
+class WorkerProcessRegistry:
+    """Construct a :py:class:`nemo_nowcast.processes.WorkerProcessRegistry`
+    instance.
+
+    The registry isn't thread-safe.
+    It must only be used from the thread that runs the manager's or the
+    scheduler's main loop,
+    or the manager's :py:mod:`asyncio` event loop.
+    Their :py:data:`~signal.SIGCHLD` handlers only wake that loop,
+    which then reaps the worker processes that have exited.
+    """
+
+    #: Number of finished worker processes to keep the details of.
+    history = attr.ib(default=100)
+    #: Running worker processes keyed by process id.
+    running = attr.ib(default=attr.Factory(dict), init=False)
+    #: Most recently finished worker processes, oldest first.
+    finished = attr.ib(init=False)
+
+    @finished.default
+    def _finished_default(self):
+        return collections.deque(maxlen=self.history)
+
+    def add(self, next_worker, popen):
+        """Add a launched worker process to the registry.
+
+        :arg next_worker: Worker that was launched.
+        :type next_worker: :py:class:`nemo_nowcast.worker.NextWorker`
+
+        :arg popen: Worker process,
+                    or :py:obj:`None` if no process was launched,
+                    in which case nothing is added.
+        :type popen: :py:class:`subprocess.Popen`
+
+        :returns: Registry entry for the worker process, or :py:obj:`None`.
+        :rtype: :py:class:`nemo_nowcast.processes.WorkerProcess`
+        """
+        if popen is None:
+            return None
+        process = WorkerProcess(
+            module=next_worker.module,
+            args=list(next_worker.args),
+            host=next_worker.host,
+            pid=popen.pid,
+            popen=popen,
+        )
+        self.running[popen.pid] = process
+        return process
+
+    def reap(self):
+        """Wait for the worker processes in the registry that have exited,
+        and record their exit statuses and resource usage.
+
+        :returns: Worker processes that were reaped.
+        :rtype: list of :py:class:`nemo_nowcast.processes.WorkerProcess`
+        """
+        reaped = []
+        for pid, process in list(self.running.items()):
+            try:
+                wpid, status, rusage = os.wait4(pid, os.WNOHANG)
+            except ChildProcessError:
+                # Already waited for by something else (e.g. Popen.poll())
+                wpid, status, rusage = pid, None, None
+            if wpid == 0:
+                continue
+            process.finish(status, rusage)
+            del self.running[pid]
+            self.finished.append(process)
+            reaped.append(process)
+        return reaped
+
+    def status(self):
+        """Return the details of the running and most recently finished worker
+        processes.
+
+        :rtype: dict
+        """
+        return {
+            "running": [process.as_dict() for process in self.running.values()],
+            "finished": [process.as_dict() for process in self.finished],
+        }
+
+    def write_status(self, status_file, extra_status=None):
+        """Write the details of the running and most recently finished worker
+        processes to status_file as YAML,
+        replacing the file atomically.
+
+        :arg status_file: Path of the worker process status file.
+        :type status_file: :py:class:`pathlib.Path` or str
+
+        :arg dict extra_status: Additional items to include in the status file.
+        """
+        status = {**self.status(), **(extra_status or {})}
+        with fileutils.atomic_save(
+            os.fspath(status_file), text_mode=True, overwrite_part=True
+        ) as f:
+            yamlutils.dump(status, f)
@@ -14,24 +14,53 @@
 
 """NEMO_Nowcast worker launch scheduler."""
 
+import datetime
+import functools
+import heapq
+import itertools
 import logging
 import logging.config
 import os
+import select
 import signal
-import time
 
+import attr
 import schedule
 import sentry_sdk
 import zmq
-import zmq.log.handlers
 
-from nemo_nowcast import CommandLineInterface, Config, NextWorker
+from nemo_nowcast import (
+    CommandLineInterface,
+    Config,
+    NextWorker,
+    cron,
+    file_watch,
+    fileutils,
+    processes,
+    yamlutils,
+    zmq_logging,
+)
 
 NAME = "scheduler"
 logger = logging.getLogger(NAME)
 
 context = zmq.Context()
 
+#: Maximum number of seconds that the scheduler sleeps between checks of its
+#: jobs, so that changes of the system clock don't delay jobs for long.
+MAX_SLEEP_SECONDS = 3600
+
+#: Policies for scheduled worker launches that were missed while the scheduler
+#: was not running.
+CATCH_UP_POLICIES = ("skip", "run-once", "run-all")
+
+#: File watches that launch workers when files arrive;
+#: replaced when the schedule is prepared.
+_file_watches = []
+#: Job timer of the running scheduled worker launching loop;
+#: closed when the configuration is reloaded.
+_timer = None
+
 
 def main():
     """Set up and run the nowcast system worker launch scheduler.
@@ -85,20 +114,16 @@ def _configure_logging(config):
         port = config["zmq"]["ports"]["logging"][NAME]
         addr = f"tcp://*:{port}"
         logging_config["handlers"]["zmq_pub"]["interface_or_socket"] = addr
+        zmq_logging.use_xpub_handler(logging_config["handlers"]["zmq_pub"])
         logging.config.dictConfig(logging_config)
-        for handler in logger.root.handlers:
-            if isinstance(handler, zmq.log.handlers.PUBHandler):
-                handler.root_topic = NAME
-                handler.formatters = {
-                    logging.DEBUG: logging.Formatter("%(message)s\n"),
-                    logging.INFO: logging.Formatter("%(message)s\n"),
-                    logging.WARNING: logging.Formatter("%(message)s\n"),
-                    logging.ERROR: logging.Formatter("%(message)s\n"),
-                    logging.CRITICAL: logging.Formatter("%(message)s\n"),
-                }
-        # Not sure why, but we need a brief pause before we start logging
-        # messages
-        time.sleep(0.25)
+        zmq_logging.configure_pub_handlers(
+            logger.root, NAME, config["zmq"].get("log format", "text")
+        )
+        # Wait for the log aggregator to subscribe so that the first log
+        # messages aren't dropped
+        zmq_logging.wait_for_subscribers(
+            logger.root, config["zmq"].get("log subscription timeout", 0.25)
+        )
         msg = f"publishing logging messages to {addr}"
     else:
         # Write log messages to local file system
@@ -122,56 +147,533 @@ def _configure_logging(config):
 def run(config):
     """Run the nowcast system worker launch scheduler.
 
-    * Prepare the schedule as specified in the configuration file.
-    * Loop forever, periodically checking to see if it is time to launch the
-      scheduled workers.
+    * Load the scheduler state file given by the
+      :kbd:`run: scheduler state file` configuration key, if any.
+    * Prepare the schedule as specified in the configuration file,
+      catching up on worker launches that were missed while the scheduler was
+      not running.
+    * Install a signal handler for child process exit.
+    * Loop forever, sleeping until the next scheduled worker launch is due,
+      a watched file arrives,
+      or a launched worker process exits,
+      launching the scheduled workers that are due,
+      and reaping the worker processes that have exited.
 
     :param config: Nowcast system configuration.
     :type config: :py:class:`nemo_nowcast.config.Config`
     """
-    sleep_seconds = _prep_schedule(config)
+    global _timer
+    worker_processes = processes.WorkerProcessRegistry()
+    try:
+        state_file = config["run"]["scheduler state file"]
+    except (KeyError, TypeError):
+        state_file = None
+    state = SchedulerState(state_file)
+    state.load()
+    _prep_schedule(config, worker_processes, state)
+    _timer = timer = JobTimer(on_run=state.record, file_watches=_file_watches)
+    timer.add_jobs()
+
+    def sigchld_handler(signal, frame):
+        timer.wake()
+
+    signal.signal(signal.SIGCHLD, sigchld_handler)
     while True:
-        schedule.run_pending()
-        time.sleep(sleep_seconds)
+        timer.run_pending()
+        _reap_worker_processes(config, worker_processes)
+        timer.sleep()
+
+
+def _prep_schedule(config, worker_processes=None, state=None):
+    """Create the schedule to launch workers,
+    replacing any previously created schedule.
 
+    Workers that are launched when files arrive are added to
+    :py:data:`_file_watches`.
 
-def _prep_schedule(config):
-    """Create the schedule to launch workers and set how often it is checked.
+    If state is given,
+    the launches that were missed since the jobs last ran are handled
+    according to their catch-up policies,
+    and the state is written to the scheduler state file.
 
     :param config: Nowcast system configuration.
     :type config: :py:class:`nemo_nowcast.config.Config`
+
+    :param worker_processes: Registry to add launched worker processes to.
+    :type worker_processes: :py:class:`nemo_nowcast.processes.WorkerProcessRegistry`
+
+    :param state: Scheduler state.
+    :type state: :py:class:`nemo_nowcast.scheduler.SchedulerState`
     """
-    sleep_seconds = 60
+    schedule.clear()
+    for watch in _file_watches:
+        watch.close()
+    _file_watches.clear()
     try:
         for sched_item in config["scheduled workers"]:
             worker_module = list(sched_item.keys())[0]
-            _create_scheduled_job(worker_module, sched_item[worker_module], config)
+            params = sched_item[worker_module]
+            if "watch" in params:
+                _file_watches.append(
+                    _create_file_watch(worker_module, params, config, worker_processes)
+                )
+                continue
+            job = _create_scheduled_job(worker_module, params, config, worker_processes)
+            if state is not None:
+                _catch_up_missed_runs(job, params.get("catch up", "skip"), state)
     except (AttributeError, KeyError):
         # Do nothing if scheduled workers config section is missing or empty
         pass
-    return sleep_seconds
+    if state is not None:
+        state.write()
 
 
-def _create_scheduled_job(worker_module, params, config):
+def _create_scheduled_job(worker_module, params, config, worker_processes=None):
     try:
         args = params["cmd line opts"].split()
     except KeyError:
         args = []
     worker = NextWorker(worker_module, args)
-    job = (
-        schedule.every()
-        .__getattribute__(params["every"])
-        .at(params["at"])
-        .do(worker.launch, config, NAME)
+    if "cron" in params:
+        job = CronJob(cron.CronExpression(params["cron"]), schedule.default_scheduler)
+        when = f"cron {params['cron']}"
+    else:
+        job = schedule.every().__getattribute__(params["every"]).at(params["at"])
+        when = f"every {params['every']} at {params['at']}"
+    job = job.tag(" ".join([worker_module, *args, f"({when})"])).do(
+        worker.launch, config, NAME, registry=worker_processes
     )
     return job
 
 
+def _create_file_watch(worker_module, params, config, worker_processes=None):
+    """Create and start a file watch that launches a worker when files arrive.
+
+    :param str worker_module: Name of the worker module including its package
+                              path, in dotted notation.
+
+    :param dict params: Scheduled worker parameters.
+
+    :param config: Nowcast system configuration.
+    :type config: :py:class:`nemo_nowcast.config.Config`
+
+    :param worker_processes: Registry to add launched worker processes to.
+    :type worker_processes: :py:class:`nemo_nowcast.processes.WorkerProcessRegistry`
+
+    :rtype: :py:class:`nemo_nowcast.file_watch.FileWatch`
+    """
+    try:
+        args = params["cmd line opts"].split()
+    except KeyError:
+        args = []
+    worker = NextWorker(worker_module, args)
+    watch = file_watch.FileWatch.from_glob(
+        params["watch"],
+        functools.partial(_launch_for_files, worker, config, worker_processes),
+        settle_seconds=params.get("settle seconds", file_watch.SETTLE_SECONDS),
+        batch_seconds=params.get("batch seconds", file_watch.BATCH_SECONDS),
+        poll_seconds=params.get("poll seconds", file_watch.POLL_SECONDS),
+        poll=params.get("poll", False),
+    )
+    watch.start()
+    method = "polling" if watch.inotify is None else "inotify"
+    logger.info(f"watching for {params['watch']} to launch {worker_module} ({method})")
+    return watch
+
+
+def _launch_for_files(worker, config, worker_processes, paths):
+    """Launch worker for a batch of arrived files.
+
+    :param worker: Worker to launch.
+    :type worker: :py:class:`nemo_nowcast.worker.NextWorker`
+
+    :param config: Nowcast system configuration.
+    :type config: :py:class:`nemo_nowcast.config.Config`
+
+    :param worker_processes: Registry to add launched worker processes to.
+    :type worker_processes: :py:class:`nemo_nowcast.processes.WorkerProcessRegistry`
+
+    :param list paths: Paths of the arrived files.
+    """
+    logger.info(
+        f"launching {worker.module} for {len(paths)} arrived file(s)",
+        extra={"arrived_files": paths},
+    )
+    worker.launch(config, NAME, registry=worker_processes)
+
+
+def _job_name(job):
+    """Return the name of a scheduled worker launch job that is used as its key
+    in the scheduler state.
+
+    :param job: Scheduled worker launch job.
+    :type job: :py:class:`schedule.Job`
+
+    :rtype: str
+    """
+    return next(iter(job.tags))
+
+
+def _job_cron(job):
+    """Return the cron expression that matches the times at which job is due,
+    or :py:obj:`None` if there isn't one
+    (e.g. for jobs that run every minute).
+
+    :param job: Scheduled worker launch job.
+    :type job: :py:class:`schedule.Job`
+
+    :rtype: :py:class:`nemo_nowcast.cron.CronExpression`
+    """
+    if isinstance(job, CronJob):
+        return job.cron
+    if job.at_time is None or job.interval != 1:
+        return None
+    at = job.at_time
+    if job.unit == "hours":
+        expression = f"{at.minute} * * * *"
+    elif job.unit == "days":
+        expression = f"{at.minute} {at.hour} * * *"
+    elif job.unit == "weeks" and job.start_day is not None:
+        expression = f"{at.minute} {at.hour} * * {job.start_day[:3]}"
+    else:
+        return None
+    return cron.CronExpression(expression, second=at.second)
+
+
+def _catch_up_missed_runs(job, policy, state):
+    """Handle the launches of job that were due after the time that it last ran
+    according to policy,
+    and record the latest of them in state.
+
+    Jobs that are not in state are recorded as having last run now.
+
+    :param job: Scheduled worker launch job.
+    :type job: :py:class:`schedule.Job`
+
+    :param str policy: Catch-up policy;
+                       one of :py:data:`CATCH_UP_POLICIES`.
+
+    :param state: Scheduler state.
+    :type state: :py:class:`nemo_nowcast.scheduler.SchedulerState`
+
+    :raises: :py:exc:`ValueError` if policy is not a catch-up policy.
+    """
+    if policy not in CATCH_UP_POLICIES:
+        raise ValueError(
+            f"invalid catch up policy: {policy}; "
+            f"must be one of {', '.join(CATCH_UP_POLICIES)}"
+        )
+    name = _job_name(job)
+    now = datetime.datetime.now()
+    last_run = state.last_runs.get(name)
+    if last_run is None:
+        state.last_runs[name] = now
+        return
+    job_cron = _job_cron(job)
+    if job_cron is None:
+        return
+    missed = list(job_cron.times_between(last_run, now))
+    if not missed:
+        return
+    if policy == "skip":
+        logger.info(f"skipping {len(missed)} missed launch(es) of {name}")
+    else:
+        for due in missed if policy == "run-all" else missed[-1:]:
+            logger.info(f"catching up launch of {name} that was due at {due}")
+            job.job_func()
+    state.last_runs[name] = missed[-1]
+
+
+class CronJob(schedule.Job):
+    """Construct a :py:class:`nemo_nowcast.scheduler.CronJob` instance.
+
+    A :py:class:`schedule.Job` that is due at the times given by a cron
+    expression.
+
+    :param cron: Cron expression.
+    :type cron: :py:class:`nemo_nowcast.cron.CronExpression`
+
+    :param scheduler: Scheduler to add the job to.
+    :type scheduler: :py:class:`schedule.Scheduler`
+    """
+
+    def __init__(self, cron, scheduler=None):
+        super().__init__(1, scheduler)
+        self.cron = cron
+
+    def __repr__(self):
+        next_run = (
+            self.next_run.strftime("%Y-%m-%d %H:%M:%S") if self.next_run else "[never]"
+        )
+        return (
+            f"Cron {self.cron.expression} do {self.job_func!r} (next run: {next_run})"
+        )
+
+    def _schedule_next_run(self):
+        self.next_run = self.cron.next_after(datetime.datetime.now())
+
+
+@attr.s
+class SchedulerState:
+    """Construct a :py:class:`nemo_nowcast.scheduler.SchedulerState` instance.
+
+    The state records the time at which each scheduled worker launch job was
+    last due to run,
+    so that launches that are missed while the scheduler is not running can be
+    caught up when it starts.
+    """
+
+    #: Path of the scheduler state file,
+    #: or :py:obj:`None` if the state is not persisted.
+    state_file = attr.ib(default=None)
+    #: Times at which the jobs were last due to run keyed by job name.
+    last_runs = attr.ib(default=attr.Factory(dict))
+
+    def load(self):
+        """Read the state from the scheduler state file, if it exists."""
+        if self.state_file is None:
+            return
+        try:
+            with open(self.state_file, "rt") as f:
+                state = yamlutils.safe_load(f) or {}
+        except FileNotFoundError:
+            return
+        self.last_runs = dict(state.get("last runs") or {})
+
+    def record(self, job, due):
+        """Record that job ran at the time that it was due,
+        and write the state to the scheduler state file.
+
+        :param job: Scheduled worker launch job.
+        :type job: :py:class:`schedule.Job`
+
+        :param due: Time at which the job was due.
+        :type due: :py:class:`datetime.datetime`
+        """
+        self.last_runs[_job_name(job)] = due
+        self.write()
+
+    def write(self):
+        """Write the state to the scheduler state file,
+        replacing the file atomically.
+        """
+        if self.state_file is None:
+            return
+        try:
+            with fileutils.atomic_save(
+                os.fspath(self.state_file), text_mode=True, overwrite_part=True
+            ) as f:
+                yamlutils.dump({"last runs": self.last_runs}, f)
+        except OSError:
+            logger.error("scheduler state file write failed:", exc_info=True)
+
+
+@attr.s
+class JobTimer:
+    """Construct a :py:class:`nemo_nowcast.scheduler.JobTimer` instance.
+
+    The timer keeps the jobs of a :py:class:`schedule.Scheduler` in a heap
+    ordered by the time that they are next due to run,
+    so that it can sleep until the earliest one is due instead of polling the
+    scheduler.
+    """
+
+    #: :py:class:`schedule.Scheduler` whose jobs are run.
+    scheduler = attr.ib(default=attr.Factory(lambda: schedule.default_scheduler))
+    #: Maximum number of seconds to sleep for.
+    max_sleep = attr.ib(default=MAX_SLEEP_SECONDS)
+    #: Callable that is called with each job that is run,
+    #: and the time at which it was due,
+    #: after the job runs.
+    on_run = attr.ib(default=None)
+    #: Started :py:class:`nemo_nowcast.file_watch.FileWatch` instances
+    #: to run along with the jobs.
+    file_watches = attr.ib(default=attr.Factory(list))
+    #: Heap of (next run time, sequence number, job) tuples.
+    _heap = attr.ib(default=attr.Factory(list), init=False, repr=False)
+    _sequence = attr.ib(default=attr.Factory(itertools.count), init=False, repr=False)
+    #: Read and write ends of the pipe that wakes the timer,
+    #: or :py:obj:`None` after the timer has been closed.
+    _wakeup_pipe = attr.ib(init=False, repr=False)
+
+    @_wakeup_pipe.default
+    def _wakeup_pipe_default(self):
+        read_fd, write_fd = os.pipe()
+        os.set_blocking(read_fd, False)
+        os.set_blocking(write_fd, False)
+        return read_fd, write_fd
+
+    def add_jobs(self):
+        """Add all of the scheduler's jobs to the timer."""
+        for job in self.scheduler.jobs:
+            self._push(job)
+
+    def add(self, job):
+        """Add a job to the timer,
+        and wake the timer if it is sleeping so that it can take the job into
+        account.
+
+        Jobs must be added in the thread that runs the timer.
+
+        :arg job: Job in :py:attr:`scheduler`.
+        :type job: :py:class:`schedule.Job`
+        """
+        self._push(job)
+        self.wake()
+
+    def wake(self):
+        """Wake the timer if it is sleeping.
+
+        Safe to call from signal handlers and other threads because it only
+        writes a byte to the timer's wake-up pipe.
+        Does nothing if the timer has been closed.
+        """
+        if self._wakeup_pipe is None:
+            return
+        try:
+            os.write(self._wakeup_pipe[1], b"\0")
+        except BlockingIOError:
+            # Pipe is full, so the timer will wake anyway
+            pass
+
+    def run_pending(self):
+        """Run the jobs that are due,
+        and the file watches that have work to do.
+
+        :returns: Number of jobs that were run,
+                  and file watch batches that were handled.
+        :rtype: int
+        """
+        n_run = 0
+        while self._heap and self._heap[0][0] <= datetime.datetime.now():
+            next_run, _, job = heapq.heappop(self._heap)
+            if job not in self.scheduler.jobs:
+                # Cancelled job
+                continue
+            if job.next_run != next_run:
+                # Rescheduled job
+                self._push(job)
+                continue
+            result = job.run()
+            n_run += 1
+            if self.on_run is not None:
+                self.on_run(job, next_run)
+            if isinstance(result, schedule.CancelJob) or result is schedule.CancelJob:
+                self.scheduler.cancel_job(job)
+                continue
+            self._push(job)
+        for watch in self.file_watches:
+            n_run += watch.run_pending()
+        return n_run
+
+    def seconds_until_next_job(self):
+        """Return the number of seconds until the next job is due,
+        or :py:obj:`None` if there are no jobs.
+
+        :rtype: float
+        """
+        if not self._heap:
+            return None
+        delta = self._heap[0][0] - datetime.datetime.now()
+        return max(delta.total_seconds(), 0)
+
+    def sleep(self):
+        """Sleep until the next job is due,
+        a file watch has work to do or receives inotify events,
+        the timer is woken,
+        or :py:attr:`max_sleep` seconds have passed.
+
+        :returns: :py:obj:`True` if the timer was woken,
+                  or a file watch received inotify events.
+        :rtype: boolean
+        """
+        timeouts = [self.max_sleep, self.seconds_until_next_job()]
+        timeouts.extend(watch.seconds_until_next_check() for watch in self.file_watches)
+        timeout = min(seconds for seconds in timeouts if seconds is not None)
+        read_fd = self._wakeup_pipe[0]
+        watch_fds = {
+            watch.fileno(): watch
+            for watch in self.file_watches
+            if watch.fileno() is not None
+        }
+        readable, _, _ = select.select([read_fd, *watch_fds], [], [], timeout)
+        for fd in readable:
+            if fd in watch_fds:
+                watch_fds[fd].read_events()
+        if read_fd in readable:
+            try:
+                while os.read(read_fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+        return bool(readable)
+
+    def close(self):
+        """Close the timer's wake-up pipe and its file watches.
+
+        Closing a timer that has already been closed does nothing.
+        """
+        for watch in self.file_watches:
+            watch.close()
+        if self._wakeup_pipe is None:
+            return
+        wakeup_pipe, self._wakeup_pipe = self._wakeup_pipe, None
+        for fd in wakeup_pipe:
+            os.close(fd)
+
+    def _push(self, job):
+        if job.next_run is not None:
+            heapq.heappush(self._heap, (job.next_run, next(self._sequence), job))
+
+
+def _reap_worker_processes(config, worker_processes):
+    """Reap the worker processes that have exited,
+    log their exit statuses and resource usage,
+    and write the worker process status file given by the
+    :kbd:`run: worker status files: scheduler` configuration key, if any.
+
+    :param config: Nowcast system configuration.
+    :type config: :py:class:`nemo_nowcast.config.Config`
+
+    :param worker_processes: Registry of launched worker processes.
+    :type worker_processes: :py:class:`nemo_nowcast.processes.WorkerProcessRegistry`
+    """
+    for process in worker_processes.reap():
+        logger.info(
+            process.exit_summary(),
+            extra={"worker_process": process.as_dict()},
+        )
+    try:
+        status_file = config["run"]["worker status files"][NAME]
+    except (KeyError, TypeError):
+        return
+    try:
+        worker_processes.write_status(status_file)
+    except OSError:
+        logger.error("worker status file write failed:", exc_info=True)
+
+
+def _close_timer():
+    """Close the job timer of the running scheduled worker launching loop,
+    and its file watches,
+    so that their file descriptors aren't leaked when the configuration is
+    reloaded.
+    """
+    global _timer
+    if _timer is not None:
+        _timer.close()
+        _timer = None
+    for watch in _file_watches:
+        watch.close()
+    _file_watches.clear()
+
+
 def _install_signal_handlers():
     """Set up hangup, interrupt, and kill signal handlers."""
 
     def sighup_handler(signal, frame):
         logger.info("hangup signal (SIGHUP) received; reloading configuration")
+        _close_timer()
         main()
 
     signal.signal(signal.SIGHUP, sighup_handler)
@@ -0,0 +1,324 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework on-disk HTTP cache for downloaded files.
+
+A :py:class:`~nemo_nowcast.web_cache.WebDataCache` stores a copy of each
+file that :py:func:`nemo_nowcast.worker.get_web_data` downloads,
+keyed by its URL,
+with the :kbd:`ETag` and :kbd:`Last-Modified` validators from the response
+and the SHA-256 hash of the content.
+The next download of the URL is a conditional request,
+and if the server responds that the content has not been modified,
+the cached file is linked to the download file path instead of being
+downloaded again.
+
+Cached files are linked to download file paths by reflink
+(copy-on-write clone) on file systems that support it,
+otherwise by hard link,
+otherwise by copying.
+Downloaded files that may be hard links to cached files must not be modified
+in place.
+
+A worker uses the cache by passing it to
+:py:func:`~nemo_nowcast.worker.get_web_data` or
+:py:func:`~nemo_nowcast.worker.get_web_data_many`:
+
+.. code-block:: python
+
+    cache = WebDataCache(
+        config["web data cache"]["dir"], max_bytes=10 * 1024**3
+    )
+    get_web_data(url, NAME, filepath, cache=cache)
+    checklist["cache"] = cache.stats()
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import attr
+
+#: ioctl request to clone a file from <linux/fs.h>
+_FICLONE = 0x40049409
+
+#: Number of bytes to read at a time when hashing files.
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def _url_key(url):
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def file_sha256(path):
+    """Return the SHA-256 hash of the contents of the file at path.
+
+    :arg path: Path of file.
+    :type path: :py:class:`pathlib.Path` or str
+
+    :rtype: str
+    """
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_HASH_BLOCK_BYTES):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def link_file(src, dest):
+    """Link the file at src to dest by reflink,
+    hard link,
+    or copy,
+    whichever is the first to succeed.
+
+    An existing file at dest is replaced.
+
+    :arg src: Path of file to link.
+    :type src: :py:class:`pathlib.Path` or str
+
+    :arg dest: Path to link the file to.
+    :type dest: :py:class:`pathlib.Path` or str
+
+    :returns: Method that the file was linked by;
+              :kbd:`reflink`,
+              :kbd:`hardlink`,
+              or :kbd:`copy`.
+    :rtype: str
+    """
+    tmp = f"{dest}.{os.getpid()}.{threading.get_ident()}.link"
+    try:
+        try:
+            with open(src, "rb") as fsrc, open(tmp, "wb") as fdest:
+                fcntl.ioctl(fdest.fileno(), _FICLONE, fsrc.fileno())
+            method = "reflink"
+        except OSError:
+            # File system doesn't support reflinks
+            os.unlink(tmp)
+            try:
+                os.link(src, tmp)
+                method = "hardlink"
+            except OSError:
+                # e.g. src and dest are on different file systems
+                shutil.copyfile(src, tmp)
+                method = "copy"
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+    return method
+
+
+@attr.s
+class WebDataCache:
+    """Construct a :py:class:`nemo_nowcast.web_cache.WebDataCache` instance.
+
+    The cache directory is created if it doesn't exist.
+    """
+
+    #: Cache directory.
+    cache_dir = attr.ib(converter=os.fspath)
+    #: Maximum total size of the cached files in bytes.
+    #: The least recently used files are evicted when it is exceeded.
+    #: :py:obj:`None` means that the size of the cache is not limited.
+    max_bytes = attr.ib(default=None)
+    #: Number of downloads that were satisfied from the cache.
+    hits = attr.ib(default=0, init=False)
+    #: Number of downloads that were not satisfied from the cache.
+    misses = attr.ib(default=0, init=False)
+    _lock = attr.ib(default=attr.Factory(threading.Lock), init=False, repr=False)
+
+    def __attrs_post_init__(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = _url_key(url)
+        return (
+            os.path.join(self.cache_dir, f"{key}.json"),
+            os.path.join(self.cache_dir, f"{key}.data"),
+        )
+
+    def _read_entry(self, url):
+        meta_path, data_path = self._paths(url)
+        try:
+            with open(meta_path, "rt") as f:
+                entry = json.load(f)
+            size = os.stat(data_path).st_size
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or entry.get("size") != size:
+            return None
+        return entry
+
+    def _write_entry(self, url, entry):
+        meta_path, _ = self._paths(url)
+        tmp = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(tmp, "wt") as f:
+            json.dump(entry, f)
+        os.replace(tmp, meta_path)
+
+    def conditional_headers(self, url):
+        """Return the request headers to make a conditional request for url.
+
+        :arg str url: URL to download content from.
+
+        :returns: :kbd:`If-None-Match` and/or :kbd:`If-Modified-Since` headers,
+                  or an empty :py:class:`dict` if url is not cached.
+        :rtype: dict
+        """
+        entry = self._read_entry(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def link(self, url, filepath):
+        """Link the cached file for url to filepath,
+        and count a cache hit.
+
+        :arg str url: URL that the file was downloaded from.
+
+        :arg filepath: File path/name at which to store the cached content.
+        :type filepath: :py:class:`pathlib.Path`
+
+        :returns: :py:obj:`True` if the file was linked,
+                  or :py:obj:`False` if url is no longer cached.
+        :rtype: boolean
+        """
+        entry = self._read_entry(url)
+        if entry is None:
+            return False
+        _, data_path = self._paths(url)
+        try:
+            link_file(data_path, filepath)
+        except FileNotFoundError:
+            # Evicted by another process
+            return False
+        entry["last_used"] = time.time()
+        try:
+            self._write_entry(url, entry)
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, url, filepath, response, sha256=None):
+        """Store the file at filepath that was downloaded from url in the cache,
+        and count a cache miss.
+
+        Files whose responses have neither :kbd:`ETag` nor
+        :kbd:`Last-Modified` headers are not stored because they can't be
+        revalidated.
+        Errors are ignored so that a full or unwritable cache directory doesn't
+        cause downloads to fail.
+
+        :arg str url: URL that the file was downloaded from.
+
+        :arg filepath: File path/name at which the content is stored.
+        :type filepath: :py:class:`pathlib.Path`
+
+        :arg response: Response that the content was downloaded in.
+        :type response: :py:class:`requests.Response`
+
+        :arg str sha256: SHA-256 hash of the content,
+                         if it was calculated during the download.
+        """
+        with self._lock:
+            self.misses += 1
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            return
+        _, data_path = self._paths(url)
+        try:
+            size = os.stat(filepath).st_size
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            entry = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "sha256": sha256 or file_sha256(filepath),
+                "size": size,
+                "last_used": time.time(),
+            }
+            link_file(filepath, data_path)
+            self._write_entry(url, entry)
+            self.evict()
+        except OSError:
+            pass
+
+    def discard(self, url):
+        """Delete the cached file for url,
+        if there is one.
+
+        :arg str url: URL that the file was downloaded from.
+        """
+        for path in self._paths(url):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        """Delete the least recently used cached files until the total size of
+        the cache is no more than :py:attr:`max_bytes`.
+
+        :returns: Number of cached files that were deleted.
+        :rtype: int
+        """
+        if self.max_bytes is None:
+            return 0
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            meta_path = os.path.join(self.cache_dir, name)
+            try:
+                with open(meta_path, "rt") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            entries.append((entry.get("last_used", 0), entry.get("size", 0), name))
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            key = name.removesuffix(".json")
+            for suffix in (".json", ".data"):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, f"{key}{suffix}"))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            evicted += 1
+        return evicted
+
+    def stats(self):
+        """Return the numbers of cache hits and misses for inclusion in a
+        worker's checklist.
+
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses}
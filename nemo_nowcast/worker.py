@@ -14,21 +14,39 @@
 
 """NEMO_Nowcast worker classes."""
 
+import concurrent.futures
+import contextlib
+import hashlib
 import logging
 import logging.config
 import os
+import pathlib
 import signal
 import socket
 import subprocess
+import threading
 import time
+import urllib.parse
 
 import attr
-import requests
-import sentry_sdk
-import zmq
-import zmq.log.handlers
 
-from nemo_nowcast import CommandLineInterface, Config, Message
+from nemo_nowcast import (
+    CommandLineInterface,
+    Config,
+    Message,
+    fileutils,
+)
+
+#: Default ssh control socket path for connection multiplexing to enabled hosts.
+#: :command:`ssh` replaces :kbd:`%C` with a hash of the connection details.
+SSH_CONTROL_PATH = "~/.ssh/nemo_nowcast-%C"
+#: Default time that multiplexed ssh connections to enabled hosts stay open
+#: after their last session ends.
+SSH_CONTROL_PERSIST = "10m"
+
+#: Number of times that a segment of a segmented download is retried
+#: before the download waits to retry.
+_SEGMENT_RETRIES = 3
 
 
 class WorkerError(Exception):
@@ -37,6 +55,13 @@ class WorkerError(Exception):
     """
 
 
+class _DigestMismatchError(Exception):
+    """Raised when the digest of a downloaded file doesn't match its expected
+    digest,
+    so that the download is retried.
+    """
+
+
 @attr.s
 class NextWorker:
     """Construct a :py:class:`nemo_nowcast.worker.NextWorker` instance.
@@ -58,17 +83,49 @@ class NextWorker:
     #: Host to launch the worker on.
     #: Defaults to :kbd:`localhost`
     host = attr.ib(default="localhost")
+    #: Priority of the worker in the manager's launch queue when the
+    #: :kbd:`run: launch queue order` configuration key is :kbd:`priority`.
+    #: Workers with higher priorities are launched first.
+    #: Defaults to 0.
+    priority = attr.ib(default=0)
 
-    def launch(self, config, logger_name):
+    def launch(self, config, logger_name, registry=None):
         """Use a subprocess to launch worker on host with args as the
         worker's command-line arguments.
 
+        Workers on remote hosts are launched via :command:`ssh`.
+        If the host's :kbd:`run: enabled hosts` configuration section includes
+        :kbd:`ssh multiplexing`,
+        launches share a persistent ssh connection to the host
+        (see :py:func:`ssh_multiplexing_options`).
+
+        If the :kbd:`run: launcher` configuration key is :kbd:`forkserver`,
+        workers on :kbd:`localhost` are launched by the
+        :py:mod:`nemo_nowcast.forkserver`,
+        falling back to a subprocess if the forkserver can't be reached.
+        If the forkserver doesn't reply to a launch request the worker may
+        have been launched,
+        so the failure is logged as an error and the worker is not launched
+        in a subprocess.
+
         :arg config: Nowcast system configuration that was read from the
                      configuration file.
         :type config: :py:class:`nemo_nowcast.config.Config`
 
         :arg str logger_name: Name of the logger to emit messages on.
 
+        :arg registry: Registry to add the worker subprocess to so that it is
+                       reaped when it exits.
+        :type registry: :py:class:`nemo_nowcast.processes.WorkerProcessRegistry`
+
+        :returns: Worker subprocess,
+                  or the forkserver's worker process if the worker was
+                  launched by the forkserver,
+                  or :py:obj:`None` if the forkserver didn't reply to the
+                  launch request.
+        :rtype: :py:class:`subprocess.Popen` or
+                :py:class:`nemo_nowcast.forkserver.ForkedWorker`
+
         This method *does not* wait for the subprocess to complete.
         """
         logger = logging.getLogger(logger_name)
@@ -79,6 +136,7 @@ class NextWorker:
             enabled_host_config = config["run"]["enabled hosts"][self.host]
             cmd = [
                 "ssh",
+                *ssh_multiplexing_options(enabled_host_config),
                 self.host,
                 "source",
                 enabled_host_config["envvars"],
@@ -91,8 +149,76 @@ class NextWorker:
         if self.args:
             cmd.extend(self.args)
         logger.info(f"launching {self}", extra={"worker": self})
+        if self.host == "localhost" and config.get("run", {}).get("launcher") == (
+            "forkserver"
+        ):
+            # Deferred import so that importing worker modules doesn't import
+            # the forkserver's dependencies
+            from nemo_nowcast import forkserver
+
+            argv = [os.path.abspath(config_file), *self.args]
+            socket_path = config["run"]["forkserver"]["socket"]
+            try:
+                pid = forkserver.launch(socket_path, self.module, argv)
+            except forkserver.LaunchError as e:
+                logger.error(
+                    f"forkserver launch of {self.module} failed; "
+                    f"not relaunching in subprocess: {e}"
+                )
+                return None
+            except OSError as e:
+                logger.warning(
+                    f"forkserver launch failed; launching in subprocess: {e}"
+                )
+            else:
+                logger.debug(
+                    f"launched {self.module} by forkserver in process {pid}",
+                    extra={"pid": pid},
+                )
+                return forkserver.ForkedWorker(pid)
         logger.debug(f"cmd = {cmd}", extra={"cmd": cmd})
-        subprocess.Popen(cmd)
+        popen = subprocess.Popen(cmd)
+        if registry is not None:
+            registry.add(self, popen)
+        return popen
+
+
+def ssh_multiplexing_options(enabled_host_config):
+    """Return the :command:`ssh` command-line options that make launches of
+    workers on an enabled host share a persistent, multiplexed connection.
+
+    The first launch opens a master connection to the host that later launches
+    use for their sessions,
+    so they don't pay for TCP connection set-up,
+    key exchange,
+    and authentication.
+    The master connection stays open for the :kbd:`control persist` time
+    after its last session ends.
+
+    :arg dict enabled_host_config: Host's :kbd:`run: enabled hosts`
+                                   configuration section.
+
+    :returns: ssh options;
+              an empty list if the host's configuration doesn't include
+              :kbd:`ssh multiplexing`.
+    :rtype: list
+    """
+    if "ssh multiplexing" not in enabled_host_config:
+        return []
+    multiplexing_config = enabled_host_config["ssh multiplexing"] or {}
+    control_path = multiplexing_config.get("control path", SSH_CONTROL_PATH)
+    control_persist = multiplexing_config.get("control persist", SSH_CONTROL_PERSIST)
+    if isinstance(control_persist, bool):
+        # YAML parses yes and no as booleans
+        control_persist = "yes" if control_persist else "no"
+    return [
+        "-o",
+        "ControlMaster=auto",
+        "-o",
+        f"ControlPath={control_path}",
+        "-o",
+        f"ControlPersist={control_persist}",
+    ]
 
 
 @attr.s
@@ -159,7 +285,9 @@ class NowcastWorker:
     _parsed_args = attr.ib(default=None)
     #: :py:class:`zmq.Context` instance that provides the basis for the
     #: nowcast messaging system.
-    _context = attr.ib(default=attr.Factory(zmq.Context))
+    #: Created when it is first needed so that zmq isn't imported to show the
+    #: worker's command-line help, or to run it in debug mode.
+    _context = attr.ib(default=None)
     #: :py:class:`zmq.Context.socket` instance that is connected to the
     #: message broker to enable nowcast system messages to be exchanged
     #: with manager process.
@@ -263,6 +391,14 @@ class NowcastWorker:
 
     def _configure_logging(self):
         """Configure the worker's logging system interface."""
+        # sentry_sdk and zmq are imported here rather than at module level
+        # because they are slow to import and aren't needed to show the
+        # worker's command-line help
+        import sentry_sdk
+        import zmq
+
+        from nemo_nowcast import zmq_logging
+
         # Initialize exception logging to Sentry with client DSN URL from SENTRY_DSN envvar;
         # does nothing if SENTRY_DSN does not exist, is empty, or is not recognized by Sentry
         if not self._parsed_args.debug:
@@ -272,7 +408,8 @@ class NowcastWorker:
             # Publish log messages to distributed logging aggregator
             logging_config = self.config["logging"]["publisher"]
             zmq_pub_config = logging_config["handlers"]["zmq_pub"]
-            zmq_pub_config["context"] = self._context
+            zmq_pub_config["context"] = self._zmq_context()
+            zmq_logging.use_xpub_handler(zmq_pub_config)
             if self.name in self.config["zmq"]["ports"]["logging"]:
                 addrs = self.config["zmq"]["ports"]["logging"][self.name]
                 addrs = addrs if isinstance(addrs, list) else [addrs]
@@ -307,19 +444,17 @@ class NowcastWorker:
                     continue
             else:
                 raise WorkerError("unable for find port to publish log messages to")
-            for handler in self.logger.root.handlers:
-                if isinstance(handler, zmq.log.handlers.PUBHandler):
-                    handler.root_topic = self.name
-                    handler.formatters = {
-                        logging.DEBUG: logging.Formatter("%(message)s\n"),
-                        logging.INFO: logging.Formatter("%(message)s\n"),
-                        logging.WARNING: logging.Formatter("%(message)s\n"),
-                        logging.ERROR: logging.Formatter("%(message)s\n"),
-                        logging.CRITICAL: logging.Formatter("%(message)s\n"),
-                    }
-            # Not sure why, but we need a brief pause before we start logging
-            # messages
-            time.sleep(0.25)
+            zmq_logging.configure_pub_handlers(
+                self.logger.root,
+                self.name,
+                self.config["zmq"].get("log format", "text"),
+            )
+            # Wait for the log aggregator to subscribe so that the first log
+            # messages aren't dropped
+            zmq_logging.wait_for_subscribers(
+                self.logger.root,
+                self.config["zmq"].get("log subscription timeout", 0.25),
+            )
             msg = f"publishing log messages to {addr}"
         else:
             # Write log messages to local file system
@@ -371,7 +506,9 @@ class NowcastWorker:
         if self._parsed_args.debug:
             self.logger.debug("**debug mode** no connection to manager")
             return
-        self._socket = self._context.socket(zmq.REQ)
+        import zmq
+
+        self._socket = self._zmq_context().socket(zmq.REQ)
         zmq_host = self.config["zmq"]["host"]
         zmq_port = self.config["zmq"]["ports"]["workers"]
         self._socket.setsockopt(zmq.TCP_KEEPALIVE, 1)
@@ -400,7 +537,20 @@ class NowcastWorker:
             self.logger.critical("unhandled exception:", exc_info=True)
             self.tell_manager("crash")
         self.logger.debug("shutting down", extra={"logger_name": self.name})
-        self._context.destroy()
+        if self._context is not None:
+            self._context.destroy()
+
+    def _zmq_context(self):
+        """Return the worker's ZeroMQ context, creating it if necessary.
+
+        :rtype: :py:class:`zmq.Context`
+        """
+        if self._context is None:
+            # Deferred import so that importing worker modules doesn't import zmq
+            import zmq
+
+            self._context = zmq.Context()
+        return self._context
 
     def tell_manager(self, msg_type, payload=None):
         """Exchange messages with the nowcast manager process.
@@ -437,14 +587,18 @@ class NowcastWorker:
             )
             return
         # Send message to nowcast manager
-        message = Message(self.name, msg_type, payload).serialize()
-        self._socket.send_string(message)
+        codec = self.config.get("zmq", {}).get("message codec", "yaml")
+        message = Message(self.name, msg_type, payload).serialize(codec)
+        if codec == "yaml":
+            self._socket.send_string(message)
+        else:
+            self._socket.send(message)
         self.logger.debug(
             f"sent message: ({msg_type}) {worker_msgs[msg_type]}",
             extra={"logger_name": self.name},
         )
         # Wait for and process response
-        msg = self._socket.recv_string()
+        msg = self._socket.recv_string() if codec == "yaml" else self._socket.recv()
         message = Message.deserialize(msg)
         mgr_msgs = self.config["message registry"]["manager"]
         try:
@@ -469,6 +623,11 @@ def get_web_data(
     wait_exponential_multiplier=2,
     wait_retry_max=256,
     wait_exponential_max=60 * 60,
+    cache=None,
+    segments=1,
+    hash_algorithm=None,
+    expected_digest=None,
+    digest_url=None,
 ):
     """Download content from file_url and store it in filepath.
 
@@ -482,6 +641,41 @@ def get_web_data(
     2 seconds after the download fails, and subsequent retries will
     occur at 4, 8, 16, 32, 64, ..., 256, 256, ..., 3582 seconds after each failure.
 
+    If the server supports range requests for the content,
+    retries resume the download from the end of the partially downloaded
+    file instead of starting again from its beginning.
+    The :kbd:`If-Range` request header ensures that the download starts
+    again from the beginning if the content has changed.
+
+    If segments is greater than 1 and the server supports range requests for
+    the content,
+    the content is split into byte ranges that are downloaded concurrently
+    and written directly into their places in a preallocated file.
+    Segments whose downloads fail are retried individually,
+    and retries after back-off waits download only the unfinished parts of the
+    segments.
+    Content that is too small to split into segments of at least chunk_size
+    bytes,
+    or for which the server doesn't support range requests,
+    is downloaded in a single stream.
+
+    If hash_algorithm,
+    expected_digest,
+    or digest_url is given,
+    the digest of the content is calculated from the blocks of the download as
+    they are written to filepath,
+    and recorded in a digest manifest file named for filepath with the hash
+    algorithm name as an additional extension;
+    e.g. :file:`foo.nc.sha256`.
+    The manifest is in the format that is written by :command:`sha256sum`
+    and similar tools.
+    The digests of segmented downloads are calculated by reading the file when
+    all of the segments have been downloaded because the segments are written
+    out of order.
+    If the digest doesn't match the expected digest,
+    the file is deleted,
+    and the download is retried.
+
     :param str file_url: URL to download content from.
 
     :param str logger_name: Name of the :py:class:`logging.Logger` to emit
@@ -489,6 +683,9 @@ def get_web_data(
 
     :param filepath: File path/name at which to store the downloaded content.
                      If :py:class:`None` (the default) the content is returned.
+                     Use :py:func:`~nemo_nowcast.worker.open_web_data`
+                     instead to stream-parse large content without holding
+                     all of it in memory.
     :type filepath: :py:class:`pathlib.Path`
 
     :param session: Session object to use for TCP connection pooling
@@ -538,36 +735,442 @@ def get_web_data(
                                  seconds.
     :type wait_exponential_max: int or float
 
-    :return: :py:class:`requests.Response.content`
-    :rtype: bytes
+    :param cache: Cache to make a conditional request with,
+                  and to link the file from if the content has not been
+                  modified since it was cached,
+                  or to store the downloaded file in.
+                  Only used when filepath is given.
+                  Defaults to :py:obj:`None` for no caching.
+    :type cache: :py:class:`nemo_nowcast.web_cache.WebDataCache`
+
+    :param int segments: Maximum number of byte ranges of the content to
+                         download concurrently.
+                         Only used when filepath is given.
+                         Defaults to 1 for a single stream.
+                         The session's connection pool should be large enough
+                         for segments connections.
+
+    :param str hash_algorithm: Name of the :py:mod:`hashlib` algorithm to
+                               calculate the digest of the content with;
+                               e.g. :kbd:`sha256`,
+                               :kbd:`md5`,
+                               or :kbd:`blake2b`.
+                               Only used when filepath is given.
+                               Defaults to :kbd:`sha256` if expected_digest or
+                               digest_url is given,
+                               otherwise no digest is calculated.
+
+    :param str expected_digest: Hexadecimal digest that the content must have.
+
+    :param str digest_url: URL of a digest manifest in the format that is
+                           written by :command:`sha256sum` and similar tools
+                           to get the expected digest of the content from;
+                           e.g. the URL of a :file:`SHA256SUMS` file.
+                           The digest is looked up by the file name at the end
+                           of file_url.
+                           A manifest that contains only a digest is also
+                           accepted.
+
+    :return: :py:class:`requests.Response.content` if filepath is
+             :py:obj:`None`,
+             otherwise the hexadecimal digest of the content if it was
+             calculated,
+             otherwise :py:obj:`None`.
+    :rtype: bytes or str
 
     :raises: :py:exc:`nemo_nowcast.workers.WorkerError`
     """
+    # Deferred import because requests is slow to import and most workers
+    # don't download anything
+    import requests
+
     logger = logging.getLogger(logger_name)
     if session is None:
         session = requests.Session()
-
-    def _get_data():
+    retry_errors = _retry_errors(requests) + (_DigestMismatchError,)
+    if hash_algorithm is None and (expected_digest or digest_url):
+        hash_algorithm = "sha256"
+    if hash_algorithm is not None:
+        # Fail fast on unknown algorithms
+        hashlib.new(hash_algorithm)
+    expected = expected_digest.lower() if expected_digest else None
+    # ETag or Last-Modified value of the content that is being downloaded to
+    # filepath, if the server supports range requests for it
+    validator = None
+    # [next byte, last byte] of the unfinished segments of a segmented download,
+    # and the response to its first request
+    parts = None
+    parts_response = None
+
+    def _get(headers):
+        if headers:
+            return session.get(file_url, stream=True, headers=headers)
+        return session.get(file_url, stream=True)
+
+    def _get_segment(fd, segment, response=None):
+        for attempt in range(_SEGMENT_RETRIES + 1):
+            try:
+                if response is None:
+                    response = _get(
+                        {
+                            "Range": f"bytes={segment[0]}-{segment[1]}",
+                            "If-Range": validator,
+                        }
+                    )
+                    response.raise_for_status()
+                    content_range = response.headers.get("Content-Range", "")
+                    if response.status_code != 206 or not content_range.startswith(
+                        f"bytes {segment[0]}-"
+                    ):
+                        raise requests.exceptions.HTTPError(
+                            f"unexpected response to range request: "
+                            f"{response.status_code} {content_range}",
+                            response=response,
+                        )
+                with response:
+                    for block in response.iter_content(chunk_size=chunk_size):
+                        block = block[: segment[1] + 1 - segment[0]]
+                        _pwrite_all(fd, block, segment[0])
+                        segment[0] += len(block)
+                        if segment[0] > segment[1]:
+                            break
+                if segment[0] <= segment[1]:
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"segment ending at byte {segment[1]} truncated at byte "
+                        f"{segment[0]}"
+                    )
+                return
+            except retry_errors as e:
+                response = None
+                if attempt == _SEGMENT_RETRIES or _content_changed(e):
+                    raise
+                logger.debug(
+                    f"received {e} from {file_url}; "
+                    f"retrying segment from byte {segment[0]}"
+                )
+                time.sleep(wait_exponential_multiplier)
+
+    def _get_segments(response=None):
+        nonlocal parts, validator
+        fd = os.open(filepath, os.O_WRONLY)
         try:
-            response = session.get(file_url, stream=True)
+            with concurrent.futures.ThreadPoolExecutor(len(parts)) as executor:
+                futures = [
+                    executor.submit(
+                        _get_segment, fd, segment, response if i == 0 else None
+                    )
+                    for i, segment in enumerate(parts)
+                ]
+            errors = [future.exception() for future in futures if future.exception()]
+            parts = [segment for segment in parts if segment[0] <= segment[1]]
+            if errors:
+                if any(_content_changed(e) for e in errors):
+                    # Start again from the beginning
+                    parts = validator = None
+                raise errors[0]
+        finally:
+            os.close(fd)
+        parts = None
+
+    def _content_changed(e):
+        # Responses to range requests for content that has changed since the
+        # segmented download started are 200 for the complete content,
+        # or 416 if the content is now shorter
+        status_code = getattr(getattr(e, "response", None), "status_code", None)
+        return status_code in {200, 416}
+
+    def _expected_digest():
+        nonlocal expected
+        if expected is None and digest_url is not None:
+            response = session.get(digest_url)
+            response.raise_for_status()
+            filename = urllib.parse.urlsplit(file_url).path.rpartition("/")[2]
+            expected = _manifest_digest(response.text, filename)
+            if expected is None:
+                raise WorkerError(f"no digest for {filename} in {digest_url}")
+        return expected
+
+    def _finish(response, digest=None, sha256=None):
+        # Verify the digest of the downloaded file, record it in the digest
+        # manifest, and store the file in the cache
+        nonlocal validator, parts
+        if hash_algorithm is not None:
+            if digest is None:
+                with filepath.open("rb") as f:
+                    digest = hashlib.file_digest(f, hash_algorithm).hexdigest()
+            if expected is not None and digest != expected:
+                filepath.unlink(missing_ok=True)
+                validator = parts = None
+                if cache is not None:
+                    cache.discard(file_url)
+                raise _DigestMismatchError(
+                    f"{hash_algorithm} digest of {filepath} is {digest}; "
+                    f"expected {expected}"
+                )
+            _write_digest_manifest(filepath, hash_algorithm, digest)
+            if hash_algorithm == "sha256":
+                sha256 = digest
+        if cache is not None and response is not None:
+            cache.store(file_url, filepath, response, sha256)
+        return digest
+
+    def _get_data(resume=False):
+        nonlocal validator, parts, parts_response
+        try:
+            if filepath is not None and hash_algorithm is not None:
+                _expected_digest()
+            if resume and parts:
+                size = int(parts_response.headers["Content-Length"])
+                if _partial_size(filepath) == size:
+                    logger.debug(
+                        f"resuming {len(parts)} segments of download from {file_url}"
+                    )
+                    _get_segments()
+                    return _finish(parts_response)
+                # The preallocated file has been changed
+                parts = validator = None
+            offset = _partial_size(filepath) if resume and validator else 0
+            if offset:
+                headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+            elif cache is not None and filepath is not None:
+                headers = cache.conditional_headers(file_url)
+            else:
+                headers = {}
+            response = _get(headers)
+            if offset and response.status_code == 416:
+                # Range not satisfiable, so start again from the beginning
+                response.close()
+                offset = 0
+                response = _get({})
+            if cache is not None and response.status_code == 304:
+                response.close()
+                if cache.link(file_url, filepath):
+                    logger.debug(f"{file_url} not modified; used cached file")
+                    return _finish(None)
+                # Evicted from the cache since the request was made
+                response = _get({})
             response.raise_for_status()
             if filepath is None:
                 return response.content
-            with filepath.open("wb") as f:
+            if response.status_code == 206:
+                content_range = response.headers.get("Content-Range", "")
+                if not content_range.startswith(f"bytes {offset}-"):
+                    validator = None
+                    raise requests.exceptions.HTTPError(
+                        f"unexpected Content-Range: {content_range}", response=response
+                    )
+                logger.debug(f"resuming download from {file_url} at byte {offset}")
+            else:
+                # Complete content; e.g. because it changed since the partial
+                # download
+                offset = 0
+                validator = _range_validator(response)
+                ranges = _segment_ranges(response, validator, segments, chunk_size)
+                if len(ranges) > 1:
+                    # The file may be a hard link to a cached file that must
+                    # not be overwritten
+                    filepath.unlink(missing_ok=True)
+                    _preallocate(filepath, int(response.headers["Content-Length"]))
+                    parts, parts_response = ranges, response
+                    logger.debug(f"downloading {file_url} in {len(parts)} segments")
+                    _get_segments(response)
+                    return _finish(response)
+            hashers = {}
+            if hash_algorithm is not None:
+                if offset:
+                    # Continue the digest from the partially downloaded file
+                    with filepath.open("rb") as f:
+                        hashers[hash_algorithm] = hashlib.file_digest(f, hash_algorithm)
+                else:
+                    hashers[hash_algorithm] = hashlib.new(hash_algorithm)
+            if cache is not None and not offset:
+                hashers.setdefault("sha256", hashlib.sha256())
+                # The file may be a hard link to a cached file that must not
+                # be overwritten
+                filepath.unlink(missing_ok=True)
+            with filepath.open("ab" if offset else "wb") as f:
                 for block in response.iter_content(chunk_size=chunk_size):
                     if not block:
                         break
                     f.write(block)
-        except (
-            requests.exceptions.ConnectionError,
-            requests.exceptions.HTTPError,
-            socket.error,
-        ) as e:
+                    for hasher in hashers.values():
+                        hasher.update(block)
+            digests = {name: hasher.hexdigest() for name, hasher in hashers.items()}
+            return _finish(response, digests.get(hash_algorithm), digests.get("sha256"))
+        except retry_errors as e:
+            logger.debug(f"received {e} from {file_url}")
+            raise e
+
+    return _retry(
+        _get_data,
+        logger,
+        file_url,
+        retry_errors,
+        wait_exponential_multiplier,
+        wait_retry_max,
+        wait_exponential_max,
+    )
+
+
+@contextlib.contextmanager
+def open_web_data(
+    file_url,
+    logger_name,
+    session=None,
+    chunk_size=100 * 1024,
+    max_memory=8 * 1024**2,
+    wait_exponential_multiplier=2,
+    wait_retry_max=256,
+    wait_exponential_max=60 * 60,
+):
+    """Download content from file_url into a temporary file and provide it as a
+    binary file object for reading.
+
+    The temporary file is held in memory until it exceeds max_memory bytes,
+    and is then moved to disk,
+    so that large content can be stream-parsed with bounded memory use:
+
+    .. code-block:: python
+
+        with nemo_nowcast.worker.open_web_data(url, NAME) as f:
+            for row in csv.reader(io.TextIOWrapper(f, encoding="utf-8")):
+                ...
+
+    The temporary file is deleted when the context manager exits.
+
+    Failed downloads are retried at exponentially increasing intervals,
+    and retries resume the download if the server supports range requests for
+    the content,
+    as in :py:func:`~nemo_nowcast.worker.get_web_data`.
+
+    :param str file_url: URL to download content from.
+
+    :param str logger_name: Name of the :py:class:`logging.Logger` to emit
+                            messages on.
+
+    :param session: Session object to use for TCP connection pooling.
+                    Defaults to :py:obj:`None`,
+                    in which case a session is created within the function.
+    :type session: :py:class:`requests.Session`
+
+    :param int chunk_size: Maximum number of bytes to read into memory at a
+                           time as the download proceeds.
+
+    :param int max_memory: Maximum number of bytes of content to hold in
+                           memory before the temporary file is moved to disk.
+
+    :param wait_exponential_multiplier: Multiplicative factor that increases
+                                        the time interval between retries.
+    :type wait_exponential_multiplier: int or float
+
+    :param wait_retry_max: Maximum number of seconds to wait between retries.
+    :type wait_retry_max: int or float
+
+    :param wait_exponential_max: Maximum number of seconds for the final retry
+                                 wait interval.
+    :type wait_exponential_max: int or float
+
+    :return: Temporary file positioned at the start of the content.
+    :rtype: :py:class:`tempfile.SpooledTemporaryFile`
+
+    :raises: :py:exc:`nemo_nowcast.workers.WorkerError`
+    """
+    import tempfile
+
+    import requests
+
+    logger = logging.getLogger(logger_name)
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+    retry_errors = _retry_errors(requests)
+    # ETag or Last-Modified value of the content that is being downloaded,
+    # if the server supports range requests for it
+    validator = None
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+
+    def _get_data(resume=False):
+        nonlocal validator
+        try:
+            offset = spool.tell() if resume and validator else 0
+            if offset:
+                response = session.get(
+                    file_url,
+                    stream=True,
+                    headers={"Range": f"bytes={offset}-", "If-Range": validator},
+                )
+                if response.status_code == 416:
+                    # Range not satisfiable, so start again from the beginning
+                    response.close()
+                    offset = 0
+                    response = session.get(file_url, stream=True)
+            else:
+                response = session.get(file_url, stream=True)
+            with response:
+                response.raise_for_status()
+                if response.status_code == 206:
+                    content_range = response.headers.get("Content-Range", "")
+                    if not content_range.startswith(f"bytes {offset}-"):
+                        validator = None
+                        raise requests.exceptions.HTTPError(
+                            f"unexpected Content-Range: {content_range}",
+                            response=response,
+                        )
+                    logger.debug(f"resuming download from {file_url} at byte {offset}")
+                else:
+                    validator = _range_validator(response)
+                    spool.seek(0)
+                    spool.truncate()
+                for block in response.iter_content(chunk_size=chunk_size):
+                    spool.write(block)
+        except retry_errors as e:
             logger.debug(f"received {e} from {file_url}")
             raise e
 
     try:
-        return _get_data()
+        _retry(
+            _get_data,
+            logger,
+            file_url,
+            retry_errors,
+            wait_exponential_multiplier,
+            wait_retry_max,
+            wait_exponential_max,
+        )
+        spool.seek(0)
+        yield spool
+    finally:
+        spool.close()
+        if own_session:
+            session.close()
+
+
+def _retry_errors(requests):
+    """Return the exceptions on which downloads are retried."""
+    return (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.HTTPError,
+        requests.exceptions.ChunkedEncodingError,
+        socket.error,
+    )
+
+
+def _retry(
+    get_data,
+    logger,
+    file_url,
+    retry_errors,
+    wait_exponential_multiplier,
+    wait_retry_max,
+    wait_exponential_max,
+):
+    """Call get_data,
+    and if it fails,
+    call it with resume=True at exponentially increasing intervals until it
+    succeeds or wait_exponential_max is exceeded.
+    """
+    try:
+        return get_data()
     except:
         wait_seconds = wait_exponential_multiplier
         total_seconds = wait_exponential_multiplier
@@ -577,14 +1180,212 @@ def get_web_data(
             logger.debug(f"waiting {sleep_seconds} seconds until retry {retries + 1}")
             time.sleep(sleep_seconds)
             try:
-                return _get_data()
-            except (
-                requests.exceptions.ConnectionError,
-                requests.exceptions.HTTPError,
-                socket.error,
-            ):
+                return get_data(resume=True)
+            except retry_errors:
                 wait_seconds *= wait_exponential_multiplier
                 total_seconds += sleep_seconds
                 retries += 1
         logger.error(f"giving up; download from {file_url} failed {retries + 1} times")
-        raise WorkerError
+        raise WorkerError(f"download from {file_url} failed {retries + 1} times")
+
+
+def _manifest_digest(text, filename):
+    """Return the digest of filename from the text of a digest manifest in the
+    format that is written by :command:`sha256sum` and similar tools,
+    or :py:obj:`None` if filename isn't in the manifest.
+
+    A manifest that contains only a digest is the digest of filename.
+    """
+    lines = [line.split(maxsplit=1) for line in text.splitlines() if line.strip()]
+    for fields in lines:
+        # Binary mode file names are prefixed with *
+        if len(fields) == 2 and fields[1].strip().removeprefix("*") == filename:
+            return fields[0].lower()
+    if len(lines) == 1 and len(lines[0]) == 1:
+        return lines[0][0].lower()
+    return None
+
+
+def _write_digest_manifest(filepath, hash_algorithm, digest):
+    """Write the digest manifest of the file at filepath."""
+    manifest = filepath.with_name(f"{filepath.name}.{hash_algorithm}")
+    with fileutils.atomic_save(
+        os.fspath(manifest), text_mode=True, overwrite_part=True
+    ) as f:
+        f.write(f"{digest}  {filepath.name}\n")
+
+
+def _segment_ranges(response, validator, segments, chunk_size):
+    """Return the [first byte, last byte] ranges of the segments to download
+    the content of response in,
+    or an empty list if it can't be split into segments.
+    """
+    content_length = response.headers.get("Content-Length")
+    if segments < 2 or validator is None or not content_length:
+        return []
+    if response.headers.get("Content-Encoding", "identity") != "identity":
+        # Ranges would be of the encoded content
+        return []
+    size = int(content_length)
+    segments = min(segments, size // chunk_size)
+    if segments < 2:
+        return []
+    bounds = [size * i // segments for i in range(segments + 1)]
+    return [[start, end - 1] for start, end in zip(bounds, bounds[1:])]
+
+
+def _preallocate(filepath, size):
+    """Create the file at filepath with size bytes allocated to it."""
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            # Not available on this platform or file system, so extend the
+            # file without allocating its blocks
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def _pwrite_all(fd, data, offset):
+    """Write all of data to fd at offset."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _partial_size(filepath):
+    """Return the size of the partially downloaded file at filepath,
+    or 0 if there isn't one.
+    """
+    if filepath is None:
+        return 0
+    try:
+        return filepath.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def _range_validator(response):
+    """Return the validator to use in the :kbd:`If-Range` header of requests
+    to resume the download of the content of response,
+    or :py:obj:`None` if the server doesn't support range requests for it.
+    """
+    if response.headers.get("Accept-Ranges", "").lower() != "bytes":
+        return None
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        # Weak ETags can't be used in If-Range headers
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def get_web_data_many(
+    downloads,
+    logger_name,
+    session=None,
+    max_workers=8,
+    max_per_host=4,
+    **kwargs,
+):
+    """Download content from many URLs concurrently and store it in files.
+
+    Each file is downloaded by :py:func:`~nemo_nowcast.worker.get_web_data`
+    in a thread pool,
+    so failed downloads are retried with its exponential back-off,
+    and the retries resume partial files if the server supports range
+    requests.
+    The failure of a download doesn't stop the others.
+
+    :param downloads: (file_url, filepath) pairs of the URLs to download content
+                      from and the file paths/names at which to store it.
+    :type downloads: iterable
+
+    :param str logger_name: Name of the :py:class:`logging.Logger` to emit
+                            messages on.
+
+    :param session: Session object to share among the downloads.
+                    Defaults to :py:obj:`None`,
+                    in which case a session with a connection pool that is
+                    large enough for max_workers connections is created
+                    within the function.
+    :type session: :py:class:`requests.Session`
+
+    :param int max_workers: Maximum number of concurrent downloads.
+
+    :param int max_per_host: Maximum number of concurrent downloads from each
+                             host.
+
+    :param kwargs: Other keyword arguments for
+                   :py:func:`~nemo_nowcast.worker.get_web_data`;
+                   e.g. :kbd:`chunk_size`,
+                   :kbd:`wait_exponential_max`,
+                   or :kbd:`digest_url` to verify the downloads against
+                   a :file:`SHA256SUMS` file.
+
+    :returns: Manifest of the downloads in the order of downloads.
+              Each item is a :py:class:`dict` with :kbd:`url`,
+              :kbd:`filepath`,
+              :kbd:`status` (:kbd:`downloaded` or :kbd:`failed`),
+              :kbd:`bytes`,
+              and :kbd:`seconds` keys,
+              a :kbd:`digest` key for downloads whose digests were calculated,
+              and an :kbd:`error` key for failed downloads.
+              It can be included in the worker's checklist.
+    :rtype: list
+    """
+    import requests
+
+    logger = logging.getLogger(logger_name)
+    own_session = session is None
+    if own_session:
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+    host_slots = {}
+    host_slots_lock = threading.Lock()
+
+    def _download(file_url, filepath):
+        host = urllib.parse.urlsplit(file_url).netloc
+        with host_slots_lock:
+            slot = host_slots.setdefault(host, threading.Semaphore(max_per_host))
+        with slot:
+            result = {"url": file_url, "filepath": os.fspath(filepath)}
+            t_start = time.perf_counter()
+            try:
+                digest = get_web_data(
+                    file_url, logger_name, filepath, session, **kwargs
+                )
+            except Exception as e:
+                result.update(
+                    status="failed",
+                    bytes=_partial_size(filepath),
+                    error=str(e) or type(e).__name__,
+                )
+            else:
+                result.update(status="downloaded", bytes=filepath.stat().st_size)
+                if digest is not None:
+                    result["digest"] = digest
+            result["seconds"] = round(time.perf_counter() - t_start, 3)
+        return result
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            futures = [
+                executor.submit(_download, file_url, pathlib.Path(filepath))
+                for file_url, filepath in downloads
+            ]
+            manifest = [future.result() for future in futures]
+    finally:
+        if own_session:
+            session.close()
+    failed = sum(result["status"] == "failed" for result in manifest)
+    logger.debug(
+        f"downloaded {len(manifest) - failed} of {len(manifest)} files"
+        + (f"; {failed} failed" if failed else "")
+    )
+    return manifest
@@ -18,6 +18,12 @@ Iterate through the nowcast system logging handlers, calling the
 :py:meth:`doRollover` method on any that are instances of
 :py:class:`logging.handlers.RotatingFileHandler`.
 
+Optionally,
+compress the rotated log files in a pool of threads after all of the log files
+have been rotated,
+and delete backup log files that are older than a maximum age,
+or that exceed a maximum total size.
+
 This worker is normally launched in automation at the end of a nowcast
 processing cycle (e.g. end of the day).
 
@@ -25,16 +31,31 @@ It can also be launched from the command-line by the nowcast administrator
 as necessary for system maintenance.
 """
 
+import bz2
+import concurrent.futures
+import gzip
 import logging
 import logging.config
+import lzma
+import os
+import re
+import shutil
+import time
 from pathlib import Path
 
-from nemo_nowcast import NowcastWorker
+from nemo_nowcast import NowcastWorker, WorkerError
 from nemo_nowcast.fileutils import FilePerms
 
 NAME = "rotate_logs"
 logger = logging.getLogger(NAME)
 
+#: Rotated log file compression methods and their file name extensions.
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "bz2": ".bz2", "xz": ".xz", "zstd": ".zst"}
+#: Default maximum number of threads to compress rotated log files with.
+COMPRESSION_THREADS = 4
+
+_EXTENSION_NAMES = [extension[1:] for extension in COMPRESSION_EXTENSIONS.values()]
+
 
 def main():
     """Set up and run the worker.
@@ -85,8 +106,22 @@ def rotate_logs(parsed_args, config, *args):
                     {"loggers": {"checklist": pub_loggers["checklist"]}}
                 )
         logging.config.dictConfig(config["logging"]["aggregator"])
+    rotate_config = config.get("rotate logs") or {}
+    compression = rotate_config.get("compression")
+    if compression is not None and compression not in COMPRESSION_EXTENSIONS:
+        raise WorkerError(
+            f"invalid rotate logs compression: {compression}; "
+            f"must be one of {', '.join(COMPRESSION_EXTENSIONS)}"
+        )
+    if compression == "zstd":
+        # Check before any log files are rotated so that they aren't left
+        # uncompressed with names that retention doesn't recognize
+        _zstd_module()
+    rotated = []
     for handler in logger.root.handlers + checklist_logger.handlers:
         if not hasattr(handler, "when"):
+            if compression is not None and hasattr(handler, "doRollover"):
+                _compress_on_rollover(handler, compression, rotated)
             try:
                 handler.flush()
                 handler.doRollover()
@@ -104,8 +139,199 @@ def rotate_logs(parsed_args, config, *args):
                 extra={"logger_name": NAME},
             )
             checklist["log files"].append(handler.baseFilename)
+    if compression is not None:
+        checklist["bytes saved"] = _compress_rotated(
+            rotated,
+            compression,
+            rotate_config.get("compression level"),
+            rotate_config.get("compression threads", COMPRESSION_THREADS),
+        )
+    max_age_days = rotate_config.get("max backup age days")
+    max_megabytes = rotate_config.get("max backup megabytes")
+    if max_age_days is not None or max_megabytes is not None:
+        checklist["deleted files"] = []
+        for log_file in checklist["log files"]:
+            checklist["deleted files"].extend(
+                _apply_retention(log_file, max_age_days, max_megabytes)
+            )
     return checklist
 
 
+def _compress_on_rollover(handler, compression, rotated):
+    """Set handler's namer and rotator so that its backup files are named with
+    the compression method's extension,
+    and its log file is renamed by :py:meth:`doRollover` to a file that is
+    compressed after all of the log files have been rotated.
+
+    :arg handler: Rotating file handler.
+    :type handler: :py:class:`logging.handlers.RotatingFileHandler`
+
+    :arg str compression: Compression method.
+
+    :arg list rotated: List to append (uncompressed, compressed) path pairs of
+                         rotated log files to.
+    """
+    extension = COMPRESSION_EXTENSIONS[compression]
+
+    def namer(default_name):
+        return f"{default_name}{extension}"
+
+    def rotator(source, dest):
+        # Rename quickly so that processes that watch the log file reopen it;
+        # compression happens later
+        if not os.path.exists(source):
+            return
+        uncompressed = f"{dest}.uncompressed"
+        os.rename(source, uncompressed)
+        rotated.append((uncompressed, dest))
+
+    handler.namer = namer
+    handler.rotator = rotator
+
+
+def _compress_rotated(rotated, compression, level, threads):
+    """Compress rotated log files in a pool of threads.
+
+    :arg list rotated: (uncompressed, compressed) path pairs of rotated log
+                         files.
+
+    :arg str compression: Compression method.
+
+    :arg int level: Compression level,
+                      or :py:obj:`None` for the method's default.
+
+    :arg int threads: Maximum number of threads to compress with.
+
+    :returns: Number of bytes saved by compression.
+    :rtype: int
+    """
+    if not rotated:
+        return 0
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(threads, len(rotated))
+    ) as executor:
+        futures = [
+            executor.submit(_compress, uncompressed, compressed, compression, level)
+            for uncompressed, compressed in rotated
+        ]
+    bytes_saved = 0
+    n_compressed = 0
+    for (uncompressed, compressed), future in zip(rotated, futures):
+        try:
+            size, compressed_size = future.result()
+        except Exception:
+            logger.error(
+                f"rotated log file compression failed: {uncompressed}",
+                exc_info=True,
+                extra={"logger_name": NAME},
+            )
+            _restore_uncompressed(uncompressed, compressed, compression)
+            continue
+        n_compressed += 1
+        bytes_saved += size - compressed_size
+        logger.debug(
+            f"rotated log file compressed: {compressed} "
+            f"({size} bytes to {compressed_size} bytes)",
+            extra={"logger_name": NAME},
+        )
+    logger.info(
+        f"compressed {n_compressed} of {len(rotated)} rotated log files; "
+        f"saved {bytes_saved} bytes",
+        extra={"logger_name": NAME},
+    )
+    return bytes_saved
+
+
+def _restore_uncompressed(uncompressed, compressed, compression):
+    """Rename a rotated log file that couldn't be compressed to the backup file
+    name without the compression method's extension,
+    so that it is recognized by retention,
+    and delete its partially compressed file.
+    """
+    partial = f"{compressed}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    backup = compressed.removesuffix(COMPRESSION_EXTENSIONS[compression])
+    if os.path.exists(uncompressed) and not os.path.exists(backup):
+        os.rename(uncompressed, backup)
+
+
+def _zstd_module():
+    """Return the zstd compression module,
+    or raise :py:exc:`nemo_nowcast.worker.WorkerError` if it isn't available.
+    """
+    try:
+        # Python>=3.14
+        from compression import zstd
+    except ImportError:
+        raise WorkerError("zstd compression requires Python 3.14 or later")
+    return zstd
+
+
+def _compress(uncompressed, compressed, compression, level=None):
+    """Compress the file uncompressed to compressed, and delete uncompressed.
+
+    :returns: Sizes in bytes of the uncompressed and compressed files.
+    :rtype: tuple
+    """
+    partial = f"{compressed}.partial"
+    if compression == "gzip":
+        dest = gzip.open(partial, "wb", compresslevel=9 if level is None else level)
+    elif compression == "bz2":
+        dest = bz2.open(partial, "wb", compresslevel=9 if level is None else level)
+    elif compression == "xz":
+        dest = lzma.open(partial, "wb", preset=level)
+    else:
+        dest = _zstd_module().open(partial, "wb", level=level)
+    with open(uncompressed, "rb") as src, dest:
+        shutil.copyfileobj(src, dest, 1024 * 1024)
+    shutil.copymode(uncompressed, partial)
+    os.replace(partial, compressed)
+    size = os.stat(uncompressed).st_size
+    os.remove(uncompressed)
+    return size, os.stat(compressed).st_size
+
+
+def _apply_retention(log_file, max_age_days=None, max_megabytes=None):
+    """Delete backups of log_file that are older than max_age_days,
+    and the oldest backups of log_file while the total size of its backups is
+    more than max_megabytes.
+
+    :arg str log_file: Log file path.
+
+    :arg float max_age_days: Maximum age of backups in days.
+
+    :arg float max_megabytes: Maximum total size of backups in megabytes.
+
+    :returns: Paths of the deleted backups.
+    :rtype: list
+    """
+    log_path = Path(log_file)
+    backup_name = re.compile(
+        rf"{re.escape(log_path.name)}\.\d+(\.({'|'.join(_EXTENSION_NAMES)}))?$"
+    )
+    backups = []
+    for path in log_path.parent.iterdir():
+        if backup_name.match(path.name):
+            stat = path.stat()
+            backups.append((stat.st_mtime, stat.st_size, path))
+    # Newest first
+    backups.sort(reverse=True)
+    now = time.time()
+    total_bytes = 0
+    deleted = []
+    for mtime, size, path in backups:
+        total_bytes += size
+        too_old = max_age_days is not None and now - mtime > max_age_days * 86400
+        too_big = (
+            max_megabytes is not None and total_bytes > max_megabytes * 1024 * 1024
+        )
+        if too_old or too_big:
+            path.unlink()
+            deleted.append(os.fspath(path))
+            logger.info(f"log file backup deleted: {path}", extra={"logger_name": NAME})
+    return deleted
+
+
 if __name__ == "__main__":
     main()  # pragma: no cover
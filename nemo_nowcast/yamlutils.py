@@ -0,0 +1,64 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework YAML parsing and emitting functions.
+
+All of the framework modules parse and emit YAML via these functions
+so that the fast libyaml C loader and dumper are used when PyYAML was built
+with libyaml,
+falling back to the pure-Python implementations when it wasn't.
+"""
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+#: :py:obj:`True` if the libyaml C loader and dumper are being used.
+LIBYAML = SafeLoader is not yaml.SafeLoader
+
+
+def safe_load(stream):
+    """Parse the first YAML document in stream and produce the corresponding
+    Python object using only the standard YAML tags.
+
+    Equivalent to :py:func:`yaml.safe_load`.
+
+    :arg stream: YAML document to parse.
+    :type stream: str, bytes, or file-like object
+
+    :returns: Python object.
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def dump(data, stream=None, **kwargs):
+    """Serialize data as a YAML document using only the standard YAML tags.
+
+    Equivalent to :py:func:`yaml.safe_dump`.
+
+    :arg data: Python object to serialize.
+
+    :arg stream: File-like object to write the YAML document to.
+                 If :py:obj:`None` (the default) the YAML document is returned.
+
+    :arg kwargs: Keyword arguments to pass to :py:func:`yaml.dump`.
+
+    :returns: YAML document if stream is :py:obj:`None`, otherwise :py:obj:`None`.
+    :rtype: str
+    """
+    return yaml.dump(data, stream, Dumper=SafeDumper, **kwargs)
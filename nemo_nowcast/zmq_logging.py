@@ -0,0 +1,316 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""NEMO_Nowcast framework distributed logging wire formats.
+
+The manager,
+message broker,
+scheduler,
+and workers publish their log messages to the
+:ref:`NEMO_NowcastLogAggregator` via :py:class:`zmq.log.handlers.PUBHandler`
+handlers.
+The format of the published messages is set by the :kbd:`zmq: log format`
+configuration key:
+
+* :kbd:`text` (the default) publishes only the log message text;
+  the publisher's name and the log level are carried by the message topic.
+
+* :kbd:`json` publishes a JSON object with the record's time,
+  level,
+  logger name,
+  host,
+  process id,
+  message text,
+  exception traceback (if any),
+  and the fields that were passed to the logging call via its
+  :kbd:`extra` argument.
+  The object is prefixed with an ASCII record separator character,
+  as in :rfc:`7464` JSON text sequences,
+  so that the log aggregator can distinguish it from a text message.
+
+:py:class:`~nemo_nowcast.zmq_logging.JSONFormatter` is also used in the
+log aggregator's logging configuration to write JSON lines log files.
+
+Messages that are published on a PUB socket before the log aggregator's
+subscription reaches it are dropped
+(the ZeroMQ "slow joiner" problem).
+So the publishers use :py:class:`~nemo_nowcast.zmq_logging.XPUBHandler`
+handlers,
+and wait for the aggregator's subscription before they start logging.
+"""
+
+import datetime
+import json
+import logging
+import socket
+import time
+
+import zmq
+import zmq.log.handlers
+
+#: Log message wire formats.
+LOG_FORMATS = ("text", "json")
+
+#: Prefix of JSON log messages on the wire.
+RECORD_SEPARATOR = "\x1e"
+
+#: Fully qualified name of the handler class that publishes log messages on an
+#: XPUB socket.
+XPUB_HANDLER_CLASS = "nemo_nowcast.zmq_logging.XPUBHandler"
+
+_PUB_HANDLER_CLASS = "zmq.log.handlers.PUBHandler"
+
+_HOSTNAME = socket.gethostname()
+
+#: :py:class:`logging.LogRecord` attributes that aren't extra fields.
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None))
+) | {"message", "asctime", "logger_name", "host", "taskName"}
+
+_LEVELS = (
+    logging.DEBUG,
+    logging.INFO,
+    logging.WARNING,
+    logging.ERROR,
+    logging.CRITICAL,
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Format log records as JSON objects on single lines.
+
+    The :kbd:`logger` field is the record's :kbd:`logger_name` attribute,
+    if it has one,
+    so that records that are logged by the log aggregator on behalf of the
+    processes that published them are attributed to those processes.
+
+    :arg boolean wire: Prefix the JSON object with
+                         :py:data:`RECORD_SEPARATOR` for publishing.
+    """
+
+    def __init__(self, wire=False):
+        super().__init__()
+        self.wire = wire
+
+    def format(self, record):
+        created = record.created
+        data = {
+            "created": created,
+            "time": datetime.datetime.fromtimestamp(created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": getattr(record, "logger_name", record.name),
+            "host": getattr(record, "host", _HOSTNAME),
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        extra = extra_fields(record)
+        if extra:
+            data["extra"] = extra
+        text = json.dumps(data, default=str)
+        return f"{RECORD_SEPARATOR}{text}\n" if self.wire else text
+
+
+class XPUBHandler(zmq.log.handlers.PUBHandler):
+    """Publish log messages on a ZeroMQ XPUB socket.
+
+    An XPUB socket is a PUB socket that also receives the subscriptions of its
+    subscribers,
+    so the handler can tell when the log aggregator has subscribed.
+
+    :arg interface_or_socket: Interface to bind an XPUB socket to;
+                              e.g. :kbd:`tcp://*:4345`,
+                              or a socket to publish on.
+    :type interface_or_socket: str or :py:class:`zmq.Socket`
+
+    :arg context: Context to create the socket in.
+    :type context: :py:class:`zmq.Context`
+
+    :arg str root_topic: Root of the message topics.
+    """
+
+    def __init__(self, interface_or_socket, context=None, root_topic=""):
+        if isinstance(interface_or_socket, str):
+            context = context or zmq.Context.instance()
+            xpub_socket = context.socket(zmq.XPUB)
+            try:
+                xpub_socket.bind(interface_or_socket)
+            except zmq.ZMQError:
+                xpub_socket.close(linger=0)
+                raise
+            interface_or_socket = xpub_socket
+        super().__init__(interface_or_socket, context, root_topic)
+        self.subscribed = False
+
+    def wait_for_subscriber(self, timeout):
+        """Wait until a subscriber has subscribed,
+        or timeout seconds have passed.
+
+        :arg float timeout: Maximum number of seconds to wait.
+
+        :returns: :py:obj:`True` if a subscriber has subscribed.
+        :rtype: boolean
+        """
+        if not self.subscribed:
+            self.subscribed = bool(self.socket.poll(int(timeout * 1000)))
+        # The subscriptions are only used to signal readiness, so discard them
+        while self.socket.poll(0):
+            self.socket.recv()
+        return self.subscribed
+
+
+def extra_fields(record):
+    """Return the fields that were added to record via the :kbd:`extra`
+    argument of its logging call.
+
+    :arg record: Log record.
+    :type record: :py:class:`logging.LogRecord`
+
+    :rtype: dict
+    """
+    return {
+        key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS
+    }
+
+
+def configure_pub_handlers(root, root_topic, log_format="text"):
+    """Set the topic and formatters of the
+    :py:class:`zmq.log.handlers.PUBHandler` handlers of the root logger.
+
+    :arg root: Root logger.
+    :type root: :py:class:`logging.Logger`
+
+    :arg str root_topic: Name of the publishing process,
+                           used as the root of the message topics.
+
+    :arg str log_format: Log message wire format;
+                           one of :py:data:`LOG_FORMATS`.
+
+    :raises: :py:exc:`ValueError` if log_format is not a log message wire
+             format.
+    """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(
+            f"invalid log format: {log_format}; "
+            f"must be one of {', '.join(LOG_FORMATS)}"
+        )
+    for handler in root.handlers:
+        if isinstance(handler, zmq.log.handlers.PUBHandler):
+            handler.root_topic = root_topic
+            if log_format == "json":
+                formatter = JSONFormatter(wire=True)
+            else:
+                formatter = logging.Formatter("%(message)s\n")
+            handler.formatters = {level: formatter for level in _LEVELS}
+
+
+def use_xpub_handler(handler_config):
+    """Change the class of a handler in a logging configuration dictionary
+    from :py:class:`zmq.log.handlers.PUBHandler` to
+    :py:class:`~nemo_nowcast.zmq_logging.XPUBHandler`.
+
+    Handlers of other classes are unchanged.
+
+    :arg dict handler_config: Handler section of a logging configuration
+                              dictionary.
+    """
+    if handler_config.get("class") == _PUB_HANDLER_CLASS:
+        handler_config["class"] = XPUB_HANDLER_CLASS
+
+
+def wait_for_subscribers(root, timeout):
+    """Wait until the log aggregator has subscribed to the
+    :py:class:`zmq.log.handlers.PUBHandler` handlers of the root logger,
+    or timeout seconds have passed.
+
+    It can't be known when subscribers have subscribed to the PUB sockets of
+    handlers that aren't :py:class:`~nemo_nowcast.zmq_logging.XPUBHandler`
+    handlers,
+    so the wait for those is timeout seconds.
+
+    :arg root: Root logger.
+    :type root: :py:class:`logging.Logger`
+
+    :arg float timeout: Maximum number of seconds to wait for each handler.
+
+    :returns: :py:obj:`True` if all of the XPUB handlers have subscribers.
+    :rtype: boolean
+    """
+    subscribed = True
+    for handler in root.handlers:
+        if isinstance(handler, XPUBHandler):
+            subscribed = handler.wait_for_subscriber(timeout) and subscribed
+        elif isinstance(handler, zmq.log.handlers.PUBHandler):
+            time.sleep(timeout)
+    return subscribed
+
+
+def is_json_message(message):
+    """Return :py:obj:`True` if message is a JSON log message.
+
+    :arg bytes message: Published log message.
+
+    :rtype: boolean
+    """
+    return message.startswith(RECORD_SEPARATOR.encode())
+
+
+def make_record(logger, message, logger_name=None):
+    """Make a log record from a JSON log message.
+
+    The record has the published record's time,
+    level,
+    process id,
+    message text,
+    and traceback.
+    Its :kbd:`logger_name` and :kbd:`host` attributes are the publishing
+    logger's name and host,
+    and the published extra fields are set as attributes.
+
+    :arg logger: Logger to make the record with.
+    :type logger: :py:class:`logging.Logger`
+
+    :arg bytes message: JSON log message.
+
+    :arg str logger_name: Name to use instead of the publishing logger's name;
+                          e.g. the name of the publishing process from the
+                          message topic.
+
+    :rtype: :py:class:`logging.LogRecord`
+    """
+    data = json.loads(message[len(RECORD_SEPARATOR) :])
+    record = logger.makeRecord(
+        logger.name,
+        logging.getLevelName(data["level"]),
+        "(unknown file)",
+        0,
+        data["message"],
+        None,
+        None,
+    )
+    record.created = data["created"]
+    record.msecs = int((data["created"] - int(data["created"])) * 1000) + 0.0
+    record.process = data["pid"]
+    record.exc_text = data.get("exc_info")
+    for key, value in data.get("extra", {}).items():
+        if key not in _RECORD_ATTRS:
+            setattr(record, key, value)
+    record.logger_name = logger_name or data["logger"]
+    record.host = data["host"]
+    return record
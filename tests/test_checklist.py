@@ -0,0 +1,273 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for checklist module."""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+import yaml
+
+from nemo_nowcast import checklist
+
+
+class TestUpdate:
+    """Unit tests for nemo_nowcast.checklist.update function."""
+
+    def test_add_key(self):
+        cl = {}
+        checklist.update(cl, "foo", {"bar": 1})
+        assert cl == {"foo": {"bar": 1}}
+
+    def test_merge_dict_value(self):
+        value = {"bar": 1}
+        cl = {"foo": value}
+        checklist.update(cl, "foo", {"baz": 2})
+        assert cl == {"foo": {"bar": 1, "baz": 2}}
+        assert cl["foo"] is not value
+
+    def test_replace_non_dict_value(self):
+        cl = {"foo": "bar"}
+        checklist.update(cl, "foo", {"baz": 2})
+        assert cl == {"foo": {"baz": 2}}
+
+
+class TestChecklistJournal:
+    """Unit tests for nemo_nowcast.checklist.ChecklistJournal class."""
+
+    @pytest.fixture
+    def journal(self, tmp_path):
+        journal = checklist.ChecklistJournal(
+            snapshot_file=tmp_path / "nowcast_checklist.yaml",
+            journal_file=tmp_path / "nowcast_checklist.yaml.journal",
+            compact_interval=3,
+        )
+        yield journal
+        journal.close()
+
+    def test_load_no_files(self, journal):
+        with pytest.raises(FileNotFoundError):
+            journal.load()
+
+    def test_load_snapshot_only(self, journal):
+        journal.snapshot_file.write_text(yaml.safe_dump({"foo": {"bar": 1}}))
+        assert journal.load() == {"foo": {"bar": 1}}
+        assert journal.records == 0
+
+    def test_load_empty_snapshot(self, journal):
+        journal.snapshot_file.write_text("")
+        assert journal.load() == {}
+
+    def test_replay_journal(self, journal):
+        journal.snapshot_file.write_text(yaml.safe_dump({"foo": {"bar": 1}}))
+        journal.append("foo", {"baz": 2})
+        journal.append("qux", ["2024-01-01"])
+        journal.close()
+        assert journal.load() == {"foo": {"bar": 1, "baz": 2}, "qux": ["2024-01-01"]}
+        assert journal.records == 2
+
+    def test_replay_journal_without_snapshot(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.close()
+        assert journal.load() == {"foo": {"bar": 1}}
+
+    def test_append_counts_records(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.append("foo", {"bar": 2})
+        assert journal.records == 2
+        assert not journal.needs_compaction
+        journal.append("foo", {"bar": 3})
+        assert journal.needs_compaction
+
+    def test_torn_record_discarded(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.close()
+        good_size = journal.journal_file.stat().st_size
+        journal.append("foo", {"bar": 2})
+        journal.close()
+        with journal.journal_file.open("r+b") as f:
+            f.truncate(journal.journal_file.stat().st_size - 3)
+        assert journal.load() == {"foo": {"bar": 1}}
+        assert journal.journal_file.stat().st_size == good_size
+
+    def test_corrupt_record_discarded(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.append("foo", {"bar": 2})
+        journal.close()
+        data = bytearray(journal.journal_file.read_bytes())
+        data[-1] ^= 0xFF
+        journal.journal_file.write_bytes(bytes(data))
+        assert journal.load() == {"foo": {"bar": 1}}
+        assert journal.records == 1
+
+    def test_compact(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.compact({"foo": {"bar": 1}})
+        assert yaml.safe_load(journal.snapshot_file.read_text()) == {"foo": {"bar": 1}}
+        assert journal.journal_file.stat().st_size == 0
+        assert journal.records == 0
+        assert not (
+            journal.snapshot_file.parent / "nowcast_checklist.yaml.part"
+        ).exists()
+
+    def test_append_after_compact(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.compact({"foo": {"bar": 1}})
+        journal.append("foo", {"baz": 2})
+        journal.close()
+        assert journal.load() == {"foo": {"bar": 1, "baz": 2}}
+        assert journal.records == 1
+
+    def test_replay_after_compacted_records_is_idempotent(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.append("foo", "replaced")
+        journal.close()
+        # Snapshot written, but journal not truncated
+        journal.snapshot_file.write_text(yaml.safe_dump({"foo": "replaced"}))
+        assert journal.load() == {"foo": "replaced"}
+
+    def test_clear(self, journal):
+        journal.append("foo", {"bar": 1})
+        journal.clear()
+        assert yaml.safe_load(journal.snapshot_file.read_text()) == {}
+        assert journal.journal_file.stat().st_size == 0
+        assert journal.records == 0
+        journal.append("baz", {"qux": 2})
+        journal.close()
+        assert journal.load() == {"baz": {"qux": 2}}
+
+    def test_replay_after_clear_before_truncate(self, journal):
+        journal.append("foo", {"bar": 1})
+        with patch.object(journal, "compact") as m_compact:
+            journal.clear()
+        m_compact.assert_called_once_with({})
+        journal.close()
+        # Empty snapshot written, but journal not truncated
+        journal.snapshot_file.write_text(yaml.safe_dump({}))
+        assert journal.load() == {}
+        assert journal.records == 2
+
+    def test_replay_clear_before_snapshot(self, journal):
+        journal.snapshot_file.write_text(yaml.safe_dump({"foo": {"bar": 1}}))
+        with patch.object(journal, "compact"):
+            journal.clear()
+        journal.append("baz", {"qux": 2})
+        journal.close()
+        assert journal.load() == {"baz": {"qux": 2}}
+
+
+class TestWriteSnapshot:
+    """Unit tests for nemo_nowcast.checklist.write_snapshot function."""
+
+    @pytest.mark.parametrize("fsync", (True, False))
+    def test_write_snapshot(self, fsync, tmp_path):
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        checklist_file.write_text("previous checklist")
+        checklist.write_snapshot(checklist_file, {"foo": {"bar": 1}}, fsync=fsync)
+        assert yaml.safe_load(checklist_file.read_text()) == {"foo": {"bar": 1}}
+        assert list(tmp_path.iterdir()) == [checklist_file]
+
+    def test_failed_write_leaves_previous_file(self, tmp_path):
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        checklist_file.write_text("previous checklist")
+        with pytest.raises(yaml.representer.RepresenterError):
+            checklist.write_snapshot(checklist_file, {"foo": object()})
+        assert checklist_file.read_text() == "previous checklist"
+        assert list(tmp_path.iterdir()) == [checklist_file]
+
+
+class TestChecklistWriter:
+    """Unit tests for nemo_nowcast.checklist.ChecklistWriter class."""
+
+    def test_invalid_fsync_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            checklist.ChecklistWriter(tmp_path / "checklist.yaml", None, fsync="maybe")
+
+    def test_submit_writes_snapshot(self, tmp_path):
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        writer = checklist.ChecklistWriter(checklist_file, Mock(name="logger"))
+        cl = {"foo": {"bar": 1}}
+        writer.submit(cl)
+        cl["foo"] = "changed after submit"
+        writer.close()
+        assert yaml.safe_load(checklist_file.read_text()) == {"foo": {"bar": 1}}
+        assert writer.writes == 1
+
+    def test_flush(self, tmp_path):
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        writer = checklist.ChecklistWriter(checklist_file, Mock(name="logger"))
+        writer.submit({"foo": 1})
+        writer.flush()
+        assert yaml.safe_load(checklist_file.read_text()) == {"foo": 1}
+        writer.close()
+
+    def test_flush_before_submit(self, tmp_path):
+        writer = checklist.ChecklistWriter(tmp_path / "checklist.yaml", None)
+        writer.flush()
+        writer.close()
+        assert writer.writes == 0
+
+    def test_bursts_coalesced(self, tmp_path):
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        writer = checklist.ChecklistWriter(checklist_file, Mock(name="logger"))
+        write_started, finish_write = threading.Event(), threading.Event()
+        write = writer._write
+
+        def slow_write(cl):
+            write_started.set()
+            finish_write.wait()
+            write(cl)
+
+        writer._write = slow_write
+        writer.submit({"update": 0})
+        write_started.wait()
+        for i in range(1, 6):
+            writer.submit({"update": i})
+        finish_write.set()
+        writer.close()
+        assert yaml.safe_load(checklist_file.read_text()) == {"update": 5}
+        assert writer.writes == 2
+        assert writer.coalesced == 4
+
+    def test_write_failure_logged(self, tmp_path):
+        logger = Mock(name="logger")
+        writer = checklist.ChecklistWriter(tmp_path / "no_such_dir" / "cl.yaml", logger)
+        writer.submit({"foo": 1})
+        writer.close()
+        assert logger.error.call_args.args == ("checklist write failed:",)
+        assert writer.writes == 0
+
+    @pytest.mark.parametrize(
+        "fsync, fsync_interval, expected",
+        (
+            ("always", 60, [True, True]),
+            ("never", 60, [False, False]),
+            ("interval", 60, [True, False]),
+            ("interval", 0, [True, True]),
+        ),
+    )
+    def test_fsync_policy(self, fsync, fsync_interval, expected, tmp_path):
+        writer = checklist.ChecklistWriter(
+            tmp_path / "checklist.yaml",
+            None,
+            fsync=fsync,
+            fsync_interval=fsync_interval,
+        )
+        with patch("nemo_nowcast.checklist.write_snapshot") as m_write_snapshot:
+            writer._write({"foo": 1})
+            writer._write({"foo": 2})
+        assert [
+            call.kwargs["fsync"] for call in m_write_snapshot.call_args_list
+        ] == expected
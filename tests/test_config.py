@@ -14,6 +14,7 @@
 
 """Unit tests for config module."""
 
+import os
 from unittest.mock import Mock, mock_open, patch
 
 import pytest
@@ -253,6 +254,193 @@ class TestConfigLoad:
             config.load("nowcast.yaml")
         assert config._replace_env.call_count == 0
 
+    def test_replace_forkserver_socket_envvar(self):
+        m_open = mock_open(
+            read_data=(
+                "checklist file: nowcast_checklist.yaml\n"
+                "python: python\n"
+                "logging:\n"
+                "  handlers: {}\n"
+                "run:\n"
+                "  forkserver:\n"
+                "    socket: $(NOWCAST.ENV.foo)/forkserver.sock"
+            )
+        )
+        config = Config()
+        config._replace_env = Mock(return_value="bar")
+        with patch("nemo_nowcast.config.open", m_open):
+            config.load("nowcast.yaml")
+        assert config["run"]["forkserver"]["socket"] == "bar/forkserver.sock"
+
+    def test_replace_worker_status_files_envvars(self):
+        m_open = mock_open(
+            read_data=(
+                "checklist file: nowcast_checklist.yaml\n"
+                "python: python\n"
+                "logging:\n"
+                "  handlers: {}\n"
+                "run:\n"
+                "  worker status files:\n"
+                "    manager: $(NOWCAST.ENV.foo)/manager_workers.yaml\n"
+                "    scheduler: $(NOWCAST.ENV.foo)/scheduler_workers.yaml\n"
+            )
+        )
+        config = Config()
+        config._replace_env = Mock(return_value="bar")
+        with patch("nemo_nowcast.config.open", m_open):
+            config.load("nowcast.yaml")
+        assert config["run"]["worker status files"] == {
+            "manager": "bar/manager_workers.yaml",
+            "scheduler": "bar/scheduler_workers.yaml",
+        }
+
+    def test_replace_scheduler_state_file_envvars(self):
+        m_open = mock_open(
+            read_data=(
+                "checklist file: nowcast_checklist.yaml\n"
+                "python: python\n"
+                "logging:\n"
+                "  handlers: {}\n"
+                "run:\n"
+                "  scheduler state file: $(NOWCAST.ENV.foo)/scheduler_state.yaml\n"
+            )
+        )
+        config = Config()
+        config._replace_env = Mock(return_value="bar")
+        with patch("nemo_nowcast.config.open", m_open):
+            config.load("nowcast.yaml")
+        assert config["run"]["scheduler state file"] == "bar/scheduler_state.yaml"
+
+
+class TestConfigPreload:
+    """Unit tests for nemo_nowcast.config.Config.preload method."""
+
+    @pytest.fixture
+    def config_file(self, tmp_path):
+        config_file = tmp_path / "nowcast.yaml"
+        config_file.write_text(
+            "checklist file: nowcast_checklist.yaml\n"
+            "python: python\n"
+            "logging:\n"
+            "  handlers: {}\n"
+        )
+        with patch.dict("nemo_nowcast.config._preloaded", clear=True):
+            yield config_file
+
+    def test_preloaded_config_used(self, config_file):
+        config = Config()
+        config.load(config_file)
+        config.preload()
+        preloaded_config = Config()
+        with patch("nemo_nowcast.config.open") as m_open:
+            preloaded_config.load(config_file)
+        assert not m_open.called
+        assert preloaded_config._dict is config._dict
+        assert preloaded_config.file == config_file
+
+    def test_preloaded_config_used_once(self, config_file):
+        config = Config()
+        config.load(config_file)
+        config.preload()
+        Config().load(config_file)
+        reloaded_config = Config()
+        reloaded_config.load(config_file)
+        assert reloaded_config._dict is not config._dict
+        assert reloaded_config._dict == config._dict
+
+    def test_changed_config_file_loaded(self, config_file):
+        config = Config()
+        config.load(config_file)
+        config.preload()
+        config_file.write_text(config_file.read_text() + "foo: bar\n")
+        changed_config = Config()
+        changed_config.load(config_file)
+        assert changed_config["foo"] == "bar"
+
+
+class TestConfigCache:
+    """Unit tests for configuration caching in nemo_nowcast.config.Config.load
+    method.
+    """
+
+    @pytest.fixture
+    def config_file(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("NOWCAST_CONFIG_CACHE", str(tmp_path / "cache"))
+        monkeypatch.setenv("NOWCAST_LOGS", "/nowcast/logs")
+        config_file = tmp_path / "nowcast.yaml"
+        config_file.write_text(
+            "checklist file: $(NOWCAST.ENV.NOWCAST_LOGS)/nowcast_checklist.yaml\n"
+            "python: python\n"
+            "logging:\n"
+            "  handlers: {}\n"
+        )
+        return config_file
+
+    def test_cache_written(self, config_file, tmp_path):
+        Config().load(config_file)
+        (cache_file,) = (tmp_path / "cache").iterdir()
+        assert cache_file.name.startswith("nowcast.yaml-")
+        assert cache_file.stat().st_mode & 0o777 == 0o600
+
+    def test_cache_used(self, config_file):
+        config = Config()
+        config.load(config_file)
+        cached_config = Config()
+        with patch("nemo_nowcast.config.yamlutils.safe_load") as m_safe_load:
+            cached_config.load(config_file)
+        assert not m_safe_load.called
+        assert cached_config._dict == config._dict
+        assert cached_config["checklist file"] == "/nowcast/logs/nowcast_checklist.yaml"
+        assert cached_config.file == config_file
+
+    def test_cached_dict_not_shared(self, config_file):
+        Config().load(config_file)
+        config = Config()
+        config.load(config_file)
+        config["python"] = "changed"
+        cached_config = Config()
+        cached_config.load(config_file)
+        assert cached_config["python"] == "python"
+
+    def test_changed_content_same_size_and_mtime(self, config_file):
+        Config().load(config_file)
+        stat = config_file.stat()
+        config_file.write_text(config_file.read_text().replace(": python", ": pythoN"))
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        config = Config()
+        config.load(config_file)
+        assert config["python"] == "pythoN"
+
+    def test_changed_envvar(self, config_file, monkeypatch):
+        Config().load(config_file)
+        monkeypatch.setenv("NOWCAST_LOGS", "/new/logs")
+        config = Config()
+        config.load(config_file)
+        assert config["checklist file"] == "/new/logs/nowcast_checklist.yaml"
+
+    def test_corrupt_cache_replaced(self, config_file, tmp_path):
+        Config().load(config_file)
+        (cache_file,) = (tmp_path / "cache").iterdir()
+        cache_file.write_bytes(b"not a pickle")
+        config = Config()
+        config.load(config_file)
+        assert config["python"] == "python"
+        with patch("nemo_nowcast.config.yamlutils.safe_load") as m_safe_load:
+            Config().load(config_file)
+        assert not m_safe_load.called
+
+    def test_unwritable_cache_dir(self, config_file, tmp_path, monkeypatch):
+        (tmp_path / "not_a_dir").write_text("")
+        monkeypatch.setenv("NOWCAST_CONFIG_CACHE", str(tmp_path / "not_a_dir"))
+        config = Config()
+        config.load(config_file)
+        assert config["python"] == "python"
+
+    def test_no_cache_dir(self, config_file, tmp_path, monkeypatch):
+        monkeypatch.delenv("NOWCAST_CONFIG_CACHE")
+        Config().load(config_file)
+        assert not (tmp_path / "cache").exists()
+
 
 class TestReplaceEnv:
     """Unit tests for nemo_nowcast.config.Config._replace_env load method."""
@@ -0,0 +1,110 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for cron module."""
+
+import datetime
+
+import pytest
+
+from nemo_nowcast import cron
+
+# Saturday
+SATURDAY_NOON = datetime.datetime(2026, 10, 17, 12, 0)
+
+
+class TestCronExpression:
+    """Unit tests for nemo_nowcast.cron.CronExpression class."""
+
+    @pytest.mark.parametrize(
+        "expression",
+        (
+            "* * * *",
+            "* * * * * *",
+            "60 * * * *",
+            "* 24 * * *",
+            "* * 0 * *",
+            "* * * 13 *",
+            "* * * * 8",
+            "*/0 * * * *",
+            "5-1 * * * *",
+            "x * * * *",
+            "* * * foo *",
+        ),
+    )
+    def test_invalid_expression(self, expression):
+        with pytest.raises(ValueError):
+            cron.CronExpression(expression)
+
+    def test_fields(self):
+        expression = cron.CronExpression("*/15 9-17/4 1,15 jan-mar sun,7")
+        assert expression.minutes == {0, 15, 30, 45}
+        assert expression.hours == {9, 13, 17}
+        assert expression.days == {1, 15}
+        assert expression.months == {1, 2, 3}
+        assert expression.weekdays == {6}
+
+    def test_step_from_value(self):
+        expression = cron.CronExpression("50/5 * * * *")
+        assert expression.minutes == {50, 55}
+
+    @pytest.mark.parametrize(
+        "expression, expected",
+        (
+            ("15 5 * * *", datetime.datetime(2026, 10, 18, 5, 15)),
+            ("15 13 * * *", datetime.datetime(2026, 10, 17, 13, 15)),
+            ("*/15 9-17 * * mon-fri", datetime.datetime(2026, 10, 19, 9, 0)),
+            ("0 0 1 * *", datetime.datetime(2026, 11, 1)),
+            ("0 0 29 2 *", datetime.datetime(2028, 2, 29)),
+            ("@hourly", datetime.datetime(2026, 10, 17, 13, 0)),
+            ("@weekly", datetime.datetime(2026, 10, 18)),
+            ("@yearly", datetime.datetime(2027, 1, 1)),
+        ),
+    )
+    def test_next_after(self, expression, expected):
+        assert cron.CronExpression(expression).next_after(SATURDAY_NOON) == expected
+
+    def test_next_after_is_after_moment(self):
+        expression = cron.CronExpression("0 12 * * *")
+        assert expression.next_after(SATURDAY_NOON) == datetime.datetime(
+            2026, 10, 18, 12, 0
+        )
+
+    def test_next_after_second(self):
+        expression = cron.CronExpression("0 12 * * *", second=30)
+        assert expression.next_after(SATURDAY_NOON) == datetime.datetime(
+            2026, 10, 17, 12, 0, 30
+        )
+
+    def test_day_of_month_or_day_of_week(self):
+        # 13th of the month, or Fridays
+        expression = cron.CronExpression("0 12 13 * fri")
+        assert expression.next_after(SATURDAY_NOON) == datetime.datetime(
+            2026, 10, 23, 12, 0
+        )
+        assert expression.next_after(
+            datetime.datetime(2026, 11, 7)
+        ) == datetime.datetime(2026, 11, 13, 12, 0)
+
+    def test_never_matches(self):
+        with pytest.raises(ValueError):
+            cron.CronExpression("0 0 30 2 *").next_after(SATURDAY_NOON)
+
+    def test_times_between(self):
+        expression = cron.CronExpression("@daily")
+        times = expression.times_between(datetime.datetime(2026, 10, 15), SATURDAY_NOON)
+        assert list(times) == [
+            datetime.datetime(2026, 10, 16),
+            datetime.datetime(2026, 10, 17),
+        ]
@@ -0,0 +1,268 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for file_watch module."""
+
+import os
+import select
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from nemo_nowcast import file_watch
+
+requires_inotify = pytest.mark.skipif(
+    not file_watch.inotify_available(), reason="inotify is not available"
+)
+
+
+def _wait_for_events(watch, timeout=5):
+    """Wait for watch's inotify file descriptor to become readable,
+    and read its events.
+    """
+    readable, _, _ = select.select([watch.fileno()], [], [], timeout)
+    assert readable
+    watch.read_events()
+
+
+def _run_until_called(watch, timeout=5):
+    """Run watch until its function is called, or timeout seconds pass."""
+    t_end = time.monotonic() + timeout
+    while not watch.func.called and time.monotonic() < t_end:
+        if watch.fileno() is not None:
+            select.select([watch.fileno()], [], [], 0.01)
+            watch.read_events()
+        else:
+            time.sleep(0.01)
+        watch.run_pending()
+
+
+class TestFromGlob:
+    """Unit tests for nemo_nowcast.file_watch.FileWatch.from_glob method."""
+
+    def test_from_glob(self):
+        watch = file_watch.FileWatch.from_glob(
+            "/results/forcing/GRIB/*.grib2", Mock(), settle_seconds=1
+        )
+        assert watch.directory == "/results/forcing/GRIB"
+        assert watch.pattern == "*.grib2"
+        assert watch.settle_seconds == 1
+
+    def test_directory(self):
+        watch = file_watch.FileWatch.from_glob("/results/forcing/GRIB/", Mock())
+        assert watch.pattern == "*"
+
+    def test_wildcard_in_directory(self):
+        with pytest.raises(ValueError):
+            file_watch.FileWatch.from_glob("/results/*/GRIB/*.grib2", Mock())
+
+
+class TestInotify:
+    """Unit tests for nemo_nowcast.file_watch.Inotify class."""
+
+    @requires_inotify
+    def test_read_events(self, tmp_path):
+        inotify = file_watch.Inotify(tmp_path)
+        try:
+            assert inotify.read_events() == []
+            (tmp_path / "foo.grib2").write_bytes(b"grib")
+            select.select([inotify.fd], [], [], 5)
+            events = inotify.read_events()
+        finally:
+            inotify.close()
+        assert (file_watch.IN_CREATE, "foo.grib2") in events
+        assert (file_watch.IN_CLOSE_WRITE, "foo.grib2") in events
+
+    @requires_inotify
+    def test_missing_directory(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            file_watch.Inotify(tmp_path / "missing")
+
+    def test_not_available(self, tmp_path):
+        with patch("nemo_nowcast.file_watch._libc", None):
+            with pytest.raises(OSError):
+                file_watch.Inotify(tmp_path)
+
+
+class TestFileWatch:
+    """Unit tests for nemo_nowcast.file_watch.FileWatch class."""
+
+    @pytest.fixture(params=["inotify", "poll"])
+    def watch(self, request, tmp_path):
+        if request.param == "inotify" and not file_watch.inotify_available():
+            pytest.skip("inotify is not available")
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path),
+            "*.grib2",
+            Mock(name="func"),
+            settle_seconds=0.05,
+            poll_seconds=0.02,
+            poll=request.param == "poll",
+        )
+        watch.start()
+        yield watch
+        watch.close()
+
+    def test_inotify_or_poll(self, watch):
+        if watch.poll:
+            assert watch.fileno() is None
+        else:
+            assert watch.fileno() is not None
+
+    def test_arrival(self, watch, tmp_path):
+        (tmp_path / "foo.grib2").write_bytes(b"grib")
+        _run_until_called(watch)
+        watch.func.assert_called_once_with([os.fspath(tmp_path / "foo.grib2")])
+
+    def test_non_matching_file_ignored(self, watch, tmp_path):
+        (tmp_path / "foo.txt").write_bytes(b"text")
+        _run_until_called(watch, timeout=0.3)
+        assert not watch.func.called
+
+    def test_existing_files_ignored(self, tmp_path):
+        (tmp_path / "foo.grib2").write_bytes(b"grib")
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path), "*.grib2", Mock(name="func"), settle_seconds=0
+        )
+        watch.start()
+        try:
+            watch._rescan()
+            assert watch.run_pending() == 0
+        finally:
+            watch.close()
+
+    def test_changed_file_arrives_again(self, watch, tmp_path):
+        (tmp_path / "foo.grib2").write_bytes(b"grib")
+        _run_until_called(watch)
+        watch.func.reset_mock()
+        (tmp_path / "foo.grib2").write_bytes(b"grib grib")
+        _run_until_called(watch)
+        watch.func.assert_called_once_with([os.fspath(tmp_path / "foo.grib2")])
+
+    def test_file_not_settled(self, tmp_path):
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path), "*.grib2", Mock(name="func"), settle_seconds=60
+        )
+        watch.start()
+        try:
+            (tmp_path / "foo.grib2").write_bytes(b"grib")
+            watch._rescan()
+            assert watch.run_pending() == 0
+            assert 59 < watch.seconds_until_next_check() <= 60
+        finally:
+            watch.close()
+
+    def test_changing_file_restarts_settling(self, tmp_path):
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path), "*.grib2", Mock(name="func"), settle_seconds=0
+        )
+        watch.start()
+        path = tmp_path / "foo.grib2"
+        path.write_bytes(b"grib")
+        watch._rescan()
+        path.write_bytes(b"grib grib")
+        assert watch.run_pending() == 0
+        assert watch.run_pending() == 1
+        watch.func.assert_called_once_with([os.fspath(path)])
+        watch.close()
+
+    def test_deleted_file_forgotten(self, tmp_path):
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path), "*.grib2", Mock(name="func"), settle_seconds=0
+        )
+        watch.start()
+        path = tmp_path / "foo.grib2"
+        path.write_bytes(b"grib")
+        watch._rescan()
+        path.unlink()
+        assert watch.run_pending() == 0
+        assert watch._pending == {}
+        watch.close()
+
+    def test_batch(self, tmp_path):
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path),
+            "*.grib2",
+            Mock(name="func"),
+            settle_seconds=0,
+            batch_seconds=60,
+        )
+        watch.start()
+        for name in ("foo.grib2", "bar.grib2"):
+            (tmp_path / name).write_bytes(b"grib")
+        watch._rescan()
+        assert watch.run_pending() == 0
+        assert 59 < watch.seconds_until_next_check() <= 60
+        with patch(
+            "nemo_nowcast.file_watch.time.monotonic",
+            return_value=time.monotonic() + 61,
+        ):
+            assert watch.run_pending() == 1
+        watch.close()
+        (batch,) = watch.func.call_args.args
+        assert sorted(batch) == [
+            os.fspath(tmp_path / "bar.grib2"),
+            os.fspath(tmp_path / "foo.grib2"),
+        ]
+
+    def test_seconds_until_next_check(self, tmp_path):
+        watch = file_watch.FileWatch(os.fspath(tmp_path), "*.grib2", Mock())
+        watch.start()
+        if watch.fileno() is not None:
+            assert watch.seconds_until_next_check() is None
+        watch.close()
+
+    def test_poll_seconds_until_next_check(self, tmp_path):
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path), "*.grib2", Mock(), poll_seconds=10, poll=True
+        )
+        watch.start()
+        assert 9 < watch.seconds_until_next_check() <= 10
+
+    @requires_inotify
+    def test_queue_overflow_rescans(self, tmp_path):
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path), "*.grib2", Mock(), settle_seconds=0
+        )
+        watch.start()
+        (tmp_path / "foo.grib2").write_bytes(b"grib")
+        watch.inotify = Mock(
+            name="inotify",
+            read_events=Mock(return_value=[(file_watch.IN_Q_OVERFLOW, "")]),
+        )
+        watch.read_events()
+        assert watch.run_pending() == 1
+
+    @requires_inotify
+    def test_inotify_failure_falls_back_to_polling(self, tmp_path):
+        watch = file_watch.FileWatch(os.fspath(tmp_path), "*.grib2", Mock())
+        with patch(
+            "nemo_nowcast.file_watch.Inotify", side_effect=OSError("watch limit")
+        ):
+            watch.start()
+        assert watch.fileno() is None
+
+    @requires_inotify
+    def test_wait_for_events(self, tmp_path):
+        watch = file_watch.FileWatch(
+            os.fspath(tmp_path), "*.grib2", Mock(), settle_seconds=0
+        )
+        watch.start()
+        try:
+            (tmp_path / "foo.grib2").write_bytes(b"grib")
+            _wait_for_events(watch)
+            assert watch.run_pending() == 1
+        finally:
+            watch.close()
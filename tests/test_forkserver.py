@@ -0,0 +1,337 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for nemo_nowcast.forkserver module."""
+
+import os
+import signal
+import socket
+import sys
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+import yaml
+
+from nemo_nowcast import forkserver
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    # Unix domain socket paths are limited to about 100 characters
+    path = f"/tmp/nemo_nowcast_forkserver_test_{os.getpid()}.sock"
+    yield path
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+@patch("nemo_nowcast.forkserver.logger", autospec=True)
+class TestPreload:
+    """Unit tests for forkserver._preload function."""
+
+    def test_preload_modules(self, m_logger):
+        config = Mock(name="config")
+        config.__getitem__ = Mock(
+            return_value={"forkserver": {"preload": ["nemo_nowcast.workers.sleep"]}}
+        )
+        with patch("nemo_nowcast.forkserver.importlib") as m_importlib:
+            forkserver._preload(config)
+        imported = [c.args[0] for c in m_importlib.import_module.call_args_list]
+        assert imported == [*forkserver.PRELOAD_MODULES, "nemo_nowcast.workers.sleep"]
+        config.preload.assert_called_once_with()
+
+    def test_preload_import_error(self, m_logger):
+        config = Mock(name="config")
+        config.__getitem__ = Mock(
+            return_value={"forkserver": {"preload": ["nowcast.workers.no_such"]}}
+        )
+        forkserver._preload(config)
+        m_logger.warning.assert_called_once()
+        config.preload.assert_called_once_with()
+
+
+@patch("nemo_nowcast.forkserver.logger", autospec=True)
+class TestRefreshPreloadedConfig:
+    """Unit tests for forkserver._refresh_preloaded_config function."""
+
+    def test_unchanged_config(self, m_logger, tmp_path):
+        config_file = tmp_path / "nowcast.yaml"
+        config_file.write_text("foo: bar\n")
+        config = Mock(name="config", file=config_file)
+        signature = forkserver._file_signature(config_file)
+        assert forkserver._refresh_preloaded_config(config, signature) == signature
+        assert not config.load.called
+        assert not config.preload.called
+
+    def test_changed_config(self, m_logger, tmp_path):
+        config_file = tmp_path / "nowcast.yaml"
+        config_file.write_text("foo: bar\n")
+        config = Mock(name="config", file=config_file)
+        signature = forkserver._refresh_preloaded_config(config, (0, 0))
+        assert signature == forkserver._file_signature(config_file)
+        config.load.assert_called_once_with(config_file)
+        config.preload.assert_called_once_with()
+
+    def test_config_load_error(self, m_logger, tmp_path):
+        config_file = tmp_path / "nowcast.yaml"
+        config_file.write_text("foo: bar\n")
+        config = Mock(name="config", file=config_file)
+        config.load.side_effect = KeyError("checklist file")
+        assert forkserver._refresh_preloaded_config(config, (0, 0)) == (0, 0)
+        assert not config.preload.called
+        m_logger.error.assert_called_once()
+
+
+@patch("nemo_nowcast.forkserver.logger", autospec=True)
+class TestHandleRequest:
+    """Unit tests for forkserver._handle_request function."""
+
+    def test_parent(self, m_logger):
+        conn, client = socket.socketpair()
+        request = {"module": "nowcast.workers.test_worker", "argv": [], "cwd": "/"}
+        client.sendall(yaml.safe_dump(request).encode())
+        client.shutdown(socket.SHUT_WR)
+        children = {}
+        with patch("nemo_nowcast.forkserver.os.fork", return_value=4242):
+            forkserver._handle_request(conn, Mock(name="server"), children)
+        conn.close()
+        assert yaml.safe_load(client.recv(4096)) == {"pid": 4242}
+        assert children == {4242: "nowcast.workers.test_worker"}
+        client.close()
+
+    def test_child(self, m_logger):
+        conn = Mock(name="conn")
+        conn.recv.side_effect = [
+            yaml.safe_dump(
+                {"module": "nowcast.workers.test_worker", "argv": ["x"], "cwd": "/"}
+            ).encode(),
+            b"",
+        ]
+        server = Mock(name="server")
+        with patch("nemo_nowcast.forkserver.os.fork", return_value=0):
+            with patch("nemo_nowcast.forkserver._run_worker") as m_run_worker:
+                forkserver._handle_request(conn, server, {})
+        conn.close.assert_called_once_with()
+        server.close.assert_called_once_with()
+        m_run_worker.assert_called_once_with("nowcast.workers.test_worker", ["x"], "/")
+
+
+class TestRunWorker:
+    """Unit tests for forkserver._run_worker function."""
+
+    @pytest.fixture(autouse=True)
+    def restore_process_state(self, monkeypatch):
+        monkeypatch.setattr(sys, "argv", sys.argv)
+        monkeypatch.chdir(os.getcwd())
+        handlers = {
+            signum: signal.getsignal(signum)
+            for signum in (signal.SIGCHLD, signal.SIGHUP, signal.SIGINT, signal.SIGTERM)
+        }
+        yield
+        for signum, handler in handlers.items():
+            signal.signal(signum, handler)
+
+    @pytest.mark.parametrize(
+        "main_effect, exit_code",
+        (
+            (None, 0),
+            (SystemExit, 0),
+            (SystemExit(2), 2),
+            (SystemExit("fatal"), 1),
+            (ValueError("bug"), 1),
+        ),
+    )
+    def test_exit_code(self, main_effect, exit_code, tmp_path):
+        m_module = Mock(name="worker_module")
+        m_module.main.side_effect = main_effect
+        with patch.object(forkserver.os, "_exit") as m_exit:
+            with patch.object(forkserver.importlib, "import_module") as m_import:
+                m_import.return_value = m_module
+                forkserver._run_worker(
+                    "nowcast.workers.test_worker", ["nowcast.yaml"], os.fspath(tmp_path)
+                )
+        m_import.assert_called_once_with("nowcast.workers.test_worker")
+        m_exit.assert_called_once_with(exit_code)
+        assert sys.argv == ["nowcast.workers.test_worker", "nowcast.yaml"]
+        assert os.getcwd() == os.fspath(tmp_path)
+
+
+@patch("nemo_nowcast.forkserver.logger", autospec=True)
+class TestReapChildren:
+    """Unit tests for forkserver._reap_children function."""
+
+    def test_reap_children(self, m_logger):
+        children = {4242: "nowcast.workers.test_worker"}
+        waitpid_returns = [(4242, 0), (0, 0)]
+        with patch(
+            "nemo_nowcast.forkserver.os.waitpid", side_effect=waitpid_returns
+        ) as m_waitpid:
+            forkserver._reap_children(children)
+        assert m_waitpid.call_count == 2
+        assert children == {}
+        m_logger.info.assert_called_once_with(
+            "nowcast.workers.test_worker worker process 4242 exited with status 0"
+        )
+
+    def test_no_children(self, m_logger):
+        with patch("nemo_nowcast.forkserver.os.waitpid", side_effect=ChildProcessError):
+            forkserver._reap_children({})
+        assert not m_logger.info.called
+
+
+class TestLaunch:
+    """Unit tests for forkserver.launch function."""
+
+    def test_launch(self, socket_path):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        server.listen()
+        requests = []
+
+        def serve():
+            conn, _ = server.accept()
+            with conn:
+                requests.append(yaml.safe_load(forkserver._recv_all(conn)))
+                conn.sendall(yaml.safe_dump({"pid": 4242}).encode())
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        pid = forkserver.launch(
+            socket_path, "nowcast.workers.test_worker", ["nowcast.yaml"]
+        )
+        thread.join()
+        server.close()
+        assert pid == 4242
+        assert requests == [
+            {
+                "module": "nowcast.workers.test_worker",
+                "argv": ["nowcast.yaml"],
+                "cwd": os.getcwd(),
+            }
+        ]
+
+    def test_no_forkserver(self, socket_path):
+        with pytest.raises(OSError):
+            forkserver.launch(socket_path, "nowcast.workers.test_worker", [])
+
+    @patch("nemo_nowcast.forkserver.LAUNCH_TIMEOUT", 0.05)
+    def test_reply_timeout(self, socket_path):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        server.listen()
+        try:
+            with pytest.raises(forkserver.LaunchError):
+                forkserver.launch(socket_path, "nowcast.workers.test_worker", [])
+        finally:
+            server.close()
+
+    def test_invalid_reply(self, socket_path):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(socket_path)
+        server.listen()
+
+        def serve():
+            conn, _ = server.accept()
+            with conn:
+                forkserver._recv_all(conn)
+                conn.sendall(b"error: fork failed")
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        try:
+            with pytest.raises(forkserver.LaunchError):
+                forkserver.launch(socket_path, "nowcast.workers.test_worker", [])
+        finally:
+            thread.join()
+            server.close()
+
+    def test_launch_error_is_not_os_error(self):
+        assert not issubclass(forkserver.LaunchError, OSError)
+
+
+class TestForkedWorker:
+    """Unit tests for forkserver.ForkedWorker class."""
+
+    def test_is_alive(self):
+        assert forkserver.ForkedWorker(os.getpid()).is_alive()
+
+    @patch("nemo_nowcast.forkserver.os.kill", side_effect=ProcessLookupError)
+    def test_exited(self, m_kill):
+        assert not forkserver.ForkedWorker(4242).is_alive()
+        m_kill.assert_called_once_with(4242, 0)
+
+    @patch("nemo_nowcast.forkserver.os.kill", side_effect=PermissionError)
+    def test_other_user(self, m_kill):
+        assert forkserver.ForkedWorker(4242).is_alive()
+
+
+class TestForkserver:
+    """Integration test of worker launch by the forkserver."""
+
+    def test_launch_worker(self, socket_path, tmp_path, monkeypatch):
+        module_file = tmp_path / "forkserver_test_worker.py"
+        module_file.write_text(
+            "import sys\n"
+            "from pathlib import Path\n"
+            "\n"
+            "def main():\n"
+            "    from nemo_nowcast import Config\n"
+            "    config = Config()\n"
+            "    config.load(sys.argv[1])\n"
+            "    Path(sys.argv[2]).write_text(config['foo'])\n"
+        )
+        config_file = tmp_path / "nowcast.yaml"
+        config_file.write_text(
+            "foo: preloaded\n"
+            "checklist file: nowcast_checklist.yaml\n"
+            "python: python\n"
+            "logging:\n"
+            "  handlers: {}\n"
+            "run:\n"
+            "  forkserver:\n"
+            f"    socket: {socket_path}\n"
+            "    preload:\n"
+            "      - forkserver_test_worker\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        pid = os.fork()
+        if pid == 0:
+            # Forkserver process
+            try:
+                sys.argv = ["forkserver", os.fspath(config_file)]
+                forkserver.main()
+            finally:
+                os._exit(0)
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                threading.Event().wait(0.05)
+            output_file = tmp_path / "output.txt"
+            worker_pid = forkserver.launch(
+                socket_path,
+                "forkserver_test_worker",
+                [os.fspath(config_file), os.fspath(output_file)],
+            )
+            for _ in range(100):
+                if output_file.exists() and output_file.read_text():
+                    break
+                threading.Event().wait(0.05)
+        finally:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        assert worker_pid not in (pid, os.getpid())
+        assert output_file.read_text() == "preloaded"
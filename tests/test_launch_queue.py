@@ -0,0 +1,174 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for launch_queue module."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from nemo_nowcast import NextWorker, launch_queue
+
+
+def test_worker_name():
+    next_worker = NextWorker("nowcast.workers.download_weather")
+    assert launch_queue.worker_name(next_worker) == "download_weather"
+
+
+class TestLaunchQueue:
+    """Unit tests for nemo_nowcast.launch_queue.LaunchQueue class."""
+
+    def test_invalid_order(self):
+        with pytest.raises(ValueError):
+            launch_queue.LaunchQueue(order="lifo")
+
+    def test_no_limits(self):
+        queue = launch_queue.LaunchQueue()
+        workers = [NextWorker(f"nowcast.workers.worker_{i}") for i in range(5)]
+        assert queue.submit(workers) == workers
+        assert queue.depth == 0
+        assert len(queue.running) == 5
+
+    def test_global_limit(self):
+        queue = launch_queue.LaunchQueue(max_workers=2)
+        workers = [NextWorker(f"nowcast.workers.worker_{i}") for i in range(4)]
+        assert queue.submit(workers) == workers[:2]
+        assert queue.depth == 2
+        assert queue.finished("worker_0")
+        assert queue.release() == [workers[2]]
+        assert queue.release() == []
+
+    def test_host_limit(self):
+        queue = launch_queue.LaunchQueue(host_max_workers={"arbutus.cloud": 1})
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO", host="arbutus.cloud"),
+            NextWorker("nowcast.workers.watch_NEMO", host="arbutus.cloud"),
+            NextWorker("nowcast.workers.download_weather"),
+        ]
+        assert queue.submit(workers) == [workers[0], workers[2]]
+        assert queue.host_depths() == {"arbutus.cloud": 1}
+        queue.finished("run_NEMO")
+        assert queue.release() == [workers[1]]
+
+    def test_fifo_order(self):
+        queue = launch_queue.LaunchQueue(max_workers=0)
+        workers = [
+            NextWorker("nowcast.workers.low", priority=0),
+            NextWorker("nowcast.workers.high", priority=10),
+        ]
+        queue.submit(workers)
+        queue.max_workers = None
+        assert queue.release() == workers
+
+    def test_priority_order(self):
+        queue = launch_queue.LaunchQueue(max_workers=0, order="priority")
+        workers = [
+            NextWorker("nowcast.workers.low_1", priority=0),
+            NextWorker("nowcast.workers.high", priority=10),
+            NextWorker("nowcast.workers.low_2", priority=0),
+        ]
+        queue.submit(workers)
+        queue.max_workers = None
+        assert queue.release() == [workers[1], workers[0], workers[2]]
+
+    def test_blocked_host_does_not_block_other_hosts(self):
+        queue = launch_queue.LaunchQueue(host_max_workers={"arbutus.cloud": 0})
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO", host="arbutus.cloud"),
+            NextWorker("nowcast.workers.download_weather"),
+        ]
+        assert queue.submit(workers) == [workers[1]]
+        assert queue.depth == 1
+
+    def test_finished_earliest_launch(self):
+        queue = launch_queue.LaunchQueue()
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO", host="arbutus.cloud"),
+            NextWorker("nowcast.workers.run_NEMO", host="orcinus"),
+        ]
+        queue.submit(workers)
+        assert queue.finished("run_NEMO")
+        assert [launch.worker for launch in queue.running] == [workers[1]]
+
+    def test_finished_ignores_known_pid(self):
+        queue = launch_queue.LaunchQueue()
+        worker = NextWorker("nowcast.workers.run_NEMO")
+        queue.submit([worker])
+        queue.launched(worker, 42)
+        assert not queue.finished("run_NEMO")
+        assert [launch.pid for launch in queue.running] == [42]
+
+    def test_launch_failed(self):
+        queue = launch_queue.LaunchQueue(max_workers=1)
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO"),
+            NextWorker("nowcast.workers.watch_NEMO"),
+        ]
+        queue.submit(workers)
+        assert queue.launch_failed(workers[0]) == [workers[1]]
+        assert [launch.worker for launch in queue.running] == [workers[1]]
+        assert queue.depth == 0
+
+    def test_finished_unknown_worker(self):
+        queue = launch_queue.LaunchQueue()
+        assert not queue.finished("run_NEMO")
+
+    def test_process_exited(self):
+        queue = launch_queue.LaunchQueue()
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO"),
+            NextWorker("nowcast.workers.run_NEMO"),
+        ]
+        queue.submit(workers)
+        queue.launched(workers[0], 42)
+        queue.launched(workers[1], 43)
+        assert queue.process_exited(43)
+        assert [launch.pid for launch in queue.running] == [42]
+        assert not queue.process_exited(43)
+
+    def test_forked_workers_exited(self):
+        queue = launch_queue.LaunchQueue()
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO"),
+            NextWorker("nowcast.workers.watch_NEMO"),
+            NextWorker("nowcast.workers.download_weather"),
+        ]
+        queue.submit(workers)
+        assert not queue.has_forked_workers
+        exited = Mock(name="exited", pid=42, **{"is_alive.return_value": False})
+        alive = Mock(name="alive", pid=43, **{"is_alive.return_value": True})
+        queue.launched(workers[0], 42, forked_worker=exited)
+        queue.launched(workers[1], 43, forked_worker=alive)
+        queue.launched(workers[2], 44)
+        assert queue.has_forked_workers
+        assert queue.forked_workers_exited()
+        assert [launch.pid for launch in queue.running] == [43, 44]
+        assert not queue.forked_workers_exited()
+
+    def test_status(self):
+        queue = launch_queue.LaunchQueue(max_workers=1)
+        queue.submit(
+            [
+                NextWorker("nowcast.workers.run_NEMO"),
+                NextWorker("nowcast.workers.watch_NEMO", ["nowcast"], priority=2),
+            ]
+        )
+        status = queue.status()
+        assert status["running"] == 1
+        assert status["depth"] == 1
+        assert status["host depths"] == {"localhost": 1}
+        (queued,) = status["queued"]
+        assert queued["module"] == "nowcast.workers.watch_NEMO"
+        assert queued["args"] == ["nowcast"]
+        assert queued["priority"] == 2
@@ -21,7 +21,7 @@ from unittest.mock import call, Mock, patch
 import pytest
 import zmq
 
-from nemo_nowcast import log_aggregator
+from nemo_nowcast import log_aggregator, zmq_logging
 
 
 @patch("nemo_nowcast.log_aggregator.CommandLineInterface")
@@ -143,6 +143,54 @@ class TestRun:
         log_aggregator.run(config)
         m_proc_msgs.assert_called_once_with(m_context.socket())
 
+    def test_receive_hwm(self, m_proc_msgs, m_ish, m_context):
+        config = {
+            "zmq": {"host": "localhost", "ports": {"logging": {"worker": 4343}}},
+            "log aggregator": {"receive hwm": 100_000},
+        }
+        log_aggregator.run(config)
+        m_context.socket(zmq.SUB).setsockopt.assert_called_once_with(
+            zmq.RCVHWM, 100_000
+        )
+
+    @patch("nemo_nowcast.log_aggregator.BatchedLogWriter", autospec=True)
+    def test_batched_message_processing(self, m_writer, m_proc_msgs, m_ish, m_context):
+        config = {
+            "zmq": {"host": "localhost", "ports": {"logging": {"worker": 4343}}},
+            "log aggregator": {
+                "message processing": "batched",
+                "batch size": 500,
+                "batch seconds": 0.1,
+                "max queued messages": 10_000,
+                "stats interval": 60,
+            },
+        }
+        log_aggregator.run(config)
+        m_writer.assert_called_once_with(
+            batch_size=500, batch_seconds=0.1, max_queued=10_000, stats_seconds=60
+        )
+        m_writer().start.assert_called_once_with()
+        m_ish.assert_called_once_with(m_context.socket(), m_writer())
+        m_proc_msgs.assert_called_once_with(m_context.socket(), m_writer())
+        m_writer().stop.assert_called_once_with()
+
+
+class TestProcessMessages:
+    """Unit tests for log_aggregator._process_messages function."""
+
+    @patch("nemo_nowcast.log_aggregator._log_messages", side_effect=SystemExit)
+    def test_log_messages(self, m_log_messages):
+        socket = Mock(name="socket")
+        log_aggregator._process_messages(socket)
+        m_log_messages.assert_called_once_with(socket)
+
+    def test_batched_log_writer(self):
+        socket = Mock(name="socket")
+        writer = Mock(name="writer")
+        writer.log_messages.side_effect = SystemExit
+        log_aggregator._process_messages(socket, writer)
+        writer.log_messages.assert_called_once_with(socket)
+
 
 @patch("nemo_nowcast.log_aggregator.zmq.Socket", spec=zmq.Socket)
 @patch("nemo_nowcast.log_aggregator.logger")
@@ -156,6 +204,162 @@ class TestLogMessages:
             logging.INFO, "message", extra={"logger_name": "worker_name"}
         )
 
+    @patch("nemo_nowcast.log_aggregator.zmq_logging.make_record")
+    def test_json_message(self, m_make_record, m_logger, m_socket):
+        message = _json_message("watch_NEMO", logging.INFO, "message")
+        m_socket.recv_multipart.return_value = [b"watch_NEMO.INFO", message]
+        log_aggregator._log_messages(m_socket)
+        m_make_record.assert_called_once_with(m_logger, message, "watch_NEMO")
+        m_logger.handle.assert_called_once_with(m_make_record())
+        assert not m_logger.log.called
+
+    @patch("nemo_nowcast.log_aggregator.zmq_logging.make_record")
+    def test_json_message_level_disabled(self, m_make_record, m_logger, m_socket):
+        m_logger.isEnabledFor.return_value = False
+        message = _json_message("watch_NEMO", logging.DEBUG, "message")
+        m_socket.recv_multipart.return_value = [b"watch_NEMO.DEBUG", message]
+        log_aggregator._log_messages(m_socket)
+        assert not m_make_record.called
+        assert not m_logger.handle.called
+
+
+def _json_message(logger_name, level, msg, **extra):
+    record = logging.LogRecord(logger_name, level, "", 0, msg, None, None)
+    record.__dict__.update(extra)
+    return zmq_logging.JSONFormatter(wire=True).format(record).encode()
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+        self.flushes = 0
+
+    def emit(self, record):
+        self.records.append(record)
+        self.flush()
+
+    def flush(self):
+        self.flushes += 1
+
+
+def _socket(*messages):
+    socket = Mock(name="socket")
+    socket.recv_multipart.side_effect = [*messages, zmq.Again()]
+    return socket
+
+
+class TestBatchedLogWriter:
+    """Unit tests for log_aggregator.BatchedLogWriter class."""
+
+    @pytest.fixture
+    def handler(self):
+        root = logging.getLogger()
+        saved_handlers, saved_level = list(root.handlers), root.level
+        for saved_handler in saved_handlers:
+            root.removeHandler(saved_handler)
+        handler = _RecordingHandler()
+        root.addHandler(handler)
+        root.setLevel(logging.DEBUG)
+        yield handler
+        for root_handler in list(root.handlers):
+            root.removeHandler(root_handler)
+        for saved_handler in saved_handlers:
+            root.addHandler(saved_handler)
+        root.setLevel(saved_level)
+
+    def test_batch_written_with_one_flush(self, handler):
+        writer = log_aggregator.BatchedLogWriter(stats_seconds=3600)
+        writer.start()
+        assert handler not in logging.getLogger().handlers
+        socket = _socket(
+            [b"run_NEMO.INFO", b"message 1\n"],
+            [b"watch_NEMO.DEBUG", b"message 2\n"],
+        )
+        assert writer.log_messages(socket) == 2
+        writer.stop()
+        assert handler in logging.getLogger().handlers
+        records = [r for r in handler.records if r.msg.startswith("message")]
+        assert [(r.levelno, r.logger_name, r.msg) for r in records] == [
+            (logging.INFO, "run_NEMO", "message 1"),
+            (logging.DEBUG, "watch_NEMO", "message 2"),
+        ]
+        # 1 flush for the batch, and 1 for the stats message logged by stop()
+        assert handler.flushes == 2
+        assert writer.stats() == {
+            "received": 2,
+            "batches": 1,
+            "queued": 0,
+            "dropped": 0,
+        }
+
+    def test_first_recv_blocks(self):
+        writer = log_aggregator.BatchedLogWriter()
+        socket = _socket([b"run_NEMO.INFO", b"message"])
+        writer.log_messages(socket)
+        assert socket.recv_multipart.call_args_list == [call(), call(zmq.NOBLOCK)]
+
+    def test_batch_size(self, handler):
+        writer = log_aggregator.BatchedLogWriter(batch_size=2)
+        socket = _socket(*[[b"run_NEMO.INFO", b"message"]] * 3)
+        assert writer.log_messages(socket) == 2
+        assert writer.log_messages(socket) == 1
+
+    def test_handler_level(self, handler):
+        handler.setLevel(logging.INFO)
+        writer = log_aggregator.BatchedLogWriter()
+        writer.start()
+        writer.log_messages(_socket([b"run_NEMO.DEBUG", b"debug message"]))
+        writer.stop()
+        assert not [r for r in handler.records if r.msg == "debug message"]
+
+    def test_json_messages(self, handler):
+        writer = log_aggregator.BatchedLogWriter(stats_seconds=3600)
+        writer.start()
+        writer.log_messages(
+            _socket(
+                [
+                    b"run_NEMO.INFO",
+                    _json_message(
+                        "run_NEMO", logging.INFO, "message", run_date="2026-10-17"
+                    ),
+                ]
+            )
+        )
+        writer.stop()
+        (record,) = [r for r in handler.records if r.msg == "message"]
+        assert record.logger_name == "run_NEMO"
+        assert record.run_date == "2026-10-17"
+
+    def test_topic_cache(self):
+        writer = log_aggregator.BatchedLogWriter()
+        writer.log_messages(_socket([b"run_NEMO.WARNING", b"message"]))
+        assert writer._topics == {b"run_NEMO.WARNING": ("run_NEMO", logging.WARNING)}
+
+    def test_dropped_messages(self, caplog):
+        caplog.set_level(logging.DEBUG)
+        writer = log_aggregator.BatchedLogWriter(max_queued=2)
+        writer.log_messages(_socket(*[[b"run_NEMO.INFO", b"message"]] * 3))
+        writer.log_messages(_socket([b"run_NEMO.INFO", b"message"]))
+        assert writer.dropped == 2
+        assert writer.queued == 2
+        warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+        assert [r.msg for r in warnings] == [
+            "log message queue is full (2 messages); dropping messages"
+        ]
+
+    def test_stats_logged(self, caplog):
+        caplog.set_level(logging.DEBUG)
+        writer = log_aggregator.BatchedLogWriter(stats_seconds=0)
+        writer._next_stats = 0
+        writer.log_messages(_socket([b"run_NEMO.INFO", b"message"]))
+        (record,) = [r for r in caplog.records if r.msg.startswith("received")]
+        assert record.msg == (
+            "received 1 messages in 1 batches; 1 queued for writing; 0 dropped"
+        )
+        assert record.levelno == logging.INFO
+        assert record.log_aggregator_stats["received"] == 1
+
 
 @pytest.mark.parametrize(
     "i, sig", [(0, signal.SIGHUP), (1, signal.SIGINT), (2, signal.SIGTERM)]
@@ -0,0 +1,153 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for log_query module."""
+
+import argparse
+import datetime
+import json
+import logging
+import textwrap
+
+import pytest
+
+from nemo_nowcast import log_query, log_store
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("NOWCAST_LOGS", str(tmp_path))
+    config_file = tmp_path / "nowcast.yaml"
+    config_file.write_text(textwrap.dedent("""\
+            checklist file: nowcast_checklist.yaml
+            python: python
+            logging:
+              aggregator:
+                handlers:
+                  info_text:
+                    class: logging.handlers.RotatingFileHandler
+                    filename: $(NOWCAST.ENV.NOWCAST_LOGS)/nowcast.log
+                  store:
+                    class: nemo_nowcast.log_store.SQLiteHandler
+                    filename: $(NOWCAST.ENV.NOWCAST_LOGS)/nowcast.sqlite
+              publisher:
+                handlers: {}
+            """))
+    return config_file
+
+
+@pytest.fixture
+def store(tmp_path):
+    handler = log_store.SQLiteHandler(tmp_path / "nowcast.sqlite")
+    for hour, name, level, msg, pid in (
+        (1, "download_weather", logging.INFO, "downloading", 11),
+        (2, "download_weather", logging.ERROR, "download failed", 11),
+        (3, "make_forcing_links", logging.INFO, "links created", 12),
+    ):
+        record = logging.LogRecord(name, level, "", 0, msg, None, None)
+        record.created = datetime.datetime(2026, 10, 17, hour).timestamp()
+        record.process = pid
+        handler.handle(record)
+    handler.close()
+    return tmp_path / "nowcast.sqlite"
+
+
+class TestCLI:
+    """Unit tests for log_query._cli function."""
+
+    def test_config_file(self):
+        parsed_args = log_query._cli(["nowcast.yaml"])
+        assert parsed_args.config_file == "nowcast.yaml"
+        assert parsed_args.worker is None
+        assert not parsed_args.runs
+
+    def test_workers(self):
+        parsed_args = log_query._cli(
+            ["nowcast.yaml", "--worker", "download_weather", "--worker", "sleep"]
+        )
+        assert parsed_args.worker == ["download_weather", "sleep"]
+
+    def test_since(self):
+        parsed_args = log_query._cli(["nowcast.yaml", "--since", "2026-10-17T12:30"])
+        assert parsed_args.since == datetime.datetime(2026, 10, 17, 12, 30).timestamp()
+
+    def test_level(self):
+        parsed_args = log_query._cli(["nowcast.yaml", "--level", "warning"])
+        assert parsed_args.level == logging.WARNING
+
+
+class TestArgTypes:
+    """Unit tests for log_query command-line argument type functions."""
+
+    def test_bad_timestamp(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            log_query._timestamp("17-Oct-2026")
+
+    def test_bad_level(self):
+        with pytest.raises(argparse.ArgumentTypeError):
+            log_query._level("LOUD")
+
+
+class TestMain:
+    """Unit tests for log_query.main function."""
+
+    def test_records(self, config_file, store, capsys):
+        log_query.main([str(config_file), "--worker", "download_weather"])
+        lines = capsys.readouterr().out.splitlines()
+        assert lines == [
+            "2026-10-17 01:00:00.000 INFO [download_weather] downloading",
+            "2026-10-17 02:00:00.000 ERROR [download_weather] download failed",
+        ]
+
+    def test_json(self, config_file, store, capsys):
+        log_query.main([str(config_file), "--level", "ERROR", "--json"])
+        (line,) = capsys.readouterr().out.splitlines()
+        data = json.loads(line)
+        assert data["logger"] == "download_weather"
+        assert data["level"] == "ERROR"
+        assert data["pid"] == 11
+
+    def test_runs(self, config_file, store, capsys):
+        log_query.main([str(config_file), "--runs", "--since", "2026-10-17"])
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].startswith("2026-10-17 01:00:00.000  1:00:00  download_weather")
+        assert lines[0].endswith("2 records, max level ERROR")
+        assert "make_forcing_links" in lines[1]
+
+    def test_store_option(self, tmp_path, store, capsys):
+        config_file = tmp_path / "local.yaml"
+        config_file.write_text(
+            "checklist file: checklist.yaml\n"
+            "python: python\n"
+            "logging:\n"
+            "  handlers: {}\n"
+        )
+        log_query.main([str(config_file), "--store", str(store), "--limit", "1"])
+        (line,) = capsys.readouterr().out.splitlines()
+        assert line.endswith("[make_forcing_links] links created")
+
+    def test_no_store_handler(self, tmp_path):
+        config_file = tmp_path / "local.yaml"
+        config_file.write_text(
+            "checklist file: checklist.yaml\n"
+            "python: python\n"
+            "logging:\n"
+            "  handlers: {}\n"
+        )
+        with pytest.raises(SystemExit):
+            log_query.main([str(config_file)])
+
+    def test_missing_store(self, config_file):
+        with pytest.raises(SystemExit):
+            log_query.main([str(config_file)])
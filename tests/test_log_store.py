@@ -0,0 +1,230 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for log_store module."""
+
+import json
+import logging
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from nemo_nowcast import log_aggregator, log_store, zmq_logging
+
+
+def _record(name="download_weather", level=logging.INFO, msg="message", **extra):
+    record = logging.LogRecord(name, level, "", 0, msg, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = log_store.SQLiteHandler(tmp_path / "nowcast.sqlite")
+    yield handler
+    handler.close()
+
+
+def _rows(handler):
+    return handler.connection.execute("SELECT * FROM log_records").fetchall()
+
+
+class TestConnect:
+    """Unit tests for nemo_nowcast.log_store.connect function."""
+
+    def test_wal_mode(self, tmp_path):
+        connection = log_store.connect(tmp_path / "nowcast.sqlite")
+        (journal_mode,) = connection.execute("PRAGMA journal_mode").fetchone()
+        connection.close()
+        assert journal_mode == "wal"
+
+    def test_indexes(self, tmp_path):
+        connection = log_store.connect(tmp_path / "nowcast.sqlite")
+        indexes = {
+            row["name"] for row in connection.execute("PRAGMA index_list(log_records)")
+        }
+        connection.close()
+        assert indexes == {
+            "log_records_created",
+            "log_records_logger_name_created",
+            "log_records_level_created",
+        }
+
+    def test_readonly(self, tmp_path, handler):
+        handler.handle(_record())
+        connection = log_store.connect(handler.filename, readonly=True)
+        with pytest.raises(log_store.sqlite3.OperationalError):
+            connection.execute("DELETE FROM log_records")
+        connection.close()
+
+    def test_readonly_missing_store(self, tmp_path):
+        with pytest.raises(log_store.sqlite3.OperationalError):
+            log_store.connect(tmp_path / "missing.sqlite", readonly=True)
+
+
+class TestSQLiteHandler:
+    """Unit tests for nemo_nowcast.log_store.SQLiteHandler class."""
+
+    def test_local_record(self, handler):
+        record = _record(run_date="2026-10-17")
+        handler.handle(record)
+        (row,) = _rows(handler)
+        assert row["created"] == record.created
+        assert row["logger_name"] == "download_weather"
+        assert row["level"] == logging.INFO
+        assert row["host"] == log_store._HOSTNAME
+        assert row["pid"] == record.process
+        assert row["message"] == "message"
+        assert row["exc_text"] is None
+        assert json.loads(row["extra"]) == {"run_date": "2026-10-17"}
+
+    def test_aggregated_text_record(self, handler):
+        handler.handle(_record("log_aggregator", logger_name="download_weather"))
+        (row,) = _rows(handler)
+        assert row["logger_name"] == "download_weather"
+        assert row["host"] is None
+        assert row["pid"] is None
+        assert row["extra"] is None
+
+    def test_aggregated_json_record(self, handler):
+        published = _record(worker_msg={"run date": "2026-10-17"})
+        published.process = 4242
+        message = zmq_logging.JSONFormatter(wire=True).format(published).encode()
+        record = zmq_logging.make_record(
+            logging.getLogger("log_aggregator"), message, "download_weather"
+        )
+        handler.handle(record)
+        (row,) = _rows(handler)
+        assert row["logger_name"] == "download_weather"
+        assert row["pid"] == 4242
+        assert json.loads(row["extra"]) == {"worker_msg": {"run date": "2026-10-17"}}
+
+    def test_exc_text(self, handler):
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            record = _record(level=logging.ERROR)
+            record.exc_info = sys.exc_info()
+        handler.handle(record)
+        (row,) = _rows(handler)
+        assert row["exc_text"].endswith("ValueError: bad value")
+
+    def test_flush_seconds(self, tmp_path):
+        handler = log_store.SQLiteHandler(
+            tmp_path / "nowcast.sqlite", flush_seconds=3600
+        )
+        handler.handle(_record())
+        handler.handle(_record())
+        assert _rows(handler) == []
+        handler.close()
+        connection = log_store.connect(tmp_path / "nowcast.sqlite", readonly=True)
+        assert len(connection.execute("SELECT * FROM log_records").fetchall()) == 2
+        connection.close()
+
+    def test_capacity(self, tmp_path):
+        handler = log_store.SQLiteHandler(
+            tmp_path / "nowcast.sqlite", capacity=2, flush_seconds=3600
+        )
+        handler.handle(_record())
+        assert len(_rows(handler)) == 0
+        handler.handle(_record())
+        assert len(_rows(handler)) == 2
+        handler.close()
+
+    def test_batch_written_in_one_transaction(self, handler):
+        listener = log_aggregator._BatchQueueListener(None, handler)
+        flush = log_store.SQLiteHandler.flush
+        with patch.object(
+            log_store.SQLiteHandler, "flush", autospec=True, side_effect=flush
+        ) as m_flush:
+            listener.handle([_record(), _record(), _record()])
+        m_flush.assert_called_once_with(handler)
+        assert len(_rows(handler)) == 3
+
+    def test_write_error(self, handler):
+        handler.handle(_record())
+        handler.connection.execute("DROP TABLE log_records")
+        with patch.object(handler, "handleError") as m_handle_error:
+            handler.handle(_record())
+        assert m_handle_error.called
+        assert handler.buffer == []
+
+
+class TestQuery:
+    """Unit tests for nemo_nowcast.log_store.query function."""
+
+    @pytest.fixture
+    def connection(self, handler):
+        for created, logger_name, level, msg in (
+            (100, "download_weather", logging.INFO, "downloading"),
+            (200, "download_weather", logging.ERROR, "download failed"),
+            (300, "make_forcing_links", logging.INFO, "links created"),
+            (400, "download_weather", logging.INFO, "downloading"),
+        ):
+            record = _record(logger_name, level, msg)
+            record.created = created
+            handler.handle(record)
+        return handler.connection
+
+    def test_all(self, connection):
+        records = log_store.query(connection)
+        assert [r["created"] for r in records] == [100, 200, 300, 400]
+
+    def test_logger_names(self, connection):
+        records = log_store.query(connection, ["make_forcing_links"])
+        assert [r["created"] for r in records] == [300]
+
+    def test_since_until(self, connection):
+        records = log_store.query(connection, since=200, until=400)
+        assert [r["created"] for r in records] == [200, 300]
+
+    def test_level(self, connection):
+        records = log_store.query(connection, level=logging.WARNING)
+        assert [r["message"] for r in records] == ["download failed"]
+
+    def test_contains(self, connection):
+        records = log_store.query(connection, contains="fail")
+        assert [r["created"] for r in records] == [200]
+
+    def test_limit(self, connection):
+        records = log_store.query(connection, ["download_weather"], limit=2)
+        assert [r["created"] for r in records] == [200, 400]
+
+
+class TestRuns:
+    """Unit tests for nemo_nowcast.log_store.runs function."""
+
+    def test_runs(self, handler):
+        for created, pid, level in (
+            (100, 1, logging.INFO),
+            (160, 1, logging.WARNING),
+            (200, 2, logging.INFO),
+            (290, 2, logging.INFO),
+        ):
+            record = _record(level=level)
+            record.created, record.process = created, pid
+            handler.handle(record)
+        runs = log_store.runs(handler.connection, ["download_weather"])
+        assert [
+            (r["pid"], r["start"], r["end"], r["records"], r["max_level"]) for r in runs
+        ] == [(1, 100, 160, 2, logging.WARNING), (2, 200, 290, 2, logging.INFO)]
+
+    def test_text_records_grouped_by_day(self, handler):
+        for created in (0, 60, 2 * 86400):
+            record = _record("log_aggregator", logger_name="download_weather")
+            record.created = created
+            handler.handle(record)
+        runs = log_store.runs(handler.connection)
+        assert [r["records"] for r in runs] == [2, 1]
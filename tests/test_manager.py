@@ -14,14 +14,31 @@
 
 """Unit tests for nemo_nowcast.manager module."""
 
+import asyncio
+import concurrent.futures
+import importlib
+import logging
 import os
 import signal
-from unittest.mock import patch, Mock, mock_open
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, patch, Mock, mock_open
 
 import pytest
+import yaml
 import zmq
-
-from nemo_nowcast import Config, manager, Message, NextWorker
+import zmq.asyncio
+
+from nemo_nowcast import (
+    checklist,
+    Config,
+    forkserver,
+    manager,
+    Message,
+    NextWorker,
+    zmq_logging,
+)
 
 
 @patch("nemo_nowcast.manager.NowcastManager")
@@ -84,6 +101,10 @@ class TestNowcastManagerConstructor:
         mgr = manager.NowcastManager()
         assert mgr._socket is None
 
+    def test_reply_codec(self):
+        mgr = manager.NowcastManager()
+        assert mgr._reply_codec == "yaml"
+
 
 @patch("nemo_nowcast.manager.logging")
 class TestNowcastManagerSetup:
@@ -185,6 +206,41 @@ class TestNowcastManagerSetup:
         with pytest.raises(ImportError):
             mgr.setup()
 
+    @pytest.mark.parametrize("policy", ["on change", "always"])
+    @patch("nemo_nowcast.manager.importlib")
+    def test_next_workers_reload_policy(self, m_importlib, m_logging, policy):
+        mgr = manager.NowcastManager()
+        mgr.config._dict = {
+            "logging": {"handlers": {}},
+            "manager": {"next workers reload": policy},
+            "message registry": {
+                "next workers module": "nowcast.next_workers",
+                "workers": {},
+            },
+        }
+        mgr.config.load = Mock()
+        mgr._cli = Mock(name="_cli")
+        mgr.setup()
+        assert not mgr.logger.critical.called
+
+    @patch("nemo_nowcast.manager.importlib")
+    def test_invalid_next_workers_reload_policy(self, m_importlib, m_logging):
+        mgr = manager.NowcastManager()
+        mgr.config._dict = {
+            "logging": {"handlers": {}},
+            "manager": {"next workers reload": "on-change"},
+            "message registry": {
+                "next workers module": "nowcast.next_workers",
+                "workers": {},
+            },
+        }
+        mgr.config.load = Mock()
+        mgr._cli = Mock(name="_cli")
+        with pytest.raises(ValueError, match="'on-change'"):
+            mgr.setup()
+        mgr.logger.critical.assert_called_once()
+        assert not m_importlib.import_module.called
+
     @patch("nemo_nowcast.manager.importlib")
     def test_logging_info(self, m_importlib, m_logging):
         mgr = manager.NowcastManager()
@@ -292,14 +348,38 @@ class TestConfigureLogging:
         m_handler = Mock(name="m_zmq_handler", spec=zmq.log.handlers.PUBHandler)
         mgr.logger.root = Mock(handlers=[m_handler])
         mgr._configure_logging()
-        expected = {
-            m_logging.DEBUG: m_logging.Formatter("%(message)s\n"),
-            m_logging.INFO: m_logging.Formatter("%(message)s\n"),
-            m_logging.WARNING: m_logging.Formatter("%(message)s\n"),
-            m_logging.ERROR: m_logging.Formatter("%(message)s\n"),
-            m_logging.CRITICAL: m_logging.Formatter("%(message)s\n"),
+        assert set(m_handler.formatters) == {
+            logging.DEBUG,
+            logging.INFO,
+            logging.WARNING,
+            logging.ERROR,
+            logging.CRITICAL,
         }
-        assert m_handler.formatters == expected
+        for formatter in m_handler.formatters.values():
+            assert formatter._fmt == "%(message)s\n"
+
+    def test_xpub_handler(self, m_logging_config):
+        mgr = manager.NowcastManager()
+        mgr.config._dict = {
+            "logging": {
+                "publisher": {
+                    "handlers": {"zmq_pub": {"class": "zmq.log.handlers.PUBHandler"}}
+                }
+            },
+            "zmq": {"host": "localhost", "ports": {"logging": {"manager": 4347}}},
+        }
+        mgr._configure_logging()
+        zmq_pub_config = mgr.config["logging"]["publisher"]["handlers"]["zmq_pub"]
+        assert zmq_pub_config["class"] == "nemo_nowcast.zmq_logging.XPUBHandler"
+
+    @patch("nemo_nowcast.manager.logging")
+    def test_wait_for_subscriber(self, m_logging, m_logging_config):
+        mgr = manager.NowcastManager()
+        mgr.config._dict = self.zmq_logging_config
+        m_handler = Mock(name="m_zmq_handler", spec=zmq_logging.XPUBHandler)
+        m_logging.getLogger.return_value = Mock(root=Mock(handlers=[m_handler]))
+        mgr._configure_logging()
+        m_handler.wait_for_subscriber.assert_called_once_with(1)
 
     def test_change_rotating_logger_handler_to_watched(self, m_logging_config):
         mgr = manager.NowcastManager()
@@ -359,9 +439,33 @@ class TestNowcastManagerRun:
         mgr.run()
         assert mgr._process_messages.called
 
+    def test_ignore_checklist_clears_journal(self):
+        mgr = manager.NowcastManager()
+        mgr._parsed_args = Mock(config_file="foo.yaml", ignore_checklist=True)
+        mgr.config = {"zmq": {"host": "example.com", "ports": {"manager": 6666}}}
+        mgr._context = Mock(name="zmq_context")
+        mgr.logger = Mock(name="logger")
+        mgr._install_signal_handlers = Mock(name="_install_signal_handlers")
+        m_journal = Mock(name="_checklist_journal")
+
+        def open_checklist_journal():
+            mgr._checklist_journal = m_journal
+
+        mgr._open_checklist_journal = open_checklist_journal
+        mgr._close_checklist_persistence = Mock(name="_close_checklist_persistence")
+        mgr._process_messages = Mock(name="_process_messages")
+        mgr.run()
+        m_journal.clear.assert_called_once_with()
+
 
 @pytest.mark.parametrize(
-    "i, sig", [(0, signal.SIGHUP), (1, signal.SIGINT), (2, signal.SIGTERM)]
+    "i, sig",
+    [
+        (0, signal.SIGHUP),
+        (1, signal.SIGINT),
+        (2, signal.SIGTERM),
+        (3, signal.SIGCHLD),
+    ],
 )
 class TestInstallSignalHandlers:
     """Unit tests for NowcastManager._install_signal_handlers method."""
@@ -374,6 +478,90 @@ class TestInstallSignalHandlers:
         assert args[0] == sig
 
 
+class TestSigchldHandler:
+    """Unit tests for the child process exit signal handler that is installed
+    by NowcastManager._install_signal_handlers method.
+    """
+
+    def test_handler_only_wakes_loop(self):
+        mgr = manager.NowcastManager()
+        mgr._reap_worker_processes = Mock(name="_reap_worker_processes")
+        mgr._launch_workers = Mock(name="_launch_workers")
+        with patch("nemo_nowcast.manager.signal.signal") as m_signal:
+            mgr._install_signal_handlers("example.com", 4343)
+        sigchld_handler = m_signal.call_args_list[3].args[1]
+        try:
+            sigchld_handler(signal.SIGCHLD, None)
+            assert os.read(mgr._sigchld_pipe[0], 4096) == b"\0"
+            assert not mgr._reap_worker_processes.called
+            assert not mgr._launch_workers.called
+        finally:
+            for fd in mgr._sigchld_pipe:
+                os.close(fd)
+
+
+class TestWaitForMessage:
+    """Unit tests for NowcastManager._wait_for_message method."""
+
+    @pytest.fixture
+    def mgr(self):
+        mgr = manager.NowcastManager()
+        context = zmq.Context()
+        mgr._socket = context.socket(zmq.PULL)
+        port = mgr._socket.bind_to_random_port("tcp://127.0.0.1")
+        push = context.socket(zmq.PUSH)
+        push.connect(f"tcp://127.0.0.1:{port}")
+        mgr._sigchld_pipe = os.pipe()
+        for fd in mgr._sigchld_pipe:
+            os.set_blocking(fd, False)
+        mgr._reap_worker_processes = Mock(
+            name="_reap_worker_processes", return_value=True
+        )
+        mgr._launch_workers = Mock(name="_launch_workers")
+        yield mgr, push
+        push.close(linger=0)
+        mgr._socket.close(linger=0)
+        context.term()
+        for fd in mgr._sigchld_pipe:
+            os.close(fd)
+
+    def test_message(self, mgr):
+        mgr, push = mgr
+        push.send(b"message")
+        assert mgr._wait_for_message()
+        assert not mgr._reap_worker_processes.called
+
+    def test_child_exit(self, mgr):
+        mgr, push = mgr
+        os.write(mgr._sigchld_pipe[1], b"\0\0")
+        assert not mgr._wait_for_message()
+        mgr._reap_worker_processes.assert_called_once_with()
+        mgr._launch_workers.assert_called_once_with([])
+        with pytest.raises(BlockingIOError):
+            os.read(mgr._sigchld_pipe[0], 4096)
+
+    def test_child_exit_no_launch(self, mgr):
+        mgr, push = mgr
+        mgr._reap_worker_processes.return_value = False
+        os.write(mgr._sigchld_pipe[1], b"\0")
+        mgr._wait_for_message()
+        assert not mgr._launch_workers.called
+
+    @patch("nemo_nowcast.manager.FORKED_WORKER_CHECK_INTERVAL", 0.01)
+    def test_forked_worker_exit(self, mgr):
+        mgr, push = mgr
+        mgr._check_forked_workers = Mock(
+            name="_check_forked_workers", return_value=True
+        )
+        worker = NextWorker("nowcast.workers.run_NEMO")
+        mgr._launch_queue.submit([worker])
+        mgr._launch_queue.launched(worker, 42, forked_worker=Mock(name="forked"))
+        assert not mgr._wait_for_message()
+        mgr._check_forked_workers.assert_called_once_with()
+        assert not mgr._reap_worker_processes.called
+        mgr._launch_workers.assert_called_once_with([])
+
+
 class TestLoadChecklist:
     """Unit tests for NowcastManager._load_checklist method."""
 
@@ -397,19 +585,19 @@ class TestLoadChecklist:
 class TestTryMessages:
     """Unit tests for NowcastManager._try_messages method."""
 
-    def test_recv_string(self):
+    def test_recv(self):
         mgr = manager.NowcastManager()
         mgr._socket = Mock(name="_socket")
         mgr._message_handler = Mock(name="_message_handler", return_value=("reply", []))
         mgr._try_messages()
-        mgr._socket.recv_string.assert_called_once_with()
+        mgr._socket.recv.assert_called_once_with()
 
     def test_handle_message(self):
         mgr = manager.NowcastManager()
         mgr._socket = Mock(name="_socket")
         mgr._message_handler = Mock(name="_message_handler", return_value=("reply", []))
         mgr._try_messages()
-        mgr._message_handler.assert_called_once_with(mgr._socket.recv_string())
+        mgr._message_handler.assert_called_once_with(mgr._socket.recv())
 
     def test_send_reply(self):
         mgr = manager.NowcastManager()
@@ -418,6 +606,16 @@ class TestTryMessages:
         mgr._try_messages()
         mgr._socket.send_string.assert_called_once_with("reply")
 
+    def test_send_binary_reply(self):
+        mgr = manager.NowcastManager()
+        mgr._socket = Mock(name="_socket")
+        mgr._message_handler = Mock(
+            name="_message_handler", return_value=(b"\x00\x01\x01reply", [])
+        )
+        mgr._try_messages()
+        mgr._socket.send.assert_called_once_with(b"\x00\x01\x01reply")
+        assert not mgr._socket.send_string.called
+
     def test_launch_next_workers(self):
         mgr = manager.NowcastManager()
         mgr._socket = Mock(name="_socket")
@@ -429,6 +627,20 @@ class TestTryMessages:
         mgr._try_messages()
         next_worker.launch.assert_called_once_with(mgr.config, mgr.name)
 
+    def test_register_next_worker_processes(self):
+        mgr = manager.NowcastManager()
+        mgr._socket = Mock(name="_socket")
+        next_worker = NextWorker("nowcast.workers.next_worker")
+        popen = Mock(name="popen", pid=4242)
+        next_worker.launch = Mock(name="launch", return_value=popen)
+        mgr._message_handler = Mock(
+            name="_message_handler", return_value=("reply", [next_worker])
+        )
+        mgr._write_worker_status = Mock(name="_write_worker_status")
+        mgr._try_messages()
+        assert mgr._worker_processes.running[4242].popen is popen
+        mgr._write_worker_status.assert_called_once_with()
+
 
 class TestMessageHandler:
     """Unit tests for NowcastManager._message_handler method."""
@@ -508,6 +720,16 @@ class TestMessageHandler:
         assert reply == "ack"
         assert next_workers == "next_worker"
 
+    @pytest.mark.parametrize("codec", ["yaml", "binary"])
+    def test_reply_codec_matches_msg_codec(self, codec):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._msg_registry = {"workers": {}}
+        msg = Message(source="worker", type="foo", payload=None)
+        reply, next_workers = mgr._message_handler(msg.serialize(codec))
+        assert mgr._reply_codec == codec
+        assert Message.deserialize(reply).codec == codec
+
 
 class TestHandleUnregisteredWorkerMsg:
     """Unit test for NowcastManager._handle_unregistered_worker_msg method."""
@@ -571,6 +793,7 @@ class TestHandleContinueMsg:
 
     def test_no_checklist_update_when_no_payload(self, m_importlib):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._update_checklist = Mock(name="_update_checklist")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -583,6 +806,7 @@ class TestHandleContinueMsg:
     @pytest.mark.parametrize("payload", ["payload", True, False, {"foo": "43"}])
     def test_update_checklist(self, m_importlib, payload):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._update_checklist = Mock(name="_update_checklist")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -594,6 +818,7 @@ class TestHandleContinueMsg:
 
     def test_slack_notification(self, m_importlib):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._slack_notification = Mock(name="_slack_notification")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -603,8 +828,21 @@ class TestHandleContinueMsg:
         mgr._handle_continue_msg(msg)
         assert mgr._slack_notification.called
 
+    def test_launch_queue_slot_released(self, m_importlib):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._next_workers_module = Mock(
+            name="nowcast.next_workers",
+            after_test_worker=Mock(name="after_test_worker", return_value=[]),
+        )
+        mgr._launch_queue.submit([NextWorker("nowcast.workers.test_worker")])
+        msg = Message(source="test_worker", type="success")
+        mgr._handle_continue_msg(msg)
+        assert mgr._launch_queue.running == []
+
     def test_reload_next_workers_module(self, m_importlib):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._update_checklist = Mock(name="_update_checklist")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -658,6 +896,7 @@ class TestHandleContinueMsg:
 
     def test_one_next_worker_no_race_condition_mgmt(self, m_importlib):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._update_checklist = Mock(name="_update_checklist")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -672,6 +911,7 @@ class TestHandleContinueMsg:
 
     def test_multiple_next_workers_no_race_condition_mgmt(self, m_importlib):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._update_checklist = Mock(name="_update_checklist")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -714,6 +954,7 @@ class TestHandleContinueMsg:
 
     def test_worker_not_in_race_condition_mgmt(self, m_importlib):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._update_checklist = Mock(name="_update_checklist")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -750,6 +991,7 @@ class TestHandleContinueMsg:
 
     def test_reply(self, m_importlib):
         mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
         mgr._update_checklist = Mock(name="_update_checklist")
         mgr._next_workers_module = Mock(
             name="nowcast.next_workers",
@@ -929,6 +1171,16 @@ class TestClearChecklist:
         assert mgr.checklist == {}
         assert mgr.logger.info.call_count == 1
 
+    def test_checklist_journal(self):
+        mgr = manager.NowcastManager()
+        mgr.checklist = {"foo": "bar"}
+        mgr.logger = Mock(name="logger")
+        mgr._checklist_journal = Mock(name="_checklist_journal")
+        mgr._write_checklist_to_disk = Mock(name="_write_checklist_to_disk")
+        mgr._clear_checklist()
+        mgr._checklist_journal.clear.assert_called_once_with()
+        assert not mgr._write_checklist_to_disk.called
+
     def test_with_checklist_logging(self):
         mgr = manager.NowcastManager()
         mgr.checklist = {"foo": "bar"}
@@ -954,3 +1206,976 @@ class TestClearChecklist:
         assert Message.deserialize(reply) == Message(
             source="manager", type="checklist cleared"
         )
+
+
+class TestNowcastManagerRunAsync:
+    """Unit tests for NowcastManager.run method in asynchronous message
+    processing mode.
+    """
+
+    config = {
+        "manager": {"message processing": "async"},
+        "zmq": {"host": "example.com", "ports": {"manager": 6666}},
+    }
+
+    def test_socket(self):
+        mgr = manager.NowcastManager()
+        mgr._parsed_args = Mock(config_file="foo.yaml", ignore_checklist=True)
+        mgr.config = self.config
+        mgr.logger = Mock(name="logger")
+        mgr._install_signal_handlers = Mock(name="_install_signal_handlers")
+        mgr._process_messages_async = Mock(name="_process_messages_async")
+        mgr._context = zmq.Context()
+        mgr.run()
+        assert isinstance(mgr._socket, zmq.asyncio.Socket)
+        assert mgr._socket.type == zmq.DEALER
+        mgr._socket.close()
+
+    def test_process_messages_async(self):
+        mgr = manager.NowcastManager()
+        mgr._parsed_args = Mock(config_file="foo.yaml", ignore_checklist=True)
+        mgr.config = self.config
+        mgr.logger = Mock(name="logger")
+        mgr._install_signal_handlers = Mock(name="_install_signal_handlers")
+        mgr._process_messages = Mock(name="_process_messages")
+        mgr._process_messages_async = Mock(name="_process_messages_async")
+        mgr._context = Mock(name="zmq_context")
+        with patch("nemo_nowcast.manager.zmq.asyncio.Socket.from_socket"):
+            mgr.run()
+        assert mgr._process_messages_async.called
+        assert not mgr._process_messages.called
+
+
+class TestAsyncMessageHandler:
+    """Unit tests for NowcastManager._async_message_handler method."""
+
+    def test_unregistered_worker_msg(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._msg_registry = {"workers": {}}
+        msg = Message(source="worker", type="foo", payload=None)
+        reply, persist, continuation = mgr._async_message_handler(msg.serialize())
+        assert Message.deserialize(reply) == Message("manager", "unregistered worker")
+        assert not persist
+        assert continuation is None
+
+    def test_clear_checklist_msg(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.checklist = {"foo": "bar"}
+        mgr._msg_registry = {
+            "workers": {"clear_checklist": {"clear checklist": "clear checklist"}}
+        }
+        mgr._write_checklist_to_disk = Mock(name="_write_checklist_to_disk")
+        msg = Message(source="clear_checklist", type="clear checklist")
+        reply, persist, continuation = mgr._async_message_handler(msg.serialize())
+        assert Message.deserialize(reply) == Message("manager", "checklist cleared")
+        assert mgr.checklist == {}
+        assert not mgr._write_checklist_to_disk.called
+        assert persist
+        assert continuation is None
+
+    def test_need_msg(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.checklist = {"info": "requested info"}
+        mgr._msg_registry = {"workers": {"test_worker": {"need": "need info"}}}
+        msg = Message(source="test_worker", type="need", payload="info")
+        reply, persist, continuation = mgr._async_message_handler(msg.serialize())
+        assert Message.deserialize(reply) == Message(
+            "manager", "ack", payload="requested info"
+        )
+        assert not persist
+        assert continuation is None
+
+    @patch("nemo_nowcast.manager.importlib")
+    def test_continue_msg(self, m_importlib):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._msg_registry = {
+            "workers": {"test_worker": {"checklist key": "foo", "success": "success"}}
+        }
+        mgr._write_checklist_to_disk = Mock(name="_write_checklist_to_disk")
+        mgr._slack_notification = Mock(name="_slack_notification")
+        after_func = Mock(name="after_test_worker", return_value=[])
+        mgr._next_workers_module = Mock(
+            name="nowcast.next_workers", after_test_worker=after_func
+        )
+        msg = Message(source="test_worker", type="success", payload={"bar": True})
+        reply, persist, continuation = mgr._async_message_handler(msg.serialize())
+        assert Message.deserialize(reply) == Message("manager", "ack")
+        assert mgr.checklist == {"foo": {"bar": True}}
+        assert not mgr._write_checklist_to_disk.called
+        assert persist
+        assert continuation == (msg, after_func, {"foo": {"bar": True}})
+        assert continuation[2] is not mgr.checklist
+        assert not mgr._slack_notification.called
+        assert not after_func.called
+
+    @patch("nemo_nowcast.manager.importlib")
+    def test_continue_msg_no_payload(self, m_importlib):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._msg_registry = {"workers": {"test_worker": {"success": "success"}}}
+        mgr._next_workers_module = Mock(
+            name="nowcast.next_workers", after_test_worker=Mock()
+        )
+        msg = Message(source="test_worker", type="success")
+        _, persist, _ = mgr._async_message_handler(msg.serialize())
+        assert not persist
+
+    @patch("nemo_nowcast.manager.importlib")
+    def test_continue_msg_releases_launch_queue_slot(self, m_importlib):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._msg_registry = {"workers": {"test_worker": {"crash": "crashed"}}}
+        mgr._next_workers_module = Mock(
+            name="nowcast.next_workers", after_test_worker=Mock()
+        )
+        mgr._launch_queue.submit([NextWorker("nowcast.workers.test_worker")])
+        msg = Message(source="test_worker", type="crash")
+        mgr._async_message_handler(msg.serialize())
+        assert mgr._launch_queue.running == []
+
+    @patch("nemo_nowcast.manager.importlib")
+    def test_missing_after_worker_function(self, m_importlib):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._msg_registry = {
+            "next workers module": "nowcast.next_workers",
+            "workers": {"test_worker": {"success": "success"}},
+        }
+        msg = Message(source="test_worker", type="success")
+        reply, _, continuation = mgr._async_message_handler(msg.serialize())
+        assert Message.deserialize(reply) == Message(
+            "manager", "no after_worker function"
+        )
+        assert continuation == (msg, None, {})
+
+
+class TestAsyncTryMessages:
+    """Unit tests for NowcastManager._async_try_messages method."""
+
+    def _run(self, mgr):
+        async def try_messages():
+            await mgr._async_try_messages()
+            # Let the continuation tasks run
+            await asyncio.gather(*(q.join() for q in mgr._worker_queues.values()))
+
+        asyncio.run(try_messages())
+
+    def _mgr(self, message, handler_return):
+        mgr = manager.NowcastManager()
+        mgr._socket = Mock(name="_socket")
+        mgr._socket.recv_multipart = AsyncMock(
+            return_value=[b"worker id", b"", message]
+        )
+        mgr._socket.send_multipart = AsyncMock()
+        mgr._async_message_handler = Mock(return_value=handler_return)
+        mgr._queue_checklist_write = Mock(name="_queue_checklist_write")
+        return mgr
+
+    def test_reply_with_envelope(self):
+        mgr = self._mgr(b"message", ("reply", False, None))
+        self._run(mgr)
+        mgr._async_message_handler.assert_called_once_with(b"message")
+        mgr._socket.send_multipart.assert_called_once_with(
+            [b"worker id", b"", b"reply"]
+        )
+        assert not mgr._queue_checklist_write.called
+
+    def test_binary_reply(self):
+        mgr = self._mgr(b"message", (b"\x00\x01\x01reply", False, None))
+        self._run(mgr)
+        mgr._socket.send_multipart.assert_called_once_with(
+            [b"worker id", b"", b"\x00\x01\x01reply"]
+        )
+
+    def test_queue_checklist_write(self):
+        mgr = self._mgr(b"message", ("reply", True, None))
+        self._run(mgr)
+        mgr._queue_checklist_write.assert_called_once_with(None)
+
+    def test_queue_checklist_update_write(self):
+        msg = Message("test_worker", "success", {"foo": "bar"})
+        mgr = self._mgr(b"message", ("reply", True, (msg, None, {})))
+        mgr._slack_notification = Mock(name="_slack_notification")
+        self._run(mgr)
+        mgr._queue_checklist_write.assert_called_once_with(msg)
+
+    def test_process_continuation(self):
+        msg = Message("test_worker", "success")
+        next_worker = NextWorker("nowcast.workers.next_worker")
+        next_worker.launch = Mock(name="launch")
+        after_func = Mock(name="after_test_worker", return_value=[next_worker])
+        snapshot = {"foo": "bar"}
+        mgr = self._mgr(b"message", ("reply", False, (msg, after_func, snapshot)))
+        mgr.checklist = {}
+        mgr._slack_notification = Mock(name="_slack_notification")
+        self._run(mgr)
+        mgr._slack_notification.assert_called_once_with(msg)
+        after_func.assert_called_once_with(msg, mgr.config, snapshot)
+        next_worker.launch.assert_called_once_with(mgr.config, mgr.name)
+        assert list(mgr._worker_queues) == ["test_worker"]
+
+    def test_register_next_worker_processes(self):
+        msg = Message("test_worker", "success")
+        next_worker = NextWorker("nowcast.workers.next_worker")
+        popen = Mock(name="popen", pid=4242)
+        next_worker.launch = Mock(name="launch", return_value=popen)
+        after_func = Mock(name="after_test_worker", return_value=[next_worker])
+        mgr = self._mgr(b"message", ("reply", False, (msg, after_func, {})))
+        mgr._slack_notification = Mock(name="_slack_notification")
+        mgr._write_worker_status = Mock(name="_write_worker_status")
+        self._run(mgr)
+        assert mgr._worker_processes.running[4242].popen is popen
+        mgr._write_worker_status.assert_called_once_with()
+
+    def test_queued_workers_released_without_after_func(self):
+        msg = Message("test_worker", "success")
+        mgr = self._mgr(b"message", ("reply", False, (msg, None, {})))
+        mgr._slack_notification = Mock(name="_slack_notification")
+        mgr._write_worker_status = Mock(name="_write_worker_status")
+        mgr._launch_queue.max_workers = 1
+        running, queued = (
+            NextWorker("nowcast.workers.test_worker"),
+            NextWorker("nowcast.workers.queued_worker"),
+        )
+        queued.launch = Mock(name="launch", return_value=None)
+        mgr._launch_queue.submit([running, queued])
+        mgr._launch_queue.finished("test_worker")
+        self._run(mgr)
+        queued.launch.assert_called_once_with(mgr.config, mgr.name)
+        assert mgr._launch_queue.depth == 0
+
+    def test_continuations_processed_in_order_per_worker(self):
+        calls = []
+        mgr = manager.NowcastManager()
+        mgr._slack_notification = Mock(name="_slack_notification")
+
+        def after_func(msg, config, checklist):
+            calls.append(msg.payload)
+            return []
+
+        async def process():
+            queue = asyncio.Queue()
+            for i in range(5):
+                queue.put_nowait((Message("test_worker", "success", i), after_func, {}))
+            task = asyncio.create_task(mgr._process_continuations(queue))
+            await queue.join()
+            task.cancel()
+
+        asyncio.run(process())
+        assert calls == [0, 1, 2, 3, 4]
+
+    def test_continuation_exception_logged(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._slack_notification = Mock(name="_slack_notification")
+        after_func = Mock(name="after_test_worker", side_effect=ValueError)
+
+        async def process():
+            queue = asyncio.Queue()
+            queue.put_nowait((Message("test_worker", "success"), after_func, {}))
+            task = asyncio.create_task(mgr._process_continuations(queue))
+            await queue.join()
+            task.cancel()
+
+        asyncio.run(process())
+        assert mgr.logger.critical.call_count == 1
+
+
+class TestAsyncBackgroundTasks:
+    """Unit tests for NowcastManager background task handling in asynchronous
+    message processing mode.
+    """
+
+    def test_task_held_until_done(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+
+        async def run():
+            task = mgr._create_background_task(asyncio.sleep(0))
+            assert mgr._background_tasks == {task}
+            await task
+            # Let the done callback run
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        assert mgr._background_tasks == set()
+        assert not mgr.logger.critical.called
+
+    def test_task_exception_logged(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._reap_worker_processes = Mock(
+            name="_reap_worker_processes", return_value=True
+        )
+        mgr._async_launch_workers = AsyncMock(
+            name="_async_launch_workers", side_effect=OSError
+        )
+
+        async def run():
+            mgr._async_reap_worker_processes()
+            await asyncio.gather(*mgr._background_tasks, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        asyncio.run(run())
+        mgr.logger.critical.assert_called_once()
+        assert isinstance(mgr.logger.critical.call_args.kwargs["exc_info"], OSError)
+        assert mgr._background_tasks == set()
+
+    def test_hangup_processes_acknowledged_messages(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._slack_notification = Mock(name="_slack_notification")
+        after_func = Mock(name="after_test_worker", return_value=[])
+        msg = Message("test_worker", "success")
+
+        async def try_messages():
+            queue = mgr._worker_queues["test_worker"] = asyncio.Queue()
+            queue.put_nowait((msg, after_func, {}))
+            mgr._create_background_task(mgr._process_continuations(queue))
+            # Hangup signal
+            raise asyncio.CancelledError
+
+        mgr._async_try_messages = try_messages
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(mgr._async_process_messages())
+        after_func.assert_called_once_with(msg, mgr.config, {})
+
+    def test_log_dropped_continuations(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        queue = mgr._worker_queues["test_worker"] = asyncio.Queue()
+        msg = Message("test_worker", "success")
+        queue.put_nowait((msg, None, {}))
+        mgr._log_dropped_continuations()
+        mgr.logger.error.assert_called_once_with(
+            "success message from test_worker dropped before its next workers "
+            "were launched",
+            extra={"worker_msg": msg},
+        )
+        assert queue.empty()
+
+
+class TestQueueChecklistWrite:
+    """Unit tests for NowcastManager._queue_checklist_write method."""
+
+    def test_checklist_written(self, tmp_path):
+        mgr = manager.NowcastManager()
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        mgr.checklist = {"foo": {"bar": True}}
+        mgr._checklist_file_writer = checklist.ChecklistWriter(
+            checklist_file, Mock(name="logger")
+        )
+        mgr._queue_checklist_write()
+        mgr.checklist["foo"] = "changed after snapshot"
+        mgr._checklist_file_writer.close()
+        assert yaml.safe_load(checklist_file.read_text()) == {"foo": {"bar": True}}
+
+    def test_checklist_journal_append(self, tmp_path):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        mgr._msg_registry = {"workers": {"test_worker": {"checklist key": "foo"}}}
+        mgr._checklist_journal = checklist.ChecklistJournal(
+            checklist_file, tmp_path / "nowcast_checklist.yaml.journal"
+        )
+        mgr.checklist = {"foo": {"bar": True}}
+        mgr._checklist_journal_writer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1
+        )
+        mgr._queue_checklist_write(Message("test_worker", "success", {"bar": True}))
+        mgr._checklist_journal_writer.shutdown(wait=True)
+        mgr._checklist_journal.close()
+        assert mgr._checklist_journal.records == 1
+        assert not checklist_file.exists()
+        assert mgr._checklist_journal.load() == {"foo": {"bar": True}}
+
+    def test_checklist_journal_compact(self, tmp_path):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        checklist_file = tmp_path / "nowcast_checklist.yaml"
+        mgr._checklist_journal = checklist.ChecklistJournal(
+            checklist_file, tmp_path / "nowcast_checklist.yaml.journal"
+        )
+        mgr.checklist = {}
+        mgr._checklist_journal_writer = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1
+        )
+        mgr._checklist_journal.append("foo", "cleared")
+        mgr._queue_checklist_write()
+        mgr.checklist["foo"] = "changed after clear"
+        mgr._checklist_journal_writer.shutdown(wait=True)
+        mgr._checklist_journal.close()
+        assert yaml.safe_load(checklist_file.read_text()) == {}
+        assert mgr._checklist_journal.load() == {}
+
+    def test_checklist_journal_clear_failure_logged(self, tmp_path):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._checklist_journal = Mock(
+            name="_checklist_journal", **{"clear.side_effect": OSError}
+        )
+        mgr._clear_checklist_journal()
+        mgr.logger.error.assert_called_once()
+
+
+class TestChecklistFileWriter:
+    """Unit tests for NowcastManager checklist file writer."""
+
+    def _mgr(self, tmp_path, manager_config=None):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.config = {"checklist file": os.fspath(tmp_path / "nowcast_checklist.yaml")}
+        if manager_config is not None:
+            mgr.config["manager"] = manager_config
+        return mgr
+
+    def test_file_writer_created_on_first_write(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        assert mgr._checklist_file_writer is None
+        mgr._write_checklist_to_disk()
+        assert mgr._checklist_file_writer.checklist_file == (
+            tmp_path / "nowcast_checklist.yaml"
+        )
+        assert mgr._checklist_file_writer.fsync == "always"
+        mgr._close_checklist_persistence()
+
+    def test_fsync_policy(self, tmp_path):
+        mgr = self._mgr(
+            tmp_path, {"checklist fsync": "interval", "checklist fsync interval": 10}
+        )
+        mgr._write_checklist_to_disk()
+        assert mgr._checklist_file_writer.fsync == "interval"
+        assert mgr._checklist_file_writer.fsync_interval == 10
+        mgr._close_checklist_persistence()
+
+    def test_invalid_fsync_policy(self, tmp_path):
+        mgr = self._mgr(tmp_path, {"checklist fsync": "sometimes"})
+        with pytest.raises(ValueError):
+            mgr._write_checklist_to_disk()
+
+    def test_write_checklist_to_disk(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        mgr.checklist = {"foo": {"bar": 1}}
+        mgr._write_checklist_to_disk()
+        mgr._close_checklist_persistence()
+        checklist_yaml = (tmp_path / "nowcast_checklist.yaml").read_text()
+        assert yaml.safe_load(checklist_yaml) == {"foo": {"bar": 1}}
+        assert mgr._checklist_file_writer is None
+
+    def test_close_checklist_persistence(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        file_writer = mgr._checklist_file_writer = Mock(name="_checklist_file_writer")
+        journal = mgr._checklist_journal = Mock(name="_checklist_journal")
+        mgr._close_checklist_persistence()
+        file_writer.close.assert_called_once_with()
+        journal.close.assert_called_once_with()
+        assert mgr._checklist_file_writer is None
+        assert mgr._checklist_journal is None
+
+
+class TestChecklistJournalMode:
+    """Unit tests for NowcastManager checklist journal mode."""
+
+    def _mgr(self, tmp_path, compact_interval=100):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.config = {
+            "checklist file": os.fspath(tmp_path / "nowcast_checklist.yaml"),
+            "manager": {"checklist journal": {"compact interval": compact_interval}},
+        }
+        mgr._msg_registry = {"workers": {"test_worker": {"checklist key": "foo"}}}
+        mgr._open_checklist_journal()
+        return mgr
+
+    def test_journal_disabled_by_default(self, tmp_path):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.config = {"checklist file": os.fspath(tmp_path / "nowcast_checklist.yaml")}
+        mgr._open_checklist_journal()
+        assert mgr._checklist_journal is None
+
+    def test_default_journal_file(self, tmp_path):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.config = {
+            "checklist file": os.fspath(tmp_path / "nowcast_checklist.yaml"),
+            "manager": {"checklist journal": None},
+        }
+        mgr._open_checklist_journal()
+        assert mgr._checklist_journal.journal_file == (
+            tmp_path / "nowcast_checklist.yaml.journal"
+        )
+        assert mgr._checklist_journal.compact_interval == 100
+
+    def test_journal_file(self, tmp_path):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.config = {
+            "checklist file": os.fspath(tmp_path / "nowcast_checklist.yaml"),
+            "manager": {
+                "checklist journal": {"file": os.fspath(tmp_path / "checklist.jnl")}
+            },
+        }
+        mgr._open_checklist_journal()
+        assert mgr._checklist_journal.journal_file == tmp_path / "checklist.jnl"
+
+    def test_update_appends_journal_record(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        mgr._update_checklist(Message("test_worker", "success", {"bar": 1}))
+        mgr._update_checklist(Message("test_worker", "success", {"baz": 2}))
+        assert mgr._checklist_journal.records == 2
+        assert not (tmp_path / "nowcast_checklist.yaml").exists()
+
+    def test_update_compacts_journal(self, tmp_path):
+        mgr = self._mgr(tmp_path, compact_interval=2)
+        mgr._update_checklist(Message("test_worker", "success", {"bar": 1}))
+        mgr._update_checklist(Message("test_worker", "success", {"baz": 2}))
+        assert mgr._checklist_journal.records == 0
+        checklist_yaml = (tmp_path / "nowcast_checklist.yaml").read_text()
+        assert yaml.safe_load(checklist_yaml) == {"foo": {"bar": 1, "baz": 2}}
+
+    def test_clear_checklist_compacts_journal(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        mgr._update_checklist(Message("test_worker", "success", {"bar": 1}))
+        mgr._clear_checklist()
+        assert mgr._checklist_journal.records == 0
+        assert yaml.safe_load((tmp_path / "nowcast_checklist.yaml").read_text()) == {}
+
+    def test_load_checklist_replays_journal(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        mgr._update_checklist(Message("test_worker", "success", {"bar": 1}))
+        mgr._update_checklist(Message("test_worker", "success", {"baz": 2}))
+        mgr._open_checklist_journal()
+        mgr.checklist = {}
+        mgr._load_checklist()
+        assert mgr.checklist == {"foo": {"bar": 1, "baz": 2}}
+
+    def test_load_checklist_filenotfounderror(self, tmp_path):
+        mgr = self._mgr(tmp_path)
+        mgr._load_checklist()
+        mgr.logger.warning.assert_called_with("running with empty checklist")
+
+
+class TestReloadNextWorkersModule:
+    """Unit tests for NowcastManager._reload_next_workers_module and
+    NowcastManager._after_worker_func methods.
+    """
+
+    @pytest.fixture
+    def next_workers_module(self, tmp_path, monkeypatch):
+        module_file = tmp_path / "reloadable_next_workers.py"
+        module_file.write_text(
+            "def after_test_worker(msg, config, checklist):\n    return []\n"
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        module = importlib.import_module("reloadable_next_workers")
+        yield module
+        sys.modules.pop("reloadable_next_workers", None)
+
+    def _mgr(self, module, config=None):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.config = config or {}
+        mgr._msg_registry = {"next workers module": "reloadable_next_workers"}
+        mgr._next_workers_module = module
+        mgr._next_workers_signature = mgr._next_workers_module_signature()
+        return mgr
+
+    def test_setup_reloads_edited_module(self, next_workers_module):
+        mgr = self._mgr(next_workers_module)
+        mgr.config = Config()
+        mgr.config._dict = {
+            "message registry": {
+                "next workers module": "reloadable_next_workers",
+                "workers": {},
+            },
+        }
+        mgr.config.load = Mock()
+        mgr._cli = Mock(name="_cli")
+        mgr._configure_logging = Mock(name="_configure_logging", return_value="")
+        msg = Message("test_worker", "success")
+        assert mgr._after_worker_func("test_worker")(msg, mgr.config, {}) == []
+        Path(next_workers_module.__file__).write_text(
+            "def after_test_worker(msg, config, checklist):\n    return ['changed']\n"
+        )
+        mgr.setup()
+        after_func = mgr._after_worker_func("test_worker")
+        assert after_func(msg, mgr.config, {}) == ["changed"]
+
+    def test_reload_skipped_when_unchanged(self, next_workers_module):
+        mgr = self._mgr(next_workers_module)
+        with patch("nemo_nowcast.manager.importlib.reload") as m_reload:
+            mgr._reload_next_workers_module()
+        assert not m_reload.called
+        assert mgr._next_workers_reload_stats["skipped"] == 1
+        assert mgr._next_workers_reload_stats["reloads"] == 0
+
+    def test_reload_when_changed(self, next_workers_module):
+        mgr = self._mgr(next_workers_module)
+        mgr._after_worker_funcs = {"test_worker": Mock()}
+        module_file = Path(next_workers_module.__file__)
+        module_file.write_text(
+            "def after_test_worker(msg, config, checklist):\n    return ['changed']\n"
+        )
+        with patch("nemo_nowcast.manager.importlib.reload") as m_reload:
+            mgr._reload_next_workers_module()
+        m_reload.assert_called_once_with(next_workers_module)
+        assert mgr._next_workers_reload_stats["reloads"] == 1
+        assert mgr._after_worker_funcs == {}
+        assert mgr._next_workers_signature == mgr._next_workers_module_signature()
+
+    def test_always_reload_policy(self, next_workers_module):
+        mgr = self._mgr(
+            next_workers_module, {"manager": {"next workers reload": "always"}}
+        )
+        with patch("nemo_nowcast.manager.importlib.reload") as m_reload:
+            mgr._reload_next_workers_module()
+            mgr._reload_next_workers_module()
+        assert m_reload.call_count == 2
+        assert mgr._next_workers_reload_stats["reloads"] == 2
+
+    def test_reload_when_module_file_not_found(self):
+        mgr = self._mgr(Mock(name="nowcast.next_workers"))
+        with patch("nemo_nowcast.manager.importlib.reload") as m_reload:
+            mgr._reload_next_workers_module()
+        assert m_reload.called
+
+    def test_after_worker_func_cached(self, next_workers_module):
+        mgr = self._mgr(next_workers_module)
+        after_func = mgr._after_worker_func("test_worker")
+        assert after_func is next_workers_module.after_test_worker
+        assert mgr._after_worker_funcs == {"test_worker": after_func}
+        next_workers_module.after_test_worker = Mock(name="not used")
+        assert mgr._after_worker_func("test_worker") is after_func
+
+    def test_after_worker_func_reloaded(self, next_workers_module):
+        mgr = self._mgr(next_workers_module)
+        mgr._after_worker_func("test_worker")
+        module_file = Path(next_workers_module.__file__)
+        module_file.write_text(
+            "def after_test_worker(msg, config, checklist):\n    return ['changed']\n"
+            "\n\n# padding to change file size\n"
+        )
+        after_func = mgr._after_worker_func("test_worker")
+        assert after_func(None, None, None) == ["changed"]
+
+    def test_missing_after_worker_func_not_cached(self, next_workers_module):
+        mgr = self._mgr(next_workers_module)
+        assert mgr._after_worker_func("foo") is None
+        assert mgr._after_worker_funcs == {}
+        assert mgr.logger.critical.call_count == 1
+
+
+class TestReapWorkerProcesses:
+    """Unit tests for NowcastManager._reap_worker_processes method."""
+
+    def test_log_reaped_processes(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        process = Mock(name="process")
+        mgr._worker_processes = Mock(name="_worker_processes")
+        mgr._worker_processes.reap.return_value = [process]
+        mgr._write_worker_status = Mock(name="_write_worker_status")
+        mgr._reap_worker_processes()
+        mgr.logger.info.assert_called_once_with(
+            process.exit_summary(), extra={"worker_process": process.as_dict()}
+        )
+        mgr._write_worker_status.assert_called_once_with()
+
+    def test_reap_launched_worker(self, tmp_path):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        status_file = tmp_path / "manager_workers.yaml"
+        mgr.config._dict = {"run": {"worker status files": {"manager": status_file}}}
+        popen = subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"])
+        mgr._worker_processes.add(NextWorker("nowcast.workers.test_worker"), popen)
+        os.waitid(os.P_PID, popen.pid, os.WEXITED | os.WNOWAIT)
+        mgr._reap_worker_processes()
+        assert popen.returncode == 3
+        status = yaml.safe_load(status_file.read_text())
+        assert status["running"] == []
+        assert status["finished"][0]["module"] == "nowcast.workers.test_worker"
+        assert status["finished"][0]["exit_code"] == 3
+
+
+class TestWriteWorkerStatus:
+    """Unit tests for NowcastManager._write_worker_status method."""
+
+    def test_no_worker_status_file(self):
+        mgr = manager.NowcastManager()
+        mgr._worker_processes = Mock(name="_worker_processes")
+        mgr._write_worker_status()
+        assert not mgr._worker_processes.write_status.called
+
+    def test_write_worker_status(self):
+        mgr = manager.NowcastManager()
+        mgr.config._dict = {
+            "run": {"worker status files": {"manager": "manager_workers.yaml"}}
+        }
+        mgr._worker_processes = Mock(name="_worker_processes")
+        mgr._write_worker_status()
+        mgr._worker_processes.write_status.assert_called_once_with(
+            "manager_workers.yaml", {"launch queue": mgr._launch_queue.status()}
+        )
+
+    def test_write_error(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr.config._dict = {
+            "run": {"worker status files": {"manager": "manager_workers.yaml"}}
+        }
+        mgr._worker_processes = Mock(name="_worker_processes")
+        mgr._worker_processes.write_status.side_effect = PermissionError
+        mgr._write_worker_status()
+        assert mgr.logger.error.call_args.args == ("worker status file write failed:",)
+
+
+class TestConfigureLaunchQueue:
+    """Unit tests for NowcastManager._configure_launch_queue method."""
+
+    def test_no_limits(self):
+        mgr = manager.NowcastManager()
+        mgr._configure_launch_queue()
+        assert mgr._launch_queue.max_workers is None
+        assert mgr._launch_queue.host_max_workers == {}
+        assert mgr._launch_queue.order == "fifo"
+
+    def test_limits(self):
+        mgr = manager.NowcastManager()
+        mgr.config._dict = {
+            "run": {
+                "max concurrent workers": 8,
+                "launch queue order": "priority",
+                "enabled hosts": {
+                    "arbutus.cloud": {"max concurrent workers": 4},
+                    "salish": {"envvars": "nowcast.env"},
+                    "localhost": None,
+                },
+            }
+        }
+        mgr._configure_launch_queue()
+        assert mgr._launch_queue.max_workers == 8
+        assert mgr._launch_queue.host_max_workers == {"arbutus.cloud": 4}
+        assert mgr._launch_queue.order == "priority"
+
+    def test_invalid_order(self):
+        mgr = manager.NowcastManager()
+        mgr.config._dict = {"run": {"launch queue order": "lifo"}}
+        with pytest.raises(ValueError):
+            mgr._configure_launch_queue()
+
+    def test_queue_kept_on_reconfigure(self):
+        mgr = manager.NowcastManager()
+        mgr._launch_queue.max_workers = 0
+        mgr._launch_queue.submit([NextWorker("nowcast.workers.test_worker")])
+        mgr.config._dict = {"run": {"max concurrent workers": 0}}
+        mgr._configure_launch_queue()
+        assert mgr._launch_queue.depth == 1
+
+
+class TestLaunchWorkers:
+    """Unit tests for NowcastManager._launch_workers method."""
+
+    def _next_worker(self, module, host="localhost", pid=None):
+        next_worker = NextWorker(module, host=host)
+        popen = None if pid is None else Mock(name="popen", pid=pid)
+        next_worker.launch = Mock(name="launch", return_value=popen)
+        return next_worker
+
+    def test_host_limit(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._launch_queue.host_max_workers = {"arbutus.cloud": 1}
+        workers = [
+            self._next_worker("nowcast.workers.run_NEMO", "arbutus.cloud", 42),
+            self._next_worker("nowcast.workers.watch_NEMO", "arbutus.cloud", 43),
+            self._next_worker("nowcast.workers.download_weather", pid=44),
+        ]
+        mgr._launch_workers(workers)
+        assert workers[0].launch.called
+        assert not workers[1].launch.called
+        assert workers[2].launch.called
+        assert mgr._launch_queue.depth == 1
+        mgr.logger.info.assert_called_once_with(
+            "launch queue depth: 1",
+            extra={
+                "launch_queue_depth": 1,
+                "launch_queue_host_depths": {"arbutus.cloud": 1},
+            },
+        )
+
+    def test_queued_worker_launched_when_slot_released(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._launch_queue.max_workers = 1
+        workers = [
+            self._next_worker("nowcast.workers.run_NEMO", pid=42),
+            self._next_worker("nowcast.workers.watch_NEMO", pid=43),
+        ]
+        mgr._launch_workers(workers)
+        assert not workers[1].launch.called
+        mgr._launch_queue.process_exited(42)
+        mgr._launch_workers([])
+        workers[1].launch.assert_called_once_with(mgr.config, mgr.name)
+        assert [launch.pid for launch in mgr._launch_queue.running] == [43]
+
+    def test_no_workers(self):
+        mgr = manager.NowcastManager()
+        mgr._write_worker_status = Mock(name="_write_worker_status")
+        mgr._launch_workers([])
+        assert not mgr._write_worker_status.called
+
+    def test_failed_forkserver_launch_releases_slot(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._launch_queue.max_workers = 1
+        mgr.config = Config()
+        mgr.config.file = "nowcast.yaml"
+        mgr.config._dict = {
+            "python": "nowcast-env/bin/python3",
+            "run": {
+                "launcher": "forkserver",
+                "forkserver": {"socket": "/nowcast-sys/forkserver.sock"},
+            },
+        }
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO"),
+            NextWorker("nowcast.workers.watch_NEMO"),
+        ]
+        with patch(
+            "nemo_nowcast.forkserver.launch",
+            side_effect=[forkserver.LaunchError("timed out"), 43],
+        ) as m_launch:
+            mgr._launch_workers(workers)
+        assert m_launch.call_count == 2
+        (launch,) = mgr._launch_queue.running
+        assert launch.worker is workers[1]
+        assert launch.pid == 43
+        assert mgr._launch_queue.depth == 0
+
+    def test_forked_worker(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._worker_processes = Mock(name="_worker_processes")
+        worker = NextWorker("nowcast.workers.run_NEMO")
+        forked_worker = forkserver.ForkedWorker(42)
+        worker.launch = Mock(name="launch", return_value=forked_worker)
+        mgr._launch_workers([worker])
+        assert not mgr._worker_processes.add.called
+        (launch,) = mgr._launch_queue.running
+        assert launch.pid == 42
+        assert launch.forked_worker is forked_worker
+
+
+class TestAsyncLaunchWorkers:
+    """Unit tests for NowcastManager._async_launch_workers method."""
+
+    def test_async_launch_workers(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._launch_queue.max_workers = 1
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO"),
+            NextWorker("nowcast.workers.watch_NEMO"),
+        ]
+        for pid, worker in enumerate(workers, start=42):
+            worker.launch = Mock(name="launch", return_value=Mock(pid=pid))
+        asyncio.run(mgr._async_launch_workers(workers))
+        workers[0].launch.assert_called_once_with(mgr.config, mgr.name)
+        assert not workers[1].launch.called
+        assert mgr._launch_queue.depth == 1
+
+    def test_failed_launch_releases_slot(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._launch_queue.max_workers = 1
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO"),
+            NextWorker("nowcast.workers.watch_NEMO"),
+        ]
+        workers[0].launch = Mock(name="launch", return_value=None)
+        workers[1].launch = Mock(name="launch", return_value=Mock(pid=43))
+        asyncio.run(mgr._async_launch_workers(workers))
+        workers[1].launch.assert_called_once_with(mgr.config, mgr.name)
+        assert [launch.pid for launch in mgr._launch_queue.running] == [43]
+        assert mgr._launch_queue.depth == 0
+
+
+class TestReapWorkerProcessesLaunchQueue:
+    """Unit tests for release of launch queue slots by
+    NowcastManager._reap_worker_processes method.
+    """
+
+    def test_reaped_worker_releases_slot(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._launch_queue.max_workers = 1
+        mgr._launch_queue.submit(
+            [
+                NextWorker("nowcast.workers.run_NEMO"),
+                NextWorker("nowcast.workers.watch_NEMO"),
+            ]
+        )
+        mgr._launch_queue.running[0].pid = 42
+        process = Mock(name="process", pid=42)
+        mgr._worker_processes = Mock(name="_worker_processes")
+        mgr._worker_processes.reap.return_value = [process]
+        assert mgr._reap_worker_processes()
+        assert mgr._launch_queue.running == []
+
+    def test_no_queued_workers(self):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._launch_queue.submit([NextWorker("nowcast.workers.run_NEMO")])
+        mgr._launch_queue.running[0].pid = 42
+        mgr._worker_processes = Mock(name="_worker_processes")
+        mgr._worker_processes.reap.return_value = [Mock(name="process", pid=42)]
+        assert not mgr._reap_worker_processes()
+
+
+class TestCheckForkedWorkers:
+    """Unit tests for NowcastManager._check_forked_workers method."""
+
+    def _mgr(self, alive):
+        mgr = manager.NowcastManager()
+        mgr.logger = Mock(name="logger")
+        mgr._write_worker_status = Mock(name="_write_worker_status")
+        mgr._launch_queue.max_workers = 1
+        workers = [
+            NextWorker("nowcast.workers.run_NEMO"),
+            NextWorker("nowcast.workers.watch_NEMO"),
+        ]
+        mgr._launch_queue.submit(workers)
+        forked_worker = Mock(name="forked", **{"is_alive.return_value": alive})
+        mgr._launch_queue.launched(workers[0], 42, forked_worker=forked_worker)
+        return mgr
+
+    def test_exited_worker_releases_slot(self):
+        mgr = self._mgr(alive=False)
+        assert mgr._check_forked_workers()
+        assert mgr._launch_queue.running == []
+        mgr._write_worker_status.assert_called_once_with()
+
+    def test_running_worker(self):
+        mgr = self._mgr(alive=True)
+        assert not mgr._check_forked_workers()
+        assert len(mgr._launch_queue.running) == 1
+        assert not mgr._write_worker_status.called
+
+    @patch("nemo_nowcast.manager.FORKED_WORKER_CHECK_INTERVAL", 0)
+    def test_async_check_forked_workers(self):
+        mgr = self._mgr(alive=False)
+        mgr._async_launch_workers = AsyncMock(name="_async_launch_workers")
+
+        async def check():
+            task = asyncio.create_task(mgr._async_check_forked_workers())
+            while not mgr._async_launch_workers.called:
+                await asyncio.sleep(0)
+            task.cancel()
+
+        asyncio.run(asyncio.wait_for(check(), 5))
+        mgr._async_launch_workers.assert_called_once_with([])
@@ -14,10 +14,13 @@
 
 """Unit tests for message module."""
 
+import datetime
+
 import pytest
 import yaml
 
 from nemo_nowcast import Message
+from nemo_nowcast.message import FRAME_MARKER, FRAME_VERSION
 
 
 class TestMessage:
@@ -60,3 +63,71 @@ class TestMessage:
         assert msg.source == source
         assert msg.type == msg_type
         assert msg.payload == payload
+
+    def test_deserialize_yaml_bytes(self):
+        message = yaml.dump({"source": "manager", "type": "ack", "payload": None})
+        msg = Message.deserialize(message.encode())
+        assert msg == Message("manager", "ack")
+        assert msg.codec == "yaml"
+
+
+class TestBinaryCodec:
+    """Unit tests for the binary codec of nemo_nowcast.message.Message class."""
+
+    def test_frame_header(self):
+        frame = Message("manager", "ack").serialize("binary")
+        assert frame[:3] == FRAME_MARKER + bytes((FRAME_VERSION, 1))
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            None,
+            True,
+            False,
+            0,
+            -43,
+            2**70,
+            -(2**64),
+            4.3,
+            "",
+            "ünïcödé",
+            b"\x00\xff",
+            datetime.date(2026, 10, 17),
+            datetime.datetime(2026, 10, 17, 5, 15, 43),
+            datetime.datetime(2026, 10, 17, 5, 15, tzinfo=datetime.timezone.utc),
+            [1, "two", [3.0, None]],
+            {"00 forecast": True, 6: {"files": ["a.grib2", "b.grib2"]}},
+        ],
+    )
+    def test_round_trip(self, payload):
+        frame = Message("download_weather", "success 00", payload).serialize("binary")
+        msg = Message.deserialize(frame)
+        assert msg == Message("download_weather", "success 00", payload)
+        assert msg.codec == "binary"
+
+    def test_tuple_deserialized_as_list(self):
+        frame = Message("worker", "success", (1, 2)).serialize("binary")
+        assert Message.deserialize(frame).payload == [1, 2]
+
+    def test_unserializable_payload(self):
+        with pytest.raises(TypeError):
+            Message("worker", "success", {1, 2}).serialize("binary")
+
+    def test_unknown_codec_name(self):
+        with pytest.raises(ValueError):
+            Message("worker", "success").serialize("foo")
+
+    def test_unknown_frame_version(self):
+        frame = Message("worker", "success").serialize("binary")
+        with pytest.raises(ValueError):
+            Message.deserialize(FRAME_MARKER + b"\x09" + frame[2:])
+
+    def test_unknown_codec_id(self):
+        frame = Message("worker", "success").serialize("binary")
+        with pytest.raises(ValueError):
+            Message.deserialize(frame[:2] + b"\xff" + frame[3:])
+
+    def test_trailing_bytes(self):
+        frame = Message("worker", "success").serialize("binary")
+        with pytest.raises(ValueError):
+            Message.deserialize(frame + b"N")
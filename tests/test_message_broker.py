@@ -14,13 +14,14 @@
 
 """Unit tests for nemo_nowcast.message_broker module."""
 
+import logging
 import signal
 from unittest.mock import call, Mock, patch
 
 import pytest
 import zmq
 
-from nemo_nowcast import message_broker
+from nemo_nowcast import message_broker, zmq_logging
 
 
 @patch("nemo_nowcast.message_broker.CommandLineInterface")
@@ -125,14 +126,38 @@ class TestConfigureLogging:
         m_handler = Mock(name="m_zmq_handler", spec=zmq.log.handlers.PUBHandler)
         m_logger.root = Mock(handlers=[m_handler])
         message_broker._configure_logging(self.zmq_logging_config)
-        expected = {
-            m_logging.DEBUG: m_logging.Formatter("%(message)s\n"),
-            m_logging.INFO: m_logging.Formatter("%(message)s\n"),
-            m_logging.WARNING: m_logging.Formatter("%(message)s\n"),
-            m_logging.ERROR: m_logging.Formatter("%(message)s\n"),
-            m_logging.CRITICAL: m_logging.Formatter("%(message)s\n"),
+        assert set(m_handler.formatters) == {
+            logging.DEBUG,
+            logging.INFO,
+            logging.WARNING,
+            logging.ERROR,
+            logging.CRITICAL,
         }
-        assert m_handler.formatters == expected
+        for formatter in m_handler.formatters.values():
+            assert formatter._fmt == "%(message)s\n"
+
+    def test_xpub_handler(self, m_logging_config):
+        config = {
+            "logging": {
+                "publisher": {
+                    "handlers": {"zmq_pub": {"class": "zmq.log.handlers.PUBHandler"}}
+                }
+            },
+            "zmq": {
+                "host": "localhost",
+                "ports": {"logging": {"message_broker": 4347}},
+            },
+        }
+        message_broker._configure_logging(config)
+        zmq_pub_config = config["logging"]["publisher"]["handlers"]["zmq_pub"]
+        assert zmq_pub_config["class"] == "nemo_nowcast.zmq_logging.XPUBHandler"
+
+    @patch("nemo_nowcast.message_broker.logger")
+    def test_wait_for_subscriber(self, m_logger, m_logging_config):
+        m_handler = Mock(name="m_zmq_handler", spec=zmq_logging.XPUBHandler)
+        m_logger.root = Mock(handlers=[m_handler])
+        message_broker._configure_logging(self.zmq_logging_config)
+        m_handler.wait_for_subscriber.assert_called_once_with(0.25)
 
     def test_change_rotating_logger_handler_to_watched(self, m_logging_config):
         message_broker._configure_logging(self.filesystem_logging_config)
@@ -0,0 +1,197 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for processes module."""
+
+import os
+import signal
+import subprocess
+import sys
+from unittest.mock import Mock
+
+import pytest
+import yaml
+
+from nemo_nowcast import NextWorker, processes
+
+
+def _wait_for_exit(popen):
+    """Wait for popen's process to exit without reaping it."""
+    os.waitid(os.P_PID, popen.pid, os.WEXITED | os.WNOWAIT)
+
+
+class TestWorkerProcess:
+    """Unit tests for nemo_nowcast.processes.WorkerProcess class."""
+
+    def test_finish(self):
+        popen = Mock(name="popen", pid=4242, returncode=None)
+        process = processes.WorkerProcess(
+            "nowcast.workers.test_worker", [], "localhost", 4242, popen
+        )
+        rusage = Mock(name="rusage", ru_utime=1.5, ru_stime=0.25, ru_maxrss=65536)
+        process.finish(2 << 8, rusage)
+        assert process.exit_code == 2
+        assert popen.returncode == 2
+        assert process.wall_seconds >= 0
+        assert process.user_cpu_seconds == 1.5
+        assert process.system_cpu_seconds == 0.25
+        assert process.max_rss_kb == 65536
+
+    def test_finish_already_waited(self):
+        popen = Mock(name="popen", pid=4242, returncode=1)
+        process = processes.WorkerProcess(
+            "nowcast.workers.test_worker", [], "localhost", 4242, popen
+        )
+        process.finish(None, None)
+        assert process.exit_code == 1
+        assert process.max_rss_kb is None
+
+    def test_exit_summary(self):
+        popen = Mock(name="popen", pid=4242, returncode=None)
+        process = processes.WorkerProcess(
+            "nowcast.workers.test_worker", [], "localhost", 4242, popen
+        )
+        rusage = Mock(name="rusage", ru_utime=1.5, ru_stime=0.25, ru_maxrss=65536)
+        process.finish(0, rusage)
+        process.wall_seconds = 12.34
+        assert process.exit_summary() == (
+            "nowcast.workers.test_worker worker process 4242 exited with status 0 "
+            "after 12.3 s; max RSS 65536 kB, CPU user 1.5 s, system 0.2 s"
+        )
+
+    def test_as_dict(self):
+        popen = Mock(name="popen", pid=4242)
+        process = processes.WorkerProcess(
+            "nowcast.workers.test_worker", ["--debug"], "localhost", 4242, popen
+        )
+        process_dict = process.as_dict()
+        assert "popen" not in process_dict
+        assert "started_monotonic" not in process_dict
+        assert process_dict["module"] == "nowcast.workers.test_worker"
+        assert process_dict["args"] == ["--debug"]
+        assert process_dict["pid"] == 4242
+
+
+class TestWorkerProcessRegistry:
+    """Unit tests for nemo_nowcast.processes.WorkerProcessRegistry class."""
+
+    def test_add(self):
+        registry = processes.WorkerProcessRegistry()
+        next_worker = NextWorker("nowcast.workers.test_worker", ["--debug"])
+        popen = Mock(name="popen", pid=4242)
+        process = registry.add(next_worker, popen)
+        assert registry.running == {4242: process}
+        assert process.module == "nowcast.workers.test_worker"
+        assert process.args == ["--debug"]
+        assert process.host == "localhost"
+
+    def test_add_forkserver_launch(self):
+        registry = processes.WorkerProcessRegistry()
+        assert registry.add(NextWorker("nowcast.workers.test_worker"), None) is None
+        assert registry.running == {}
+
+    @pytest.mark.parametrize(
+        "code, exit_code",
+        (
+            ("pass", 0),
+            ("raise SystemExit(3)", 3),
+            ("import os, signal; os.kill(os.getpid(), signal.SIGKILL)", -9),
+        ),
+    )
+    def test_reap_exited_process(self, code, exit_code):
+        registry = processes.WorkerProcessRegistry()
+        popen = subprocess.Popen([sys.executable, "-c", code])
+        registry.add(NextWorker("nowcast.workers.test_worker"), popen)
+        _wait_for_exit(popen)
+        (process,) = registry.reap()
+        assert process.exit_code == exit_code
+        assert popen.returncode == exit_code
+        assert process.max_rss_kb > 0
+        assert registry.running == {}
+        assert list(registry.finished) == [process]
+        with pytest.raises(ChildProcessError):
+            os.waitpid(popen.pid, os.WNOHANG)
+
+    def test_running_process_not_reaped(self):
+        registry = processes.WorkerProcessRegistry()
+        popen = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        registry.add(NextWorker("nowcast.workers.test_worker"), popen)
+        try:
+            assert registry.reap() == []
+            assert list(registry.running) == [popen.pid]
+        finally:
+            popen.send_signal(signal.SIGTERM)
+            _wait_for_exit(popen)
+        (process,) = registry.reap()
+        assert process.exit_code == -signal.SIGTERM
+
+    def test_reap_process_waited_for_by_popen(self):
+        registry = processes.WorkerProcessRegistry()
+        popen = subprocess.Popen([sys.executable, "-c", "raise SystemExit(2)"])
+        registry.add(NextWorker("nowcast.workers.test_worker"), popen)
+        popen.wait()
+        (process,) = registry.reap()
+        assert process.exit_code == 2
+        assert process.max_rss_kb is None
+
+    def test_unregistered_child_not_reaped(self):
+        registry = processes.WorkerProcessRegistry()
+        popen = subprocess.Popen([sys.executable, "-c", "pass"])
+        _wait_for_exit(popen)
+        assert registry.reap() == []
+        assert popen.wait() == 0
+
+    def test_finished_history(self):
+        registry = processes.WorkerProcessRegistry(history=2)
+        for i in range(3):
+            popen = subprocess.Popen([sys.executable, "-c", "pass"])
+            registry.add(NextWorker(f"nowcast.workers.worker_{i}"), popen)
+            _wait_for_exit(popen)
+            registry.reap()
+        assert [process.module for process in registry.finished] == [
+            "nowcast.workers.worker_1",
+            "nowcast.workers.worker_2",
+        ]
+
+    def test_write_status(self, tmp_path):
+        registry = processes.WorkerProcessRegistry()
+        running = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"]
+        )
+        finished = subprocess.Popen([sys.executable, "-c", "pass"])
+        registry.add(NextWorker("nowcast.workers.running", ["--debug"]), running)
+        registry.add(NextWorker("nowcast.workers.finished"), finished)
+        try:
+            _wait_for_exit(finished)
+            registry.reap()
+            status_file = tmp_path / "manager_workers.yaml"
+            registry.write_status(status_file)
+        finally:
+            running.kill()
+            running.wait()
+        status = yaml.safe_load(status_file.read_text())
+        assert [p["module"] for p in status["running"]] == ["nowcast.workers.running"]
+        assert status["running"][0]["args"] == ["--debug"]
+        assert status["running"][0]["exit_code"] is None
+        assert [p["module"] for p in status["finished"]] == ["nowcast.workers.finished"]
+        assert status["finished"][0]["exit_code"] == 0
+        assert status["finished"][0]["max_rss_kb"] > 0
+        assert list(tmp_path.iterdir()) == [status_file]
+
+    def test_write_extra_status(self, tmp_path):
+        registry = processes.WorkerProcessRegistry()
+        status_file = tmp_path / "manager_workers.yaml"
+        registry.write_status(status_file, {"launch queue": {"depth": 0}})
+        status = yaml.safe_load(status_file.read_text())
+        assert status == {"running": [], "finished": [], "launch queue": {"depth": 0}}
@@ -14,13 +14,19 @@
 
 """Unit tests for nemo_nowcast.scheduler module."""
 
+import datetime
+import logging
+import os
 import signal
-from unittest.mock import Mock, patch
+import threading
+import time
+from unittest.mock import call, Mock, patch
 
 import pytest
+import schedule
 import zmq.log.handlers
 
-from nemo_nowcast import scheduler
+from nemo_nowcast import cron, processes, scheduler, zmq_logging
 
 
 @patch("nemo_nowcast.scheduler.CommandLineInterface")
@@ -140,14 +146,35 @@ class TestConfigureLogging:
         m_handler = Mock(name="m_zmq_handler", spec=zmq.log.handlers.PUBHandler)
         m_logger.root = Mock(handlers=[m_handler])
         scheduler._configure_logging(self.zmq_logging_config)
-        expected = {
-            m_logging.DEBUG: m_logging.Formatter("%(message)s\n"),
-            m_logging.INFO: m_logging.Formatter("%(message)s\n"),
-            m_logging.WARNING: m_logging.Formatter("%(message)s\n"),
-            m_logging.ERROR: m_logging.Formatter("%(message)s\n"),
-            m_logging.CRITICAL: m_logging.Formatter("%(message)s\n"),
+        assert set(m_handler.formatters) == {
+            logging.DEBUG,
+            logging.INFO,
+            logging.WARNING,
+            logging.ERROR,
+            logging.CRITICAL,
         }
-        assert m_handler.formatters == expected
+        for formatter in m_handler.formatters.values():
+            assert formatter._fmt == "%(message)s\n"
+
+    def test_xpub_handler(self, m_logging_config):
+        config = {
+            "logging": {
+                "publisher": {
+                    "handlers": {"zmq_pub": {"class": "zmq.log.handlers.PUBHandler"}}
+                }
+            },
+            "zmq": {"host": "localhost", "ports": {"logging": {"scheduler": 4347}}},
+        }
+        scheduler._configure_logging(config)
+        zmq_pub_config = config["logging"]["publisher"]["handlers"]["zmq_pub"]
+        assert zmq_pub_config["class"] == "nemo_nowcast.zmq_logging.XPUBHandler"
+
+    @patch("nemo_nowcast.scheduler.logger")
+    def test_wait_for_subscriber(self, m_logger, m_logging_config):
+        m_handler = Mock(name="m_zmq_handler", spec=zmq_logging.XPUBHandler)
+        m_logger.root = Mock(handlers=[m_handler])
+        scheduler._configure_logging(self.zmq_logging_config)
+        m_handler.wait_for_subscriber.assert_called_once_with(0.25)
 
     def test_change_rotating_logger_handler_to_watched(self, m_logging_config):
         scheduler._configure_logging(self.filesystem_logging_config)
@@ -156,6 +183,218 @@ class TestConfigureLogging:
         assert "backupCount" not in handler
 
 
+class TestPrepSchedule:
+    """Unit tests for scheduler._prep_schedule function."""
+
+    def test_schedule_replaced(self):
+        config = {
+            "scheduled workers": [
+                {"nemo_nowcast.workers.sleep": {"every": "day", "at": "15:43"}}
+            ]
+        }
+        scheduler._prep_schedule(config)
+        scheduler._prep_schedule(config)
+        assert len(schedule.jobs) == 1
+        schedule.clear()
+
+    def test_no_scheduled_workers(self):
+        scheduler._prep_schedule({})
+        assert schedule.jobs == []
+
+    def test_file_watches_replaced(self, tmp_path):
+        config = {
+            "scheduled workers": [
+                {"nemo_nowcast.workers.sleep": {"watch": f"{tmp_path}/*.grib2"}}
+            ]
+        }
+        scheduler._prep_schedule(config)
+        (watch,) = scheduler._file_watches
+        scheduler._prep_schedule(config)
+        assert len(scheduler._file_watches) == 1
+        assert scheduler._file_watches[0] is not watch
+        assert watch.fileno() is None
+        assert schedule.jobs == []
+        scheduler._prep_schedule({})
+        assert scheduler._file_watches == []
+
+    def test_state_written(self, tmp_path):
+        config = {
+            "scheduled workers": [
+                {"nemo_nowcast.workers.sleep": {"every": "day", "at": "15:43"}}
+            ]
+        }
+        state = scheduler.SchedulerState(tmp_path / "scheduler_state.yaml")
+        scheduler._prep_schedule(config, state=state)
+        schedule.clear()
+        state = scheduler.SchedulerState(tmp_path / "scheduler_state.yaml")
+        state.load()
+        assert list(state.last_runs) == [
+            "nemo_nowcast.workers.sleep (every day at 15:43)"
+        ]
+
+
+class TestJobTimer:
+    """Unit tests for scheduler.JobTimer class."""
+
+    @pytest.fixture
+    def job_scheduler(self):
+        return schedule.Scheduler()
+
+    @pytest.fixture
+    def timer(self, job_scheduler):
+        timer = scheduler.JobTimer(job_scheduler)
+        yield timer
+        timer.close()
+
+    def _due_job(self, job_scheduler, job_func, seconds_ago=1):
+        job = job_scheduler.every().hour.do(job_func)
+        job.next_run = datetime.datetime.now() - datetime.timedelta(seconds=seconds_ago)
+        return job
+
+    def test_run_due_jobs(self, job_scheduler, timer):
+        job_func = Mock(name="job_func", return_value=None)
+        job = self._due_job(job_scheduler, job_func)
+        job_scheduler.every().day.do(Mock(name="not_due"))
+        timer.add_jobs()
+        assert timer.run_pending() == 1
+        job_func.assert_called_once_with()
+        assert job.next_run > datetime.datetime.now()
+        assert timer.run_pending() == 0
+
+    def test_due_jobs_run_in_next_run_order(self, job_scheduler, timer):
+        calls = []
+        self._due_job(job_scheduler, lambda: calls.append("later"), seconds_ago=1)
+        self._due_job(job_scheduler, lambda: calls.append("earlier"), seconds_ago=2)
+        timer.add_jobs()
+        timer.run_pending()
+        assert calls == ["earlier", "later"]
+
+    def test_cancelled_job_not_run(self, job_scheduler, timer):
+        job_func = Mock(name="job_func")
+        job = self._due_job(job_scheduler, job_func)
+        timer.add_jobs()
+        job_scheduler.cancel_job(job)
+        assert timer.run_pending() == 0
+        assert not job_func.called
+
+    def test_cancel_job_result(self, job_scheduler, timer):
+        job = self._due_job(job_scheduler, Mock(return_value=schedule.CancelJob))
+        timer.add_jobs()
+        timer.run_pending()
+        assert job not in job_scheduler.jobs
+        assert timer.seconds_until_next_job() is None
+
+    def test_rescheduled_job(self, job_scheduler, timer):
+        job_func = Mock(name="job_func")
+        job = self._due_job(job_scheduler, job_func)
+        timer.add_jobs()
+        job.next_run = datetime.datetime.now() + datetime.timedelta(hours=1)
+        assert timer.run_pending() == 0
+        assert 3590 < timer.seconds_until_next_job() <= 3600
+
+    def test_seconds_until_next_job(self, job_scheduler, timer):
+        assert timer.seconds_until_next_job() is None
+        self._due_job(job_scheduler, Mock(name="job_func"))
+        timer.add_jobs()
+        assert timer.seconds_until_next_job() == 0
+
+    def test_sleep_until_job_due(self, job_scheduler, timer):
+        job_func = Mock(name="job_func")
+        job = job_scheduler.every().hour.do(job_func)
+        job.next_run = datetime.datetime.now() + datetime.timedelta(seconds=0.2)
+        timer.add_jobs()
+        assert not timer.sleep()
+        lateness = datetime.datetime.now() - job.next_run
+        assert datetime.timedelta(0) <= lateness < datetime.timedelta(seconds=0.1)
+        assert timer.run_pending() == 1
+
+    def test_sleep_max_sleep(self, timer):
+        timer.max_sleep = 0.01
+        t_start = time.monotonic()
+        assert not timer.sleep()
+        assert time.monotonic() - t_start < 1
+
+    def test_wake(self, timer):
+        threading.Timer(0.05, timer.wake).start()
+        t_start = time.monotonic()
+        assert timer.sleep()
+        assert time.monotonic() - t_start < 5
+
+    def test_wake_from_signal_handler(self, timer):
+        handler = signal.signal(signal.SIGUSR1, lambda signum, frame: timer.wake())
+        try:
+            threading.Timer(0.05, os.kill, (os.getpid(), signal.SIGUSR1)).start()
+            t_start = time.monotonic()
+            assert timer.sleep()
+            assert time.monotonic() - t_start < 5
+        finally:
+            signal.signal(signal.SIGUSR1, handler)
+
+    def test_wake_with_full_pipe(self, timer):
+        for _ in range(100_000):
+            timer.wake()
+        assert timer.sleep()
+        timer.max_sleep = 0
+        assert not timer.sleep()
+
+    def test_add_wakes_timer(self, job_scheduler, timer):
+        job = job_scheduler.every().hour.do(Mock(name="job_func"))
+        timer.add(job)
+        assert timer.sleep()
+
+    def test_run_file_watches(self, timer):
+        watch = Mock(name="watch")
+        watch.run_pending.return_value = 1
+        timer.file_watches.append(watch)
+        assert timer.run_pending() == 1
+
+    def test_sleep_until_file_watch_check(self, timer):
+        watch = Mock(name="watch")
+        watch.fileno.return_value = None
+        watch.seconds_until_next_check.return_value = 0.01
+        timer.file_watches.append(watch)
+        t_start = time.monotonic()
+        assert not timer.sleep()
+        assert time.monotonic() - t_start < 1
+
+    def test_file_watch_events_wake_timer(self, timer):
+        read_fd, write_fd = os.pipe()
+        watch = Mock(name="watch")
+        watch.fileno.return_value = read_fd
+        watch.seconds_until_next_check.return_value = None
+        timer.file_watches.append(watch)
+        os.write(write_fd, b"\0")
+        try:
+            assert timer.sleep()
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+        watch.read_events.assert_called_once_with()
+
+    def test_on_run(self, job_scheduler, timer):
+        timer.on_run = Mock(name="on_run")
+        job = self._due_job(job_scheduler, Mock(name="job_func"))
+        due = job.next_run
+        timer.add_jobs()
+        timer.run_pending()
+        timer.on_run.assert_called_once_with(job, due)
+
+    def test_close(self, timer):
+        watch = Mock(name="watch")
+        timer.file_watches.append(watch)
+        read_fd, write_fd = timer._wakeup_pipe
+        timer.close()
+        watch.close.assert_called_once_with()
+        for fd in (read_fd, write_fd):
+            with pytest.raises(OSError):
+                os.fstat(fd)
+        timer.close()
+
+    def test_wake_after_close(self, timer):
+        timer.close()
+        timer.wake()
+
+
 class TestCreateScheduledJob:
     """Unit tests for scheduler._create_scheduled_job function."""
 
@@ -179,6 +418,275 @@ class TestCreateScheduledJob:
         assert job.unit == "days"
         assert job.job_func.args == (config, "scheduler")
 
+    def test_worker_processes_registry(self):
+        params = {"every": "day", "at": "15:43"}
+        config = {"scheduled workers": {"nemo_nowcast.workers.sleep": params}}
+        worker_processes = processes.WorkerProcessRegistry()
+        job = scheduler._create_scheduled_job(
+            "nemo_nowcast.workers.sleep", params, config, worker_processes
+        )
+        assert job.job_func.keywords == {"registry": worker_processes}
+
+    def test_job_name(self):
+        params = {"every": "day", "at": "15:43", "cmd line opts": "--sleep-time 2"}
+        config = {"scheduled workers": {"nemo_nowcast.workers.sleep": params}}
+        job = scheduler._create_scheduled_job(
+            "nemo_nowcast.workers.sleep", params, config
+        )
+        assert scheduler._job_name(job) == (
+            "nemo_nowcast.workers.sleep --sleep-time 2 (every day at 15:43)"
+        )
+
+    def test_cron(self):
+        params = {"cron": "15 5 * * mon-fri", "cmd line opts": "12"}
+        config = {"scheduled workers": {"nemo_nowcast.workers.sleep": params}}
+        job = scheduler._create_scheduled_job(
+            "nemo_nowcast.workers.sleep", params, config
+        )
+        assert isinstance(job, scheduler.CronJob)
+        assert job.cron == cron.CronExpression("15 5 * * mon-fri")
+        assert job.next_run == job.cron.next_after(datetime.datetime.now())
+        assert job.job_func.args == (config, "scheduler")
+        assert scheduler._job_name(job) == (
+            "nemo_nowcast.workers.sleep 12 (cron 15 5 * * mon-fri)"
+        )
+        assert "15 5 * * mon-fri" in repr(job)
+
+    def test_invalid_cron(self):
+        params = {"cron": "15 5 * *"}
+        config = {"scheduled workers": {"nemo_nowcast.workers.sleep": params}}
+        with pytest.raises(ValueError):
+            scheduler._create_scheduled_job(
+                "nemo_nowcast.workers.sleep", params, config
+            )
+
+
+class TestCreateFileWatch:
+    """Unit tests for scheduler._create_file_watch function."""
+
+    @patch("nemo_nowcast.scheduler.logger", autospec=True)
+    def test_create_file_watch(self, m_logger, tmp_path):
+        params = {
+            "watch": f"{tmp_path}/*.grib2",
+            "cmd line opts": "12",
+            "settle seconds": 2,
+            "batch seconds": 30,
+            "poll": True,
+            "poll seconds": 60,
+        }
+        config = {"scheduled workers": [{"nemo_nowcast.workers.sleep": params}]}
+        watch = scheduler._create_file_watch(
+            "nemo_nowcast.workers.sleep", params, config
+        )
+        assert watch.directory == os.fspath(tmp_path)
+        assert watch.pattern == "*.grib2"
+        assert watch.settle_seconds == 2
+        assert watch.batch_seconds == 30
+        assert watch.poll_seconds == 60
+        assert watch.fileno() is None
+        worker, func_config, worker_processes = watch.func.args
+        assert worker.module == "nemo_nowcast.workers.sleep"
+        assert worker.args == ["12"]
+        assert func_config is config
+        m_logger.info.assert_called_once_with(
+            f"watching for {tmp_path}/*.grib2 to launch nemo_nowcast.workers.sleep "
+            f"(polling)"
+        )
+
+    @patch("nemo_nowcast.scheduler.logger", autospec=True)
+    def test_launch_for_files(self, m_logger):
+        worker = Mock(name="worker", module="nemo_nowcast.workers.sleep")
+        config = {}
+        worker_processes = processes.WorkerProcessRegistry()
+        scheduler._launch_for_files(
+            worker, config, worker_processes, ["/data/foo.grib2", "/data/bar.grib2"]
+        )
+        worker.launch.assert_called_once_with(
+            config, "scheduler", registry=worker_processes
+        )
+        m_logger.info.assert_called_once_with(
+            "launching nemo_nowcast.workers.sleep for 2 arrived file(s)",
+            extra={"arrived_files": ["/data/foo.grib2", "/data/bar.grib2"]},
+        )
+
+
+class TestCronJob:
+    """Unit tests for scheduler.CronJob class."""
+
+    def test_run_reschedules(self):
+        job_scheduler = schedule.Scheduler()
+        job_func = Mock(name="job_func")
+        job = scheduler.CronJob(cron.CronExpression("* * * * *"), job_scheduler).do(
+            job_func
+        )
+        job.next_run = datetime.datetime.now() - datetime.timedelta(minutes=1)
+        job.run()
+        job_func.assert_called_once_with()
+        assert 0 < (job.next_run - datetime.datetime.now()).total_seconds() <= 60
+
+
+class TestJobCron:
+    """Unit tests for scheduler._job_cron function."""
+
+    @pytest.mark.parametrize(
+        "every, at, expected",
+        (
+            ("day", "05:15", cron.CronExpression("15 5 * * *")),
+            ("day", "05:15:30", cron.CronExpression("15 5 * * *", second=30)),
+            ("hour", ":20", cron.CronExpression("20 * * * *")),
+            ("monday", "12:00", cron.CronExpression("0 12 * * mon")),
+            ("minute", ":30", None),
+        ),
+    )
+    def test_job_cron(self, every, at, expected):
+        job = getattr(schedule.Scheduler().every(), every).at(at).do(Mock())
+        assert scheduler._job_cron(job) == expected
+
+    def test_no_at_time(self):
+        job = schedule.Scheduler().every().day.do(Mock())
+        assert scheduler._job_cron(job) is None
+
+    def test_cron_job(self):
+        job = scheduler.CronJob(cron.CronExpression("@daily"), schedule.Scheduler())
+        assert scheduler._job_cron(job) is job.cron
+
+
+@patch("nemo_nowcast.scheduler.logger", autospec=True)
+class TestCatchUpMissedRuns:
+    """Unit tests for scheduler._catch_up_missed_runs function."""
+
+    @pytest.fixture
+    def job(self):
+        job_func = Mock(name="job_func")
+        return (
+            scheduler.CronJob(cron.CronExpression("* * * * *"), schedule.Scheduler())
+            .tag("nemo_nowcast.workers.sleep (cron * * * * *)")
+            .do(job_func)
+        )
+
+    @pytest.fixture
+    def minute(self):
+        return datetime.datetime.now().replace(second=0, microsecond=0)
+
+    def _state(self, job, last_run):
+        return scheduler.SchedulerState(last_runs={scheduler._job_name(job): last_run})
+
+    def test_invalid_policy(self, m_logger, job):
+        with pytest.raises(ValueError):
+            scheduler._catch_up_missed_runs(job, "run-some", scheduler.SchedulerState())
+
+    def test_new_job(self, m_logger, job):
+        state = scheduler.SchedulerState()
+        scheduler._catch_up_missed_runs(job, "run-all", state)
+        last_run = state.last_runs[scheduler._job_name(job)]
+        assert (
+            datetime.timedelta(0)
+            <= datetime.datetime.now() - last_run
+            < (datetime.timedelta(seconds=5))
+        )
+        assert not job.job_func.func.called
+
+    def test_no_missed_runs(self, m_logger, job):
+        last_run = datetime.datetime.now()
+        state = self._state(job, last_run)
+        scheduler._catch_up_missed_runs(job, "run-all", state)
+        assert state.last_runs[scheduler._job_name(job)] == last_run
+        assert not job.job_func.func.called
+
+    def test_skip(self, m_logger, job, minute):
+        state = self._state(job, minute - datetime.timedelta(minutes=3))
+        scheduler._catch_up_missed_runs(job, "skip", state)
+        assert not job.job_func.func.called
+        assert state.last_runs[scheduler._job_name(job)] == minute
+        m_logger.info.assert_called_once_with(
+            "skipping 3 missed launch(es) of nemo_nowcast.workers.sleep (cron * * * * *)"
+        )
+
+    def test_run_once(self, m_logger, job, minute):
+        state = self._state(job, minute - datetime.timedelta(minutes=3))
+        scheduler._catch_up_missed_runs(job, "run-once", state)
+        job.job_func.func.assert_called_once_with()
+        assert state.last_runs[scheduler._job_name(job)] == minute
+
+    def test_run_all(self, m_logger, job, minute):
+        state = self._state(job, minute - datetime.timedelta(minutes=3))
+        scheduler._catch_up_missed_runs(job, "run-all", state)
+        assert job.job_func.func.call_count == 3
+        assert state.last_runs[scheduler._job_name(job)] == minute
+
+    def test_no_job_cron(self, m_logger):
+        job = schedule.Scheduler().every().minute.tag("sleep").do(Mock(name="func"))
+        last_run = datetime.datetime.now() - datetime.timedelta(hours=1)
+        state = scheduler.SchedulerState(last_runs={"sleep": last_run})
+        scheduler._catch_up_missed_runs(job, "run-all", state)
+        assert not job.job_func.func.called
+        assert state.last_runs["sleep"] == last_run
+
+
+class TestSchedulerState:
+    """Unit tests for scheduler.SchedulerState class."""
+
+    def test_load_no_state_file(self):
+        state = scheduler.SchedulerState()
+        state.load()
+        assert state.last_runs == {}
+
+    def test_load_missing_state_file(self, tmp_path):
+        state = scheduler.SchedulerState(tmp_path / "scheduler_state.yaml")
+        state.load()
+        assert state.last_runs == {}
+
+    def test_record(self, tmp_path):
+        state_file = tmp_path / "scheduler_state.yaml"
+        state = scheduler.SchedulerState(state_file)
+        job = schedule.Scheduler().every().day.tag("sleep").do(Mock(name="func"))
+        due = datetime.datetime(2026, 10, 17, 5, 15)
+        state.record(job, due)
+        loaded = scheduler.SchedulerState(state_file)
+        loaded.load()
+        assert loaded.last_runs == {"sleep": due}
+        assert list(tmp_path.iterdir()) == [state_file]
+
+    @patch("nemo_nowcast.scheduler.logger", autospec=True)
+    def test_write_error(self, m_logger, tmp_path):
+        state = scheduler.SchedulerState(tmp_path / "missing" / "state.yaml")
+        state.write()
+        m_logger.error.assert_called_once_with(
+            "scheduler state file write failed:", exc_info=True
+        )
+
+
+@patch("nemo_nowcast.scheduler.logger", autospec=True)
+class TestReapWorkerProcesses:
+    """Unit tests for scheduler._reap_worker_processes function."""
+
+    def test_log_reaped_processes(self, m_logger):
+        process = Mock(name="process")
+        worker_processes = Mock(name="worker_processes")
+        worker_processes.reap.return_value = [process]
+        scheduler._reap_worker_processes({}, worker_processes)
+        m_logger.info.assert_called_once_with(
+            process.exit_summary(), extra={"worker_process": process.as_dict()}
+        )
+        assert not worker_processes.write_status.called
+
+    def test_write_status_file(self, m_logger):
+        config = {"run": {"worker status files": {"scheduler": "workers.yaml"}}}
+        worker_processes = Mock(name="worker_processes")
+        worker_processes.reap.return_value = []
+        scheduler._reap_worker_processes(config, worker_processes)
+        worker_processes.write_status.assert_called_once_with("workers.yaml")
+
+    def test_write_status_file_error(self, m_logger):
+        config = {"run": {"worker status files": {"scheduler": "workers.yaml"}}}
+        worker_processes = Mock(name="worker_processes")
+        worker_processes.reap.return_value = []
+        worker_processes.write_status.side_effect = PermissionError
+        scheduler._reap_worker_processes(config, worker_processes)
+        m_logger.error.assert_called_once_with(
+            "worker status file write failed:", exc_info=True
+        )
+
 
 @pytest.mark.parametrize(
     "i, sig", [(0, signal.SIGHUP), (1, signal.SIGINT), (2, signal.SIGTERM)]
@@ -191,3 +699,46 @@ class TestInstallSignalHandlers:
             scheduler._install_signal_handlers()
         args, kwargs = m_signal.call_args_list[i]
         assert args[0] == sig
+
+
+class TestSighupHandler:
+    """Unit test for scheduler hangup signal handler."""
+
+    @patch("nemo_nowcast.scheduler.main")
+    @patch("nemo_nowcast.scheduler._close_timer")
+    def test_close_timer_before_reload(self, m_close_timer, m_main):
+        calls = Mock(name="calls")
+        calls.attach_mock(m_close_timer, "_close_timer")
+        calls.attach_mock(m_main, "main")
+        with patch("nemo_nowcast.scheduler.signal.signal") as m_signal:
+            scheduler._install_signal_handlers()
+        (sighup_handler,) = (
+            args[1] for args, _ in m_signal.call_args_list if args[0] == signal.SIGHUP
+        )
+        sighup_handler(signal.SIGHUP, None)
+        assert calls.mock_calls == [call._close_timer(), call.main()]
+
+
+class TestCloseTimer:
+    """Unit tests for scheduler._close_timer function."""
+
+    def test_close_timer(self):
+        timer = scheduler.JobTimer(schedule.Scheduler())
+        watch = Mock(name="watch")
+        with (
+            patch("nemo_nowcast.scheduler._timer", timer),
+            patch("nemo_nowcast.scheduler._file_watches", [watch]),
+        ):
+            scheduler._close_timer()
+            assert scheduler._timer is None
+            assert scheduler._file_watches == []
+        assert timer._wakeup_pipe is None
+        watch.close.assert_called_with()
+
+    def test_no_timer(self):
+        with (
+            patch("nemo_nowcast.scheduler._timer", None),
+            patch("nemo_nowcast.scheduler._file_watches", []),
+        ):
+            scheduler._close_timer()
+            assert scheduler._timer is None
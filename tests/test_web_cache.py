@@ -0,0 +1,195 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for web_cache module."""
+
+import hashlib
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from nemo_nowcast import web_cache
+
+
+def _response(etag='"abc"', last_modified=None):
+    headers = {}
+    if etag is not None:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = last_modified
+    return Mock(name="response", headers=headers)
+
+
+class TestFileSha256:
+    """Unit test for nemo_nowcast.web_cache.file_sha256 function."""
+
+    def test_file_sha256(self, tmp_path):
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        assert web_cache.file_sha256(path) == hashlib.sha256(b"bathymetry").hexdigest()
+
+
+class TestLinkFile:
+    """Unit tests for nemo_nowcast.web_cache.link_file function."""
+
+    def test_link_file(self, tmp_path):
+        src = tmp_path / "src"
+        src.write_bytes(b"bathymetry")
+        method = web_cache.link_file(src, tmp_path / "dest")
+        assert method in {"reflink", "hardlink", "copy"}
+        assert (tmp_path / "dest").read_bytes() == b"bathymetry"
+
+    def test_replaces_existing_file(self, tmp_path):
+        src = tmp_path / "src"
+        src.write_bytes(b"bathymetry")
+        (tmp_path / "dest").write_bytes(b"old")
+        web_cache.link_file(src, tmp_path / "dest")
+        assert (tmp_path / "dest").read_bytes() == b"bathymetry"
+
+    @patch("nemo_nowcast.web_cache.fcntl.ioctl", side_effect=OSError)
+    def test_hardlink_fallback(self, m_ioctl, tmp_path):
+        src = tmp_path / "src"
+        src.write_bytes(b"bathymetry")
+        method = web_cache.link_file(src, tmp_path / "dest")
+        assert method == "hardlink"
+        assert os.path.samefile(src, tmp_path / "dest")
+
+    @patch("nemo_nowcast.web_cache.os.link", side_effect=OSError)
+    @patch("nemo_nowcast.web_cache.fcntl.ioctl", side_effect=OSError)
+    def test_copy_fallback(self, m_ioctl, m_link, tmp_path):
+        src = tmp_path / "src"
+        src.write_bytes(b"bathymetry")
+        method = web_cache.link_file(src, tmp_path / "dest")
+        assert method == "copy"
+        assert (tmp_path / "dest").read_bytes() == b"bathymetry"
+        assert not os.path.samefile(src, tmp_path / "dest")
+
+    def test_missing_src(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            web_cache.link_file(tmp_path / "missing", tmp_path / "dest")
+        assert os.listdir(tmp_path) == []
+
+
+class TestWebDataCache:
+    """Unit tests for nemo_nowcast.web_cache.WebDataCache class."""
+
+    def test_creates_cache_dir(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        assert (tmp_path / "cache").is_dir()
+        assert cache.cache_dir == os.fspath(tmp_path / "cache")
+
+    def test_conditional_headers_not_cached(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        assert cache.conditional_headers("https://example.com/foo.nc") == {}
+
+    def test_store_and_conditional_headers(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        cache.store(
+            "https://example.com/foo.nc",
+            path,
+            _response(last_modified="Mon, 12 Oct 2026 00:00:00 GMT"),
+        )
+        assert cache.conditional_headers("https://example.com/foo.nc") == {
+            "If-None-Match": '"abc"',
+            "If-Modified-Since": "Mon, 12 Oct 2026 00:00:00 GMT",
+        }
+        assert cache.stats() == {"hits": 0, "misses": 1}
+
+    def test_no_validators_not_stored(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        cache.store("https://example.com/foo.nc", path, _response(etag=None))
+        assert os.listdir(tmp_path / "cache") == []
+        assert cache.misses == 1
+
+    def test_link(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        cache.store("https://example.com/foo.nc", path, _response())
+        path.unlink()
+        assert cache.link("https://example.com/foo.nc", path)
+        assert path.read_bytes() == b"bathymetry"
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    def test_link_not_cached(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        assert not cache.link("https://example.com/foo.nc", tmp_path / "foo.nc")
+        assert cache.hits == 0
+
+    def test_link_truncated_entry(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        cache.store("https://example.com/foo.nc", path, _response())
+        path.unlink()
+        (data_path,) = (tmp_path / "cache").glob("*.data")
+        data_path.write_bytes(b"bathy")
+        assert not cache.link("https://example.com/foo.nc", path)
+        assert cache.conditional_headers("https://example.com/foo.nc") == {}
+
+    def test_discard(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        cache.store("https://example.com/foo.nc", path, _response())
+        cache.discard("https://example.com/foo.nc")
+        assert os.listdir(tmp_path / "cache") == []
+        cache.discard("https://example.com/foo.nc")
+
+    def test_store_sha256(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        cache.store("https://example.com/foo.nc", path, _response())
+        entry = cache._read_entry("https://example.com/foo.nc")
+        assert entry["sha256"] == hashlib.sha256(b"bathymetry").hexdigest()
+        assert entry["size"] == 10
+
+    def test_file_larger_than_max_bytes_not_stored(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache", max_bytes=5)
+        path = tmp_path / "foo.nc"
+        path.write_bytes(b"bathymetry")
+        cache.store("https://example.com/foo.nc", path, _response())
+        assert os.listdir(tmp_path / "cache") == []
+
+    def test_evict_least_recently_used(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache", max_bytes=25)
+        urls = [f"https://example.com/{name}.nc" for name in ("foo", "bar", "baz")]
+        with patch("nemo_nowcast.web_cache.time.time", side_effect=range(100)):
+            for url in urls[:2]:
+                path = tmp_path / "download.nc"
+                path.write_bytes(b"bathymetry")
+                cache.store(url, path, _response())
+                path.unlink()
+            cache.link(urls[0], tmp_path / "download.nc")
+            (tmp_path / "download.nc").unlink()
+            path.write_bytes(b"bathymetry")
+            cache.store(urls[2], path, _response())
+        assert cache.conditional_headers(urls[0])
+        assert cache.conditional_headers(urls[1]) == {}
+        assert cache.conditional_headers(urls[2])
+
+    def test_evict_unlimited(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        assert cache.evict() == 0
+
+    def test_store_error_ignored(self, tmp_path):
+        cache = web_cache.WebDataCache(tmp_path / "cache")
+        cache.store("https://example.com/foo.nc", tmp_path / "missing.nc", _response())
+        assert cache.misses == 1
@@ -15,15 +15,74 @@
 """Unit tests for nemo_nowcast.worker module."""
 
 import argparse
+import csv
+import hashlib
+import http.server
+import io
+import logging
+import os
 import signal
+import subprocess
+import sys
+import threading
 from types import SimpleNamespace
 from unittest.mock import call, Mock, mock_open, patch
 
 import pytest
+import requests
 import zmq
 import zmq.log.handlers
 
-from nemo_nowcast import Config, Message, NextWorker, NowcastWorker, WorkerError
+from nemo_nowcast import (
+    Config,
+    forkserver,
+    get_web_data,
+    get_web_data_many,
+    open_web_data,
+    Message,
+    NextWorker,
+    NowcastWorker,
+    WorkerError,
+    zmq_logging,
+)
+from nemo_nowcast.web_cache import WebDataCache
+from nemo_nowcast.worker import (
+    SSH_CONTROL_PATH,
+    SSH_CONTROL_PERSIST,
+    _manifest_digest,
+    ssh_multiplexing_options,
+)
+
+
+class TestLazyImports:
+    """Unit tests for deferred imports of the worker module's dependencies."""
+
+    def test_worker_import_skips_heavy_dependencies(self):
+        code = (
+            "import sys\n"
+            "import nemo_nowcast.workers.awaken\n"
+            "print(' '.join(sorted(\n"
+            "    name for name in ('arrow', 'requests', 'sentry_sdk', 'zmq')\n"
+            "    if name in sys.modules\n"
+            ")))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == ""
+
+    def test_package_exports(self):
+        import nemo_nowcast
+        import nemo_nowcast.worker
+
+        assert nemo_nowcast.NowcastWorker is nemo_nowcast.worker.NowcastWorker
+        assert "get_web_data" in dir(nemo_nowcast)
+
+    def test_package_unknown_attribute(self):
+        import nemo_nowcast
+
+        with pytest.raises(AttributeError):
+            nemo_nowcast.not_an_export
 
 
 class TestNextWorkerConstructor:
@@ -34,18 +93,119 @@ class TestNextWorkerConstructor:
         assert next_worker.module == "nowcast.workers.download_weather"
         assert next_worker.args == []
         assert next_worker.host == "localhost"
+        assert next_worker.priority == 0
 
     def test_specified_args(self):
         next_worker = NextWorker("nowcast.workers.download_weather", ["--debug", "00"])
         assert next_worker.module == "nowcast.workers.download_weather"
         assert next_worker.args == ["--debug", "00"]
 
+    def test_specified_priority(self):
+        next_worker = NextWorker("nowcast.workers.run_NEMO", priority=10)
+        assert next_worker.priority == 10
+
     def test_specified_host(self):
         next_worker = NextWorker("nowcast.workers.run_NEMO", host="west.cloud")
         assert next_worker.module == "nowcast.workers.run_NEMO"
         assert next_worker.host == "west.cloud"
 
 
+class TestSSHMultiplexingOptions:
+    """Unit tests for nemo_nowcast.worker.ssh_multiplexing_options function."""
+
+    def test_no_multiplexing(self):
+        assert ssh_multiplexing_options({"envvars": "envvars.sh"}) == []
+
+    def test_defaults(self):
+        options = ssh_multiplexing_options({"ssh multiplexing": None})
+        assert options == [
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            f"ControlPath={SSH_CONTROL_PATH}",
+            "-o",
+            f"ControlPersist={SSH_CONTROL_PERSIST}",
+        ]
+
+    @pytest.mark.parametrize(
+        "control_persist, expected", (("30s", "30s"), (True, "yes"), (False, "no"))
+    )
+    def test_control_persist(self, control_persist, expected):
+        options = ssh_multiplexing_options(
+            {"ssh multiplexing": {"control persist": control_persist}}
+        )
+        assert options[-1] == f"ControlPersist={expected}"
+
+    def test_control_path(self):
+        options = ssh_multiplexing_options(
+            {"ssh multiplexing": {"control path": "/tmp/nowcast-%C"}}
+        )
+        assert options[3] == "ControlPath=/tmp/nowcast-%C"
+
+
+class TestRemoteLaunchLoopback:
+    """Test remote worker launches via a loopback :command:`ssh` that runs
+    the remote command on the local host.
+    """
+
+    FAKE_SSH = """\
+#!/bin/bash
+# Record the ssh options, skip the host, and run the remote command locally
+args=()
+while [[ $1 == -* ]]; do
+    args+=("$1" "$2")
+    shift 2
+done
+printf '%s\\n' "${{args[@]}}" > {options_file}
+shift
+eval "$*"
+"""
+
+    def test_launch_via_loopback_ssh(self, tmp_path, monkeypatch):
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        options_file = tmp_path / "ssh_options.txt"
+        ssh = bin_dir / "ssh"
+        ssh.write_text(self.FAKE_SSH.format(options_file=options_file))
+        ssh.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+        (tmp_path / "loopback_worker.py").write_text(
+            "import os, sys\n"
+            "from pathlib import Path\n"
+            "Path(sys.argv[2]).write_text(f\"{os.environ['NOWCAST_ENV']} {sys.argv[1]}\")\n"
+        )
+        envvars = tmp_path / "envvars.sh"
+        envvars.write_text(f"export NOWCAST_ENV=remote PYTHONPATH={tmp_path}\n")
+        config = Config()
+        config._dict = {
+            "run": {
+                "enabled hosts": {
+                    "loopback": {
+                        "envvars": os.fspath(envvars),
+                        "config file": "remote_nowcast.yaml",
+                        "python": sys.executable,
+                        "ssh multiplexing": {"control path": f"{tmp_path}/%C"},
+                    }
+                }
+            }
+        }
+        output_file = tmp_path / "output.txt"
+        next_worker = NextWorker(
+            "loopback_worker", [os.fspath(output_file)], host="loopback"
+        )
+        popen = next_worker.launch(config, "test_runner")
+        assert popen.wait(timeout=30) == 0
+        assert output_file.read_text() == "remote remote_nowcast.yaml"
+        assert options_file.read_text().split() == [
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            f"ControlPath={tmp_path}/%C",
+            "-o",
+            "ControlPersist=10m",
+        ]
+
+
 @patch("nemo_nowcast.worker.subprocess")
 class TestNextWorkerLaunch:
     """Unit tests for NextWorker.lauch method."""
@@ -102,6 +262,34 @@ class TestNextWorkerLaunch:
         )
         assert cmd == expected
 
+    def test_remote_host_ssh_multiplexing(self, m_subprocess):
+        config = Config()
+        config._dict = {
+            "run": {
+                "enabled hosts": {
+                    "remotehost": {
+                        "envvars": "envvars.sh",
+                        "config file": "nowcast.yaml",
+                        "python": "nowcast-env/bin/python3",
+                        "ssh multiplexing": {"control persist": "1h"},
+                    }
+                }
+            }
+        }
+        next_worker = NextWorker("nowcast.workers.test_worker", host="remotehost")
+        next_worker.launch(config, "test_runner")
+        cmd = m_subprocess.Popen.call_args.args[0]
+        assert cmd[:8] == [
+            "ssh",
+            "-o",
+            "ControlMaster=auto",
+            "-o",
+            "ControlPath=~/.ssh/nemo_nowcast-%C",
+            "-o",
+            "ControlPersist=1h",
+            "remotehost",
+        ]
+
     def test_no_cmdline_args(self, m_subprocess):
         config = Config()
         config.file = "nowcast.yaml"
@@ -119,6 +307,108 @@ class TestNextWorkerLaunch:
         )
         assert cmd == expected
 
+    def test_returns_popen(self, m_subprocess):
+        config = Config()
+        config.file = "nowcast.yaml"
+        config._dict = {"python": "nowcast-env/bin/python3"}
+        next_worker = NextWorker("nowcast.workers.test_worker")
+        popen = next_worker.launch(config, "test_runner")
+        assert popen == m_subprocess.Popen()
+
+    def test_add_to_registry(self, m_subprocess):
+        config = Config()
+        config.file = "nowcast.yaml"
+        config._dict = {"python": "nowcast-env/bin/python3"}
+        next_worker = NextWorker("nowcast.workers.test_worker")
+        registry = Mock(name="registry")
+        popen = next_worker.launch(config, "test_runner", registry=registry)
+        registry.add.assert_called_once_with(next_worker, popen)
+
+    @patch("nemo_nowcast.forkserver.launch", return_value=4242)
+    def test_forkserver_launcher(self, m_launch, m_subprocess):
+        config = Config()
+        config.file = "/nowcast-sys/nowcast.yaml"
+        config._dict = {
+            "python": "nowcast-env/bin/python3",
+            "run": {
+                "launcher": "forkserver",
+                "forkserver": {"socket": "/nowcast-sys/forkserver.sock"},
+            },
+        }
+        next_worker = NextWorker("nowcast.workers.test_worker", ["--debug"])
+        popen = next_worker.launch(config, "test_runner")
+        assert popen == forkserver.ForkedWorker(4242)
+        m_launch.assert_called_once_with(
+            "/nowcast-sys/forkserver.sock",
+            "nowcast.workers.test_worker",
+            ["/nowcast-sys/nowcast.yaml", "--debug"],
+        )
+        assert not m_subprocess.Popen.called
+
+    @patch("nemo_nowcast.forkserver.launch", side_effect=ConnectionRefusedError)
+    def test_forkserver_launcher_fallback(self, m_launch, m_subprocess):
+        config = Config()
+        config.file = "nowcast.yaml"
+        config._dict = {
+            "python": "nowcast-env/bin/python3",
+            "run": {
+                "launcher": "forkserver",
+                "forkserver": {"socket": "/nowcast-sys/forkserver.sock"},
+            },
+        }
+        next_worker = NextWorker("nowcast.workers.test_worker")
+        next_worker.launch(config, "test_runner")
+        m_subprocess.Popen.assert_called_once_with(
+            [
+                "nowcast-env/bin/python3",
+                "-m",
+                "nowcast.workers.test_worker",
+                "nowcast.yaml",
+            ]
+        )
+
+    @patch(
+        "nemo_nowcast.forkserver.launch",
+        side_effect=forkserver.LaunchError("timed out"),
+    )
+    def test_forkserver_launcher_no_reply(self, m_launch, m_subprocess):
+        config = Config()
+        config.file = "nowcast.yaml"
+        config._dict = {
+            "python": "nowcast-env/bin/python3",
+            "run": {
+                "launcher": "forkserver",
+                "forkserver": {"socket": "/nowcast-sys/forkserver.sock"},
+            },
+        }
+        next_worker = NextWorker("nowcast.workers.test_worker")
+        with patch("nemo_nowcast.worker.logging.getLogger") as m_get_logger:
+            popen = next_worker.launch(config, "test_runner")
+        assert popen is None
+        assert not m_subprocess.Popen.called
+        assert m_get_logger().error.called
+
+    @patch("nemo_nowcast.forkserver.launch")
+    def test_forkserver_launcher_not_used_for_remote_host(self, m_launch, m_subprocess):
+        config = Config()
+        config._dict = {
+            "run": {
+                "launcher": "forkserver",
+                "forkserver": {"socket": "/nowcast-sys/forkserver.sock"},
+                "enabled hosts": {
+                    "remotehost": {
+                        "envvars": "envvars.sh",
+                        "config file": "nowcast.yaml",
+                        "python": "nowcast-env/bin/python3",
+                    }
+                },
+            }
+        }
+        next_worker = NextWorker("nowcast.workers.test_worker", host="remotehost")
+        next_worker.launch(config, "test_runner")
+        assert not m_launch.called
+        assert m_subprocess.Popen.called
+
 
 class TestNowcastWorkerConstructor:
     """Unit tests for NowcastWorker.__init__ method."""
@@ -169,7 +459,7 @@ class TestNowcastWorkerConstructor:
 
     def test_context(self):
         worker = NowcastWorker("worker_name", "description")
-        assert isinstance(worker._context, zmq.Context)
+        assert worker._context is None
 
     def test_socket(self):
         worker = NowcastWorker("worker_name", "description")
@@ -672,14 +962,40 @@ class TestConfigureLogging:
         m_handler = Mock(name="m_zmq_handler", spec=zmq.log.handlers.PUBHandler)
         m_logging.getLogger.return_value = Mock(root=Mock(handlers=[m_handler]))
         worker._configure_logging()
-        expected = {
-            m_logging.DEBUG: m_logging.Formatter("%(message)s\n"),
-            m_logging.INFO: m_logging.Formatter("%(message)s\n"),
-            m_logging.WARNING: m_logging.Formatter("%(message)s\n"),
-            m_logging.ERROR: m_logging.Formatter("%(message)s\n"),
-            m_logging.CRITICAL: m_logging.Formatter("%(message)s\n"),
+        assert set(m_handler.formatters) == {
+            logging.DEBUG,
+            logging.INFO,
+            logging.WARNING,
+            logging.ERROR,
+            logging.CRITICAL,
+        }
+        for formatter in m_handler.formatters.values():
+            assert formatter._fmt == "%(message)s\n"
+
+    def test_xpub_handler(self, m_logging_config):
+        worker = NowcastWorker("test_worker", "description")
+        worker.config._dict = {
+            "logging": {
+                "publisher": {
+                    "handlers": {"zmq_pub": {"class": "zmq.log.handlers.PUBHandler"}}
+                }
+            },
+            "zmq": {"ports": {"logging": {"workers": [4345, 4346]}}},
         }
-        assert m_handler.formatters == expected
+        worker._parsed_args = SimpleNamespace(debug=False)
+        worker._configure_logging()
+        zmq_pub_config = worker.config["logging"]["publisher"]["handlers"]["zmq_pub"]
+        assert zmq_pub_config["class"] == "nemo_nowcast.zmq_logging.XPUBHandler"
+
+    @patch("nemo_nowcast.worker.logging")
+    def test_wait_for_subscriber(self, m_logging, m_logging_config):
+        worker = NowcastWorker("test_worker", "description")
+        worker.config._dict = self.zmq_logging_config_ports_list
+        worker._parsed_args = SimpleNamespace(debug=False)
+        m_handler = Mock(name="m_zmq_handler", spec=zmq_logging.XPUBHandler)
+        m_logging.getLogger.return_value = Mock(root=Mock(handlers=[m_handler]))
+        worker._configure_logging()
+        m_handler.wait_for_subscriber.assert_called_once_with(0.25)
 
     @pytest.mark.parametrize(
         "config, worker_name",
@@ -750,6 +1066,25 @@ class TestInitZmqInterface:
         assert worker.logger.debug.call_count == 1
         assert not worker._context.socket.called
 
+    def test_debug_mode_no_context(self):
+        worker = NowcastWorker("worker_name", "description")
+        worker._parsed_args = Mock(debug=True)
+        worker.logger = Mock(name="logger")
+        worker._init_zmq_interface()
+        assert worker._context is None
+
+    def test_context_created(self):
+        worker = NowcastWorker("worker_name", "description")
+        worker._parsed_args = Mock(debug=False)
+        worker.logger = Mock(name="logger")
+        worker.config = {"zmq": {"host": "127.0.0.1", "ports": {"workers": 4343}}}
+        worker._init_zmq_interface()
+        try:
+            assert isinstance(worker._context, zmq.Context)
+        finally:
+            worker._socket.close(linger=0)
+            worker._context.term()
+
     def test_socket(self):
         worker = NowcastWorker("worker_name", "description")
         worker._parsed_args = Mock(debug=False)
@@ -833,6 +1168,13 @@ class TestDoWork:
         worker._do_work()
         worker.tell_manager.assert_called_once_with("failure")
 
+    def test_no_context_to_destroy(self):
+        worker = NowcastWorker("worker_name", "description")
+        worker.logger = Mock(name="logger")
+        worker.worker_func = Mock(name="worker_func", side_effect=SystemExit)
+        worker._do_work()
+        assert worker._context is None
+
     def test_system_exit_context_destroy(self):
         worker = NowcastWorker("worker_name", "description")
         worker.init_cli()
@@ -937,6 +1279,30 @@ class TestTellManager:
         assert worker.logger.debug.call_count == 2
         assert response == mgr_msg
 
+    def test_tell_manager_binary_codec(self):
+        worker = NowcastWorker("test_worker", "description")
+        worker._parsed_args = Mock(debug=False)
+        worker._socket = Mock(name="_socket")
+        worker.logger = Mock(name="logger")
+        worker.config._dict = {
+            "zmq": {"message codec": "binary"},
+            "message registry": {
+                "manager": {"ack": "message acknowledged"},
+                "workers": {"test_worker": {"success": "successful test"}},
+            },
+        }
+        mgr_msg = Message(source="manager", type="ack")
+        worker._socket.recv.return_value = mgr_msg.serialize("binary")
+        response = worker.tell_manager("success", "payload")
+        worker._socket.send.assert_called_once_with(
+            Message(source="test_worker", type="success", payload="payload").serialize(
+                "binary"
+            )
+        )
+        worker._socket.recv.assert_called_once_with()
+        assert response == mgr_msg
+        assert response.codec == "binary"
+
     def test_unregistered_manager_message_type(self):
         worker = NowcastWorker("test_worker", "description")
         worker._parsed_args = Mock(debug=False)
@@ -954,3 +1320,606 @@ class TestTellManager:
         worker._socket.recv_string.return_value = mgr_msg.serialize()
         with pytest.raises(WorkerError):
             worker.tell_manager("success", "payload")
+
+
+class _WebDataHandler(http.server.BaseHTTPRequestHandler):
+    """HTTP request handler that serves content from :py:attr:`files` with
+    support for range requests.
+    """
+
+    #: Content keyed by URL path.
+    files = {}
+    #: Number of bytes of the content of URL paths,
+    #: or (URL path, Range header) pairs,
+    #: to send in the response to the next request for them before the
+    #: connection is dropped.
+    truncate = {}
+    #: Paths and headers of the requests that have been handled.
+    requests = []
+    accept_ranges = True
+
+    def do_GET(self):
+        self.requests.append((self.path, dict(self.headers)))
+        content = self.files.get(self.path)
+        if content is None:
+            self.send_error(404)
+            return
+        etag = f'"{hashlib.md5(content).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        start, end = 0, len(content) - 1
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if self.accept_ranges and range_header and if_range in (None, etag):
+            first, last = range_header.removeprefix("bytes=").split("-")
+            start = int(first)
+            end = min(int(last), end) if last else end
+            if start >= len(content):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(content)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        else:
+            self.send_response(200)
+        body = content[start : end + 1]
+        if self.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        truncate = self.truncate.pop((self.path, range_header), None)
+        if truncate is None:
+            truncate = self.truncate.pop(self.path, len(body))
+        self.wfile.write(body[:truncate])
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def web_server():
+    handler = type(
+        "WebDataHandler",
+        (_WebDataHandler,),
+        {"files": {}, "truncate": {}, "requests": []},
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", handler
+    server.shutdown()
+    server.server_close()
+
+
+@patch("nemo_nowcast.worker.time.sleep")
+class TestGetWebData:
+    """Unit tests for get_web_data function."""
+
+    def test_download_to_file(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.grib2"] = b"grib" * 1000
+        get_web_data(f"{url}/foo.grib2", "test_worker", tmp_path / "foo.grib2")
+        assert (tmp_path / "foo.grib2").read_bytes() == b"grib" * 1000
+        assert not m_sleep.called
+
+    def test_return_content(self, m_sleep, web_server):
+        url, handler = web_server
+        handler.files["/foo.csv"] = b"a,b\n1,2\n"
+        content = get_web_data(f"{url}/foo.csv", "test_worker")
+        assert content == b"a,b\n1,2\n"
+
+    def test_retry_resumes_partial_download(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.grib2"] = os.urandom(10_000)
+        handler.truncate["/foo.grib2"] = 4000
+        get_web_data(
+            f"{url}/foo.grib2", "test_worker", tmp_path / "foo.grib2", chunk_size=1000
+        )
+        assert (tmp_path / "foo.grib2").read_bytes() == handler.files["/foo.grib2"]
+        assert m_sleep.call_count == 1
+        (_, first_headers), (_, retry_headers) = handler.requests
+        assert "Range" not in first_headers
+        assert retry_headers["Range"] == "bytes=4000-"
+        assert retry_headers["If-Range"].startswith('"')
+
+    def test_content_changed_before_resume(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.grib2"] = b"old" * 1000
+        handler.truncate["/foo.grib2"] = 1000
+
+        def _change_content(seconds):
+            handler.files["/foo.grib2"] = b"new" * 2000
+
+        m_sleep.side_effect = _change_content
+        get_web_data(
+            f"{url}/foo.grib2", "test_worker", tmp_path / "foo.grib2", chunk_size=100
+        )
+        assert handler.requests[-1][1]["Range"] == "bytes=1000-"
+        assert (tmp_path / "foo.grib2").read_bytes() == b"new" * 2000
+
+    def test_no_resume_without_range_support(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.accept_ranges = False
+        handler.files["/foo.grib2"] = os.urandom(10_000)
+        handler.truncate["/foo.grib2"] = 4000
+        get_web_data(
+            f"{url}/foo.grib2", "test_worker", tmp_path / "foo.grib2", chunk_size=1000
+        )
+        assert (tmp_path / "foo.grib2").read_bytes() == handler.files["/foo.grib2"]
+        _, retry_headers = handler.requests[-1]
+        assert "Range" not in retry_headers
+
+    def test_range_not_satisfiable(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        content = os.urandom(10_000)
+        handler.files["/foo.grib2"] = content
+        handler.truncate["/foo.grib2"] = 4000
+
+        def _shrink_content(seconds):
+            # Unchanged content that is shorter than the partial file
+            handler.files["/foo.grib2"] = content[:3000]
+
+        m_sleep.side_effect = _shrink_content
+        get_web_data(
+            f"{url}/foo.grib2", "test_worker", tmp_path / "foo.grib2", chunk_size=1000
+        )
+        assert handler.requests[1][1]["Range"] == "bytes=4000-"
+        assert (tmp_path / "foo.grib2").read_bytes() == content[:3000]
+
+    def test_cache_miss(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        cache = WebDataCache(tmp_path / "cache")
+        get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", cache=cache)
+        assert (tmp_path / "foo.nc").read_bytes() == b"bathymetry"
+        assert cache.stats() == {"hits": 0, "misses": 1}
+        assert "If-None-Match" not in handler.requests[0][1]
+
+    def test_cache_hit(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        cache = WebDataCache(tmp_path / "cache")
+        get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", cache=cache)
+        (tmp_path / "foo.nc").unlink()
+        get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", cache=cache)
+        assert (tmp_path / "foo.nc").read_bytes() == b"bathymetry"
+        assert cache.stats() == {"hits": 1, "misses": 1}
+        assert handler.requests[1][1]["If-None-Match"].startswith('"')
+
+    def test_cache_modified(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        cache = WebDataCache(tmp_path / "cache")
+        get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", cache=cache)
+        handler.files["/foo.nc"] = b"new bathymetry"
+        get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", cache=cache)
+        assert (tmp_path / "foo.nc").read_bytes() == b"new bathymetry"
+        assert cache.stats() == {"hits": 0, "misses": 2}
+        # The cached file wasn't overwritten in place via a hard link
+        (tmp_path / "foo.nc").unlink()
+        get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", cache=cache)
+        assert (tmp_path / "foo.nc").read_bytes() == b"new bathymetry"
+        assert cache.hits == 1
+
+    def test_segmented_download(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            chunk_size=1000,
+            segments=4,
+        )
+        assert (tmp_path / "foo.nc").read_bytes() == handler.files["/foo.nc"]
+        assert not m_sleep.called
+        assert "Range" not in handler.requests[0][1]
+        assert {headers["Range"] for _, headers in handler.requests[1:]} == {
+            "bytes=2500-4999",
+            "bytes=5000-7499",
+            "bytes=7500-9999",
+        }
+
+    def test_segment_retried(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        handler.truncate[("/foo.nc", "bytes=5000-7499")] = 1000
+        get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            chunk_size=1000,
+            segments=4,
+        )
+        assert (tmp_path / "foo.nc").read_bytes() == handler.files["/foo.nc"]
+        assert m_sleep.call_count == 1
+        assert handler.requests[-1][1]["Range"] == "bytes=6000-7499"
+
+    @patch("nemo_nowcast.worker._SEGMENT_RETRIES", 0)
+    def test_resume_unfinished_segments(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        handler.truncate[("/foo.nc", "bytes=5000-7499")] = 1000
+        handler.truncate[("/foo.nc", "bytes=7500-9999")] = 2000
+
+        def _check_partial_file(seconds):
+            assert (tmp_path / "foo.nc").stat().st_size == 10_000
+            handler.requests.clear()
+
+        m_sleep.side_effect = _check_partial_file
+        get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            chunk_size=1000,
+            segments=4,
+        )
+        assert (tmp_path / "foo.nc").read_bytes() == handler.files["/foo.nc"]
+        assert m_sleep.call_count == 1
+        assert {headers["Range"] for _, headers in handler.requests} == {
+            "bytes=6000-7499",
+            "bytes=9500-9999",
+        }
+        for _, headers in handler.requests:
+            assert headers["If-Range"].startswith('"')
+
+    @patch("nemo_nowcast.worker._SEGMENT_RETRIES", 0)
+    def test_segmented_content_changed(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"old" * 4000
+        handler.truncate[("/foo.nc", "bytes=6000-8999")] = 1000
+
+        def _change_content(seconds):
+            handler.files["/foo.nc"] = b"new" * 1000
+
+        m_sleep.side_effect = _change_content
+        get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            chunk_size=1000,
+            segments=4,
+        )
+        assert (tmp_path / "foo.nc").read_bytes() == b"new" * 1000
+
+    def test_segmented_without_range_support(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.accept_ranges = False
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            chunk_size=1000,
+            segments=4,
+        )
+        assert (tmp_path / "foo.nc").read_bytes() == handler.files["/foo.nc"]
+        assert len(handler.requests) == 1
+
+    def test_too_small_to_segment(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(1500)
+        get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            chunk_size=1000,
+            segments=4,
+        )
+        assert (tmp_path / "foo.nc").read_bytes() == handler.files["/foo.nc"]
+        assert len(handler.requests) == 1
+
+    def test_segmented_cache_store(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        cache = WebDataCache(tmp_path / "cache")
+        for _ in range(2):
+            get_web_data(
+                f"{url}/foo.nc",
+                "test_worker",
+                tmp_path / "foo.nc",
+                chunk_size=1000,
+                segments=4,
+                cache=cache,
+            )
+        assert (tmp_path / "foo.nc").read_bytes() == handler.files["/foo.nc"]
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    def test_digest(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        digest = get_web_data(
+            f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", hash_algorithm="md5"
+        )
+        assert digest == hashlib.md5(b"bathymetry").hexdigest()
+        assert (tmp_path / "foo.nc.md5").read_text() == f"{digest}  foo.nc\n"
+
+    def test_no_digest(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        digest = get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc")
+        assert digest is None
+        assert os.listdir(tmp_path) == ["foo.nc"]
+
+    def test_unknown_hash_algorithm(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        with pytest.raises(ValueError):
+            get_web_data(
+                f"{url}/foo.nc",
+                "test_worker",
+                tmp_path / "foo.nc",
+                hash_algorithm="crc32",
+            )
+        assert handler.requests == []
+
+    def test_expected_digest(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        expected = hashlib.sha256(b"bathymetry").hexdigest().upper()
+        digest = get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            expected_digest=expected,
+        )
+        assert digest == expected.lower()
+        assert (tmp_path / "foo.nc.sha256").exists()
+        assert not m_sleep.called
+
+    def test_digest_mismatch_retried(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetr"
+
+        def _fix_content(seconds):
+            assert not (tmp_path / "foo.nc").exists()
+            handler.files["/foo.nc"] = b"bathymetry"
+
+        m_sleep.side_effect = _fix_content
+        get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            expected_digest=hashlib.sha256(b"bathymetry").hexdigest(),
+        )
+        assert (tmp_path / "foo.nc").read_bytes() == b"bathymetry"
+        assert m_sleep.call_count == 1
+        assert "Range" not in handler.requests[-1][1]
+
+    def test_digest_mismatch_give_up(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetr"
+        with pytest.raises(WorkerError):
+            get_web_data(
+                f"{url}/foo.nc",
+                "test_worker",
+                tmp_path / "foo.nc",
+                expected_digest=hashlib.sha256(b"bathymetry").hexdigest(),
+                wait_exponential_max=10,
+            )
+        assert not (tmp_path / "foo.nc").exists()
+        assert not (tmp_path / "foo.nc.sha256").exists()
+
+    def test_digest_url(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        handler.files["/SHA256SUMS"] = (
+            f"{hashlib.sha256(b'tides').hexdigest()}  bar.nc\n"
+            f"{hashlib.sha256(b'bathymetry').hexdigest()} *foo.nc\n"
+        ).encode()
+        digest = get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            digest_url=f"{url}/SHA256SUMS",
+        )
+        assert digest == hashlib.sha256(b"bathymetry").hexdigest()
+
+    def test_digest_url_without_file(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        handler.files["/SHA256SUMS"] = b"0123abcd  bar.nc\n"
+        with pytest.raises(WorkerError):
+            get_web_data(
+                f"{url}/foo.nc",
+                "test_worker",
+                tmp_path / "foo.nc",
+                digest_url=f"{url}/SHA256SUMS",
+            )
+
+    def test_resumed_download_digest(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.grib2"] = os.urandom(10_000)
+        handler.truncate["/foo.grib2"] = 4000
+        digest = get_web_data(
+            f"{url}/foo.grib2",
+            "test_worker",
+            tmp_path / "foo.grib2",
+            chunk_size=1000,
+            expected_digest=hashlib.sha256(handler.files["/foo.grib2"]).hexdigest(),
+        )
+        assert digest == hashlib.sha256(handler.files["/foo.grib2"]).hexdigest()
+        assert handler.requests[-1][1]["Range"] == "bytes=4000-"
+
+    def test_segmented_download_digest(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        digest = get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            chunk_size=1000,
+            segments=4,
+            hash_algorithm="blake2b",
+        )
+        assert digest == hashlib.blake2b(handler.files["/foo.nc"]).hexdigest()
+
+    def test_cached_file_digest_mismatch(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"bathymetry"
+        cache = WebDataCache(tmp_path / "cache")
+        get_web_data(f"{url}/foo.nc", "test_worker", tmp_path / "foo.nc", cache=cache)
+        (data_path,) = (tmp_path / "cache").glob("*.data")
+        data_path.unlink()
+        data_path.write_bytes(b"bathymetrx")
+        digest = get_web_data(
+            f"{url}/foo.nc",
+            "test_worker",
+            tmp_path / "foo.nc",
+            cache=cache,
+            expected_digest=hashlib.sha256(b"bathymetry").hexdigest(),
+        )
+        assert digest == hashlib.sha256(b"bathymetry").hexdigest()
+        assert (tmp_path / "foo.nc").read_bytes() == b"bathymetry"
+        assert m_sleep.call_count == 1
+
+    def test_give_up(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        with pytest.raises(WorkerError):
+            get_web_data(
+                f"{url}/missing.grib2",
+                "test_worker",
+                tmp_path / "missing.grib2",
+                wait_exponential_max=10,
+            )
+        assert m_sleep.call_count == 3
+
+
+@patch("nemo_nowcast.worker.time.sleep")
+class TestGetWebDataMany:
+    """Unit tests for get_web_data_many function."""
+
+    def test_manifest(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        for i in range(5):
+            handler.files[f"/{i}.grib2"] = b"grib" * (i + 1)
+        downloads = [(f"{url}/{i}.grib2", tmp_path / f"{i}.grib2") for i in range(5)]
+        downloads.append((f"{url}/missing.grib2", tmp_path / "missing.grib2"))
+        manifest = get_web_data_many(
+            downloads, "test_worker", max_workers=3, wait_exponential_max=5
+        )
+        assert [result["url"] for result in manifest] == [url for url, _ in downloads]
+        for i, result in enumerate(manifest[:5]):
+            assert result["status"] == "downloaded"
+            assert result["filepath"] == os.fspath(tmp_path / f"{i}.grib2")
+            assert result["bytes"] == 4 * (i + 1)
+            assert (tmp_path / f"{i}.grib2").read_bytes() == b"grib" * (i + 1)
+        assert manifest[5]["status"] == "failed"
+        assert "missing.grib2" in manifest[5]["error"]
+
+    def test_digests(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"netcdf"
+        manifest = get_web_data_many(
+            [(f"{url}/foo.nc", tmp_path / "foo.nc")],
+            "test_worker",
+            hash_algorithm="sha256",
+        )
+        assert manifest[0]["digest"] == hashlib.sha256(b"netcdf").hexdigest()
+
+    def test_str_filepaths(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"netcdf"
+        manifest = get_web_data_many(
+            [(f"{url}/foo.nc", os.fspath(tmp_path / "foo.nc"))], "test_worker"
+        )
+        assert manifest[0]["status"] == "downloaded"
+        assert (tmp_path / "foo.nc").read_bytes() == b"netcdf"
+
+    def test_resume(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        handler.files["/foo.grib2"] = os.urandom(10_000)
+        handler.truncate["/foo.grib2"] = 4000
+        manifest = get_web_data_many(
+            [(f"{url}/foo.grib2", tmp_path / "foo.grib2")],
+            "test_worker",
+            chunk_size=1000,
+        )
+        assert manifest[0]["bytes"] == 10_000
+        assert handler.requests[-1][1]["Range"] == "bytes=4000-"
+
+    def test_shared_session(self, m_sleep, web_server, tmp_path):
+        url, handler = web_server
+        for i in range(3):
+            handler.files[f"/{i}.grib2"] = b"grib"
+        m_session = Mock(name="session", wraps=requests.Session())
+        get_web_data_many(
+            [(f"{url}/{i}.grib2", tmp_path / f"{i}.grib2") for i in range(3)],
+            "test_worker",
+            session=m_session,
+        )
+        assert m_session.get.call_count == 3
+        assert not m_session.close.called
+
+
+@patch("nemo_nowcast.worker.time.sleep")
+class TestOpenWebData:
+    """Unit tests for open_web_data context manager."""
+
+    def test_read(self, m_sleep, web_server):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        with open_web_data(f"{url}/foo.nc", "test_worker") as f:
+            assert f.read() == handler.files["/foo.nc"]
+        assert f.closed
+
+    def test_stream_parse_spilled_content(self, m_sleep, web_server):
+        url, handler = web_server
+        rows = [[str(i), str(i * i)] for i in range(1000)]
+        handler.files["/obs.csv"] = "".join(f"{i},{j}\n" for i, j in rows).encode()
+        with open_web_data(f"{url}/obs.csv", "test_worker", max_memory=1000) as f:
+            assert list(csv.reader(io.TextIOWrapper(f, encoding="utf-8"))) == rows
+
+    def test_retry_resumes(self, m_sleep, web_server):
+        url, handler = web_server
+        handler.files["/foo.nc"] = os.urandom(10_000)
+        handler.truncate["/foo.nc"] = 4000
+        with open_web_data(f"{url}/foo.nc", "test_worker", chunk_size=1000) as f:
+            assert f.read() == handler.files["/foo.nc"]
+        assert m_sleep.call_count == 1
+        assert handler.requests[-1][1]["Range"] == "bytes=4000-"
+
+    def test_content_changed_before_resume(self, m_sleep, web_server):
+        url, handler = web_server
+        handler.files["/foo.nc"] = b"old" * 1000
+        handler.truncate["/foo.nc"] = 1000
+
+        def _change_content(seconds):
+            handler.files["/foo.nc"] = b"new" * 500
+
+        m_sleep.side_effect = _change_content
+        with open_web_data(f"{url}/foo.nc", "test_worker", chunk_size=100) as f:
+            assert f.read() == b"new" * 500
+
+    def test_give_up(self, m_sleep, web_server):
+        url, handler = web_server
+        with pytest.raises(WorkerError):
+            with open_web_data(
+                f"{url}/missing.nc", "test_worker", wait_exponential_max=10
+            ):
+                pass
+        assert m_sleep.call_count == 3
+
+
+class TestManifestDigest:
+    """Unit tests for _manifest_digest function."""
+
+    def test_sha256sum_format(self):
+        text = "0123ABCD  bar.nc\n4567cdef  foo.nc\n"
+        assert _manifest_digest(text, "foo.nc") == "4567cdef"
+
+    def test_binary_mode(self):
+        assert _manifest_digest("4567cdef *foo.nc\n", "foo.nc") == "4567cdef"
+
+    def test_digest_only(self):
+        assert _manifest_digest("4567CDEF\n", "foo.nc") == "4567cdef"
+
+    def test_not_in_manifest(self):
+        assert _manifest_digest("0123abcd  bar.nc\n", "foo.nc") is None
@@ -0,0 +1,82 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for nemo_nowcast.yamlutils module."""
+
+import datetime
+import io
+from pathlib import Path
+
+import pytest
+import yaml
+
+from nemo_nowcast import yamlutils
+
+
+class TestLoaderDumper:
+    """Unit tests for the choice of YAML loader and dumper classes."""
+
+    def test_libyaml(self):
+        assert yamlutils.LIBYAML == yaml.__with_libyaml__
+
+    def test_safe_loader(self):
+        assert issubclass(yamlutils.SafeLoader, yaml.constructor.SafeConstructor)
+
+    def test_safe_dumper(self):
+        assert issubclass(yamlutils.SafeDumper, yaml.representer.SafeRepresenter)
+
+
+class TestSafeLoad:
+    """Unit tests for yamlutils.safe_load function."""
+
+    def test_load_str(self):
+        assert yamlutils.safe_load("foo: [1, 2]\nbar: 2026-10-17\n") == {
+            "foo": [1, 2],
+            "bar": datetime.date(2026, 10, 17),
+        }
+
+    def test_load_stream(self):
+        assert yamlutils.safe_load(io.StringIO("foo: bar\n")) == {"foo": "bar"}
+
+    def test_refuses_python_tags(self):
+        with pytest.raises(yaml.constructor.ConstructorError):
+            yamlutils.safe_load("!!python/object/apply:os.getcwd []\n")
+
+    def test_load_example_config(self):
+        example = (
+            Path(__file__).parent.parent / "docs/nowcast_system/example_nowcast.yaml"
+        )
+        with example.open("rt") as f:
+            config = yamlutils.safe_load(f)
+        with example.open("rt") as f:
+            assert config == yaml.safe_load(f)
+
+
+class TestDump:
+    """Unit tests for yamlutils.dump function."""
+
+    def test_dump_returns_str(self):
+        assert yamlutils.dump({"foo": "bar"}) == "foo: bar\n"
+
+    def test_dump_to_stream(self):
+        stream = io.StringIO()
+        yamlutils.dump({"foo": "bar"}, stream)
+        assert stream.getvalue() == "foo: bar\n"
+
+    def test_tuple_dumped_as_list(self):
+        assert yaml.safe_load(yamlutils.dump({"foo": (1, 2)})) == {"foo": [1, 2]}
+
+    def test_round_trip(self):
+        data = {"00 forecast": True, "files": ["a.grib2", "b.grib2"], 6: None}
+        assert yamlutils.safe_load(yamlutils.dump(data)) == data
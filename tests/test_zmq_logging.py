@@ -0,0 +1,268 @@
+# Copyright 2016 – present Doug Latornell, 43ravens
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Unit tests for zmq_logging module."""
+
+import json
+import logging
+import sys
+from unittest.mock import Mock, patch
+
+import pytest
+import zmq.log.handlers
+
+from nemo_nowcast import zmq_logging
+
+
+def _record(msg="message", level=logging.INFO, exc_info=None, **extra):
+    record = logging.LogRecord(
+        "run_NEMO", level, "run_NEMO.py", 42, msg, None, exc_info
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJSONFormatter:
+    """Unit tests for nemo_nowcast.zmq_logging.JSONFormatter class."""
+
+    def test_fields(self):
+        record = _record(worker_msg={"run date": "2026-10-17"}, cmd="run")
+        data = json.loads(zmq_logging.JSONFormatter().format(record))
+        assert data["created"] == record.created
+        assert data["level"] == "INFO"
+        assert data["logger"] == "run_NEMO"
+        assert data["host"] == zmq_logging._HOSTNAME
+        assert data["pid"] == record.process
+        assert data["message"] == "message"
+        assert data["extra"] == {"worker_msg": {"run date": "2026-10-17"}, "cmd": "run"}
+        assert "exc_info" not in data
+
+    def test_logger_name_attribute(self):
+        record = _record(logger_name="watch_NEMO")
+        data = json.loads(zmq_logging.JSONFormatter().format(record))
+        assert data["logger"] == "watch_NEMO"
+        assert "extra" not in data
+
+    def test_exc_info(self):
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            record = _record(exc_info=sys.exc_info())
+        data = json.loads(zmq_logging.JSONFormatter().format(record))
+        assert data["exc_info"].endswith("ValueError: bad value")
+
+    def test_unserializable_extra(self):
+        record = _record(path=zmq_logging)
+        data = json.loads(zmq_logging.JSONFormatter().format(record))
+        assert data["extra"]["path"] == str(zmq_logging)
+
+    def test_single_line(self):
+        text = zmq_logging.JSONFormatter().format(_record("line 1\nline 2"))
+        assert "\n" not in text
+
+    def test_wire(self):
+        text = zmq_logging.JSONFormatter(wire=True).format(_record())
+        assert text.startswith(zmq_logging.RECORD_SEPARATOR)
+        assert text.endswith("}\n")
+
+
+@pytest.fixture
+def xpub_handler():
+    context = zmq.Context()
+    handler = zmq_logging.XPUBHandler("tcp://127.0.0.1:*", context)
+    yield handler
+    handler.socket.close(linger=0)
+    context.term()
+
+
+def _subscribe(handler):
+    sub = handler.socket.context.socket(zmq.SUB)
+    sub.connect(handler.socket.getsockopt_string(zmq.LAST_ENDPOINT))
+    sub.setsockopt_string(zmq.SUBSCRIBE, "")
+    return sub
+
+
+class TestXPUBHandler:
+    """Unit tests for nemo_nowcast.zmq_logging.XPUBHandler class."""
+
+    def test_xpub_socket(self, xpub_handler):
+        assert xpub_handler.socket.type == zmq.XPUB
+
+    def test_socket(self):
+        m_socket = Mock(name="socket", spec=zmq.Socket)
+        handler = zmq_logging.XPUBHandler(m_socket)
+        assert handler.socket is m_socket
+
+    def test_bind_error(self, xpub_handler):
+        addr = xpub_handler.socket.getsockopt_string(zmq.LAST_ENDPOINT)
+        with pytest.raises(zmq.ZMQError):
+            zmq_logging.XPUBHandler(addr, xpub_handler.socket.context)
+
+    def test_no_subscriber(self, xpub_handler):
+        assert not xpub_handler.wait_for_subscriber(0.01)
+
+    def test_subscriber(self, xpub_handler):
+        sub = _subscribe(xpub_handler)
+        try:
+            assert xpub_handler.wait_for_subscriber(5)
+            xpub_handler.root_topic = "test_worker"
+            xpub_handler.emit(_record())
+            assert sub.poll(5000)
+            topic, message = sub.recv_multipart()
+        finally:
+            sub.close(linger=0)
+        assert topic == b"test_worker.INFO"
+        assert message == b"message\n"
+
+    def test_subscribed_no_wait(self, xpub_handler):
+        xpub_handler.subscribed = True
+        with patch.object(xpub_handler.socket, "poll", return_value=0) as m_poll:
+            assert xpub_handler.wait_for_subscriber(5)
+        m_poll.assert_called_once_with(0)
+
+
+class TestUseXPUBHandler:
+    """Unit tests for nemo_nowcast.zmq_logging.use_xpub_handler function."""
+
+    def test_pub_handler(self):
+        handler_config = {"class": "zmq.log.handlers.PUBHandler", "level": "DEBUG"}
+        zmq_logging.use_xpub_handler(handler_config)
+        assert handler_config == {
+            "class": zmq_logging.XPUB_HANDLER_CLASS,
+            "level": "DEBUG",
+        }
+
+    def test_other_handler(self):
+        handler_config = {"class": "mypkg.PUBHandler"}
+        zmq_logging.use_xpub_handler(handler_config)
+        assert handler_config == {"class": "mypkg.PUBHandler"}
+
+
+class TestWaitForSubscribers:
+    """Unit tests for nemo_nowcast.zmq_logging.wait_for_subscribers function."""
+
+    def test_xpub_handlers(self):
+        m_handlers = [
+            Mock(name="subscribed", spec=zmq_logging.XPUBHandler),
+            Mock(name="unsubscribed", spec=zmq_logging.XPUBHandler),
+        ]
+        m_handlers[0].wait_for_subscriber.return_value = True
+        m_handlers[1].wait_for_subscriber.return_value = False
+        root = Mock(handlers=m_handlers)
+        assert not zmq_logging.wait_for_subscribers(root, 0.25)
+        for m_handler in m_handlers:
+            m_handler.wait_for_subscriber.assert_called_once_with(0.25)
+
+    @patch("nemo_nowcast.zmq_logging.time.sleep")
+    def test_pub_handler(self, m_sleep):
+        root = Mock(handlers=[Mock(spec=zmq.log.handlers.PUBHandler)])
+        assert zmq_logging.wait_for_subscribers(root, 0.25)
+        m_sleep.assert_called_once_with(0.25)
+
+    @patch("nemo_nowcast.zmq_logging.time.sleep")
+    def test_other_handlers(self, m_sleep):
+        root = Mock(handlers=[logging.StreamHandler()])
+        assert zmq_logging.wait_for_subscribers(root, 0.25)
+        assert not m_sleep.called
+
+
+class TestConfigurePubHandlers:
+    """Unit tests for nemo_nowcast.zmq_logging.configure_pub_handlers function."""
+
+    def test_text(self):
+        m_handler = Mock(name="m_zmq_handler", spec=zmq.log.handlers.PUBHandler)
+        root = Mock(handlers=[m_handler, Mock(name="file_handler")])
+        zmq_logging.configure_pub_handlers(root, "run_NEMO")
+        assert m_handler.root_topic == "run_NEMO"
+        assert set(m_handler.formatters) == set(zmq_logging._LEVELS)
+        for formatter in m_handler.formatters.values():
+            assert formatter._fmt == "%(message)s\n"
+
+    def test_json(self):
+        m_handler = Mock(name="m_zmq_handler", spec=zmq.log.handlers.PUBHandler)
+        zmq_logging.configure_pub_handlers(
+            Mock(handlers=[m_handler]), "run_NEMO", "json"
+        )
+        for formatter in m_handler.formatters.values():
+            assert isinstance(formatter, zmq_logging.JSONFormatter)
+            assert formatter.wire
+
+    def test_invalid_log_format(self):
+        with pytest.raises(ValueError):
+            zmq_logging.configure_pub_handlers(Mock(handlers=[]), "run_NEMO", "xml")
+
+
+class TestMakeRecord:
+    """Unit tests for nemo_nowcast.zmq_logging.make_record function."""
+
+    def test_is_json_message(self):
+        message = zmq_logging.JSONFormatter(wire=True).format(_record()).encode()
+        assert zmq_logging.is_json_message(message)
+        assert not zmq_logging.is_json_message(b"message\n")
+
+    def test_round_trip(self):
+        published = _record(
+            "run %s", level=logging.WARNING, worker_msg={"run date": "2026-10-17"}
+        )
+        published.args = ("NEMO",)
+        published.process = 4242
+        message = zmq_logging.JSONFormatter(wire=True).format(published).encode()
+        record = zmq_logging.make_record(logging.getLogger("log_aggregator"), message)
+        assert record.name == "log_aggregator"
+        assert record.levelno == logging.WARNING
+        assert record.getMessage() == "run NEMO"
+        assert record.created == published.created
+        assert record.msecs == pytest.approx(published.msecs, abs=1)
+        assert record.process == 4242
+        assert record.logger_name == "run_NEMO"
+        assert record.host == zmq_logging._HOSTNAME
+        assert record.worker_msg == {"run date": "2026-10-17"}
+        assert record.exc_text is None
+
+    def test_logger_name(self):
+        message = zmq_logging.JSONFormatter(wire=True).format(_record()).encode()
+        record = zmq_logging.make_record(
+            logging.getLogger("log_aggregator"), message, "nowcast_worker"
+        )
+        assert record.logger_name == "nowcast_worker"
+
+    def test_exc_text(self):
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            published = _record(exc_info=sys.exc_info())
+        message = zmq_logging.JSONFormatter(wire=True).format(published).encode()
+        record = zmq_logging.make_record(logging.getLogger("log_aggregator"), message)
+        assert record.exc_text.endswith("ValueError: bad value")
+        formatted = logging.Formatter("%(message)s").format(record)
+        assert formatted.endswith("ValueError: bad value")
+
+    def test_reserved_extra_ignored(self):
+        message = (
+            zmq_logging.RECORD_SEPARATOR
+            + json.dumps(
+                {
+                    "created": 0.0,
+                    "level": "INFO",
+                    "logger": "run_NEMO",
+                    "host": "arbutus",
+                    "pid": 1,
+                    "message": "message",
+                    "extra": {"levelno": 50, "cmd": "run"},
+                }
+            )
+        ).encode()
+        record = zmq_logging.make_record(logging.getLogger("log_aggregator"), message)
+        assert record.levelno == logging.INFO
+        assert record.cmd == "run"
@@ -14,12 +14,18 @@
 
 """Unit tests for nemo_nowcast.workers.rotate_logs module."""
 
+import bz2
+import gzip
 import logging.handlers
+import lzma
+import os
+import time
 from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
 
+from nemo_nowcast import WorkerError
 from nemo_nowcast.workers import rotate_logs
 
 
@@ -120,3 +126,199 @@ class TestRotateLogs:
         parsed_args, config = SimpleNamespace(), {"logging": {}}
         checklist = rotate_logs.rotate_logs(parsed_args, config)
         assert checklist == {"log files": [tmpfile.strpath]}
+
+
+@patch("nemo_nowcast.workers.rotate_logs.logging.config.dictConfig")
+@patch("nemo_nowcast.workers.rotate_logs.logger")
+class TestRotateLogsCompression:
+    """Unit tests for rotate_logs function with compression of rotated log files."""
+
+    @staticmethod
+    def _handler(path, text="log message\n" * 1000):
+        handler = logging.handlers.RotatingFileHandler(os.fspath(path), backupCount=3)
+        handler.stream.write(text)
+        return handler
+
+    @pytest.mark.parametrize(
+        "compression, opener",
+        [("gzip", gzip.open), ("bz2", bz2.open), ("xz", lzma.open)],
+    )
+    def test_compressed(self, m_logger, m_dictConfig, compression, opener, tmp_path):
+        handler = self._handler(tmp_path / "nowcast.log")
+        m_logger.root.handlers = [handler]
+        config = {"logging": {}, "rotate logs": {"compression": compression}}
+        checklist = rotate_logs.rotate_logs(SimpleNamespace(), config)
+        handler.close()
+        extension = rotate_logs.COMPRESSION_EXTENSIONS[compression]
+        backup = tmp_path / f"nowcast.log.1{extension}"
+        with opener(backup, "rt") as f:
+            assert f.read() == "log message\n" * 1000
+        assert checklist["log files"] == [os.fspath(tmp_path / "nowcast.log")]
+        assert checklist["bytes saved"] == 12000 - backup.stat().st_size
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "nowcast.log",
+            f"nowcast.log.1{extension}",
+        ]
+
+    def test_backups_shifted(self, m_logger, m_dictConfig, tmp_path):
+        config = {"logging": {}, "rotate logs": {"compression": "gzip"}}
+        for day in ("day 1\n", "day 2\n"):
+            handler = self._handler(tmp_path / "nowcast.log", day)
+            m_logger.root.handlers = [handler]
+            rotate_logs.rotate_logs(SimpleNamespace(), config)
+            handler.close()
+        with gzip.open(tmp_path / "nowcast.log.1.gz", "rt") as f:
+            assert f.read() == "day 2\n"
+        with gzip.open(tmp_path / "nowcast.log.2.gz", "rt") as f:
+            assert f.read() == "day 1\n"
+
+    def test_multiple_handlers(self, m_logger, m_dictConfig, tmp_path):
+        handlers = [
+            self._handler(tmp_path / "nowcast.log"),
+            self._handler(tmp_path / "nowcast.debug.log"),
+        ]
+        m_logger.root.handlers = handlers
+        config = {
+            "logging": {},
+            "rotate logs": {"compression": "gzip", "compression threads": 2},
+        }
+        checklist = rotate_logs.rotate_logs(SimpleNamespace(), config)
+        for handler in handlers:
+            handler.close()
+        assert (tmp_path / "nowcast.log.1.gz").exists()
+        assert (tmp_path / "nowcast.debug.log.1.gz").exists()
+        assert checklist["bytes saved"] > 0
+
+    def test_missing_log_file(self, m_logger, m_dictConfig, tmp_path):
+        handler = self._handler(tmp_path / "nowcast.log")
+        rotated = []
+        rotate_logs._compress_on_rollover(handler, "gzip", rotated)
+        handler.rotator(
+            os.fspath(tmp_path / "missing.log"),
+            os.fspath(tmp_path / "missing.log.1.gz"),
+        )
+        handler.close()
+        assert rotated == []
+
+    def test_invalid_compression(self, m_logger, m_dictConfig):
+        m_logger.root.handlers = []
+        config = {"logging": {}, "rotate logs": {"compression": "rar"}}
+        with pytest.raises(WorkerError):
+            rotate_logs.rotate_logs(SimpleNamespace(), config)
+
+    def test_zstd_unavailable_before_rollover(self, m_logger, m_dictConfig, tmp_path):
+        handler = self._handler(tmp_path / "nowcast.log")
+        m_logger.root.handlers = [handler]
+        config = {"logging": {}, "rotate logs": {"compression": "zstd"}}
+        with patch(
+            "nemo_nowcast.workers.rotate_logs._zstd_module",
+            side_effect=WorkerError("zstd compression requires Python 3.14 or later"),
+        ):
+            with pytest.raises(WorkerError):
+                rotate_logs.rotate_logs(SimpleNamespace(), config)
+        handler.close()
+        assert [p.name for p in tmp_path.iterdir()] == ["nowcast.log"]
+
+    def test_compression_failure(self, m_logger, m_dictConfig, tmp_path):
+        handlers = [
+            self._handler(tmp_path / "nowcast.log"),
+            self._handler(tmp_path / "nowcast.debug.log"),
+        ]
+        m_logger.root.handlers = handlers
+        config = {"logging": {}, "rotate logs": {"compression": "gzip"}}
+        compress = rotate_logs._compress
+
+        def _compress(uncompressed, *args):
+            if "debug" in os.fspath(uncompressed):
+                raise OSError("disk full")
+            return compress(uncompressed, *args)
+
+        with patch("nemo_nowcast.workers.rotate_logs._compress", _compress):
+            checklist = rotate_logs.rotate_logs(SimpleNamespace(), config)
+        for handler in handlers:
+            handler.close()
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "nowcast.debug.log",
+            "nowcast.debug.log.1",
+            "nowcast.log",
+            "nowcast.log.1.gz",
+        ]
+        assert checklist["bytes saved"] > 0
+        assert m_logger.error.called
+
+    def test_retention(self, m_logger, m_dictConfig, tmp_path):
+        m_logger.root.handlers = [self._handler(tmp_path / "nowcast.log")]
+        (tmp_path / "nowcast.log.2").write_text("old")
+        old_time = time.time() - 40 * 86400
+        os.utime(tmp_path / "nowcast.log.2", (old_time, old_time))
+        config = {"logging": {}, "rotate logs": {"max backup age days": 30}}
+        checklist = rotate_logs.rotate_logs(SimpleNamespace(), config)
+        m_logger.root.handlers[0].close()
+        # nowcast.log.2 was shifted to nowcast.log.3 by the rotation
+        assert checklist["deleted files"] == [os.fspath(tmp_path / "nowcast.log.3")]
+        assert "bytes saved" not in checklist
+
+
+class TestCompress:
+    """Unit tests for _compress function."""
+
+    def test_zstd_unavailable(self, tmp_path):
+        try:
+            from compression import zstd
+        except ImportError:
+            pass
+        else:
+            pytest.skip("zstd compression is available")
+        (tmp_path / "nowcast.log.1.zst.uncompressed").write_text("log message")
+        with pytest.raises(WorkerError):
+            rotate_logs._compress(
+                tmp_path / "nowcast.log.1.zst.uncompressed",
+                tmp_path / "nowcast.log.1.zst",
+                "zstd",
+            )
+
+    def test_mode_preserved(self, tmp_path):
+        uncompressed = tmp_path / "nowcast.log.1.gz.uncompressed"
+        uncompressed.write_text("log message")
+        uncompressed.chmod(0o664)
+        rotate_logs._compress(uncompressed, tmp_path / "nowcast.log.1.gz", "gzip")
+        assert (tmp_path / "nowcast.log.1.gz").stat().st_mode & 0o777 == 0o664
+        assert not uncompressed.exists()
+
+
+@patch("nemo_nowcast.workers.rotate_logs.logger")
+class TestApplyRetention:
+    """Unit tests for _apply_retention function."""
+
+    @staticmethod
+    def _backups(tmp_path, sizes):
+        now = time.time()
+        paths = []
+        for i, size in enumerate(sizes, start=1):
+            path = tmp_path / f"nowcast.log.{i}.gz"
+            path.write_bytes(b"x" * size)
+            os.utime(path, (now - i * 86400, now - i * 86400))
+            paths.append(path)
+        return paths
+
+    def test_max_age(self, m_logger, tmp_path):
+        paths = self._backups(tmp_path, [10] * 5)
+        deleted = rotate_logs._apply_retention(
+            tmp_path / "nowcast.log", max_age_days=3.5
+        )
+        assert deleted == [os.fspath(paths[3]), os.fspath(paths[4])]
+        assert [path.exists() for path in paths] == [True, True, True, False, False]
+
+    def test_max_megabytes(self, m_logger, tmp_path):
+        paths = self._backups(tmp_path, [512 * 1024] * 4)
+        rotate_logs._apply_retention(tmp_path / "nowcast.log", max_megabytes=1)
+        assert [path.exists() for path in paths] == [True, True, False, False]
+
+    def test_other_files_kept(self, m_logger, tmp_path):
+        (tmp_path / "nowcast.log").write_text("current")
+        (tmp_path / "nowcast.debug.log.1").write_text("other log")
+        (tmp_path / "nowcast.log.1.gz.uncompressed").write_text("uncompressed")
+        deleted = rotate_logs._apply_retention(
+            tmp_path / "nowcast.log", max_age_days=0, max_megabytes=0
+        )
+        assert deleted == []